@@ -0,0 +1,107 @@
+"""Search API benchmark.
+
+Measure the encoding throughput of products as JSON, and the time and peak memory of NDJSON exports streamed by the
+search API against a local Typesense stub, compared with a body built at once (run it with several numbers of
+products to see the memory of streamed exports stay flat):
+
+    python -m benchmarks.bench_api --products 5000 --latency-ms 2
+"""
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+
+from django.http import HttpRequest
+from django.http import StreamingHttpResponse
+
+from benchmarks.suite import memory_per_call
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.product_json import ProductJsonEncoder
+from store_catalog.domain.model import Product
+
+FIELDS: tuple[str, ...] = ('sku', 'title', 'price', 'stock', 'num_purchases', 'model.manufacturer.title')
+
+
+def products_per_second(encode: Callable[[Product], Any], products: list[Product], rounds: int = 5) -> float:
+    start: float = time.perf_counter()
+    for _ in range(rounds):
+        for product in products:
+            encode(product)
+    return len(products) * rounds / (time.perf_counter() - start)
+
+
+def bench_encoders(products: list[Product]) -> dict:
+    encoder: ProductJsonEncoder = ProductJsonEncoder()
+    return {
+        'json_dumps_products_per_second': products_per_second(
+            lambda product: json.dumps(product.model_dump(mode='json', by_alias=True)).encode(),
+            products,
+        ),
+        'encoder_products_per_second': products_per_second(encoder.product, products),
+    }
+
+
+def bench_export(fields: str, calls: int) -> dict:
+    from django.test import RequestFactory
+
+    from djangoproject.catalog.views import catalog_api_export
+    from djangoproject.django_project import container
+
+    request: HttpRequest = RequestFactory().get('/api/products/export', {'fields': fields})
+
+    def streamed() -> int:
+        response: StreamingHttpResponse = cast(StreamingHttpResponse, catalog_api_export(request))
+        return sum(len(chunk) for chunk in cast(Iterator[bytes], response.streaming_content))
+
+    def built() -> int:
+        products: list[Product] = list(container.product_searcher().iter_all(q='*', fields=FIELDS))
+        return len('\n'.join(json.dumps(product.model_dump(mode='json', by_alias=True)) for product in products))
+
+    start: float = time.perf_counter()
+    body_bytes: int = streamed()
+    return {
+        'body_kib': body_bytes / 1024,
+        'streamed_seconds': time.perf_counter() - start,
+        'streamed_memory': memory_per_call(streamed, calls),
+        'built_memory': memory_per_call(built, calls),
+    }
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=5000, help='products exported')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='stub delay before every response')
+    parser.add_argument('--calls', type=int, default=3, help='exports measured for memory')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(products=args.products, latency_ms=args.latency_ms) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+            'SEARCH_CACHE_BACKEND': 'none',
+            'ALLOWED_HOSTS': '*',
+        })
+        import django
+
+        django.setup()
+        from djangoproject.django_project import container
+
+        results: dict = {
+            'benchmark': 'api',
+            'parameters': vars(args),
+            'encoding': bench_encoders(list(container.product_repository().iter_all(q='*'))),
+            'export': bench_export(','.join(FIELDS), args.calls),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
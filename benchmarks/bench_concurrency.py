@@ -0,0 +1,108 @@
+"""Concurrency benchmark.
+
+Compare the throughput of the sync catalog view served by a pool of worker threads (WSGI) and the async catalog view
+served by one event loop (ASGI), against a local Typesense stub answering after a fixed latency:
+
+    python -m benchmarks.bench_concurrency --requests 2000 --latency-ms 20 --threads 8 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.typesense_stub import typesense_stub
+
+
+def latency_results(latencies: list[float], elapsed_seconds: float) -> dict:
+    latencies_ms: list[float] = sorted(latency * 1000 for latency in latencies)
+    return {
+        'requests_per_second': len(latencies) / elapsed_seconds,
+        'latency_p50_ms': statistics.median(latencies_ms),
+        'latency_p90_ms': latencies_ms[int(len(latencies_ms) * 0.9) - 1],
+        'latency_p99_ms': latencies_ms[int(len(latencies_ms) * 0.99) - 1],
+    }
+
+
+def bench_sync(view: Callable, request: object, requests: int, threads: int) -> dict:
+    def timed_request(_: int) -> float:
+        start: float = time.perf_counter()
+        view(request)
+        return time.perf_counter() - start
+
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies: list[float] = list(executor.map(timed_request, range(requests)))
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+async def bench_async(view: Callable[..., Awaitable], request: object, requests: int, concurrency: int) -> dict:
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_request() -> float:
+        async with semaphore:
+            start: float = time.perf_counter()
+            await view(request)
+            return time.perf_counter() - start
+
+    start: float = time.perf_counter()
+    latencies: list[float] = list(await asyncio.gather(*(timed_request() for _ in range(requests))))
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--threads', type=int, default=8, help='worker threads of the sync (WSGI) server')
+    parser.add_argument('--concurrency', type=int, default=200, help='requests in flight of the async (ASGI) server')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(latency_ms=args.latency_ms) as port:
+        # Settings are read from environment when the container is loaded, search results must not be cached
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+            'TYPESENSE_POOL_SIZE': str(args.threads),
+            'TYPESENSE_ASYNC_POOL_SIZE': str(args.concurrency),
+            'SEARCH_CACHE_BACKEND': 'none',
+            'SINGLE_FLIGHT_BACKEND': 'none',
+        })
+        import django
+        from django.test import RequestFactory
+
+        django.setup()
+        from djangoproject.catalog.views import catalog_list
+        from djangoproject.catalog.views import catalog_list_async
+
+        request: object = RequestFactory().get('/', {'query': 'product'})
+        results: dict = {
+            'benchmark': 'concurrency',
+            'requests': args.requests,
+            'latency_ms': args.latency_ms,
+            'sync_wsgi': {
+                'threads': args.threads,
+                **bench_sync(catalog_list, request, args.requests, args.threads),
+            },
+            'async_asgi': {
+                'concurrency': args.concurrency,
+                **asyncio.run(bench_async(catalog_list_async, request, args.requests, args.concurrency)),
+            },
+        }
+
+    results['speedup'] = results['async_asgi']['requests_per_second'] / results['sync_wsgi']['requests_per_second']
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""In-memory repository benchmark.
+
+Measure load time, memory and search latency percentiles of the in-memory product repository with a synthetic
+catalog scaled up to any number of products:
+
+    python -m benchmarks.bench_in_memory --products 1000000 --calls 200
+"""
+
+import argparse
+import gc
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.catalog_documents import CATALOG_DIR
+from benchmarks.catalog_documents import scaled_product_documents
+from benchmarks.suite import timed_calls
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+
+SEARCHES: dict[str, dict] = {
+    'all_by_purchases': {'q': '*', 'sort_by': 'num_purchases:desc'},
+    'filtered_by_price': {'q': '*', 'filter_by': 'stock:true && price:[100..500]', 'sort_by': 'price:asc'},
+    'text': {'q': 'honeywell', 'query_by': 'title'},
+    'text_prefix_filtered': {'q': 'termica dir', 'filter_by': 'stock:true', 'sort_by': 'num_purchases:desc'},
+    'sku_prefix': {'q': 'PC45D', 'query_by': 'sku'},
+}
+
+
+def write_catalog(catalog_dir: Path, products: int) -> None:
+    """Copy the catalog files with the products scaled up, without joined references."""
+    for catalog_file in CATALOG_DIR.glob('*.jsonl'):
+        if catalog_file.name != 'products.jsonl':
+            shutil.copy(catalog_file, catalog_dir / catalog_file.name)
+    with (catalog_dir / 'products.jsonl').open('w', encoding='utf-8') as products_file:
+        for document in scaled_product_documents(products):
+            document.pop('product_models')
+            products_file.write(json.dumps(document) + '\n')
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=20)
+    args: argparse.Namespace = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        write_catalog(Path(catalog_dir), args.products)
+        repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir)
+        gc.collect()
+        tracemalloc.start()
+        start: float = time.perf_counter()
+        sku: str = repository.catalog.skus[-1]
+        load_seconds: float = time.perf_counter() - start
+        gc.collect()
+        memory_bytes: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        results: dict = {
+            'benchmark': 'in_memory',
+            'products': args.products,
+            'load_seconds': load_seconds,
+            'memory_mib': memory_bytes / 1024 / 1024,
+            'get': timed_calls(lambda: repository.get(sku), args.calls),
+            **{
+                name: timed_calls(lambda: repository.list_page(per_page=args.per_page, **search), args.calls)
+                for name, search in SEARCHES.items()
+            },
+        }
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Mapper benchmark.
+
+Compare validated and trusted mapping of Typesense product documents to Product domain models on search pages:
+
+    python -m benchmarks.bench_mapper --page-size 250 --pages 200
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from benchmarks.catalog_documents import scaled_product_documents
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.domain.model import Product
+
+
+def bench(mapper: Callable[[dict], Product], documents: list[dict], pages: int) -> dict:
+    start: float = time.perf_counter()
+    for _ in range(pages):
+        [mapper(document) for document in documents]
+    elapsed_seconds: float = time.perf_counter() - start
+
+    return {
+        'page_ms': elapsed_seconds / pages * 1000,
+        'products_per_second': len(documents) * pages / elapsed_seconds,
+    }
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=250)
+    parser.add_argument('--pages', type=int, default=200)
+    args: argparse.Namespace = parser.parse_args()
+
+    documents: list[dict] = list(scaled_product_documents(args.page_size))
+    results: dict = {
+        'benchmark': 'mapper',
+        'page_size': args.page_size,
+        'validated': bench(TypesenseProductRepository._product_document_to_product, documents, args.pages),
+        'trusted': bench(TypesenseProductRepository._product_document_to_trusted_product, documents, args.pages),
+    }
+    results['speedup'] = results['validated']['page_ms'] / results['trusted']['page_ms']
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Product batch benchmark.
+
+Measure the memory kept by every product of a bulk read (every page of a search got from a local Typesense stub and
+kept, e.g. a large listing), as a list of Product domain models and as a compact ProductBatch, with categories and
+manufacturers joined by every search or shared from the dimension cache, and the time to encode them as NDJSON:
+
+    python -m benchmarks.bench_product_batch --rows 10000 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sized
+from itertools import islice
+from typing import TypeVar
+
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.dimension_cache import DimensionCache
+from store_catalog.adapters.product_batch import ProductBatch
+from store_catalog.adapters.product_json import ProductJsonEncoder
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.domain.model import Product
+
+SizedT = TypeVar('SizedT', bound=Sized)
+
+
+def products_list(repository: TypesenseProductRepository, rows: int) -> list[Product]:
+    return list(islice(repository.iter_all(q='*'), rows))
+
+
+def products_batch(repository: TypesenseProductRepository, rows: int) -> ProductBatch:
+    batch: ProductBatch = ProductBatch()
+    for page_batch in repository.iter_batches(q='*'):
+        batch.extend(page_batch[:rows - len(batch)])
+        if len(batch) >= rows:
+            break
+    return batch
+
+
+def kept_bytes(read: Callable[[], SizedT]) -> tuple[SizedT, float]:
+    """Products of a read with the memory they keep per product, traced with tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    baseline_bytes: int = tracemalloc.get_traced_memory()[0]
+    products: SizedT = read()
+    gc.collect()
+    product_bytes: float = (tracemalloc.get_traced_memory()[0] - baseline_bytes) / len(products)
+    tracemalloc.stop()
+    return products, product_bytes
+
+
+def bench_read(read: Callable[[], SizedT], encode: Callable[[SizedT], Iterable[bytes]]) -> dict:
+    """Memory kept per product by a read, and time to encode its products as NDJSON."""
+    products, product_bytes = kept_bytes(read)
+    start: float = time.perf_counter()
+    for _ in encode(products):
+        pass
+    return {'bytes_per_product': product_bytes, 'ndjson_ms': (time.perf_counter() - start) * 1000}
+
+
+def bench_rows(repository: TypesenseProductRepository, rows: int) -> dict:
+    encoder: ProductJsonEncoder = ProductJsonEncoder()
+    results: dict = {
+        'list': bench_read(lambda: products_list(repository, rows), encoder.ndjson_chunks),
+        'batch': bench_read(
+            lambda: products_batch(repository, rows),
+            lambda batch: encoder.batches_ndjson_chunks([batch]),
+        ),
+    }
+    results['memory_ratio'] = results['list']['bytes_per_product'] / results['batch']['bytes_per_product']
+    return results
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000], help='products kept by a read')
+    parser.add_argument('--trusted', action='store_true', help='map trusted documents without validation')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(products=max(args.rows)) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+        })
+        from djangoproject.django_project import container
+
+        results: dict = {'benchmark': 'product_batch', 'parameters': vars(args)}
+        for name, dimension_cache in (('joined', None), ('dimension_cache', DimensionCache())):
+            repository: TypesenseProductRepository = TypesenseProductRepository(
+                session_factory=container.typesense_database().session,
+                trusted=args.trusted,
+                dimension_cache=dimension_cache,
+            )
+            results[name] = {str(rows): bench_rows(repository, rows) for rows in args.rows}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
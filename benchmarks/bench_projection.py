@@ -0,0 +1,90 @@
+"""Projection benchmark.
+
+Compare the response size, JSON decoding and mapping time of search pages with every product field, with every
+field assembled from cached dimensions instead of joined, and with the fields of the catalog list projection:
+
+    python -m benchmarks.bench_projection --page-size 20 --pages 500
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from benchmarks.catalog_documents import dimension_documents
+from benchmarks.catalog_documents import scaled_product_documents
+from benchmarks.typesense_stub import project_document
+from djangoproject.catalog.views import CATALOG_LIST_FIELDS
+from store_catalog.adapters.dimension_cache import DimensionCache
+from store_catalog.adapters.dimension_cache import Dimensions
+from store_catalog.adapters.product_projection import ProductProjection
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.domain.model import Product
+
+
+def bench(mapper: Callable[[dict], Product], response: bytes, pages: int) -> dict:
+    start: float = time.perf_counter()
+    for _ in range(pages):
+        json.loads(response)
+    decode_seconds: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        [mapper(hit['document']) for hit in json.loads(response)['hits']]
+    elapsed_seconds: float = time.perf_counter() - start
+
+    return {
+        'response_bytes': len(response),
+        'decode_ms': decode_seconds / pages * 1000,
+        'page_ms': elapsed_seconds / pages * 1000,
+    }
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=500)
+    args: argparse.Namespace = parser.parse_args()
+
+    documents: list[dict] = list(scaled_product_documents(args.page_size))
+    projection: ProductProjection = ProductProjection(CATALOG_LIST_FIELDS)
+    full_response: bytes = json.dumps({
+        'hits': [{'document': project_document(document, TypesenseProductRepository.INCLUDE_FIELDS)}
+                 for document in documents],
+    }).encode()
+    dimensions_response: bytes = json.dumps({
+        'hits': [{'document': project_document(document, TypesenseProductRepository.DIMENSIONS_INCLUDE_FIELDS)}
+                 for document in documents],
+    }).encode()
+    dimensions: Dimensions = DimensionCache().set(
+        dimension_documents()[DimensionCache.CATEGORIES_COLLECTION_NAME],
+        dimension_documents()[DimensionCache.MANUFACTURERS_COLLECTION_NAME],
+        version=0,
+    )
+    projected_response: bytes = json.dumps({
+        'hits': [{'document': project_document(document, projection.include_fields)} for document in documents],
+    }).encode()
+
+    results: dict = {
+        'benchmark': 'projection',
+        'page_size': args.page_size,
+        'include_fields': projection.include_fields,
+        'full': bench(TypesenseProductRepository._product_document_to_product, full_response, args.pages),
+        'dimensions': bench(
+            lambda document: TypesenseProductRepository._product_document_to_product(document, dimensions),
+            dimensions_response,
+            args.pages,
+        ),
+        'projected': bench(projection.product, projected_response, args.pages),
+    }
+    results['size_reduction'] = 1 - results['projected']['response_bytes'] / results['full']['response_bytes']
+    results['speedup'] = results['full']['page_ms'] / results['projected']['page_ms']
+    results['dimensions_size_reduction'] = (
+        1 - results['dimensions']['response_bytes'] / results['full']['response_bytes']
+    )
+    results['dimensions_speedup'] = results['full']['page_ms'] / results['dimensions']['page_ms']
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
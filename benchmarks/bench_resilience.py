@@ -0,0 +1,117 @@
+"""Resilience benchmark.
+
+Measure searches of popular queries by worker threads while Typesense is down (a local Typesense stub stopped once
+the queries were searched), once their cached results expired: unprotected, with the circuit breaker only, with stale
+results served only if searches fail (e.g. the catalog changed since they were searched), and served while they are
+revalidated:
+
+    python -m benchmarks.bench_resilience --searches 64 --threads 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from benchmarks.bench_concurrency import latency_results
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.circuit_breaker import CircuitBreaker
+from store_catalog.adapters.repository import SEARCH_ENGINE_ERRORS
+from store_catalog.adapters.repository import AbstractProductRepository
+from store_catalog.adapters.search_cache import LRUSearchCache
+from store_catalog.adapters.stale_cache import StaleSearchCache
+from store_catalog.domain.model import ProductsPage
+from store_catalog.service_layer.services import ProductSearcher
+
+QUERIES: tuple[str, ...] = ('*', 'cable', 'switch', 'router', 'battery', 'adapter', 'sensor', 'module')
+CACHE_TTL_SECONDS: float = 0.5
+
+
+def circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(min_calls=4, failure_errors=SEARCH_ENGINE_ERRORS)
+
+
+def searcher(
+        repository: AbstractProductRepository,
+        circuit_breaker: CircuitBreaker | None,
+        stale_cache: bool,
+) -> ProductSearcher:
+    return ProductSearcher(
+        repository=repository,
+        cache=LRUSearchCache(ttl_seconds=CACHE_TTL_SECONDS),
+        circuit_breaker=circuit_breaker,
+        stale_cache=StaleSearchCache() if stale_cache else None,
+    )
+
+
+def list_page(searcher: ProductSearcher, query: str) -> ProductsPage:
+    return searcher.list_page(q=query, query_by='title', page=1, per_page=20, facets=True)
+
+
+def bench_outage(searcher: ProductSearcher, searches: int, threads: int) -> dict:
+    outcomes: dict[str, int] = {'fresh': 0, 'stale': 0, 'errors': 0}
+
+    def timed_search(index: int) -> float:
+        start: float = time.perf_counter()
+        try:
+            outcomes['stale' if list_page(searcher, QUERIES[index % len(QUERIES)]).stale else 'fresh'] += 1
+        except Exception:
+            outcomes['errors'] += 1
+        return time.perf_counter() - start
+
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies: list[float] = list(executor.map(timed_search, range(searches)))
+
+    return {**latency_results(latencies, time.perf_counter() - start), **outcomes}
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--searches', type=int, default=64, help='searches while Typesense is down')
+    parser.add_argument('--threads', type=int, default=8, help='worker threads searching')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every response')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(latency_ms=args.latency_ms) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+        })
+        from djangoproject.django_project import container
+
+        repository: AbstractProductRepository = container.product_repository()
+        circuit_breakers: dict[str, CircuitBreaker | None] = {
+            'unprotected': None,
+            'circuit_breaker': circuit_breaker(),
+            'stale_if_error': circuit_breaker(),
+            'stale_while_revalidate': circuit_breaker(),
+        }
+        searchers: dict[str, ProductSearcher] = {
+            name: searcher(repository, breaker, stale_cache=name.startswith('stale'))
+            for name, breaker in circuit_breakers.items()
+        }
+        for products_searcher in searchers.values():
+            for query in QUERIES:
+                list_page(products_searcher, query)
+        # Stale results searched before the catalog changed are served only if searches fail
+        searchers['stale_if_error'].invalidate_cache()
+
+    # Typesense is down and the cached results expired
+    time.sleep(CACHE_TTL_SECONDS)
+    outage: dict[str, dict] = {}
+    for name, products_searcher in searchers.items():
+        outage[name] = bench_outage(products_searcher, args.searches, args.threads)
+        breaker: CircuitBreaker | None = circuit_breakers[name]
+        if breaker is not None:
+            outage[name]['circuit_breaker'] = asdict(breaker.stats)
+    print(json.dumps({'benchmark': 'resilience', 'parameters': vars(args), 'outage': outage}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Single flight benchmark.
+
+Measure bursts of identical concurrent searches missing the cache (e.g. the landing page after its entry expired),
+by worker threads and by tasks of an event loop, with and without coalescing them, against a local Typesense stub:
+
+    python -m benchmarks.bench_single_flight --bursts 50 --burst-size 32 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from benchmarks.bench_concurrency import latency_results
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.single_flight import SingleFlight
+from store_catalog.service_layer.services import AsyncProductSearcher
+from store_catalog.service_layer.services import ProductSearcher
+
+SEARCH: dict = {'q': '*', 'query_by': 'title', 'page': 1, 'per_page': 20, 'facets': True}
+
+
+def bench_threads(searcher: ProductSearcher, bursts: int, burst_size: int) -> dict:
+    def timed_search(_: int) -> float:
+        start: float = time.perf_counter()
+        searcher.list_page(**SEARCH)
+        return time.perf_counter() - start
+
+    latencies: list[float] = []
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=burst_size) as executor:
+        for _ in range(bursts):
+            latencies.extend(executor.map(timed_search, range(burst_size)))
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+async def bench_tasks(searcher: AsyncProductSearcher, bursts: int, burst_size: int) -> dict:
+    async def timed_search() -> float:
+        start: float = time.perf_counter()
+        await searcher.list_page(**SEARCH)
+        return time.perf_counter() - start
+
+    latencies: list[float] = []
+    start: float = time.perf_counter()
+    for _ in range(bursts):
+        latencies.extend(await asyncio.gather(*(timed_search() for _ in range(burst_size))))
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bursts', type=int, default=50)
+    parser.add_argument('--burst-size', type=int, default=32, help='identical searches of every burst')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='stub delay before every response')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(latency_ms=args.latency_ms) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+            'TYPESENSE_POOL_SIZE': str(args.burst_size),
+            'TYPESENSE_ASYNC_POOL_SIZE': str(args.burst_size),
+        })
+        import django
+
+        django.setup()
+        from djangoproject.django_project import container
+
+        thread_flight: SingleFlight = SingleFlight()
+        task_flight: SingleFlight = SingleFlight()
+        results: dict = {
+            'benchmark': 'single_flight',
+            'parameters': vars(args),
+            'threads': {
+                'uncoalesced': bench_threads(
+                    ProductSearcher(container.product_repository()),
+                    args.bursts,
+                    args.burst_size,
+                ),
+                'coalesced': bench_threads(
+                    ProductSearcher(container.product_repository(), single_flight=thread_flight),
+                    args.bursts,
+                    args.burst_size,
+                ),
+                'stats': asdict(thread_flight.stats),
+            },
+            'tasks': {
+                'uncoalesced': asyncio.run(bench_tasks(
+                    AsyncProductSearcher(container.async_product_repository()),
+                    args.bursts,
+                    args.burst_size,
+                )),
+                'coalesced': asyncio.run(bench_tasks(
+                    AsyncProductSearcher(container.async_product_repository(), single_flight=task_flight),
+                    args.bursts,
+                    args.burst_size,
+                )),
+                'stats': asdict(task_flight.stats),
+            },
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
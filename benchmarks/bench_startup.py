@@ -0,0 +1,127 @@
+"""Startup benchmark.
+
+Measure the cold start of a worker against a local Typesense stub: the import of the settings and Django setup, and
+the latency of the first requests of the top queries with and without the warm-up of the startup (each in a new
+process), compared with the next requests of the same queries:
+
+    python -m benchmarks.bench_startup --queries 10 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from statistics import mean
+
+from benchmarks.catalog_documents import product_documents
+from benchmarks.typesense_stub import typesense_stub
+
+
+def top_queries(count: int) -> list[str]:
+    """Distinct words of product titles, as the most popular queries."""
+    queries: dict[str, None] = {}
+    for document in product_documents():
+        for word in document['title'].lower().split():
+            if len(word) > 3 and len(queries) < count:
+                queries.setdefault(word, None)
+    return list(queries)
+
+
+def requests_ms(queries: list[str]) -> list[float]:
+    from django.test import RequestFactory
+
+    from djangoproject.catalog.views import catalog_list
+
+    request_factory: RequestFactory = RequestFactory()
+    latencies: list[float] = []
+    for query in ['', *queries]:
+        start: float = time.perf_counter()
+        catalog_list(request_factory.get('/', {'query': query} if query else {}))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def child(warm_up: bool, queries: list[str]) -> dict:
+    """Cold start of a worker, run in a new process so imports and caches are cold."""
+    start: float = time.perf_counter()
+    import djangoproject.django_project.settings  # noqa: F401
+
+    settings_import_seconds: float = time.perf_counter() - start
+    import django
+
+    django.setup()
+    setup_seconds: float = time.perf_counter() - start
+    from djangoproject.django_project import container
+
+    report: dict | None = asdict(container.startup().run()) if warm_up else None
+    ready_seconds: float = time.perf_counter() - start
+    first_ms: list[float] = requests_ms(queries)
+    next_ms: list[float] = requests_ms(queries)
+    return {
+        'settings_import_seconds': settings_import_seconds,
+        'setup_seconds': setup_seconds,
+        'ready_seconds': ready_seconds,
+        'startup': report,
+        'first_requests_mean_ms': mean(first_ms),
+        'first_requests_max_ms': max(first_ms),
+        'next_requests_mean_ms': mean(next_ms),
+    }
+
+
+def run_child(warm_up: bool, queries: list[str], env: dict[str, str]) -> dict:
+    start: float = time.perf_counter()
+    output: str = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', '--queries', str(len(queries))]
+        + (['--warm-up'] if warm_up else []),
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return {**json.loads(output), 'process_seconds': time.perf_counter() - start}
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=10, help='top queries replayed and requested')
+    parser.add_argument('--products', type=int, default=1000, help='products of the stub')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='stub delay before every response')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--warm-up', action='store_true', help=argparse.SUPPRESS)
+    args: argparse.Namespace = parser.parse_args()
+
+    queries: list[str] = top_queries(args.queries)
+    if args.child:
+        print(json.dumps(child(args.warm_up, queries)))
+        return
+
+    with typesense_stub(products=args.products, latency_ms=args.latency_ms) as port, \
+            tempfile.NamedTemporaryFile('w', suffix='.txt') as queries_file:
+        queries_file.write('\n'.join(queries))
+        queries_file.flush()
+        env: dict[str, str] = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+            'ALLOWED_HOSTS': '*',
+            'CATALOG_WARM_UP_QUERIES_FILE': queries_file.name,
+            'CATALOG_WARM_UP_TOP_N': str(args.queries),
+        }
+        results: dict = {
+            'benchmark': 'startup',
+            'parameters': {key: value for key, value in vars(args).items() if key not in ('child', 'warm_up')},
+            'cold': run_child(False, queries, env),
+            'warmed_up': run_child(True, queries, env),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
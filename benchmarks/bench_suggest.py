@@ -0,0 +1,90 @@
+"""Suggestions benchmark.
+
+Measure the latency of suggestions per keystroke of users typing product titles and SKUs, with and without the
+suggestion cache, against a local Typesense stub:
+
+    python -m benchmarks.bench_suggest --products 5000 --users 200 --latency-ms 5
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from dataclasses import asdict
+
+from benchmarks.bench_concurrency import latency_results
+from benchmarks.catalog_documents import scaled_product_documents
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.suggestion_cache import SuggestionCache
+from store_catalog.service_layer.services import ProductSearcher
+
+
+def typed_queries(products: int, users: int, seed: int = 0) -> list[str]:
+    """Query of every keystroke of users typing the title (a few words) or the SKU of a product."""
+    documents: list[dict] = list(scaled_product_documents(products))
+    randomizer: random.Random = random.Random(seed)
+    queries: list[str] = []
+    for _ in range(users):
+        document: dict = randomizer.choice(documents)
+        text: str = document['sku'] if randomizer.random() < 0.5 else ' '.join(document['title'].split()[:3])
+        queries.extend(text[:length] for length in range(1, len(text) + 1))
+    return queries
+
+
+def bench_keystrokes(searcher: ProductSearcher, queries: list[str], limit: int) -> dict:
+    latencies: list[float] = []
+    start: float = time.perf_counter()
+    for query in queries:
+        query_start: float = time.perf_counter()
+        searcher.suggest(query, limit)
+        latencies.append(time.perf_counter() - query_start)
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200, help='users typing a query, keystroke by keystroke')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stub delay before every response')
+    parser.add_argument('--limit', type=int, default=8, help='products suggested')
+    parser.add_argument('--depth', type=int, default=50, help='candidates got by a suggestions search')
+    args: argparse.Namespace = parser.parse_args()
+
+    queries: list[str] = typed_queries(args.products, args.users)
+    with typesense_stub(products=args.products, latency_ms=args.latency_ms) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+        })
+        import django
+
+        django.setup()
+        from djangoproject.django_project import container
+
+        suggestion_cache: SuggestionCache = SuggestionCache(depth=args.depth)
+        results: dict = {
+            'benchmark': 'suggest',
+            'parameters': vars(args),
+            'keystrokes': len(queries),
+            'uncached': bench_keystrokes(
+                ProductSearcher(container.product_repository()),
+                queries,
+                args.limit,
+            ),
+            'cached': bench_keystrokes(
+                ProductSearcher(container.product_repository(), suggestion_cache=suggestion_cache),
+                queries,
+                args.limit,
+            ),
+            'cache_stats': asdict(suggestion_cache.stats),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
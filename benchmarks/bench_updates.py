@@ -0,0 +1,76 @@
+"""Product updates benchmark.
+
+Measure the rate of partial updates of stock and purchases buffered by producer threads, and the bulk updates sent
+to a local Typesense stub for them:
+
+    python -m benchmarks.bench_updates --updates 100000 --skus 5000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.product_updates import ProductUpdateBuffer
+
+
+def produce(buffer: ProductUpdateBuffer, skus: list[str], updates: int, offset: int) -> None:
+    for number in range(offset, offset + updates):
+        buffer.update(skus[number * 7919 % len(skus)], num_purchases=number, stock=number % 5 != 0)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--updates', type=int, default=100_000, help='updates of every producer thread in total')
+    parser.add_argument('--skus', type=int, default=5000, help='products updated')
+    parser.add_argument('--threads', type=int, default=8, help='producer threads')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='stub delay before every response')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--flush-interval-seconds', type=float, default=0.1)
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(products=args.skus, latency_ms=args.latency_ms) as port:
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+        })
+        import django
+
+        django.setup()
+        from djangoproject.django_project import container
+
+        skus: list[str] = [product.sku for product in container.product_repository().iter_all(q='*')]
+        buffer: ProductUpdateBuffer = ProductUpdateBuffer(
+            container.product_repository(),
+            batch_size=args.batch_size,
+            flush_interval_seconds=args.flush_interval_seconds,
+        )
+        updates_per_thread: int = args.updates // args.threads
+        start: float = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            for future in [
+                executor.submit(produce, buffer, skus, updates_per_thread, thread * updates_per_thread)
+                for thread in range(args.threads)
+            ]:
+                future.result()
+        buffered_seconds: float = time.perf_counter() - start
+        buffer.close()
+        elapsed_seconds: float = time.perf_counter() - start
+
+    print(json.dumps({
+        'benchmark': 'updates',
+        'parameters': vars(args),
+        'updates_per_second_buffered': updates_per_thread * args.threads / buffered_seconds,
+        'updates_per_second_sent': updates_per_thread * args.threads / elapsed_seconds,
+        'stats': asdict(buffer.stats),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
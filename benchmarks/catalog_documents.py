@@ -0,0 +1,85 @@
+"""Catalog documents module.
+
+This module build Typesense-like search documents (with joined references) from the catalog JSONL files, scaled
+up synthetically to any number of products.
+"""
+
+import json
+from collections.abc import Iterator
+from itertools import cycle
+from itertools import islice
+from pathlib import Path
+
+CATALOG_DIR: Path = Path(__file__).resolve().parent.parent / 'tests' / 'catalog_files'
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    with path.open(encoding='utf-8') as jsonl_file:
+        for line in jsonl_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def dimension_documents(catalog_dir: Path = CATALOG_DIR) -> dict[str, list[dict]]:
+    """Documents of categories, manufacturers and product models collections of catalog files by collection name."""
+    return {
+        'product_categories': [
+            category
+            for file_name in ('product_categories.jsonl', 'product_subcategories.jsonl')
+            for category in read_jsonl(catalog_dir / file_name)
+        ],
+        'product_manufacturers': list(read_jsonl(catalog_dir / 'product_manufactures.jsonl')),
+        'product_models': list(read_jsonl(catalog_dir / 'product_models.jsonl')),
+    }
+
+
+def product_documents(catalog_dir: Path = CATALOG_DIR) -> list[dict]:
+    """Product documents of catalog files as returned by a search including every referenced collection.
+
+    Args:
+        catalog_dir (Path): directory with catalog JSONL files.
+
+    Returns:
+        list[dict]: product documents with their joined model, categories and manufacturer.
+
+    """
+    dimensions: dict[str, list[dict]] = dimension_documents(catalog_dir)
+    categories: dict[str, dict] = {category['id']: category for category in dimensions['product_categories']}
+    manufacturers: dict[str, dict] = {
+        manufacturer['id']: manufacturer for manufacturer in dimensions['product_manufacturers']
+    }
+    models: dict[str, dict] = {}
+    for model in dimensions['product_models']:
+        category: dict = categories[model['product_category_id']]
+        models[model['id']] = {
+            **model,
+            'product_categories': {**category, 'product_categories': categories[category['product_category_id']]},
+            'product_manufacturers': manufacturers[model['product_manufacturer_id']],
+        }
+
+    return [
+        {**product, 'product_models': models[product['product_model_id']]}
+        for product in read_jsonl(catalog_dir / 'products.jsonl')
+    ]
+
+
+def scaled_product_documents(count: int, catalog_dir: Path = CATALOG_DIR) -> Iterator[dict]:
+    """Synthetic product documents, the catalog products repeated with unique ids, SKUs and stats.
+
+    Args:
+        count (int): number of product documents.
+        catalog_dir (Path): directory with catalog JSONL files.
+
+    Yields:
+        dict: product document with joined references.
+
+    """
+    for number, product in enumerate(islice(cycle(product_documents(catalog_dir)), count), start=1):
+        yield {
+            **product,
+            'id': str(number),
+            'sku': f'{product["sku"]}-{number}',
+            'price': round(product['price'] * (0.8 + (number % 40) / 100), 2),
+            'stock': number % 7 != 0,
+            'num_purchases': number * 7919 % 1000,
+        }
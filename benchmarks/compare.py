@@ -0,0 +1,54 @@
+"""Benchmark results comparison.
+
+Diff two result files of the benchmark suite metric by metric, and fail if a metric regressed more than a threshold:
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Iterator
+
+# Metrics whose higher values are better, every other metric (latencies, times, memory) is better lower
+HIGHER_IS_BETTER: tuple[str, ...] = ('per_second',)
+# Metrics that describe the run instead of measuring it
+IGNORED: tuple[str, ...] = ('parameters', 'page_size', 'per_page', 'skus', 'threads', 'concurrency', 'requests')
+
+
+def metrics(results: dict, prefix: str = '') -> Iterator[tuple[str, float]]:
+    """Dotted path and value of every numeric metric of nested results."""
+    for name, value in results.items():
+        if name in IGNORED:
+            continue
+        if isinstance(value, dict):
+            yield from metrics(value, f'{prefix}{name}.')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f'{prefix}{name}', value
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('baseline', help='JSON file of baseline results')
+    parser.add_argument('results', help='JSON file of results to compare')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change considered a regression')
+    args: argparse.Namespace = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as baseline_file, open(args.results, encoding='utf-8') as results_file:
+        baseline: dict[str, float] = dict(metrics(json.load(baseline_file)))
+        results: dict[str, float] = dict(metrics(json.load(results_file)))
+
+    regressions: list[str] = []
+    for name in sorted(baseline.keys() & results.keys()):
+        change: float = (results[name] - baseline[name]) / baseline[name] if baseline[name] else 0.0
+        regression: float = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if regression > args.threshold:
+            regressions.append(name)
+        print(f'{"REGRESSION " if name in regressions else ""}{name}: {baseline[name]:.3f} -> {results[name]:.3f} '
+              f'({change:+.1%})')
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark suite.
+
+Measure mapper throughput, repository latency percentiles, catalog view requests per second and memory per request
+against a local Typesense stub, and write machine-readable results to diff between versions (see compare):
+
+    python -m benchmarks.suite --latency-ms 2 --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks import bench_mapper
+from benchmarks.bench_concurrency import bench_sync
+from benchmarks.bench_concurrency import latency_results
+from benchmarks.catalog_documents import scaled_product_documents
+from benchmarks.typesense_stub import typesense_stub
+from store_catalog.adapters.repository import TypesenseProductRepository
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed_calls(call: Callable[[], Any], calls: int) -> dict:
+    """Latency percentiles of sequential calls, after a warm up call."""
+    call()
+    latencies: list[float] = []
+    start: float = time.perf_counter()
+    for _ in range(calls):
+        call_start: float = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_start)
+
+    return latency_results(latencies, time.perf_counter() - start)
+
+
+def memory_per_call(call: Callable[[], Any], calls: int) -> dict:
+    """Peak memory allocated by a call and memory retained after the calls, traced with tracemalloc."""
+    call()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline_bytes: int = tracemalloc.get_traced_memory()[0]
+        peaks_bytes: list[int] = []
+        for _ in range(calls):
+            current_bytes: int = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            peaks_bytes.append(tracemalloc.get_traced_memory()[1] - current_bytes)
+        gc.collect()
+        retained_bytes: int = tracemalloc.get_traced_memory()[0] - baseline_bytes
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'peak_kib_p50': statistics.median(peaks_bytes) / 1024,
+        'peak_kib_max': max(peaks_bytes) / 1024,
+        'retained_kib_per_call': retained_bytes / calls / 1024,
+    }
+
+
+def bench_mappers(page_size: int, pages: int) -> dict:
+    documents: list[dict] = list(scaled_product_documents(page_size))
+    return {
+        'page_size': page_size,
+        'validated': bench_mapper.bench(TypesenseProductRepository._product_document_to_product, documents, pages),
+        'trusted': bench_mapper.bench(
+            TypesenseProductRepository._product_document_to_trusted_product,
+            documents,
+            pages,
+        ),
+    }
+
+
+def bench_repository(calls: int, page_size: int) -> dict:
+    from djangoproject.django_project import container
+
+    # Without SKU cache, so every lookup is sent to the stub
+    repository: TypesenseProductRepository = TypesenseProductRepository(
+        container.typesense_database().session,
+        trusted=container.config.TYPESENSE_TRUSTED_DOCUMENTS(),
+        dimension_cache=container.dimension_cache(),
+    )
+    skus: list[str] = [product.sku for product in repository.list_page(q='*', per_page=page_size).products]
+    return {
+        'get': timed_calls(lambda: repository.get(skus[0]), calls),
+        'get_many': {'skus': len(skus), **timed_calls(lambda: repository.get_many(skus), calls)},
+        'list_page': {'per_page': page_size, **timed_calls(
+            lambda: repository.list_page(q='product', query_by='title', per_page=page_size),
+            calls,
+        )},
+    }
+
+
+def bench_view(requests: int, threads: int) -> dict:
+    from django.http import HttpRequest
+    from django.test import RequestFactory
+
+    from djangoproject.catalog.views import catalog_list
+
+    request: HttpRequest = RequestFactory().get('/', {'query': 'product'})
+    return {
+        'sequential': timed_calls(lambda: catalog_list(request), requests),
+        'concurrent': {'threads': threads, **bench_sync(catalog_list, request, requests, threads)},
+        'memory': memory_per_call(lambda: catalog_list(request), min(requests, 200)),
+    }
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=1000, help='product documents of the stub')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='stub delay before every response')
+    parser.add_argument('--page-size', type=int, default=20, help='products of searched pages')
+    parser.add_argument('--calls', type=int, default=300, help='calls of every repository and view benchmark')
+    parser.add_argument('--threads', type=int, default=8, help='worker threads of the concurrent view benchmark')
+    parser.add_argument('--mapper-pages', type=int, default=200, help='pages of the mapper benchmark')
+    parser.add_argument('--output', help='JSON file of results, printed if not given')
+    args: argparse.Namespace = parser.parse_args()
+
+    with typesense_stub(products=args.products, latency_ms=args.latency_ms) as port:
+        # Settings are read from environment when the container is loaded, search results must not be cached
+        os.environ.update({
+            'DJANGO_SETTINGS_MODULE': 'djangoproject.django_project.settings',
+            'TYPESENSE_API_KEY': 'bench',
+            'TYPESENSE_HOST': '127.0.0.1',
+            'TYPESENSE_PORT': str(port),
+            'TYPESENSE_PROTOCOL': 'http',
+            'TYPESENSE_POOL_SIZE': str(args.threads),
+            'SEARCH_CACHE_BACKEND': 'none',
+            'SINGLE_FLIGHT_BACKEND': 'none',
+        })
+        import django
+
+        django.setup()
+        results: dict = {
+            'benchmark': 'suite',
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'parameters': vars(args),
+            'mapper': bench_mappers(250, args.mapper_pages),
+            'repository': bench_repository(args.calls, args.page_size),
+            'view': bench_view(args.calls, args.threads),
+        }
+
+    output: str = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""Typesense stub server module.
+
+A local HTTP server answering Typesense search endpoints with product documents generated from the catalog files,
+with configurable latency and result sizes, so benchmarks run without Docker or network:
+
+    python -m benchmarks.typesense_stub --port 8108 --latency-ms 5 --products 10000
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import re
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from multiprocessing.connection import Connection
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from benchmarks.catalog_documents import dimension_documents
+from benchmarks.catalog_documents import scaled_product_documents
+from store_catalog.adapters.in_memory_repository import sku_key
+from store_catalog.adapters.in_memory_repository import tokenize
+
+SKUS_FILTER: re.Pattern = re.compile(r'sku:=\[(.*)\]')
+COLLECTION_PATH: re.Pattern = re.compile(r'/collections/([^/]+)/documents/search')
+IMPORT_PATH: re.Pattern = re.compile(r'/collections/products/documents/import')
+
+
+def _split_fields(include_fields: str) -> list[str]:
+    """Split include fields by the commas out of parentheses of joined collections."""
+    fields: list[str] = []
+    depth: int = 0
+    start: int = 0
+    for index, char in enumerate(include_fields):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            fields.append(include_fields[start:index].strip())
+            start = index + 1
+    fields.append(include_fields[start:].strip())
+    return [field for field in fields if field]
+
+
+def project_document(document: dict, include_fields: str) -> dict:
+    """Document with the fields of a Typesense ``include_fields`` parameter, e.g. ``title, $product_models(*)``."""
+    fields: list[str] = _split_fields(include_fields)
+    # Only joined collections are included along with every field of the document
+    if all(field.startswith('$') for field in fields):
+        fields.append('*')
+
+    projected_document: dict = {}
+    for field in fields:
+        if field == '*':
+            projected_document.update({key: value for key, value in document.items() if not isinstance(value, dict)})
+        elif field.startswith('$'):
+            collection_name, nested_fields = field[1:-1].split('(', 1)
+            if collection_name in document:
+                projected_document[collection_name] = project_document(document[collection_name], nested_fields)
+        elif field in document:
+            projected_document[field] = document[field]
+
+    return projected_document
+
+
+class TypesenseStub:
+    """Stub of Typesense search, multi search and health endpoints.
+
+    Attributes:
+        _documents (list[dict]): product documents with joined references.
+        _dimension_documents (dict[str, list[dict]]): documents of categories, manufacturers and models by
+            collection name.
+        _documents_by_sku (dict[str, dict]): product documents by SKU.
+        _documents_by_id (dict[str, dict]): product documents by ID.
+        _text_keys (list[tuple[frozenset[str], str]]): title tokens and SKU key of every product document.
+        _latency_seconds (float): delay before every response, simulating Typesense search time.
+        _hits (int, optional): hits per page whatever the requested page size.
+
+    """
+
+    def __init__(self, products: int = 1000, latency_ms: float = 0.0, hits: int | None = None) -> None:
+        self._documents: list[dict] = list(scaled_product_documents(products))
+        self._documents_by_sku: dict[str, dict] = {document['sku']: document for document in self._documents}
+        self._documents_by_id: dict[str, dict] = {document['id']: document for document in self._documents}
+        self._text_keys: list[tuple[frozenset[str], str]] = [
+            (frozenset(tokenize(document['title'])), sku_key(document['sku'])) for document in self._documents
+        ]
+        self._dimension_documents: dict[str, list[dict]] = dimension_documents()
+        self._latency_seconds: float = latency_ms / 1000
+        self._hits: int | None = hits
+
+    def _text_matches(self, q: str) -> list[dict]:
+        """Product documents with every token of a query in the title (the last one as a prefix), or with a SKU
+        starting with the query."""
+        tokens: list[str] = tokenize(q)
+        query_sku_key: str = sku_key(q)
+        return [
+            document for document, (title_tokens, document_sku_key) in zip(self._documents, self._text_keys)
+            if (query_sku_key and document_sku_key.startswith(query_sku_key)) or (
+                tokens and all(token in title_tokens for token in tokens[:-1])
+                and any(title_token.startswith(tokens[-1]) for title_token in title_tokens)
+            )
+        ]
+
+    def search(self, params: dict, collection_name: str = 'products') -> dict:
+        """Search result of search parameters, only SKUs filters, text queries with ``prefix``, sorting by
+        purchases, included fields and facets by product model are applied."""
+        documents: list[dict] = self._dimension_documents.get(collection_name, self._documents)
+        if collection_name == 'products' and params.get('prefix') == 'true' and params.get('q', '*') != '*':
+            documents = self._text_matches(params['q'])
+        if params.get('sort_by') == 'num_purchases:desc':
+            documents = sorted(documents, key=lambda document: -document['num_purchases'])
+        skus_filter: re.Match | None = SKUS_FILTER.match(params.get('filter_by', ''))
+        if skus_filter is not None:
+            documents = [
+                self._documents_by_sku[sku.strip('`')]
+                for sku in skus_filter.group(1).split(',') if sku.strip('`') in self._documents_by_sku
+            ]
+
+        per_page: int = self._hits or int(params.get('per_page', 10))
+        page: int = int(params.get('page', 1))
+        page_documents: list[dict] = documents[(page - 1) * per_page:page * per_page]
+        if 'include_fields' in params:
+            page_documents = [project_document(document, params['include_fields']) for document in page_documents]
+
+        result: dict = {
+            'found': len(documents),
+            'out_of': len(self._documents),
+            'page': page,
+            'search_time_ms': int(self._latency_seconds * 1000),
+            'hits': [{'document': document} for document in page_documents],
+        }
+        if params.get('facet_by') == 'product_model_id':
+            model_counts: Counter[str] = Counter(document['product_model_id'] for document in documents)
+            result['facet_counts'] = [{
+                'field_name': 'product_model_id',
+                'counts': [{'value': model_id, 'count': count} for model_id, count in model_counts.most_common()],
+            }]
+        return result
+
+    def import_(self, body: bytes) -> str:
+        """Import results of product documents, applied as updates of the documents with their ID."""
+        results: list[dict] = []
+        for line in body.decode().splitlines():
+            document: dict = json.loads(line)
+            if document.get('id') in self._documents_by_id:
+                self._documents_by_id[document['id']].update(document)
+                results.append({'success': True})
+            else:
+                results.append({'success': False, 'error': 'Could not find a document with id', 'code': 404})
+        return '\n'.join(json.dumps(result) for result in results)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 keep-alive requests of a connection."""
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode().split(' ', 2)
+                headers: dict[str, str] = {}
+                while (header_line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, value = header_line.decode().split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+                body: bytes = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                await asyncio.sleep(self._latency_seconds)
+                writer.write(self.response(method, target, body))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def response(self, method: str, target: str, body: bytes) -> bytes:
+        url = urlsplit(target)
+        params: dict = dict(parse_qsl(url.query))
+        collection_path: re.Match | None = COLLECTION_PATH.fullmatch(url.path)
+        if IMPORT_PATH.fullmatch(url.path) is not None and method == 'POST':
+            return self._http_response('200 OK', 'text/plain', self.import_(body).encode())
+        if collection_path is not None:
+            result: dict = self.search(params, collection_path.group(1))
+        elif url.path == '/multi_search':
+            result = {'results': [
+                self.search({**params, **search}, search.get('collection', 'products'))
+                for search in json.loads(body)['searches']
+            ]}
+        elif url.path == '/health':
+            result = {'ok': True}
+        else:
+            result = {'message': 'Not Found'}
+
+        return self._http_response(
+            '404 Not Found' if 'message' in result else '200 OK',
+            'application/json',
+            json.dumps(result).encode(),
+        )
+
+    @staticmethod
+    def _http_response(status: str, content_type: str, content: bytes) -> bytes:
+        return (
+            f'HTTP/1.1 {status}\r\nContent-Type: {content_type}; charset=utf-8\r\n'
+            f'Content-Length: {len(content)}\r\n\r\n'
+        ).encode() + content
+
+    async def serve(self, port: int = 0, ready: Connection | None = None) -> None:
+        server: asyncio.Server = await asyncio.start_server(self.handle, '127.0.0.1', port, backlog=1024)
+        if ready is not None:
+            ready.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def _run(products: int, latency_ms: float, hits: int | None, port: int, ready: Connection) -> None:
+    asyncio.run(TypesenseStub(products=products, latency_ms=latency_ms, hits=hits).serve(port, ready))
+
+
+@contextmanager
+def typesense_stub(products: int = 1000, latency_ms: float = 0.0, hits: int | None = None) -> Iterator[int]:
+    """Run a Typesense stub server in another process, so it does not compete for the GIL of the benchmark.
+
+    Args:
+        products (int): number of product documents.
+        latency_ms (float): delay before every response.
+        hits (int, optional): hits per page whatever the requested page size.
+
+    Yields:
+        int: port of the stub server.
+
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process: multiprocessing.Process = multiprocessing.Process(
+        target=_run,
+        args=(products, latency_ms, hits, 0, sender),
+        daemon=True,
+    )
+    process.start()
+    try:
+        yield receiver.recv()
+    finally:
+        process.terminate()
+        process.join()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8108)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--hits', type=int, default=None)
+    args: argparse.Namespace = parser.parse_args()
+
+    asyncio.run(TypesenseStub(products=args.products, latency_ms=args.latency_ms, hits=args.hits).serve(args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
+from dependency_injector.providers import Object
 from django.apps import AppConfig
 
-from djangoproject.django_project import container
-
 
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'djangoproject.catalog'
 
     def ready(self) -> None:
+        from djangoproject.catalog.views import replay_catalog_query
+        from djangoproject.django_project import container
+
         container.wire(modules=['djangoproject.catalog.views'])
+        container.startup.add_kwargs(replay=Object(replay_catalog_query))
@@ -0,0 +1,57 @@
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.http import HttpRequest
+from django.http import HttpResponse
+
+from djangoproject.django_project import container
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.instrumentation import RequestTimings
+
+
+class ServerTimingMiddleware:
+    """Collect the timings of the stages of a request and send them in a ``Server-Timing`` response header.
+
+    It is the first middleware, so the request stage covers every other middleware, in WSGI and ASGI deployments.
+
+    Attributes:
+        get_response (Callable): next middleware or view.
+        _instrumentation (Instrumentation): timing of request stages.
+        _async_mode (bool): True if the next middleware or view is asynchronous (ASGI).
+
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]) -> None:
+        self.get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]] = get_response
+        self._instrumentation: Instrumentation = container.instrumentation()
+        self._async_mode: bool = iscoroutinefunction(self.get_response)
+        if self._async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if self._async_mode:
+            return self.__acall__(request)
+        if not self._instrumentation.enabled:
+            return self.get_response(request)
+
+        with self._instrumentation.request() as request_timings:
+            response: HttpResponse = self.get_response(request)  # type: ignore[assignment]
+        return self._add_server_timing(response, request_timings)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self._instrumentation.enabled:
+            return await self.get_response(request)  # type: ignore[misc]
+
+        with self._instrumentation.request() as request_timings:
+            response: HttpResponse = await self.get_response(request)  # type: ignore[misc]
+        return self._add_server_timing(response, request_timings)
+
+    @staticmethod
+    def _add_server_timing(response: HttpResponse, request_timings: RequestTimings | None) -> HttpResponse:
+        if request_timings is not None:
+            response['Server-Timing'] = request_timings.server_timing()
+        return response
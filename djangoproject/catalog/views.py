@@ -1,37 +1,701 @@
+import math
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from dataclasses import asdict
+from datetime import datetime
+from datetime import timezone
+from functools import wraps
+from io import BytesIO
+from typing import Any
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
 from dependency_injector.wiring import Provide
 from dependency_injector.wiring import inject
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404
 from django.http import HttpRequest
 from django.http import HttpResponse
+from django.http import JsonResponse
+from django.http.response import HttpResponseBase
+from django.http import QueryDict
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import add_never_cache_headers
+from django.utils.functional import lazy
+from django.utils.safestring import SafeString
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition
 
+from store_catalog.adapters.catalog_version import AbstractCatalogVersionStore
+from store_catalog.adapters.catalog_version import CatalogVersion
+from store_catalog.adapters.circuit_breaker import CircuitOpenError
+from store_catalog.adapters.instrumentation import RENDER_STAGE
+from store_catalog.adapters.instrumentation import AbstractMetrics
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.instrumentation import PrometheusMetrics
+from store_catalog.adapters.product_facets import ProductFilters
+from store_catalog.adapters.product_json import ProductJsonEncoder
+from store_catalog.adapters.product_query import RELEVANCE_SORT
+from store_catalog.adapters.product_query import SORT_CLAUSES
+from store_catalog.adapters.product_query import SORT_LABELS
+from store_catalog.adapters.product_query import ProductQuery
+from store_catalog.adapters.product_query import parse_query_by
+from store_catalog.adapters.product_updates import HOT_FIELDS
 from store_catalog.container import Container
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductsPage
+from store_catalog.domain.model import Suggestions
+from store_catalog.service_layer.services import AsyncProductSearcher
 from store_catalog.service_layer.services import ProductSearcher
+from store_catalog.service_layer.startup import Startup
+from store_catalog.service_layer.startup import StartupReport
+
+# Product fields shown by the catalog list, the others (e.g. model descriptions) are not got from Typesense
+CATALOG_LIST_FIELDS: tuple[str, ...] = (
+    'sku',
+    'title',
+    'description',
+    'image_url',
+    'price',
+    'stock',
+    'num_purchases',
+    'model.category.title',
+    'model.category.category_parent.title',
+    'model.manufacturer.title',
+    'model.manufacturer.image_url',
+)
+PRODUCT_ROW_TEMPLATE: str = 'catalog/product_row.html'
+# Max age of cacheable responses, read when a response is made so views are imported without settings (e.g. by
+# benchmarks)
+CATALOG_CACHE_MAX_AGE: int = lazy(lambda: settings.CATALOG_CACHE_MAX_AGE_SECONDS, int)()
+# Warning header of the last good page of a search served because the search failed
+STALE_WARNING: str = '110 - "Response is Stale"'
+# Max products reached by paging, further pages are served as the last one (Typesense rejects pages far beyond)
+MAX_RESULTS: int = 10000
+
+
+def _page_number(request: HttpRequest, per_page: int) -> int:
+    """Page number requested, the first page if it is missing or invalid, at most the page of ``MAX_RESULTS``."""
+    try:
+        return min(max(int(request.GET.get('page', 1)), 1), math.ceil(MAX_RESULTS / per_page))
+    except ValueError:
+        return 1
+
+
+def _price(request: HttpRequest, parameter: str) -> float | None:
+    """Price of a request parameter, None if it is missing or invalid."""
+    try:
+        return float(request.GET[parameter])
+    except (KeyError, ValueError):
+        return None
+
+
+def _product_filters(request: HttpRequest) -> ProductFilters:
+    """Filters chosen in the catalog list (categories, manufacturers, price range and stock)."""
+    return ProductFilters(
+        category_ids=tuple(request.GET.getlist('category')),
+        manufacturer_ids=tuple(request.GET.getlist('manufacturer')),
+        min_price=_price(request, 'min_price'),
+        max_price=_price(request, 'max_price'),
+        in_stock=request.GET.get('in_stock') == 'on',
+    )
+
+
+def _sort(request: HttpRequest) -> str:
+    """Sort requested, relevance if it is missing or unknown."""
+    sort: str = request.GET.get('sort', RELEVANCE_SORT)
+    return sort if sort in SORT_CLAUSES else RELEVANCE_SORT
 
 
+@inject
+def _product_query(
+        request: HttpRequest,
+        filters: ProductFilters,
+        query_by: str = Provide[Container.config.CATALOG_QUERY_BY],
+) -> ProductQuery:
+    """Query of a request, with its sort and the filters chosen, matching the weighted fields of ``query_by``."""
+    return ProductQuery(
+        q=request.GET.get('query', '*'),
+        query_by=parse_query_by(query_by),
+        filters=filters,
+        sort=_sort(request),
+        in_stock_first=request.GET.get('in_stock_first') == 'on',
+    )
+
+
+def _product_search(request: HttpRequest, filters: ProductFilters) -> dict:
+    """Search parameters of the query, sort and filters of a request, ranking and filters are pushed down to the
+    search."""
+    return _product_query(request, filters).search()
+
+
+def _catalog_list_search(request: HttpRequest, filters: ProductFilters, per_page: int) -> dict:
+    """Search parameters of the catalog list, with the facets counted."""
+    return {
+        **_product_search(request, filters),
+        'page': _page_number(request, per_page),
+        'per_page': per_page,
+        'fields': CATALOG_LIST_FIELDS,
+        'facets': True,
+    }
+
+
+def _api_encoder(request: HttpRequest) -> ProductJsonEncoder:
+    """Encoder of the fields selected by the ``fields`` parameter (comma separated), those of the catalog list if
+    missing, every field if ``*``.
+
+    Raises:
+        ValueError: if a field is not a product field.
+
+    """
+    fields: str = request.GET.get('fields', '')
+    if fields == '*':
+        return ProductJsonEncoder()
+
+    return ProductJsonEncoder(
+        [field.strip() for field in fields.split(',') if field.strip()] if fields else CATALOG_LIST_FIELDS,
+    )
+
+
+def _api_per_page(request: HttpRequest, per_page: int, max_per_page: int) -> int:
+    """Products per page of the ``per_page`` parameter, at most ``max_per_page``."""
+    try:
+        return min(max(int(request.GET['per_page']), 1), max_per_page)
+    except (KeyError, ValueError):
+        return per_page
+
+
+def _api_search(request: HttpRequest, encoder: ProductJsonEncoder, per_page: int, max_per_page: int) -> dict:
+    """Search parameters of a page of the search API, projected on the fields encoded."""
+    page_size: int = _api_per_page(request, per_page, max_per_page)
+    return {
+        **_product_search(request, _product_filters(request)),
+        'page': _page_number(request, page_size),
+        'per_page': page_size,
+        'fields': encoder.fields,
+        'facets': request.GET.get('facets') == 'true',
+    }
+
+
+def _api_error(error: ValueError) -> JsonResponse:
+    return JsonResponse({'error': str(error)}, status=400)
+
+
+def _stale_marked(response: HttpResponseBase, products_page: ProductsPage) -> HttpResponseBase:
+    """Response of a page, with a Warning header if the page is the last good result of its search."""
+    if products_page.stale:
+        response['Warning'] = STALE_WARNING
+    return response
+
+
+def _not_cached_if_stale(view: Callable) -> Callable:
+    """Send stale pages (marked by ``_stale_marked``) without the catalog ETag and Last-Modified and as not
+    cacheable, so neither browsers nor CDNs keep them once the search answers again, for synchronous and
+    asynchronous views. To decorate the cache_control and condition decorators of the view."""
+    def not_cached_if_stale(response: HttpResponseBase) -> HttpResponseBase:
+        if response.get('Warning') == STALE_WARNING:
+            del response['ETag']
+            del response['Last-Modified']
+            add_never_cache_headers(response)
+        return response
+
+    if iscoroutinefunction(view):
+        async def async_view_wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            return not_cached_if_stale(await view(request, *args, **kwargs))
+
+        return wraps(view)(async_view_wrapper)
+
+    def view_wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        return not_cached_if_stale(view(request, *args, **kwargs))
+
+    return wraps(view)(view_wrapper)
+
+
+def _circuit_open_response(error: CircuitOpenError) -> HttpResponse:
+    """Not cached 503 response, asking to retry once the circuit breaker lets searches through again."""
+    response: HttpResponse = HttpResponse(
+        'Search is temporarily unavailable, please retry later.',
+        status=503,
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(math.ceil(error.retry_after_seconds))
+    add_never_cache_headers(response)
+    return response
+
+
+def _unavailable_while_circuit_open(view: Callable) -> Callable:
+    """Answer a 503 response instead of an error when Typesense searches are rejected by the open circuit breaker and
+    no stale result is served, for synchronous and asynchronous views."""
+    if iscoroutinefunction(view):
+        async def async_view_wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            try:
+                return await view(request, *args, **kwargs)
+            except CircuitOpenError as error:
+                return _circuit_open_response(error)
+
+        return wraps(view)(async_view_wrapper)
+
+    def view_wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        try:
+            return view(request, *args, **kwargs)
+        except CircuitOpenError as error:
+            return _circuit_open_response(error)
+
+    return wraps(view)(view_wrapper)
+
+
+async def _async_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Chunks of an encoded page as an asynchronous iterator, streamed by ASGI without a worker thread."""
+    for chunk in chunks:
+        yield chunk
+
+
+def _catalog_etag(request: HttpRequest, catalog_versions: AbstractCatalogVersionStore, **kwargs: Any) -> str:
+    """ETag of catalog pages, the same for every page until the catalog changes (pages are cached by URL).
+
+    Called with the arguments of the view, dependencies included.
+    """
+    return catalog_versions.get().etag
+
+
+def _catalog_last_modified(
+        request: HttpRequest,
+        catalog_versions: AbstractCatalogVersionStore,
+        **kwargs: Any,
+) -> datetime:
+    return datetime.fromtimestamp(catalog_versions.get().last_modified_at, tz=timezone.utc)
+
+
+@inject
+def _product_rows(
+        products: Sequence[Product],
+        catalog_version: CatalogVersion | None,
+        alias: str = Provide[Container.config.CATALOG_FRAGMENT_CACHE_ALIAS],
+        ttl_seconds: float = Provide[Container.config.CATALOG_FRAGMENT_CACHE_TTL_SECONDS],
+) -> list[SafeString]:
+    """Rendered table rows of products, rows of the same SKU, catalog version and hot fields are rendered once and
+    cached, so rows of products whose stock or purchases were updated are rendered again.
+
+    Args:
+        products (Sequence[Product]): products of the page, a list or a ProductBatch.
+        catalog_version (CatalogVersion, optional): version of the catalog the products were found in, rows are
+            not cached if None (e.g. products of a stale page).
+        alias (str): Django cache alias of rendered rows, every row is rendered if empty.
+        ttl_seconds (float): seconds a rendered row is cached.
+
+    Returns:
+        list[SafeString]: HTML row of every product.
+
+    """
+    if not alias or catalog_version is None:
+        return [render_to_string(PRODUCT_ROW_TEMPLATE, {'product': product}) for product in products]
+
+    keys: list[str] = [
+        f'catalog:row:{catalog_version.key}:{product.sku}:'
+        + ':'.join(str(getattr(product, field)) for field in HOT_FIELDS)
+        for product in products
+    ]
+    rows: dict[str, str] = caches[alias].get_many(keys)
+    rendered: dict[str, str] = {
+        key: render_to_string(PRODUCT_ROW_TEMPLATE, {'product': product})
+        for key, product in zip(keys, products) if key not in rows
+    }
+    if rendered:
+        caches[alias].set_many(rendered, timeout=ttl_seconds)
+        rows.update(rendered)
+    return [mark_safe(rows[key]) for key in keys]
+
+
+def _catalog_list_response(
+        request: HttpRequest,
+        products_page: ProductsPage,
+        filters: ProductFilters,
+        catalog_version: CatalogVersion,
+        instrumentation: Instrumentation,
+) -> HttpResponse:
+    parameters: QueryDict = request.GET.copy()
+    parameters.pop('page', None)
+    with instrumentation.span(RENDER_STAGE):
+        response: HttpResponse = render(
+            request,
+            template_name='catalog/catalog_list.html',
+            context={
+                'products_page': products_page,
+                'product_rows': _product_rows(
+                    products_page.products,
+                    None if products_page.stale else catalog_version,
+                ),
+                'query': request.GET.get('query', ''),
+                'filters': filters,
+                'sort': _sort(request),
+                'sorts': SORT_LABELS,
+                'in_stock_first': request.GET.get('in_stock_first') == 'on',
+                'parameters': parameters.urlencode(),
+            },
+        )
+    _stale_marked(response, products_page)
+    return response
+
+
+@_unavailable_while_circuit_open
+@_not_cached_if_stale
+@cache_control(public=True, max_age=CATALOG_CACHE_MAX_AGE)
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
 @inject
 def catalog_list(
         request: HttpRequest,
         product_searcher: ProductSearcher = Provide[Container.product_searcher],
+        per_page: int = Provide[Container.config.CATALOG_PER_PAGE],
+        catalog_versions: AbstractCatalogVersionStore = Provide[Container.catalog_versions],
+        instrumentation: Instrumentation = Provide[Container.instrumentation],
 ) -> HttpResponse:
-    """List Products.
+    """List a page of Products, narrowed by the filters chosen, with the counts of categories and manufacturers.
+
+    Pages are cacheable by browsers and CDNs for ``CATALOG_CACHE_MAX_AGE_SECONDS``, then revalidated with the ETag
+    and Last-Modified of the catalog version: a conditional request of an unchanged catalog gets a 304 response
+    without any search. While Typesense is failing, the last good page of the search is served with a Warning
+    header and without validators, not cacheable, or a 503 response if there is none and the circuit breaker is
+    open.
 
     Args:
         request (HttpRequest): Django Http request.
         product_searcher: service to search products.
+        per_page: products per page.
+        catalog_versions: version stamp of the catalog, keying rendered rows.
+        instrumentation: timing of request stages.
+
+    Returns:
+        HttpResponse: Django Http response.
+
+    """
+    filters: ProductFilters = _product_filters(request)
+    # The version is got before the search, and the searcher clears its caches before bumping it (e.g. on imports),
+    # so rows are never cached with an older version than their products
+    catalog_version: CatalogVersion = catalog_versions.get()
+    return _catalog_list_response(
+        request,
+        product_searcher.list_page(**_catalog_list_search(request, filters, per_page)),
+        filters,
+        catalog_version,
+        instrumentation,
+    )
+
+
+@_unavailable_while_circuit_open
+@_not_cached_if_stale
+@cache_control(public=True, max_age=CATALOG_CACHE_MAX_AGE)
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+@inject
+async def catalog_list_async(
+        request: HttpRequest,
+        product_searcher: AsyncProductSearcher = Provide[Container.async_product_searcher],
+        per_page: int = Provide[Container.config.CATALOG_PER_PAGE],
+        catalog_versions: AbstractCatalogVersionStore = Provide[Container.catalog_versions],
+        instrumentation: Instrumentation = Provide[Container.instrumentation],
+) -> HttpResponse:
+    """List a page of Products without blocking a worker thread while Typesense answers, for ASGI deployments.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        product_searcher: asynchronous service to search products.
+        per_page: products per page.
+        catalog_versions: version stamp of the catalog, keying rendered rows.
+        instrumentation: timing of request stages.
 
     Returns:
         HttpResponse: Django Http response.
 
     """
-    # TODO: improve with more advanced searchs (only query_by product title for now)
-    return render(
+    filters: ProductFilters = _product_filters(request)
+    catalog_version: CatalogVersion = catalog_versions.get()
+    return _catalog_list_response(
         request,
-        template_name='catalog/catalog_list.html',
-        context={
-            'products': product_searcher(
-                q=request.GET.get('query', '*'),
-                query_by='title',
-            ),
-            'query': request.GET.get('query', ''),
-        },
+        await product_searcher.list_page(**_catalog_list_search(request, filters, per_page)),
+        filters,
+        catalog_version,
+        instrumentation,
+    )
+
+
+@_unavailable_while_circuit_open
+@_not_cached_if_stale
+@cache_control(public=True, max_age=CATALOG_CACHE_MAX_AGE)
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+@inject
+def catalog_api_search(
+        request: HttpRequest,
+        product_searcher: ProductSearcher = Provide[Container.product_searcher],
+        per_page: int = Provide[Container.config.CATALOG_PER_PAGE],
+        max_per_page: int = Provide[Container.config.CATALOG_API_MAX_PER_PAGE],
+        catalog_versions: AbstractCatalogVersionStore = Provide[Container.catalog_versions],
+) -> HttpResponseBase:
+    """Search a page of Products as JSON, with the same query and filters parameters as the catalog list.
+
+    The ``fields`` parameter selects the product fields (dotted paths, comma separated), which are the only ones got
+    from Typesense, ``per_page`` the products per page and ``facets=true`` adds the facet counts. Pages are
+    validated with the ETag of the catalog version, as catalog pages.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        product_searcher: service to search products.
+        per_page: default products per page.
+        max_per_page: max products per page.
+        catalog_versions: version stamp of the catalog.
+
+    Returns:
+        HttpResponseBase: JSON page streamed while products are encoded, or a 400 response if a field is unknown.
+
+    """
+    try:
+        encoder: ProductJsonEncoder = _api_encoder(request)
+    except ValueError as error:
+        return _api_error(error)
+
+    search: dict = _api_search(request, encoder, per_page, max_per_page)
+    products_page: ProductsPage = product_searcher.list_page(**search)
+    return _stale_marked(
+        StreamingHttpResponse(
+            encoder.page_chunks(products_page, facets=search['facets']),
+            content_type='application/json',
+        ),
+        products_page,
+    )
+
+
+@_unavailable_while_circuit_open
+@_not_cached_if_stale
+@cache_control(public=True, max_age=CATALOG_CACHE_MAX_AGE)
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+@inject
+async def catalog_api_search_async(
+        request: HttpRequest,
+        product_searcher: AsyncProductSearcher = Provide[Container.async_product_searcher],
+        per_page: int = Provide[Container.config.CATALOG_PER_PAGE],
+        max_per_page: int = Provide[Container.config.CATALOG_API_MAX_PER_PAGE],
+        catalog_versions: AbstractCatalogVersionStore = Provide[Container.catalog_versions],
+) -> HttpResponseBase:
+    """Search a page of Products as JSON, see catalog_api_search, for ASGI deployments.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        product_searcher: asynchronous service to search products.
+        per_page: default products per page.
+        max_per_page: max products per page.
+        catalog_versions: version stamp of the catalog.
+
+    Returns:
+        HttpResponseBase: JSON page streamed while products are encoded, or a 400 response if a field is unknown.
+
+    """
+    try:
+        encoder: ProductJsonEncoder = _api_encoder(request)
+    except ValueError as error:
+        return _api_error(error)
+
+    search: dict = _api_search(request, encoder, per_page, max_per_page)
+    products_page: ProductsPage = await product_searcher.list_page(**search)
+    return _stale_marked(
+        StreamingHttpResponse(
+            _async_chunks(encoder.page_chunks(products_page, facets=search['facets'])),
+            content_type='application/json',
+        ),
+        products_page,
     )
+
+
+@inject
+def catalog_api_export(
+        request: HttpRequest,
+        product_searcher: ProductSearcher = Provide[Container.product_searcher],
+) -> HttpResponseBase:
+    """Export every Product found by a search as NDJSON (a JSON object per line), with the parameters of the API.
+
+    Products are searched page by page while the response is streamed, so a single page is kept in memory whatever
+    the number of products found. With every field, pages are kept and encoded as compact product batches.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        product_searcher: service to search products.
+
+    Returns:
+        HttpResponseBase: NDJSON streamed response, or a 400 response if a field is unknown.
+
+    """
+    try:
+        encoder: ProductJsonEncoder = _api_encoder(request)
+    except ValueError as error:
+        return _api_error(error)
+
+    search: dict = _product_search(request, _product_filters(request))
+    chunks: Iterator[bytes]
+    if encoder.fields is None:
+        chunks = encoder.batches_ndjson_chunks(product_searcher.iter_batches(**search))
+    else:
+        chunks = encoder.ndjson_chunks(product_searcher.iter_all(**search, fields=encoder.fields))
+    return StreamingHttpResponse(chunks, content_type='application/x-ndjson')
+
+
+@inject
+async def catalog_api_export_async(
+        request: HttpRequest,
+        product_searcher: AsyncProductSearcher = Provide[Container.async_product_searcher],
+) -> HttpResponseBase:
+    """Export every Product found by a search as NDJSON, see catalog_api_export, for ASGI deployments.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        product_searcher: asynchronous service to search products.
+
+    Returns:
+        HttpResponseBase: NDJSON streamed response, or a 400 response if a field is unknown.
+
+    """
+    try:
+        encoder: ProductJsonEncoder = _api_encoder(request)
+    except ValueError as error:
+        return _api_error(error)
+
+    search: dict = _product_search(request, _product_filters(request))
+    chunks: AsyncIterator[bytes]
+    if encoder.fields is None:
+        chunks = encoder.async_batches_ndjson_chunks(product_searcher.iter_batches(**search))
+    else:
+        chunks = encoder.async_ndjson_chunks(product_searcher.iter_all(**search, fields=encoder.fields))
+    return StreamingHttpResponse(chunks, content_type='application/x-ndjson')
+
+
+def _suggestions_response(request: HttpRequest, suggestions: Suggestions) -> JsonResponse:
+    return JsonResponse({'query': request.GET.get('query', ''), **suggestions.model_dump()})
+
+
+@_unavailable_while_circuit_open
+@inject
+def catalog_suggest(
+        request: HttpRequest,
+        product_searcher: ProductSearcher = Provide[Container.product_searcher],
+        limit: int = Provide[Container.config.CATALOG_SUGGEST_LIMIT],
+) -> JsonResponse:
+    """Suggest products (SKU and title) for the search query being typed, most purchased first.
+
+    Args:
+        request (HttpRequest): Django Http request, with the query typed in the ``query`` parameter.
+        product_searcher: service to search products.
+        limit: max number of products suggested.
+
+    Returns:
+        JsonResponse: query, suggestions and number of products matching the query.
+
+    """
+    return _suggestions_response(request, product_searcher.suggest(request.GET.get('query', ''), limit))
+
+
+@_unavailable_while_circuit_open
+@inject
+async def catalog_suggest_async(
+        request: HttpRequest,
+        product_searcher: AsyncProductSearcher = Provide[Container.async_product_searcher],
+        limit: int = Provide[Container.config.CATALOG_SUGGEST_LIMIT],
+) -> JsonResponse:
+    """Suggest products for the search query being typed, see catalog_suggest, for ASGI deployments.
+
+    Args:
+        request (HttpRequest): Django Http request, with the query typed in the ``query`` parameter.
+        product_searcher: asynchronous service to search products.
+        limit: max number of products suggested.
+
+    Returns:
+        JsonResponse: query, suggestions and number of products matching the query.
+
+    """
+    return _suggestions_response(request, await product_searcher.suggest(request.GET.get('query', ''), limit))
+
+
+@inject
+def metrics(
+        request: HttpRequest,
+        metrics: AbstractMetrics | None = Provide[Container.metrics],
+) -> HttpResponse:
+    """Expose the metrics of request stages in Prometheus text format.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        metrics: metrics hook of request stages.
+
+    Returns:
+        HttpResponse: Django Http response.
+
+    Raises:
+        Http404: if metrics are not kept by a Prometheus backend.
+
+    """
+    if not isinstance(metrics, PrometheusMetrics):
+        raise Http404('Prometheus metrics are disabled')
+
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def replay_catalog_query(query: str) -> None:
+    """Request the first catalog page of a query, as its users would, so its search, facets and rendered rows are
+    cached by the startup before the worker is ready.
+
+    Args:
+        query (str): query searched, the landing page if empty.
+
+    Raises:
+        ValueError: if the page is not rendered.
+
+    """
+    # Built from a WSGI environ rather than by a RequestFactory, so serving workers do not import django.test
+    request: HttpRequest = WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': '/',
+        'QUERY_STRING': urlencode({'query': query}) if query else '',
+        'wsgi.input': BytesIO(),
+    })
+    response: HttpResponse = catalog_list(request)
+    if response.status_code != 200:
+        raise ValueError(f'Catalog page of query {query!r} answered {response.status_code}')
+
+
+@never_cache
+def healthz(request: HttpRequest) -> JsonResponse:
+    """Liveness probe, answered while the worker serves requests (Typesense is not checked, so a worker is not
+    restarted while Typesense is down).
+
+    Args:
+        request (HttpRequest): Django Http request.
+
+    Returns:
+        JsonResponse: status of the worker.
+
+    """
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+@inject
+def readyz(
+        request: HttpRequest,
+        startup: Startup = Provide[Container.startup],
+) -> JsonResponse:
+    """Readiness probe, ready once Typesense is healthy and caches are warmed up. The first probe starts the startup
+    of the worker unless it was started when the application was loaded, and a failed startup is started again.
+
+    Args:
+        request (HttpRequest): Django Http request.
+        startup: startup of the worker.
+
+    Returns:
+        JsonResponse: startup report, with status 200 if ready else 503.
+
+    """
+    report: StartupReport = startup.start()
+    return JsonResponse(asdict(report), status=200 if report.ready else 503)
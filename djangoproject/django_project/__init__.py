@@ -1,5 +1,20 @@
-from djangoproject.django_project import settings
-from store_catalog.container import Container
+from functools import cache
+from typing import Any
 
-container = Container()
-container.config.from_dict(settings.__dict__)
+
+@cache
+def _container() -> Any:
+    # Adapters (Typesense, pydantic, httpx...) are imported when the container is first used, not by every import of
+    # the settings (e.g. management commands or wsgi modules loading them)
+    from djangoproject.django_project import settings
+    from store_catalog.container import Container
+
+    container: Container = Container()
+    container.config.from_dict(settings.__dict__)
+    return container
+
+
+def __getattr__(name: str) -> Any:
+    if name == 'container':
+        return _container()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'djangoproject.catalog.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,6 +89,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+# In process by default: set a backend shared by processes (e.g. django.core.cache.backends.redis.RedisCache with
+# the redis package, located at redis://redis:6379) with CATALOG_VERSION_BACKEND=django, so the import and migration
+# commands invalidate the caches of the web workers
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -129,8 +143,128 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Serve the catalog with async views, to enable when deployed with ASGI
+CATALOG_ASYNC_VIEWS = os.getenv('CATALOG_ASYNC_VIEWS', 'false').lower() == 'true'
+# Products per page of the catalog navigator (at most 250, Typesense max per page)
+CATALOG_PER_PAGE = int(os.getenv('CATALOG_PER_PAGE', 20))
+# Max products per page of the JSON search API (at most 250, Typesense max per page)
+CATALOG_API_MAX_PER_PAGE = int(os.getenv('CATALOG_API_MAX_PER_PAGE', 250))
+# Products suggested while a search query is typed
+CATALOG_SUGGEST_LIMIT = int(os.getenv('CATALOG_SUGGEST_LIMIT', 8))
+# Product fields matched by search queries with their weight (title, sku and description), higher weights ranking
+# their matches first
+CATALOG_QUERY_BY = os.getenv('CATALOG_QUERY_BY', 'title:2,sku:1')
+# Seconds browsers and CDNs reuse a catalog page before revalidating it with its ETag (0 to always revalidate)
+CATALOG_CACHE_MAX_AGE_SECONDS = int(os.getenv('CATALOG_CACHE_MAX_AGE_SECONDS', 60))
+# Cache of rendered product rows by SKU and catalog version (empty alias to render every row)
+CATALOG_FRAGMENT_CACHE_ALIAS = os.getenv('CATALOG_FRAGMENT_CACHE_ALIAS', 'default')
+CATALOG_FRAGMENT_CACHE_TTL_SECONDS = float(os.getenv('CATALOG_FRAGMENT_CACHE_TTL_SECONDS', 600))
+# Version stamp of the catalog bumped on imports and migrations (backend: memory, per process, or django, shared)
+CATALOG_VERSION_BACKEND = os.getenv('CATALOG_VERSION_BACKEND', 'memory')
+CATALOG_VERSION_DJANGO_ALIAS = os.getenv('CATALOG_VERSION_DJANGO_ALIAS', 'default')
+CATALOG_VERSION_REFRESH_SECONDS = float(os.getenv('CATALOG_VERSION_REFRESH_SECONDS', 1))
+# Updates of stock and purchases keep the version, the ETag of pages changes at most once per window
+CATALOG_VERSION_UPDATES_WINDOW_SECONDS = float(os.getenv('CATALOG_VERSION_UPDATES_WINDOW_SECONDS', 60))
+
 # Typesense sttings
 TYPESENSE_API_KEY = os.getenv('TYPESENSE_API_KEY')
 TYPESENSE_HOST = os.getenv('TYPESENSE_HOST')
 TYPESENSE_PORT = os.getenv('TYPESENSE_PORT')
 TYPESENSE_PROTOCOL = os.getenv('TYPESENSE_PROTOCOL')
+# Comma separated URLs of cluster nodes (e.g. http://typesense-1:8108,http://typesense-2:8108), overrides host
+TYPESENSE_NODES = [node for node in os.getenv('TYPESENSE_NODES', '').split(',') if node]
+TYPESENSE_NEAREST_NODE = os.getenv('TYPESENSE_NEAREST_NODE')
+TYPESENSE_POOL_SIZE = int(os.getenv('TYPESENSE_POOL_SIZE', 10))
+TYPESENSE_CONNECT_TIMEOUT_SECONDS = float(os.getenv('TYPESENSE_CONNECT_TIMEOUT_SECONDS', 3.0))
+TYPESENSE_READ_TIMEOUT_SECONDS = float(os.getenv('TYPESENSE_READ_TIMEOUT_SECONDS', 10.0))
+# Max connections of the non-blocking client of async views (per event loop)
+TYPESENSE_ASYNC_POOL_SIZE = int(os.getenv('TYPESENSE_ASYNC_POOL_SIZE', 100))
+TYPESENSE_POOL_TIMEOUT_SECONDS = float(os.getenv('TYPESENSE_POOL_TIMEOUT_SECONDS', 5.0))
+TYPESENSE_HEALTHCHECK_INTERVAL_SECONDS = float(os.getenv('TYPESENSE_HEALTHCHECK_INTERVAL_SECONDS', 60))
+# Retries of a failed request on another node, the synchronous client sleeps the retry interval before every retry
+TYPESENSE_NUM_RETRIES = int(os.getenv('TYPESENSE_NUM_RETRIES', 3))
+TYPESENSE_RETRY_INTERVAL_SECONDS = float(os.getenv('TYPESENSE_RETRY_INTERVAL_SECONDS', 1.0))
+TYPESENSE_HEDGE_READS = os.getenv('TYPESENSE_HEDGE_READS', 'false').lower() == 'true'
+TYPESENSE_HEDGE_MIN_DELAY_MS = float(os.getenv('TYPESENSE_HEDGE_MIN_DELAY_MS', 50.0))
+# Build domain models of search results without validation (documents are validated on ingest)
+TYPESENSE_TRUSTED_DOCUMENTS = os.getenv('TYPESENSE_TRUSTED_DOCUMENTS', 'false').lower() == 'true'
+TYPESENSE_IMPORT_BATCH_SIZE = int(os.getenv('TYPESENSE_IMPORT_BATCH_SIZE', 1000))
+TYPESENSE_IMPORT_CONCURRENCY = int(os.getenv('TYPESENSE_IMPORT_CONCURRENCY', 4))
+# Product updates are held while migrations copy collections (lock shared as the catalog version backend), the
+# lock expires after its TTL if a migration is killed, and migrations wait the grace for updates being sent
+MIGRATION_LOCK_TTL_SECONDS = float(os.getenv('MIGRATION_LOCK_TTL_SECONDS', 3600))
+MIGRATION_LOCK_GRACE_SECONDS = float(os.getenv('MIGRATION_LOCK_GRACE_SECONDS', 10))
+
+# Products searched in Typesense or in the catalog files loaded in memory (backend: typesense or memory)
+PRODUCT_REPOSITORY_BACKEND = os.getenv('PRODUCT_REPOSITORY_BACKEND', 'typesense')
+CATALOG_DIR = os.getenv('CATALOG_DIR', str(BASE_DIR.parent / 'tests' / 'catalog_files'))
+
+# Partial updates of stock and purchases, coalesced by SKU and sent in bulk imports of at most a batch size every
+# flush interval, updates wait at most the put timeout when max pending SKUs are buffered
+PRODUCT_UPDATES_BATCH_SIZE = int(os.getenv('PRODUCT_UPDATES_BATCH_SIZE', 1000))
+PRODUCT_UPDATES_FLUSH_INTERVAL_SECONDS = float(os.getenv('PRODUCT_UPDATES_FLUSH_INTERVAL_SECONDS', 1.0))
+PRODUCT_UPDATES_MAX_PENDING = int(os.getenv('PRODUCT_UPDATES_MAX_PENDING', 100000))
+PRODUCT_UPDATES_PUT_TIMEOUT_SECONDS = float(os.getenv('PRODUCT_UPDATES_PUT_TIMEOUT_SECONDS', 5.0))
+
+# Search results cache settings (backend: memory, django or none)
+SEARCH_CACHE_BACKEND = os.getenv('SEARCH_CACHE_BACKEND', 'memory')
+SEARCH_CACHE_MAX_SIZE = int(os.getenv('SEARCH_CACHE_MAX_SIZE', 10000))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv('SEARCH_CACHE_TTL_SECONDS', 60))
+SEARCH_CACHE_DJANGO_ALIAS = os.getenv('SEARCH_CACHE_DJANGO_ALIAS', 'default')
+
+# Facet counts of searches served while refreshed in the background once stale (backend: memory or none)
+FACET_CACHE_BACKEND = os.getenv('FACET_CACHE_BACKEND', 'memory')
+FACET_CACHE_MAX_SIZE = int(os.getenv('FACET_CACHE_MAX_SIZE', 1000))
+FACET_CACHE_REFRESH_SECONDS = float(os.getenv('FACET_CACHE_REFRESH_SECONDS', 60))
+FACET_CACHE_TTL_SECONDS = float(os.getenv('FACET_CACHE_TTL_SECONDS', 600))
+# Suggestions by query, filtered from the complete suggestions of a prefix (backend: memory or none)
+SUGGESTION_CACHE_BACKEND = os.getenv('SUGGESTION_CACHE_BACKEND', 'memory')
+SUGGESTION_CACHE_MAX_SIZE = int(os.getenv('SUGGESTION_CACHE_MAX_SIZE', 10000))
+SUGGESTION_CACHE_TTL_SECONDS = float(os.getenv('SUGGESTION_CACHE_TTL_SECONDS', 300))
+# Candidates got by a suggestions search, the more the more prefixes answer the queries extending them
+SUGGESTION_CACHE_DEPTH = int(os.getenv('SUGGESTION_CACHE_DEPTH', 50))
+
+# Identical concurrent searches missing the cache searched once for all of them (backend: memory or none), waiting
+# for the search at most the timeout before searching again
+SINGLE_FLIGHT_BACKEND = os.getenv('SINGLE_FLIGHT_BACKEND', 'memory')
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv('SINGLE_FLIGHT_TIMEOUT_SECONDS', 5.0))
+
+# Typesense calls rejected at once for the open time once the failure rate or the slow call rate (calls of at least
+# the slow call time) of the last calls (window size, evaluated from the min calls) reaches its threshold, then let
+# through again once the half open probe calls succeed (backend: memory or none)
+CIRCUIT_BREAKER_BACKEND = os.getenv('CIRCUIT_BREAKER_BACKEND', 'memory')
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', 0.5))
+CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.getenv('CIRCUIT_BREAKER_SLOW_CALL_SECONDS', 2.0))
+CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.getenv('CIRCUIT_BREAKER_SLOW_CALL_RATE', 0.8))
+CIRCUIT_BREAKER_WINDOW_SIZE = int(os.getenv('CIRCUIT_BREAKER_WINDOW_SIZE', 20))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', 10))
+CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', 30))
+CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.getenv('CIRCUIT_BREAKER_HALF_OPEN_CALLS', 3))
+# Last good result of searches, served marked stale while searched again in the background for the revalidate time
+# once their cached result expired, and served if their search fails for the if error time (backend: memory or none)
+STALE_CACHE_BACKEND = os.getenv('STALE_CACHE_BACKEND', 'memory')
+STALE_CACHE_MAX_SIZE = int(os.getenv('STALE_CACHE_MAX_SIZE', 10000))
+STALE_CACHE_REVALIDATE_SECONDS = float(os.getenv('STALE_CACHE_REVALIDATE_SECONDS', 300))
+STALE_CACHE_IF_ERROR_SECONDS = float(os.getenv('STALE_CACHE_IF_ERROR_SECONDS', 3600))
+
+# Startup of workers, reported by /readyz: Typesense is awaited with exponential backoff (at most the timeout), then
+# dimensions are loaded and the first catalog page of the top queries of the file (one per line, most popular first)
+# is requested to warm up caches. Started when the WSGI/ASGI application is loaded if enabled, else by the first probe
+CATALOG_STARTUP_ON_LOAD = os.getenv('CATALOG_STARTUP_ON_LOAD', 'true').lower() == 'true'
+CATALOG_STARTUP_TIMEOUT_SECONDS = float(os.getenv('CATALOG_STARTUP_TIMEOUT_SECONDS', 60))
+CATALOG_STARTUP_INITIAL_DELAY_SECONDS = float(os.getenv('CATALOG_STARTUP_INITIAL_DELAY_SECONDS', 0.1))
+CATALOG_STARTUP_MAX_DELAY_SECONDS = float(os.getenv('CATALOG_STARTUP_MAX_DELAY_SECONDS', 5.0))
+CATALOG_WARM_UP_QUERIES_FILE = os.getenv('CATALOG_WARM_UP_QUERIES_FILE', '')
+CATALOG_WARM_UP_TOP_N = int(os.getenv('CATALOG_WARM_UP_TOP_N', 20))
+
+# Hot cache of products by SKU for detail lookups
+SKU_CACHE_MAX_SIZE = int(os.getenv('SKU_CACHE_MAX_SIZE', 10000))
+SKU_CACHE_TTL_SECONDS = float(os.getenv('SKU_CACHE_TTL_SECONDS', 60))
+
+# Cache of categories and manufacturers assembled locally instead of joined by searches (backend: memory or none)
+DIMENSION_CACHE_BACKEND = os.getenv('DIMENSION_CACHE_BACKEND', 'memory')
+DIMENSION_CACHE_TTL_SECONDS = float(os.getenv('DIMENSION_CACHE_TTL_SECONDS', 300))
+
+# Timing of request stages, sent in Server-Timing headers and to the metrics backend (prometheus or none)
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+METRICS_BACKEND = os.getenv('METRICS_BACKEND', 'prometheus')
@@ -14,12 +14,29 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 
+from djangoproject.catalog.views import catalog_api_export
+from djangoproject.catalog.views import catalog_api_export_async
+from djangoproject.catalog.views import catalog_api_search
+from djangoproject.catalog.views import catalog_api_search_async
 from djangoproject.catalog.views import catalog_list
+from djangoproject.catalog.views import catalog_list_async
+from djangoproject.catalog.views import catalog_suggest
+from djangoproject.catalog.views import catalog_suggest_async
+from djangoproject.catalog.views import healthz
+from djangoproject.catalog.views import metrics
+from djangoproject.catalog.views import readyz
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', catalog_list)
+    path('', catalog_list_async if settings.CATALOG_ASYNC_VIEWS else catalog_list),
+    path('suggest', catalog_suggest_async if settings.CATALOG_ASYNC_VIEWS else catalog_suggest),
+    path('api/products', catalog_api_search_async if settings.CATALOG_ASYNC_VIEWS else catalog_api_search),
+    path('api/products/export', catalog_api_export_async if settings.CATALOG_ASYNC_VIEWS else catalog_api_export),
+    path('metrics', metrics),
+    path('healthz', healthz),
+    path('readyz', readyz),
 ]
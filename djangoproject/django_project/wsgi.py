@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_project.settings')
 
 application = get_wsgi_application()
+
+if settings.CATALOG_STARTUP_ON_LOAD:
+    # Workers wait for Typesense and warm up caches in the background as soon as they are loaded, /readyz reports
+    # when they are done
+    from djangoproject.django_project import container
+
+    container.startup().start()
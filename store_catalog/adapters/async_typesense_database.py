@@ -0,0 +1,266 @@
+"""Asynchronous Typesense database client config module.
+"""
+
+import asyncio
+import itertools
+import ssl
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from contextlib import asynccontextmanager
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+from typesense.api_call import ApiCall  # type: ignore
+from typesense.configuration import Node  # type: ignore
+
+from store_catalog.adapters.instrumentation import DECODE_STAGE
+from store_catalog.adapters.instrumentation import SESSION_STAGE
+from store_catalog.adapters.instrumentation import TYPESENSE_STAGE
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.typesense_cluster import NodeRouter
+from store_catalog.adapters.typesense_cluster import NodeStats
+from store_catalog.adapters.typesense_cluster import node_config
+
+
+class AsyncTypesenseSession:
+    """Asynchronous session of Typesense search endpoints.
+
+    Attributes:
+        _database (AsyncTypesenseDatabase): database sending the requests.
+
+    """
+
+    def __init__(self, database: 'AsyncTypesenseDatabase') -> None:
+        self._database: AsyncTypesenseDatabase = database
+
+    async def search(self, collection_name: str, search_parameters: dict) -> dict:
+        """Search documents of a collection.
+
+        Args:
+            collection_name (str): name of the collection.
+            search_parameters (dict): search parameters.
+
+        Returns:
+            dict: search result.
+
+        """
+        return await self._database.request(
+            'GET',
+            f'/collections/{collection_name}/documents/search',
+            params=search_parameters,
+        )
+
+    async def multi_search(self, searches: list[dict], common_parameters: dict | None = None) -> dict:
+        """Send several searches in one request.
+
+        Args:
+            searches (list[dict]): search parameters, with their collection, of every search.
+            common_parameters (dict, optional): parameters shared by every search.
+
+        Returns:
+            dict: results of every search.
+
+        """
+        return await self._database.request(
+            'POST',
+            '/multi_search',
+            params=common_parameters,
+            json={'searches': searches},
+        )
+
+
+class AsyncTypesenseDatabase(object):
+    """Singleton to manage asynchronous typesense connections.
+
+    Requests are sent by non-blocking ``httpx`` clients per event loop, with pools of keep-alive connections, and
+    routed to the cluster nodes by a health and latency aware NodeRouter. The connections are split among clients
+    of at most ``CONNECTIONS_PER_CLIENT`` connections used in turn, because the cost of every request of an httpx
+    pool grows with its number of connections, which collapses throughput with hundreds of requests in flight.
+
+    Attributes:
+        _api_key (str): The API key for typesense.
+        _nodes (list[Node]): typesense cluster nodes.
+        _nearest_node (Node, optional): node preferred while it is healthy.
+        _num_retries (int): max retries of a request on another node when a node fails.
+        _clients_count (int): httpx clients per event loop.
+        _limits (httpx.Limits): connection pool limits of every client.
+        _timeout (httpx.Timeout): connect, read, write and pool timeouts.
+        _ssl_context (ssl.SSLContext): SSL context shared by every client, loading certificates once.
+        _router (NodeRouter): router of requests to typesense cluster nodes.
+        _instrumentation (Instrumentation): timing of client checkouts, round trips and JSON decoding.
+
+    """
+    CONNECTIONS_PER_CLIENT: int = 8
+
+    def __init__(
+            self,
+            api_key: str,
+            host: str | None = None,
+            port: str | None = None,
+            protocol: str | None = None,
+            nodes: list[str] | None = None,
+            nearest_node: str | None = None,
+            pool_size: int = 100,
+            connect_timeout_seconds: float = 3.0,
+            read_timeout_seconds: float = 10.0,
+            pool_timeout_seconds: float = 5.0,
+            healthcheck_interval_seconds: float = 60,
+            num_retries: int = 3,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            api_key (str): The API key for typesense.
+            host (str, optional): The host of typesense, used if there are not nodes.
+            port (str, optional): The port of typesense, used if there are not nodes.
+            protocol (str, optional): The protocol of typesense, used if there are not nodes.
+            nodes (list[str], optional): URLs of typesense cluster nodes, e.g. ``http://typesense-1:8108``.
+            nearest_node (str, optional): URL of the node to prefer while it is healthy.
+            pool_size (int): max number of connections of every event loop.
+            connect_timeout_seconds (float): timeout to establish a connection with typesense.
+            read_timeout_seconds (float): timeout to wait for typesense response once connected.
+            pool_timeout_seconds (float): max time waiting for a connection when the pool is exhausted.
+            healthcheck_interval_seconds (float): seconds before an unhealthy node is retried.
+            num_retries (int): max retries of a request on another node when a node fails.
+            instrumentation (Instrumentation, optional): timing of requests stages, disabled if None.
+
+        """
+        self._api_key: str = api_key
+        self._nodes: list[Node] = [
+            Node(**node_config(node)) for node in nodes
+        ] if nodes else [Node(host=host, port=port, path='', protocol=protocol)]
+        self._nearest_node: Node | None = Node(**node_config(nearest_node)) if nearest_node else None
+        self._num_retries: int = num_retries
+        self._clients_count: int = -(-pool_size // self.CONNECTIONS_PER_CLIENT)
+        client_pool_size: int = -(-pool_size // self._clients_count)
+        self._limits: httpx.Limits = httpx.Limits(
+            max_connections=client_pool_size,
+            max_keepalive_connections=client_pool_size,
+        )
+        self._timeout: httpx.Timeout = httpx.Timeout(
+            connect=connect_timeout_seconds,
+            read=read_timeout_seconds,
+            write=read_timeout_seconds,
+            pool=pool_timeout_seconds,
+        )
+        self._ssl_context: ssl.SSLContext = httpx.create_ssl_context()
+        self._router: NodeRouter = NodeRouter(healthcheck_interval_seconds=healthcheck_interval_seconds)
+        self._instrumentation: Instrumentation = instrumentation or Instrumentation()
+        # httpx clients are bound to the event loop that opened their connections
+        self._http_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, list[httpx.AsyncClient]] = (
+            WeakKeyDictionary()
+        )
+        self._http_clients_cycles: WeakKeyDictionary[asyncio.AbstractEventLoop, Iterator[httpx.AsyncClient]] = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def _http_client(self) -> httpx.AsyncClient:
+        event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if event_loop not in self._http_clients:
+            self._http_clients[event_loop] = [
+                httpx.AsyncClient(
+                    headers={ApiCall.API_KEY_HEADER_NAME: self._api_key},
+                    limits=self._limits,
+                    timeout=self._timeout,
+                    verify=self._ssl_context,
+                )
+                for _ in range(self._clients_count)
+            ]
+            self._http_clients_cycles[event_loop] = itertools.cycle(self._http_clients[event_loop])
+
+        return next(self._http_clients_cycles[event_loop])
+
+    async def request(
+            self,
+            method: str,
+            endpoint: str,
+            params: dict | None = None,
+            json: Any = None,
+    ) -> Any:
+        """Send a request to a typesense node, retried on another node if it fails.
+
+        Args:
+            method (str): HTTP method.
+            endpoint (str): endpoint path.
+            params (dict, optional): query parameters.
+            json (Any, optional): JSON body.
+
+        Returns:
+            Any: JSON response.
+
+        Raises:
+            TypesenseClientError: typesense client error of response status if not 2XX.
+            httpx.TransportError: if every try failed by a connection error.
+
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        last_exception: Exception | None = None
+        failed_node: Node | None = None
+
+        for _ in range(self._num_retries + 1):
+            node: Node = self._router.select(self._nodes, self._nearest_node, exclude=failed_node)
+            with self._instrumentation.span(SESSION_STAGE):
+                http_client: httpx.AsyncClient = self._http_client
+            start: float = time.perf_counter()
+            try:
+                response: httpx.Response = await http_client.request(
+                    method,
+                    node.url() + endpoint,
+                    params=params,
+                    json=json,
+                )
+            except httpx.TransportError as exception:
+                self._router.record_failure(node)
+                last_exception, failed_node = exception, node
+                continue
+
+            if response.status_code >= 500:
+                self._router.record_failure(node)
+                last_exception, failed_node = self._error(response), node
+                continue
+
+            elapsed_seconds: float = time.perf_counter() - start
+            self._router.record_success(node, elapsed_seconds)
+            if not 200 <= response.status_code < 300:
+                raise self._error(response)
+
+            if not self._instrumentation.enabled:
+                return response.json()
+
+            self._instrumentation.record(TYPESENSE_STAGE, elapsed_seconds)
+            with self._instrumentation.span(DECODE_STAGE):
+                result: Any = response.json()
+            self._instrumentation.typesense_response(result, len(response.content))
+            return result
+
+        assert last_exception is not None
+        raise last_exception
+
+    @staticmethod
+    def _error(response: httpx.Response) -> Exception:
+        """Typesense client error of a response."""
+        error_message: str = (
+            response.json().get('message', 'API error.')
+            if response.headers.get('Content-Type', '').startswith('application/json') else 'API error.'
+        )
+        return ApiCall.get_exception(response.status_code)(response.status_code, error_message)
+
+    @property
+    def node_stats(self) -> list[NodeStats]:
+        """list[NodeStats]: current counters of every typesense node."""
+        return self._router.stats
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncTypesenseSession]:
+        yield AsyncTypesenseSession(self)
+
+    async def close(self) -> None:
+        """Close the connections of the current event loop."""
+        event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self._http_clients_cycles.pop(event_loop, None)
+        for http_client in self._http_clients.pop(event_loop, []):
+            await http_client.aclose()
@@ -0,0 +1,201 @@
+"""Catalog version module.
+
+This module define a layer of abstraction around the version stamp of the catalog, bumped when products change, so
+HTTP caches of catalog pages are validated (ETag and Last-Modified) and rendered fragments are keyed by it. Updates
+of hot fields (stock and purchases) do not bump it, they only change the ETag once per updates window.
+"""
+
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from dataclasses import dataclass
+from dataclasses import replace
+from typing import Any
+
+from store_catalog.adapters.search_cache import shared_django_cache
+
+
+@dataclass(frozen=True)
+class CatalogVersion:
+    """Version stamp of the catalog.
+
+    Attributes:
+        version (int): number of the version, increased when products change.
+        modified_at (float): time of the last change, in seconds since the epoch.
+        updated_at (float): start of the last updates window with updates of hot fields, in seconds since the epoch.
+    """
+    version: int
+    modified_at: float
+    updated_at: float = 0.0
+
+    @property
+    def key(self) -> str:
+        """str: key of the version, changed by catalog changes but not by updates of hot fields."""
+        return f'{self.version}-{int(self.modified_at)}'
+
+    @property
+    def etag(self) -> str:
+        """str: entity tag of catalog pages of the version and of the last updates window (unquoted)."""
+        if self.updated_at <= self.modified_at:
+            return self.key
+        return f'{self.key}-{int(self.updated_at)}'
+
+    @property
+    def last_modified_at(self) -> float:
+        """float: time of the last change or updates window, in seconds since the epoch."""
+        return max(self.modified_at, self.updated_at)
+
+
+def updates_window_start(updates_window_seconds: float) -> float:
+    """Start of the current updates window, in seconds since the epoch."""
+    if updates_window_seconds <= 0:
+        return time.time()
+    return time.time() // updates_window_seconds * updates_window_seconds
+
+
+class AbstractCatalogVersionStore(ABC):
+    """Abstract catalog version store class Port (interface).
+    """
+
+    @abstractmethod
+    def get(self) -> CatalogVersion:
+        raise NotImplementedError
+
+    @abstractmethod
+    def bump(self) -> CatalogVersion:
+        """Increase the version of the catalog, to call when products change."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def touch(self) -> CatalogVersion:
+        """Record updates of hot fields (stock and purchases) in the current updates window, the version is kept."""
+        raise NotImplementedError
+
+    @property
+    def shared(self) -> bool:
+        """bool: True if the version is shared by processes, so a bump by a command reaches every worker."""
+        return False
+
+
+class LocalCatalogVersionStore(AbstractCatalogVersionStore):
+    """In-process catalog version store Adapter, for a single process (versions of workers are not shared).
+
+    Attributes:
+        _version (CatalogVersion): current version, the first one modified when the store is created.
+        _updates_window_seconds (float): seconds during which updates of hot fields keep the same ETag.
+
+    """
+
+    def __init__(self, updates_window_seconds: float = 60) -> None:
+        """Constructor.
+
+        Args:
+            updates_window_seconds (float): seconds during which updates of hot fields keep the same ETag.
+
+        """
+        self._version: CatalogVersion = CatalogVersion(version=0, modified_at=time.time())
+        self._updates_window_seconds: float = updates_window_seconds
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self) -> CatalogVersion:
+        return self._version
+
+    def bump(self) -> CatalogVersion:
+        with self._lock:
+            self._version = CatalogVersion(version=self._version.version + 1, modified_at=time.time())
+            return self._version
+
+    def touch(self) -> CatalogVersion:
+        updated_at: float = updates_window_start(self._updates_window_seconds)
+        with self._lock:
+            if updated_at > self._version.updated_at:
+                self._version = replace(self._version, updated_at=updated_at)
+            return self._version
+
+
+class DjangoCatalogVersionStore(AbstractCatalogVersionStore):
+    """Catalog version store Adapter over a Django cache backend, shared by every worker using the same backend.
+
+    The version is an atomic increment of the backend, and it is read again at most once per ``refresh_seconds``
+    to save a round trip per request, so workers see a bump after at most that delay. Updates of hot fields are
+    written once per updates window.
+
+    Attributes:
+        _alias (str): Django cache alias.
+        _refresh_seconds (float): seconds a version read from the backend is reused.
+        _updates_window_seconds (float): seconds during which updates of hot fields keep the same ETag.
+
+    """
+    VERSION_KEY: str = 'store_catalog:catalog:version'
+    MODIFIED_AT_KEY: str = 'store_catalog:catalog:modified_at'
+    UPDATED_AT_KEY: str = 'store_catalog:catalog:updated_at'
+
+    def __init__(
+            self,
+            alias: str = 'default',
+            refresh_seconds: float = 1.0,
+            updates_window_seconds: float = 60,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            alias (str): Django cache alias.
+            refresh_seconds (float): seconds a version read from the backend is reused.
+            updates_window_seconds (float): seconds during which updates of hot fields keep the same ETag.
+
+        """
+        self._alias: str = alias
+        self._refresh_seconds: float = refresh_seconds
+        self._updates_window_seconds: float = updates_window_seconds
+        self._version: CatalogVersion | None = None
+        self._version_expires_at: float = 0.0
+
+    @property
+    def _cache(self) -> Any:
+        # Django is imported lazily so store_catalog does not depend on it unless this backend is selected
+        from django.core.cache import caches
+
+        return caches[self._alias]
+
+    def get(self) -> CatalogVersion:
+        if self._version is None or self._version_expires_at < time.monotonic():
+            keys: list[str] = [self.VERSION_KEY, self.MODIFIED_AT_KEY, self.UPDATED_AT_KEY]
+            values: dict = self._cache.get_many(keys)
+            if self.VERSION_KEY not in values:
+                # The first worker (or the first after the backend was flushed) starts the catalog version
+                self._cache.add(self.MODIFIED_AT_KEY, time.time(), timeout=None)
+                self._cache.add(self.VERSION_KEY, 0, timeout=None)
+                values = self._cache.get_many(keys)
+            self._version = CatalogVersion(
+                version=values.get(self.VERSION_KEY, 0),
+                modified_at=values.get(self.MODIFIED_AT_KEY, 0.0),
+                updated_at=values.get(self.UPDATED_AT_KEY, 0.0),
+            )
+            self._version_expires_at = time.monotonic() + self._refresh_seconds
+
+        return self._version
+
+    def bump(self) -> CatalogVersion:
+        modified_at: float = time.time()
+        self._cache.set(self.MODIFIED_AT_KEY, modified_at, timeout=None)
+        try:
+            version: int = self._cache.incr(self.VERSION_KEY)
+        except ValueError:
+            version = 1
+            self._cache.set(self.VERSION_KEY, version, timeout=None)
+        self._version = CatalogVersion(version=version, modified_at=modified_at)
+        self._version_expires_at = time.monotonic() + self._refresh_seconds
+        return self._version
+
+    def touch(self) -> CatalogVersion:
+        updated_at: float = updates_window_start(self._updates_window_seconds)
+        version: CatalogVersion = self.get()
+        if updated_at > version.updated_at:
+            self._cache.set(self.UPDATED_AT_KEY, updated_at, timeout=None)
+            version = self._version = replace(version, updated_at=updated_at)
+        return version
+
+    @property
+    def shared(self) -> bool:
+        return shared_django_cache(self._alias)
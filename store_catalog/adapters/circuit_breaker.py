@@ -0,0 +1,243 @@
+"""Circuit breaker module.
+
+This module define a circuit breaker of the calls to the search engine: once too many recent calls failed or were
+slow, calls are rejected at once for a while instead of waiting for timeouts, then a few probe calls decide whether
+the engine recovered.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar('T')
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Call rejected by an open circuit breaker.
+
+    Attributes:
+        retry_after_seconds (float): seconds before the circuit breaker lets probe calls through.
+    """
+
+    def __init__(self, retry_after_seconds: float) -> None:
+        super().__init__(f'Circuit breaker open, retry after {retry_after_seconds:.1f}s')
+        self.retry_after_seconds: float = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class CircuitBreakerStats:
+    """Snapshot of the circuit breaker counters.
+
+    Attributes:
+        state (str): ``closed``, ``open`` or ``half_open``.
+        calls (int): calls of the sliding window.
+        failure_rate (float): rate of failed calls of the sliding window.
+        slow_call_rate (float): rate of slow calls of the sliding window.
+        rejected (int): calls rejected while open.
+        opened (int): times the circuit breaker opened.
+    """
+    state: str
+    calls: int
+    failure_rate: float
+    slow_call_rate: float
+    rejected: int
+    opened: int
+
+
+class CircuitBreaker:
+    """Circuit breaker over a sliding window of the last calls, for threads and for asynchronous tasks.
+
+    Closed, calls go through and their outcome (failed, slow) is recorded. Once the window has ``min_calls`` calls
+    and the rate of failed calls or of slow calls reaches its threshold, the circuit opens: calls raise
+    ``CircuitOpenError`` without being made for ``open_seconds``. It is then half open: ``half_open_calls`` probe
+    calls go through (the others are rejected), it closes if none of them failed nor was slow, else it opens again.
+
+    Only errors of ``failure_errors`` are failures, other errors (e.g. a malformed search) mean the engine answered.
+
+    Attributes:
+        _failure_rate_threshold (float): rate of failed calls opening the circuit.
+        _slow_call_seconds (float): duration of a call from which it is slow.
+        _slow_call_rate_threshold (float): rate of slow calls opening the circuit.
+        _min_calls (int): calls of the window before rates are evaluated.
+        _open_seconds (float): seconds calls are rejected once the circuit opened.
+        _half_open_calls (int): probe calls let through when half open.
+        _failure_errors (tuple[type[BaseException], ...]): errors counted as failures.
+        _outcomes (deque[tuple[bool, bool]]): failed and slow outcomes of the last calls.
+        _state (str): ``closed``, ``open`` or ``half_open``.
+        _opened_at (float): monotonic time the circuit opened.
+        _probes (int): probe calls let through since half open.
+        _probe_successes (int): probe calls succeeded since half open.
+
+    """
+
+    def __init__(
+            self,
+            failure_rate_threshold: float = 0.5,
+            slow_call_seconds: float = 2.0,
+            slow_call_rate_threshold: float = 0.8,
+            window_size: int = 20,
+            min_calls: int = 10,
+            open_seconds: float = 30.0,
+            half_open_calls: int = 3,
+            failure_errors: tuple[type[BaseException], ...] = (Exception,),
+    ) -> None:
+        """Constructor.
+
+        Args:
+            failure_rate_threshold (float): rate of failed calls opening the circuit.
+            slow_call_seconds (float): duration of a call from which it is slow.
+            slow_call_rate_threshold (float): rate of slow calls opening the circuit.
+            window_size (int): last calls whose outcome is evaluated.
+            min_calls (int): calls of the window before rates are evaluated.
+            open_seconds (float): seconds calls are rejected once the circuit opened.
+            half_open_calls (int): probe calls let through when half open.
+            failure_errors (tuple[type[BaseException], ...]): errors counted as failures.
+
+        """
+        self._failure_rate_threshold: float = failure_rate_threshold
+        self._slow_call_seconds: float = slow_call_seconds
+        self._slow_call_rate_threshold: float = slow_call_rate_threshold
+        self._min_calls: int = min(min_calls, window_size)
+        self._open_seconds: float = open_seconds
+        self._half_open_calls: int = half_open_calls
+        self._failure_errors: tuple[type[BaseException], ...] = failure_errors
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state: str = CLOSED
+        self._opened_at: float = 0.0
+        self._probes: int = 0
+        self._probe_successes: int = 0
+        self._rejected: int = 0
+        self._opened: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def call(self, call: Callable[[], T]) -> T:
+        """Make a call unless the circuit is open.
+
+        Args:
+            call (Callable[[], T]): call to the search engine.
+
+        Returns:
+            T: result of the call.
+
+        Raises:
+            CircuitOpenError: if the circuit is open (or half open with every probe call in flight).
+            BaseException: error raised by the call.
+
+        """
+        self._acquire()
+        start: float = time.monotonic()
+        try:
+            result: T = call()
+        except self._failure_errors:
+            self._record(True, time.monotonic() - start)
+            raise
+        except BaseException:
+            self._record(False, time.monotonic() - start)
+            raise
+
+        self._record(False, time.monotonic() - start)
+        return result
+
+    async def call_async(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Make an asynchronous call unless the circuit is open, see call."""
+        self._acquire()
+        start: float = time.monotonic()
+        try:
+            result: T = await call()
+        except asyncio.CancelledError:
+            # Not an outcome of the engine (e.g. the client disconnected), a probe call is let through again
+            self._release()
+            raise
+        except self._failure_errors:
+            self._record(True, time.monotonic() - start)
+            raise
+        except BaseException:
+            self._record(False, time.monotonic() - start)
+            raise
+
+        self._record(False, time.monotonic() - start)
+        return result
+
+    @property
+    def state(self) -> str:
+        """str: ``closed``, ``open`` or ``half_open``, open turning half open once ``open_seconds`` elapsed."""
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            calls: int = len(self._outcomes)
+            return CircuitBreakerStats(
+                state=self._current_state(),
+                calls=calls,
+                failure_rate=sum(failed for failed, _ in self._outcomes) / calls if calls else 0.0,
+                slow_call_rate=sum(slow for _, slow in self._outcomes) / calls if calls else 0.0,
+                rejected=self._rejected,
+                opened=self._opened,
+            )
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+        return self._state
+
+    def _acquire(self) -> None:
+        """Let a call through, or raise CircuitOpenError if the circuit is open or has every probe call in flight."""
+        with self._lock:
+            state: str = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self._half_open_calls:
+                self._probes += 1
+                return
+
+            self._rejected += 1
+            retry_after_seconds: float = max(self._opened_at + self._open_seconds - time.monotonic(), 0.0)
+        raise CircuitOpenError(retry_after_seconds)
+
+    def _release(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes -= 1
+
+    def _record(self, failed: bool, elapsed_seconds: float) -> None:
+        slow: bool = elapsed_seconds >= self._slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self._half_open_calls:
+                        self._state = CLOSED
+                        self._outcomes.clear()
+                return
+            if self._state == OPEN:
+                # Call let through before the circuit opened
+                return
+
+            self._outcomes.append((failed, slow))
+            calls: int = len(self._outcomes)
+            if calls < self._min_calls:
+                return
+            if sum(failed for failed, _ in self._outcomes) / calls >= self._failure_rate_threshold \
+                    or sum(slow for _, slow in self._outcomes) / calls >= self._slow_call_rate_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._opened += 1
+        self._outcomes.clear()
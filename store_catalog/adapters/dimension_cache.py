@@ -0,0 +1,157 @@
+"""Dimension cache module.
+
+This module define an in-process cache of the small and rarely changing catalog collections (categories and
+manufacturers), so searches do not join them and results share their domain models.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+
+from store_catalog.domain.model import ProductCategory
+from store_catalog.domain.model import ProductManufacturer
+
+
+@dataclass(frozen=True)
+class Dimensions:
+    """Domain models of the catalog dimensions, shared by every search result.
+
+    Attributes:
+        categories (dict[str, ProductCategory]): categories and subcategories, with their category parent, by ID.
+        manufacturers (dict[str, ProductManufacturer]): manufacturers by ID.
+        model_references (dict[str, tuple[str, str]]): category and manufacturer IDs by product model ID, to count
+            facets of products by model.
+    """
+    categories: dict[str, ProductCategory]
+    manufacturers: dict[str, ProductManufacturer]
+    model_references: dict[str, tuple[str, str]] = field(default_factory=dict)
+
+    def references(self, model_document: dict) -> tuple[ProductCategory, ProductManufacturer]:
+        """Category and manufacturer referenced by a product model document."""
+        return (
+            self.categories[model_document['product_category_id']],
+            self.manufacturers[model_document['product_manufacturer_id']],
+        )
+
+    def has_references(self, model_document: dict) -> bool:
+        """True if the category and manufacturer referenced by a (maybe projected) product model document are in
+        the dimensions."""
+        if 'product_category_id' in model_document and model_document['product_category_id'] not in self.categories:
+            return False
+
+        return 'product_manufacturer_id' not in model_document \
+            or model_document['product_manufacturer_id'] in self.manufacturers
+
+
+class DimensionCache:
+    """In-process cache of catalog dimensions, refreshed once expired by TTL or invalidated by a version bump.
+
+    Dimensions are built (and validated, even for trusted documents) once from the documents of their collections,
+    loaded by the repositories. A load started before an invalidation is not used by later searches.
+
+    Attributes:
+        _ttl_seconds (float): seconds the dimensions are valid.
+        _dimensions (Dimensions, optional): cached dimensions, None until loaded.
+        _expires_at (float): monotonic time when the cached dimensions expire.
+        _version (int): version of dimensions, increased when they are invalidated.
+
+    """
+    CATEGORIES_COLLECTION_NAME: str = 'product_categories'
+    MANUFACTURERS_COLLECTION_NAME: str = 'product_manufacturers'
+    MODELS_COLLECTION_NAME: str = 'product_models'
+    # Fields of product model documents kept in dimensions
+    MODEL_REFERENCE_FIELDS: str = 'id,product_category_id,product_manufacturer_id'
+
+    def __init__(self, ttl_seconds: float = 300) -> None:
+        """Constructor.
+
+        Args:
+            ttl_seconds (float): seconds the dimensions are valid.
+
+        """
+        self._ttl_seconds: float = ttl_seconds
+        self._dimensions: Dimensions | None = None
+        self._expires_at: float = 0.0
+        self._version: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """int: version of dimensions, to give to ``set`` when their load starts."""
+        return self._version
+
+    def get(self) -> Dimensions | None:
+        """Cached dimensions, None if they must be loaded (not loaded yet, expired or invalidated)."""
+        with self._lock:
+            if self._expires_at < time.monotonic():
+                return None
+            return self._dimensions
+
+    def set(
+            self,
+            category_documents: Iterable[dict],
+            manufacturer_documents: Iterable[dict],
+            version: int,
+            model_documents: Iterable[dict] = (),
+    ) -> Dimensions:
+        """Build and cache the dimensions of the documents of their collections.
+
+        Args:
+            category_documents (Iterable[dict]): documents of categories collection (categories and subcategories).
+            manufacturer_documents (Iterable[dict]): documents of manufacturers collection.
+            version (int): version of dimensions when their load started.
+            model_documents (Iterable[dict]): documents of product models collection, with ``MODEL_REFERENCE_FIELDS``
+                at least.
+
+        Returns:
+            Dimensions: dimensions built, cached only if they were not invalidated while they were loaded.
+
+        """
+        dimensions: Dimensions = Dimensions(
+            categories=self._categories(category_documents),
+            manufacturers={
+                document['id']: ProductManufacturer(
+                    id_=document['id'],
+                    title=document['title'],
+                    image_url=document['image_url'],
+                )
+                for document in manufacturer_documents
+            },
+            model_references={
+                document['id']: (document['product_category_id'], document['product_manufacturer_id'])
+                for document in model_documents
+            },
+        )
+        with self._lock:
+            if version == self._version:
+                self._dimensions = dimensions
+                self._expires_at = time.monotonic() + self._ttl_seconds
+
+        return dimensions
+
+    def invalidate(self) -> None:
+        """Invalidate the dimensions, to call when the catalog changes: they are loaded again by next search."""
+        with self._lock:
+            self._version += 1
+            self._expires_at = 0.0
+
+    @staticmethod
+    def _categories(category_documents: Iterable[dict]) -> dict[str, ProductCategory]:
+        """Categories by ID, subcategories share the domain model of their category parent."""
+        category_documents = list(category_documents)
+        categories: dict[str, ProductCategory] = {
+            document['id']: ProductCategory(id_=document['id'], title=document['title'])
+            for document in category_documents if not document.get('subcategory', False)
+        }
+        for document in category_documents:
+            if document.get('subcategory', False):
+                categories[document['id']] = ProductCategory(
+                    id_=document['id'],
+                    title=document['title'],
+                    subcategory=True,
+                    category_parent=categories[document['product_category_id']],
+                )
+
+        return categories
@@ -0,0 +1,136 @@
+"""Facet cache module.
+
+This module define an in-process cache of the facet counts of searches, refreshed in the background once stale so
+faceted searches of popular queries do not count facets again.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from store_catalog.adapters.product_facets import Facets
+
+
+class FacetCache:
+    """In-process cache of facet counts by search, with LRU eviction bounded by size, served stale while refreshed.
+
+    Counting facets is the most expensive part of a faceted search, and counts of a search (e.g. the unfiltered
+    catalog or a popular query) change slowly. Cached counts are served for ``ttl_seconds``; once older than
+    ``refresh_seconds`` they are still served while a single background refresh per search counts them again.
+
+    Attributes:
+        _max_size (int): max number of entries.
+        _refresh_seconds (float): seconds before cached counts are refreshed in the background.
+        _ttl_seconds (float): seconds cached counts are served, refreshed or not.
+        _entries (OrderedDict[str, tuple[float, float, Facets]]): refresh time, expiration time and facets by key,
+            least recent first.
+        _refreshing (set[str]): keys being refreshed in the background.
+        _version (int): version of facets, increased when they are cleared.
+        _executor (ThreadPoolExecutor): executor of background refreshes of synchronous searches.
+        _tasks (set[asyncio.Task]): background refreshes of asynchronous searches.
+
+    """
+
+    def __init__(self, max_size: int = 1000, refresh_seconds: float = 60, ttl_seconds: float = 600) -> None:
+        """Constructor.
+
+        Args:
+            max_size (int): max number of entries.
+            refresh_seconds (float): seconds before cached counts are refreshed in the background.
+            ttl_seconds (float): seconds cached counts are served, refreshed or not.
+
+        """
+        self._max_size: int = max_size
+        self._refresh_seconds: float = refresh_seconds
+        self._ttl_seconds: float = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, float, Facets]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._version: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='facet-refresh')
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def version(self) -> int:
+        """int: version of facets, to give to ``set`` when their count starts."""
+        return self._version
+
+    def get(self, key: str) -> Facets | None:
+        """Cached facets of a search, None if they must be counted (not cached or expired)."""
+        with self._lock:
+            entry: tuple[float, float, Facets] | None = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, facets: Facets, version: int) -> None:
+        """Cache the facets of a search, only if they were not cleared while they were counted."""
+        with self._lock:
+            self._refreshing.discard(key)
+            if version != self._version:
+                return
+
+            now: float = time.monotonic()
+            self._entries[key] = (now + self._refresh_seconds, now + self._ttl_seconds, facets)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: str, count: Callable[[], Facets]) -> None:
+        """Count again in a background thread the facets of a search if they are stale and not being refreshed.
+
+        Args:
+            key (str): key of the search.
+            count (Callable[[], Facets]): function counting the facets of the search.
+
+        """
+        if self._claim_refresh(key):
+            self._executor.submit(self._refresh, key, count, self._version)
+
+    def refresh_async(self, key: str, count: Callable[[], Awaitable[Facets]]) -> None:
+        """Count again in a background task of the running event loop the facets of a search, see refresh."""
+        if self._claim_refresh(key):
+            task: asyncio.Task = asyncio.get_running_loop().create_task(self._refresh_async(key, count, self._version))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._refreshing.clear()
+
+    def _claim_refresh(self, key: str) -> bool:
+        """True if the cached facets of a search are stale and not being refreshed, then they are being refreshed."""
+        with self._lock:
+            entry: tuple[float, float, Facets] | None = self._entries.get(key)
+            if entry is None or entry[0] > time.monotonic() or key in self._refreshing:
+                return False
+
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: str, count: Callable[[], Facets], version: int) -> None:
+        try:
+            self.set(key, count(), version)
+        except Exception:
+            # Stale facets are served until they expire, then they are counted again by a search
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(self, key: str, count: Callable[[], Awaitable[Facets]], version: int) -> None:
+        try:
+            self.set(key, await count(), version)
+        except Exception:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,874 @@
+"""In-memory repository module.
+
+This module define a product repository serving the catalog JSONL files from memory, without a search engine, to
+serve the catalog when Typesense is down and to run locally without it.
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from dataclasses import dataclass
+from dataclasses import replace
+from itertools import chain
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from typing import cast
+
+from store_catalog.adapters.dimension_cache import DimensionCache
+from store_catalog.adapters.dimension_cache import Dimensions
+from store_catalog.adapters.product_facets import Facets
+from store_catalog.adapters.product_facets import reference_facets
+from store_catalog.adapters.repository import AbstractProductRepository
+from store_catalog.adapters.repository import AsyncAbstractProductRepository
+from store_catalog.adapters.repository import ProductMultipleFoundsError
+from store_catalog.adapters.repository import ProductNotFoundError
+from store_catalog.adapters.typesense_importer import CATALOG_FILES
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductModel
+from store_catalog.domain.model import ProductsBySku
+from store_catalog.domain.model import ProductsPage
+from store_catalog.domain.model import ProductsUpdate
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN: re.Pattern = re.compile(r'\w+')
+SEPARATORS_PATTERN: re.Pattern = re.compile(r'\W+')
+ACCENTS_PATTERN: re.Pattern = re.compile('[\u0300-\u036f]')
+FILTER_CLAUSE_PATTERN: re.Pattern = re.compile(
+    r'(?:\$product_models\((?P<model_field>\w+):=?(?P<model_values>.+)\)'
+    r'|(?P<field>\w+):(?P<operator>>=|<=|>|<|=)?(?P<value>.+))',
+)
+SORT_CLAUSE_PATTERN: re.Pattern = re.compile(
+    r'(?:_eval\((?P<filter>.+)\)|(?P<field>\w*))\s*(?::\s*(?P<direction>asc|desc))?',
+    re.IGNORECASE,
+)
+RANGE_PATTERN: re.Pattern = re.compile(r'\[\s*(?P<low>-?\d+(?:\.\d+)?)\s*\.\.\s*(?P<high>-?\d+(?:\.\d+)?)\s*\]')
+
+# References of product models filtered by ``$product_models(...)``
+MODEL_FILTER_FIELDS: tuple[str, ...] = ('product_category_id', 'product_manufacturer_id')
+
+
+def normalize(text: str) -> str:
+    """Lowercase text without accents, to match it as Typesense does."""
+    return ACCENTS_PATTERN.sub('', unicodedata.normalize('NFKD', text.casefold()))
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def sku_key(sku: str) -> str:
+    """SKU normalized without separators, e.g. ``mod-PC45`` and ``MOD PC45`` are ``modpc45``."""
+    return SEPARATORS_PATTERN.sub('', normalize(sku))
+
+
+def bitmap(indices: Iterable[int], size: int) -> int:
+    """Bitmap (an int whose bit ``i`` is set for every index ``i``) of product indices."""
+    bits: bytearray = bytearray((size + 7) // 8)
+    for index in indices:
+        bits[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class _NumericColumn:
+    """Column of a numeric product field, sorted and bucketed to filter ranges and sort without scanning it.
+
+    Attributes:
+        values (array): value by product index.
+        order (array): product indices sorted by value.
+        _sorted_values (array): values sorted.
+        _bucket_size (int): products of every bucket of the sorted values.
+        _buckets (list[int]): bitmap of the products of every bucket of the sorted values.
+
+    """
+    BUCKETS: int = 64
+
+    def __init__(self, values: array) -> None:
+        self.values: array = values
+        self.order: array = array('I', sorted(range(len(values)), key=values.__getitem__))
+        self._sorted_values: array = array(values.typecode, (values[index] for index in self.order))
+        self._bucket_size: int = max(1024, -(-len(values) // self.BUCKETS))
+        self._buckets: list[int] = [
+            bitmap(self.order[start:start + self._bucket_size], len(values))
+            for start in range(0, len(values), self._bucket_size)
+        ]
+
+    def range_bitmap(self, operator: str, value: str) -> int:
+        """Bitmap of products matching a comparison (``>``, ``>=``, ``<``, ``<=``, ``=``) or a ``[low..high]``."""
+        size: int = len(self.values)
+        start: int = 0
+        end: int = size
+        range_match: re.Match | None = RANGE_PATTERN.fullmatch(value)
+        if range_match is not None:
+            start = bisect.bisect_left(self._sorted_values, float(range_match['low']))
+            end = bisect.bisect_right(self._sorted_values, float(range_match['high']))
+        elif operator in ('>', '>='):
+            start = (bisect.bisect_right if operator == '>' else bisect.bisect_left)(self._sorted_values, float(value))
+        elif operator in ('<', '<='):
+            end = (bisect.bisect_left if operator == '<' else bisect.bisect_right)(self._sorted_values, float(value))
+        else:
+            start = bisect.bisect_left(self._sorted_values, float(value))
+            end = bisect.bisect_right(self._sorted_values, float(value))
+
+        # Whole buckets of the range are merged, products of the partial buckets at its edges are added one by one
+        first_bucket: int = -(-start // self._bucket_size)
+        last_bucket: int = end // self._bucket_size
+        if first_bucket >= last_bucket:
+            return bitmap(self.order[start:end], size)
+
+        matches: int = bitmap(self.order[start:first_bucket * self._bucket_size], size)
+        matches |= bitmap(self.order[last_bucket * self._bucket_size:end], size)
+        for bucket in self._buckets[first_bucket:last_bucket]:
+            matches |= bucket
+        return matches
+
+
+class _TextIndex:
+    """Inverted index of the tokens of a product field, with a sorted vocabulary for prefix matching.
+
+    Attributes:
+        _postings (dict[str, array]): sorted product indices by token.
+        _vocabulary (list[str]): tokens sorted.
+
+    """
+
+    def __init__(self, postings: dict[str, array]) -> None:
+        self._postings: dict[str, array] = postings
+        self._vocabulary: list[str] = sorted(postings)
+
+    def matches(self, token: str, prefix: bool) -> set[int]:
+        """Products with the token, or with any token starting with it if prefix."""
+        if not prefix:
+            return set(self._postings.get(token, ()))
+
+        matches: set[int] = set()
+        for index in range(bisect.bisect_left(self._vocabulary, token), len(self._vocabulary)):
+            if not self._vocabulary[index].startswith(token):
+                break
+            matches.update(self._postings[self._vocabulary[index]])
+        return matches
+
+
+class _SkuIndex:
+    """Index of SKUs sorted by SKU key, to match them exactly or by prefix without an entry per SKU.
+
+    Attributes:
+        _keys (list[str]): SKU keys sorted.
+        _order (array): product indices sorted by SKU key.
+
+    """
+
+    def __init__(self, skus: list[str]) -> None:
+        keys: list[str] = [sku_key(sku) for sku in skus]
+        self._order: array = array('I', sorted(range(len(skus)), key=keys.__getitem__))
+        self._keys: list[str] = [keys[index] for index in self._order]
+
+    def matches(self, key: str) -> Iterator[int]:
+        """Products whose SKU key starts with a key."""
+        for position in range(bisect.bisect_left(self._keys, key), len(self._keys)):
+            if not self._keys[position].startswith(key):
+                return
+            yield self._order[position]
+
+    def get(self, key: str) -> Iterator[int]:
+        """Products whose SKU key is a key."""
+        for position in range(bisect.bisect_left(self._keys, key), bisect.bisect_right(self._keys, key)):
+            yield self._order[position]
+
+
+@dataclass(frozen=True)
+class InMemoryCatalog:
+    """Catalog products in compact columns, indexed to search, filter and sort them.
+
+    Product fields shown but not searched are not kept: the line of every product is read from the memory mapped
+    products file when its domain model is built.
+
+    Attributes:
+        size (int): number of products.
+        skus (list[str]): SKU by product index.
+        models (list[ProductModel]): product models, shared by their products.
+        dimensions (Dimensions): categories and manufacturers, to label facets.
+        model_indices (array): index of the model of every product.
+        stock (int): bitmap of the products in stock.
+        references (dict[tuple[str, str], int]): bitmap of products by model reference field and id.
+        numeric_columns (dict[str, _NumericColumn]): columns of numeric fields.
+        title_index (_TextIndex): inverted index of title tokens.
+        sku_index (_SkuIndex): index of SKUs.
+        products_file (mmap.mmap | bytes): content of products file.
+        line_offsets (array): offset of the line of every product in products file.
+        line_lengths (array): length of the line of every product.
+        updates (dict[int, dict]): hot fields updated by product index, overriding the line of the product.
+    """
+    size: int
+    skus: list[str]
+    models: list[ProductModel]
+    dimensions: Dimensions
+    model_indices: array
+    stock: int
+    references: dict[tuple[str, str], int]
+    numeric_columns: dict[str, _NumericColumn]
+    title_index: _TextIndex
+    sku_index: _SkuIndex
+    products_file: mmap.mmap | bytes
+    line_offsets: array
+    line_lengths: array
+    updates: dict[int, dict]
+
+    def product(self, index: int) -> Product:
+        """Product domain model of a product index."""
+        offset: int = self.line_offsets[index]
+        document: dict = json.loads(self.products_file[offset:offset + self.line_lengths[index]])
+        document.update(self.updates.get(index, {}))
+        return Product(
+            sku=document['sku'],
+            title=document['title'],
+            description=document['description'],
+            image_url=document['image_url'],
+            price=document['price'],
+            model=self.models[self.model_indices[index]],
+            stock=document['stock'],
+            num_purchases=document['num_purchases'],
+        )
+
+    def updated(self, updates: Mapping[int, dict]) -> 'InMemoryCatalog':
+        """Copy of the catalog with hot fields of some products updated, its stock and purchases columns rebuilt."""
+        stock: int = self.stock
+        num_purchases: array = array('q', self.numeric_columns['num_purchases'].values)
+        for index, fields in updates.items():
+            if 'stock' in fields:
+                stock = stock | (1 << index) if fields['stock'] else stock & ~(1 << index)
+            if 'num_purchases' in fields:
+                num_purchases[index] = fields['num_purchases']
+
+        return replace(
+            self,
+            stock=stock,
+            numeric_columns={**self.numeric_columns, 'num_purchases': _NumericColumn(num_purchases)},
+            updates={
+                **self.updates,
+                **{index: {**self.updates.get(index, {}), **fields} for index, fields in updates.items()},
+            },
+        )
+
+
+class InMemoryCatalogLoader:
+    """Loader of the catalog JSONL files of a directory into an InMemoryCatalog.
+
+    Attributes:
+        _catalog_dir (Path): directory with catalog JSONL files.
+
+    """
+
+    def __init__(self, catalog_dir: Path) -> None:
+        self._catalog_dir: Path = catalog_dir
+
+    def signature(self) -> tuple[tuple[int, int], ...]:
+        """Modification time and size of every catalog file, which change when a file is written.
+
+        Raises:
+            OSError: if a catalog file is missing.
+
+        """
+        return tuple(
+            (stat.st_mtime_ns, stat.st_size)
+            for stat in (
+                (self._catalog_dir / catalog_file.file_name).stat() for catalog_file in CATALOG_FILES
+            )
+        )
+
+    def _documents(self, collection_name: str) -> Iterator[dict]:
+        for catalog_file in CATALOG_FILES:
+            if catalog_file.collection_name == collection_name:
+                with (self._catalog_dir / catalog_file.file_name).open(encoding='utf-8') as jsonl_file:
+                    yield from (json.loads(line) for line in jsonl_file if line.strip())
+
+    def _models(self) -> tuple[Dimensions, list[ProductModel], dict[str, int], list[dict]]:
+        dimensions: Dimensions = DimensionCache().set(
+            self._documents(DimensionCache.CATEGORIES_COLLECTION_NAME),
+            self._documents(DimensionCache.MANUFACTURERS_COLLECTION_NAME),
+            version=0,
+        )
+        model_documents: list[dict] = list(self._documents('product_models'))
+        models: list[ProductModel] = []
+        for document in model_documents:
+            category, manufacturer = dimensions.references(document)
+            models.append(ProductModel(
+                sku=document['sku'],
+                title=document['title'],
+                description=document['description'],
+                image_url=document['image_url'],
+                min_price=document['min_price'],
+                category=category,
+                manufacturer=manufacturer,
+            ))
+
+        return (
+            dimensions,
+            models,
+            {document['id']: index for index, document in enumerate(model_documents)},
+            model_documents,
+        )
+
+    def load(self) -> InMemoryCatalog:
+        """Load and index the catalog files.
+
+        Returns:
+            InMemoryCatalog: indexed catalog.
+
+        Raises:
+            KeyError: if a document references a missing one.
+
+        """
+        dimensions, models, model_indices_by_id, model_documents = self._models()
+        columns: _ProductColumns = _ProductColumns()
+        products_path: Path = self._catalog_dir / 'products.jsonl'
+        with products_path.open('rb') as products_file:
+            products_content: mmap.mmap | bytes = (
+                mmap.mmap(products_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if products_path.stat().st_size else b''
+            )
+        offset: int = 0
+        if isinstance(products_content, mmap.mmap):
+            for line in iter(products_content.readline, b''):
+                if line.strip():
+                    columns.add(json.loads(line), model_indices_by_id, offset, len(line))
+                offset += len(line)
+
+        return columns.catalog(dimensions, models, model_documents, products_content)
+
+
+class _ProductColumns:
+    """Columns of products being loaded."""
+
+    def __init__(self) -> None:
+        self.skus: list[str] = []
+        self.model_indices: array = array('I')
+        self.stock: list[int] = []
+        self.prices: array = array('d')
+        self.num_purchases: array = array('q')
+        self.title_postings: dict[str, array] = {}
+        self.line_offsets: array = array('Q')
+        self.line_lengths: array = array('I')
+
+    def add(self, document: dict, model_indices_by_id: dict[str, int], offset: int, length: int) -> None:
+        index: int = len(self.skus)
+        self.skus.append(document['sku'])
+        self.model_indices.append(model_indices_by_id[document['product_model_id']])
+        if document['stock']:
+            self.stock.append(index)
+        self.prices.append(document['price'])
+        self.num_purchases.append(document['num_purchases'])
+        for token in dict.fromkeys(tokenize(document['title'])):
+            self.title_postings.setdefault(token, array('I')).append(index)
+        self.line_offsets.append(offset)
+        self.line_lengths.append(length)
+
+    def catalog(
+            self,
+            dimensions: Dimensions,
+            models: list[ProductModel],
+            model_documents: list[dict],
+            products_content: mmap.mmap | bytes,
+    ) -> InMemoryCatalog:
+        size: int = len(self.skus)
+        references_indices: dict[tuple[str, str], list[int]] = {}
+        for index, model_index in enumerate(self.model_indices):
+            for field in MODEL_FILTER_FIELDS:
+                references_indices.setdefault((field, model_documents[model_index][field]), []).append(index)
+
+        return InMemoryCatalog(
+            size=size,
+            skus=self.skus,
+            models=models,
+            dimensions=dimensions,
+            model_indices=self.model_indices,
+            stock=bitmap(self.stock, size),
+            references={reference: bitmap(indices, size) for reference, indices in references_indices.items()},
+            numeric_columns={'price': _NumericColumn(self.prices), 'num_purchases': _NumericColumn(self.num_purchases)},
+            title_index=_TextIndex(self.title_postings),
+            sku_index=_SkuIndex(self.skus),
+            products_file=products_content,
+            line_offsets=self.line_offsets,
+            line_lengths=self.line_lengths,
+            updates={},
+        )
+
+
+class InMemoryProductRepository(AbstractProductRepository):
+    """In-memory product repository class Adapter, serving the catalog JSONL files without a search engine.
+
+    The catalog is loaded and indexed on first use, and loaded again in the background by ``invalidate_cache`` if
+    its files changed. Searches support a subset of Typesense search parameters:
+
+    * ``q``: every token matched in ``title`` (the last one as a prefix), or a prefix of the SKU.
+    * ``query_by``: ``title`` and ``sku`` fields (``query_by_weights`` is ignored).
+    * ``filter_by``: clauses joined by ``&&`` on ``stock``, ``price`` and ``num_purchases`` (``:=``, ``:>``,
+      ``:>=``, ``:<``, ``:<=``, ``:[low..high]``), and ``$product_models(product_category_id:=[...])`` or
+      ``$product_models(product_manufacturer_id:=[...])``.
+    * ``sort_by``: ``price`` or ``num_purchases``, ascending or descending (catalog order otherwise), after an
+      ``_eval(filter):desc`` clause ranking the products matching a filter first.
+
+    Attributes:
+        _loader (InMemoryCatalogLoader): loader of the catalog files.
+        _catalog (InMemoryCatalog, optional): indexed catalog, None until loaded.
+        _signature (tuple, optional): signature of the catalog files loaded, None until loaded.
+        _reloading (bool): True while the catalog files are loaded again in the background.
+
+    """
+    MAX_PER_PAGE: int = 250
+
+    def __init__(self, catalog_dir: str | Path) -> None:
+        """Constructor.
+
+        Args:
+            catalog_dir (str | Path): directory with catalog JSONL files.
+
+        """
+        self._loader: InMemoryCatalogLoader = InMemoryCatalogLoader(Path(catalog_dir))
+        self._catalog: InMemoryCatalog | None = None
+        self._signature: tuple[tuple[int, int], ...] | None = None
+        self._reloading: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def catalog(self) -> InMemoryCatalog:
+        """InMemoryCatalog: indexed catalog, loaded if needed."""
+        catalog: InMemoryCatalog | None = self._catalog
+        if catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._signature = self._loader.signature()
+                    self._catalog = self._loader.load()
+                catalog = self._catalog
+
+        return catalog
+
+    def invalidate_cache(self) -> None:
+        """Load the catalog files again in the background if they changed, to call when the catalog changes.
+
+        The loaded catalog is searched until the new one replaces it at once, so searches never wait for a load.
+        Pages searched meanwhile are cached from the loaded catalog, until their cached search expires.
+        """
+        with self._lock:
+            if self._catalog is None or self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name='in-memory-catalog', daemon=True).start()
+
+    def _reload(self) -> None:
+        """Load the catalog files until they do not change during a load, replacing the catalog after each load."""
+        try:
+            while True:
+                signature: tuple[tuple[int, int], ...] = self._loader.signature()
+                if signature == self._signature:
+                    return
+                catalog: InMemoryCatalog = self._loader.load()
+                with self._lock:
+                    self._catalog = catalog
+                    self._signature = signature
+        except Exception:
+            # The loaded catalog is kept, files are loaded again by the next invalidation
+            logger.exception('Catalog files not loaded again, the loaded catalog is kept')
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def warm_up(self) -> None:
+        """Load and index the catalog files."""
+        self.catalog
+
+    def update_many(self, updates: Mapping[str, dict]) -> ProductsUpdate:
+        """Update hot fields of several products by SKU in memory, until the catalog files are loaded again.
+
+        The updated catalog replaces the current one at once, so searches never see a flush half applied. Every
+        product with a duplicated SKU is updated.
+
+        Args:
+            updates (Mapping[str, dict]): new value of updated fields by SKU.
+
+        Returns:
+            ProductsUpdate: SKUs of products updated or not found.
+
+        """
+        products_update: ProductsUpdate = ProductsUpdate()
+        self.warm_up()
+        with self._lock:
+            # Loaded once, the catalog is only ever replaced by another one
+            catalog: InMemoryCatalog = cast(InMemoryCatalog, self._catalog)
+            updates_by_index: dict[int, dict] = {}
+            for sku, fields in updates.items():
+                indices: list[int] = [
+                    index for index in catalog.sku_index.get(sku_key(sku)) if catalog.skus[index] == sku
+                ]
+                if not indices:
+                    products_update.not_found.append(sku)
+                    continue
+                updates_by_index.update(dict.fromkeys(indices, fields))
+                products_update.updated.append(sku)
+            self._catalog = catalog.updated(updates_by_index)
+
+        return products_update
+
+    def get(self, sku: str) -> Product | None:
+        """Get product with sku.
+
+        Args:
+            sku (str): SKU of product to get.
+
+        Returns:
+            Product | None: Product found if exists else None.
+
+        Raises:
+            ProductNotFoundError: if product with sku not exists
+            ProductMultipleFoundsError: if several products with that sku.
+
+        """
+        catalog: InMemoryCatalog = self.catalog
+        indices: list[int] = [index for index in catalog.sku_index.get(sku_key(sku)) if catalog.skus[index] == sku]
+        if len(indices) == 0:
+            raise ProductNotFoundError
+        elif len(indices) > 1:
+            raise ProductMultipleFoundsError
+
+        return catalog.product(indices[0])
+
+    def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        """Get products of several SKUs, see TypesenseProductRepository.get_many."""
+        products_by_sku: ProductsBySku = ProductsBySku()
+        for sku in dict.fromkeys(skus):
+            try:
+                products_by_sku.products[sku] = self.get(sku)  # type: ignore[assignment]
+            except ProductNotFoundError:
+                products_by_sku.not_found.append(sku)
+            except ProductMultipleFoundsError:
+                products_by_sku.duplicated.append(sku)
+
+        return products_by_sku
+
+    @staticmethod
+    def _text_matches(catalog: InMemoryCatalog, q: str, query_by: str | None) -> set[int] | None:
+        """Products matching a text query, None if every product matches."""
+        if q.strip() in ('', '*'):
+            return None
+
+        fields: list[str] = [field.strip() for field in (query_by or 'title,sku').split(',')]
+        if not set(fields) <= {'title', 'sku'}:
+            raise ValueError(f'Unsupported query_by {query_by!r}, only title and sku are indexed')
+
+        matches: set[int] = set()
+        tokens: list[str] = tokenize(q)
+        if 'title' in fields and tokens:
+            tokens_matches: list[set[int]] = sorted(
+                (catalog.title_index.matches(token, prefix=position == len(tokens) - 1)
+                 for position, token in enumerate(tokens)),
+                key=len,
+            )
+            matches = tokens_matches[0].intersection(*tokens_matches[1:])
+        if 'sku' in fields and sku_key(q):
+            matches.update(catalog.sku_index.matches(sku_key(q)))
+
+        return matches
+
+    @classmethod
+    def _filter_matches(cls, catalog: InMemoryCatalog, filter_by: str) -> int | None:
+        """Bitmap of products matching every filter clause, None if there is not any."""
+        if not filter_by.strip():
+            return None
+
+        matches: int = (1 << catalog.size) - 1
+        for clause in filter_by.split('&&'):
+            matches &= cls._clause_matches(catalog, clause.strip())
+        return matches
+
+    @staticmethod
+    def _clause_matches(catalog: InMemoryCatalog, clause: str) -> int:
+        clause_match: re.Match | None = FILTER_CLAUSE_PATTERN.fullmatch(clause)
+        if clause_match is not None and clause_match['model_field'] in MODEL_FILTER_FIELDS:
+            matches: int = 0
+            for value in clause_match['model_values'].strip().strip('[]').split(','):
+                matches |= catalog.references.get((clause_match['model_field'], value.strip().strip('`')), 0)
+            return matches
+
+        if clause_match is not None and clause_match['field'] == 'stock' and clause_match['operator'] in (None, '='):
+            in_stock: bool = clause_match['value'].strip().lower() == 'true'
+            return catalog.stock if in_stock else ((1 << catalog.size) - 1) ^ catalog.stock
+
+        if clause_match is not None and clause_match['field'] in catalog.numeric_columns:
+            return catalog.numeric_columns[clause_match['field']].range_bitmap(
+                clause_match['operator'] or '=',
+                clause_match['value'].strip(),
+            )
+
+        raise ValueError(f'Unsupported filter {clause!r}')
+
+    @staticmethod
+    def _sort_clauses(sort_by: str) -> Iterator[str]:
+        """Clauses of a ``sort_by``, split by the commas out of parentheses and brackets (of ``_eval`` filters)."""
+        depth: int = 0
+        start: int = 0
+        for index, char in enumerate(sort_by):
+            depth += {'(': 1, '[': 1, ')': -1, ']': -1}.get(char, 0)
+            if char == ',' and depth == 0:
+                yield sort_by[start:index].strip()
+                start = index + 1
+        yield sort_by[start:].strip()
+
+    @classmethod
+    def _sort(cls, catalog: InMemoryCatalog, sort_by: str) -> tuple[int | None, str | None, bool]:
+        """Products ranked first, and field and direction (True if descending) of the first field sort clause.
+
+        Products matching the filter of an ``_eval(filter):desc`` clause are ranked first (last if ``asc``), text
+        match is ignored.
+        """
+        first_matches: int | None = None
+        for sort_clause in cls._sort_clauses(sort_by):
+            sort_clause_match: re.Match | None = SORT_CLAUSE_PATTERN.fullmatch(sort_clause)
+            if sort_clause_match is None:
+                raise ValueError(f'Unsupported sort_by {sort_by!r}')
+            descending: bool = (sort_clause_match['direction'] or 'desc').lower() != 'asc'
+            if sort_clause_match['filter'] is not None:
+                if first_matches is None:
+                    first_matches = cls._filter_matches(catalog, sort_clause_match['filter'])
+                    if first_matches is not None and not descending:
+                        first_matches ^= (1 << catalog.size) - 1
+                continue
+            if sort_clause_match['field'] in ('', '_text_match'):
+                continue
+            if sort_clause_match['field'] not in ('price', 'num_purchases'):
+                raise ValueError(f'Unsupported sort_by {sort_by!r}, only price and num_purchases are sortable')
+            return first_matches, sort_clause_match['field'], descending
+
+        return first_matches, None, False
+
+    @staticmethod
+    def _order(catalog: InMemoryCatalog, sort_field: str | None, descending: bool) -> Iterator[int]:
+        """Indices of every product, sorted by a field (catalog order if None)."""
+        order: Iterable[int] = (
+            range(catalog.size) if sort_field is None else catalog.numeric_columns[sort_field].order
+        )
+        return reversed(order) if descending else iter(order)  # type: ignore[call-overload]
+
+    @staticmethod
+    def _matching(catalog: InMemoryCatalog, matches: int, order: Iterator[int]) -> Iterator[int]:
+        """Indices of an order of the products of a bitmap."""
+        bits: bytes = matches.to_bytes((catalog.size + 7) // 8, 'little')
+        return (index for index in order if bits[index >> 3] >> (index & 7) & 1)
+
+    @classmethod
+    def _walk(
+            cls,
+            catalog: InMemoryCatalog,
+            filter_matches: int | None,
+            first_matches: int | None,
+            sort_field: str | None,
+            descending: bool,
+            page: int,
+            per_page: int,
+    ) -> tuple[int, list[int]]:
+        """Number of products found and indices of the page, walking the products sorted until the page is full (the
+        products ranked first, then the others)."""
+        # Pages beyond the catalog are empty, islice rejects bounds beyond sys.maxsize
+        stop: int = min(page * per_page, catalog.size)
+        start: int = min((page - 1) * per_page, stop)
+        if filter_matches is None and first_matches is None:
+            return catalog.size, list(islice(cls._order(catalog, sort_field, descending), start, stop))
+
+        every_product: int = (1 << catalog.size) - 1
+        matches: int = every_product if filter_matches is None else filter_matches
+        ranks: tuple[int, ...] = (
+            (matches,) if first_matches is None
+            else (matches & first_matches, matches & (every_product ^ first_matches))
+        )
+        return matches.bit_count(), list(islice(
+            chain.from_iterable(
+                cls._matching(catalog, rank_matches, cls._order(catalog, sort_field, descending))
+                for rank_matches in ranks
+            ),
+            start,
+            stop,
+        ))
+
+    @staticmethod
+    def _sorted(
+            catalog: InMemoryCatalog,
+            text_matches: set[int],
+            filter_matches: int | None,
+            first_matches: int | None,
+            sort_field: str | None,
+            descending: bool,
+            page: int,
+            per_page: int,
+    ) -> tuple[int, list[int]]:
+        """Number of products found and indices of the page, sorting the products matching a text query."""
+        indices: list[int] = sorted(text_matches)
+        if filter_matches is not None:
+            bits: bytes = filter_matches.to_bytes((catalog.size + 7) // 8, 'little')
+            indices = [index for index in indices if bits[index >> 3] >> (index & 7) & 1]
+        if sort_field is not None:
+            indices.sort(key=catalog.numeric_columns[sort_field].values.__getitem__, reverse=descending)
+        if first_matches is not None:
+            # Stable sort, products ranked first keep their order by field
+            first_bits: bytes = first_matches.to_bytes((catalog.size + 7) // 8, 'little')
+            indices.sort(key=lambda index: not first_bits[index >> 3] >> (index & 7) & 1)
+
+        return len(indices), indices[(page - 1) * per_page:page * per_page]
+
+    @staticmethod
+    def _facets(catalog: InMemoryCatalog, text_matches: set[int] | None, filter_matches: int | None) -> Facets:
+        """Facets of the products found, counted with the bitmaps of products by category and manufacturer."""
+        found: int = (1 << catalog.size) - 1 if filter_matches is None else filter_matches
+        if text_matches is not None:
+            found &= bitmap(text_matches, catalog.size)
+
+        counts: dict[str, Counter[str]] = {field: Counter() for field in MODEL_FILTER_FIELDS}
+        for (field, reference_id), matches in catalog.references.items():
+            count: int = (found & matches).bit_count()
+            if count:
+                counts[field][reference_id] = count
+        return reference_facets(counts['product_category_id'], counts['product_manufacturer_id'], catalog.dimensions)
+
+    def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
+        """Search products, see InMemoryProductRepository search parameters.
+
+        Every field of products is got, whatever the projected fields.
+
+        Raises:
+            ValueError: if a search parameter is not supported.
+
+        """
+        return self.list_page(
+            *args,
+            page=kwargs.pop('page', 1),
+            per_page=kwargs.pop('per_page', 10),
+            **kwargs,
+        ).products
+
+    def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        """Search a page of products, see InMemoryProductRepository search parameters.
+
+        Args:
+            *args: Variable length argument list.
+            page (int): number of the page, starting at 1.
+            per_page (int): max number of products per page (at most ``MAX_PER_PAGE``).
+            fields (Iterable[str], optional): ignored, every field of products is got.
+            facets (bool): True to count the products found by category and manufacturer.
+            **kwargs: Arbitary kwyword arguments with search parameters.
+
+        Returns:
+            ProductsPage: products of the page with the number of products found in every page, and the facets.
+
+        Raises:
+            ValueError: if a search parameter is not supported.
+
+        """
+        catalog: InMemoryCatalog = self.catalog
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), self.MAX_PER_PAGE)
+        filter_matches: int | None = self._filter_matches(catalog, kwargs.get('filter_by', ''))
+        text_matches: set[int] | None = self._text_matches(catalog, kwargs.get('q', '*'), kwargs.get('query_by'))
+        first_matches, sort_field, descending = self._sort(catalog, kwargs.get('sort_by', ''))
+
+        found: int
+        indices: list[int]
+        if text_matches is None:
+            found, indices = self._walk(catalog, filter_matches, first_matches, sort_field, descending, page, per_page)
+        else:
+            found, indices = self._sorted(
+                catalog,
+                text_matches,
+                filter_matches,
+                first_matches,
+                sort_field,
+                descending,
+                page,
+                per_page,
+            )
+
+        return ProductsPage(
+            products=[catalog.product(index) for index in indices],
+            found=found,
+            page=page,
+            per_page=per_page,
+            facets=self._facets(catalog, text_matches, filter_matches) if facets else {},
+        )
+
+    def iter_all(self, *args: Any, per_page: int = MAX_PER_PAGE, **kwargs: Any) -> Iterator[Product]:
+        """Iterate over every product found by a search, see TypesenseProductRepository.iter_all."""
+        page: int = 1
+        while True:
+            products_page: ProductsPage = self.list_page(*args, page=page, per_page=per_page, **kwargs)
+            yield from products_page.products
+            if not products_page.has_next or not products_page.products:
+                return
+            page += 1
+
+
+class AsyncInMemoryProductRepository(AsyncAbstractProductRepository):
+    """Asynchronous in-memory product repository class Adapter, searching in the process without I/O.
+
+    Attributes:
+        _repository (InMemoryProductRepository): in-memory repository searched.
+
+    """
+
+    def __init__(self, repository: InMemoryProductRepository) -> None:
+        """Constructor.
+
+        Args:
+            repository (InMemoryProductRepository): in-memory repository searched.
+
+        """
+        self._repository: InMemoryProductRepository = repository
+
+    def invalidate_cache(self) -> None:
+        self._repository.invalidate_cache()
+
+    async def get(self, sku: str) -> Product | None:
+        return self._repository.get(sku)
+
+    async def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        return self._repository.get_many(skus)
+
+    async def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
+        return self._repository.list(*args, fields=fields, **kwargs)
+
+    async def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        return self._repository.list_page(
+            *args,
+            page=page,
+            per_page=per_page,
+            fields=fields,
+            facets=facets,
+            **kwargs,
+        )
+
+    async def iter_all(self, *args: Any, per_page: int = 250, **kwargs: Any) -> AsyncIterator[Product]:
+        for product in self._repository.iter_all(*args, per_page=per_page, **kwargs):
+            yield product
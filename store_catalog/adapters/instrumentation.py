@@ -0,0 +1,257 @@
+"""Instrumentation module.
+
+This module define the timing of the stages of catalog requests (client checkout, Typesense round trip, JSON decode,
+mapping and rendering), collected per request for ``Server-Timing`` headers and reported to a pluggable metrics hook.
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+from contextlib import contextmanager
+from contextlib import nullcontext
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any
+
+# Stages timed by the catalog, in the order of a request
+SESSION_STAGE: str = 'session'
+TYPESENSE_STAGE: str = 'typesense'
+SEARCH_STAGE: str = 'search'
+DECODE_STAGE: str = 'decode'
+MAPPING_STAGE: str = 'mapping'
+RENDER_STAGE: str = 'render'
+REQUEST_STAGE: str = 'request'
+
+HITS_COUNTER: str = 'typesense_hits'
+RECEIVED_BYTES_COUNTER: str = 'typesense_received_bytes'
+
+_NULL_SPAN: AbstractContextManager = nullcontext()
+
+
+class RequestTimings:
+    """Durations of the stages and counters of a request, summed when a stage happens several times.
+
+    Attributes:
+        durations (dict[str, float]): seconds spent by stage.
+        counters (dict[str, float]): counters by name, e.g. hits returned by typesense.
+
+    """
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+        self.counters: dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def add_duration(self, stage: str, seconds: float) -> None:
+        # Hedged searches of a request are recorded from other threads
+        with self._lock:
+            self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+
+    def add_counter(self, counter: str, value: float) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0.0) + value
+
+    def server_timing(self) -> str:
+        """str: value of a ``Server-Timing`` header, durations in milliseconds and counters as descriptions."""
+        with self._lock:
+            return ', '.join([
+                *(f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in self.durations.items()),
+                *(f'{counter};desc="{value:g}"' for counter, value in self.counters.items()),
+            ])
+
+
+_request_timings: ContextVar[RequestTimings | None] = ContextVar('request_timings', default=None)
+
+
+class AbstractMetrics(ABC):
+    """Abstract metrics hook class Port (interface), fed with every stage duration and counter.
+    """
+
+    @abstractmethod
+    def observe(self, stage: str, seconds: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def increment(self, counter: str, value: float) -> None:
+        raise NotImplementedError
+
+
+class PrometheusMetrics(AbstractMetrics):
+    """In-process metrics Adapter, with a histogram per stage, exposed in Prometheus text format.
+
+    Attributes:
+        _buckets (tuple[float, ...]): upper bounds in seconds of histogram buckets.
+        _histograms (dict[str, list[int]]): observations by bucket (last one is +Inf) by stage.
+        _sums (dict[str, float]): sum of observed seconds by stage.
+        _counters (dict[str, float]): counters by name.
+
+    """
+    NAMESPACE: str = 'catalog'
+    BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        """Constructor.
+
+        Args:
+            buckets (tuple[float, ...]): sorted upper bounds in seconds of histogram buckets.
+
+        """
+        self._buckets: tuple[float, ...] = buckets
+        self._histograms: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+        self._counters: dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            if stage not in self._histograms:
+                self._histograms[stage] = [0] * (len(self._buckets) + 1)
+                self._sums[stage] = 0.0
+            self._histograms[stage][bisect.bisect_left(self._buckets, seconds)] += 1
+            self._sums[stage] += seconds
+
+    def increment(self, counter: str, value: float) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0.0) + value
+
+    def render(self) -> str:
+        """str: metrics in Prometheus text exposition format (version 0.0.4)."""
+        name: str = f'{self.NAMESPACE}_stage_duration_seconds'
+        lines: list[str] = [
+            f'# HELP {name} Duration of catalog request stages.',
+            f'# TYPE {name} histogram',
+        ]
+        with self._lock:
+            for stage, observations in sorted(self._histograms.items()):
+                cumulative: int = 0
+                for upper_bound, count in zip((*self._buckets, '+Inf'), observations):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{upper_bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+
+            for counter, value in sorted(self._counters.items()):
+                lines.append(f'# TYPE {self.NAMESPACE}_{counter}_total counter')
+                lines.append(f'{self.NAMESPACE}_{counter}_total {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class _Span:
+    """Timer of a stage, recorded when the block exits."""
+    __slots__ = ('_instrumentation', '_stage', '_start')
+
+    def __init__(self, instrumentation: 'Instrumentation', stage: str) -> None:
+        self._instrumentation: Instrumentation = instrumentation
+        self._stage: str = stage
+        self._start: float = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        self._instrumentation.record(self._stage, time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """Timing of request stages, shared by the adapters of a process.
+
+    Stage durations and counters are added to the timings of the current request (a context variable, so they
+    follow threads of WSGI workers and tasks of ASGI event loops) and reported to the metrics hook. When disabled
+    spans are a shared no-op context manager.
+
+    Attributes:
+        _enabled (bool): True to time stages.
+        _metrics (AbstractMetrics, optional): hook fed with every duration and counter.
+
+    """
+
+    def __init__(self, enabled: bool = False, metrics: AbstractMetrics | None = None) -> None:
+        """Constructor.
+
+        Args:
+            enabled (bool): True to time stages, False to make instrumentation a no-op.
+            metrics (AbstractMetrics, optional): hook fed with every duration and counter, no hook if None.
+
+        """
+        self._enabled: bool = enabled
+        self._metrics: AbstractMetrics | None = metrics
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def span(self, stage: str) -> AbstractContextManager:
+        """Context manager timing a block as a stage."""
+        return _Span(self, stage) if self._enabled else _NULL_SPAN
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage."""
+        if not self._enabled:
+            return
+
+        request_timings: RequestTimings | None = _request_timings.get()
+        if request_timings is not None:
+            request_timings.add_duration(stage, seconds)
+        if self._metrics is not None:
+            self._metrics.observe(stage, seconds)
+
+    def increment(self, counter: str, value: float) -> None:
+        """Increment a counter."""
+        if not self._enabled:
+            return
+
+        request_timings: RequestTimings | None = _request_timings.get()
+        if request_timings is not None:
+            request_timings.add_counter(counter, value)
+        if self._metrics is not None:
+            self._metrics.increment(counter, value)
+
+    def typesense_response(self, result: Any, received_bytes: int) -> None:
+        """Record the bytes received from typesense, and the search time reported and hits of search results.
+
+        Args:
+            result (Any): decoded JSON response, a search or multi search result.
+            received_bytes (int): size of the response body.
+
+        """
+        if not self._enabled:
+            return
+
+        self.increment(RECEIVED_BYTES_COUNTER, received_bytes)
+        if not isinstance(result, dict):
+            return
+        for search_result in result.get('results', [result]):
+            if isinstance(search_result, dict) and 'hits' in search_result:
+                self.record(SEARCH_STAGE, search_result.get('search_time_ms', 0) / 1000)
+                self.increment(HITS_COUNTER, len(search_result['hits']))
+
+    @contextmanager
+    def request(self) -> Iterator[RequestTimings | None]:
+        """Collect the timings of a request while in the block.
+
+        Yields:
+            RequestTimings | None: timings of the request, None if disabled.
+
+        """
+        if not self._enabled:
+            yield None
+            return
+
+        request_timings: RequestTimings = RequestTimings()
+        token = _request_timings.set(request_timings)
+        start: float = time.perf_counter()
+        try:
+            yield request_timings
+        finally:
+            self.record(REQUEST_STAGE, time.perf_counter() - start)
+            _request_timings.reset(token)
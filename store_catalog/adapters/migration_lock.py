@@ -0,0 +1,116 @@
+"""Migration lock module.
+
+This module define a layer of abstraction around the lock held while collections are copied or reindexed into new
+versions, so writes to the current collections (e.g. product updates) are held until the aliases are swapped
+instead of being lost with the replaced collections.
+"""
+
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+
+from store_catalog.adapters.search_cache import shared_django_cache
+
+
+class AbstractMigrationLock(ABC):
+    """Abstract migration lock class Port (interface).
+    """
+
+    @abstractmethod
+    def acquire(self) -> None:
+        """Hold writes, or extend the lock held, to call before documents are copied."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self) -> None:
+        """Let writes go, to call once aliases are swapped (or the migration failed)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def locked(self) -> bool:
+        """True while a migration holds writes."""
+        raise NotImplementedError
+
+    @property
+    def shared(self) -> bool:
+        """bool: True if the lock is shared by processes, so a migration command holds the writes of workers."""
+        return False
+
+
+class LocalMigrationLock(AbstractMigrationLock):
+    """In-process migration lock Adapter, for a single process (writes of other processes are not held).
+
+    Attributes:
+        _ttl_seconds (float): seconds the lock is held if it is not released, e.g. the migration was killed.
+        _expires_at (float): monotonic time the lock expires, 0 if it is not held.
+
+    """
+
+    def __init__(self, ttl_seconds: float = 3600) -> None:
+        """Constructor.
+
+        Args:
+            ttl_seconds (float): seconds the lock is held if it is not released.
+
+        """
+        self._ttl_seconds: float = ttl_seconds
+        self._expires_at: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._expires_at = time.monotonic() + self._ttl_seconds
+
+    def release(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+    def locked(self) -> bool:
+        return time.monotonic() < self._expires_at
+
+
+class DjangoMigrationLock(AbstractMigrationLock):
+    """Migration lock Adapter over a Django cache backend, shared by every process using the same backend.
+
+    The lock is a key of the backend expiring after ``ttl_seconds``, so writes are not held forever by a killed
+    migration. It is read on every check, writers check it once per flush.
+
+    Attributes:
+        _alias (str): Django cache alias.
+        _ttl_seconds (float): seconds the lock is held if it is not released.
+
+    """
+    LOCK_KEY: str = 'store_catalog:migration:lock'
+
+    def __init__(self, alias: str = 'default', ttl_seconds: float = 3600) -> None:
+        """Constructor.
+
+        Args:
+            alias (str): Django cache alias.
+            ttl_seconds (float): seconds the lock is held if it is not released.
+
+        """
+        self._alias: str = alias
+        self._ttl_seconds: float = ttl_seconds
+
+    @property
+    def _cache(self) -> Any:
+        # Django is imported lazily so store_catalog does not depend on it unless this backend is selected
+        from django.core.cache import caches
+
+        return caches[self._alias]
+
+    def acquire(self) -> None:
+        self._cache.set(self.LOCK_KEY, time.time(), timeout=self._ttl_seconds)
+
+    def release(self) -> None:
+        self._cache.delete(self.LOCK_KEY)
+
+    def locked(self) -> bool:
+        return self._cache.get(self.LOCK_KEY) is not None
+
+    @property
+    def shared(self) -> bool:
+        return shared_django_cache(self._alias)
@@ -0,0 +1,239 @@
+"""Product batch module.
+
+This module define a compact representation of many products (e.g. large listings and exports): their fields are
+kept in columns and the product models, categories and manufacturers shared by several products are kept once, so a
+product costs its own strings and a few bytes instead of a tree of pydantic models. Product domain models are built
+on access only.
+"""
+
+from array import array
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from typing import Any
+from typing import overload
+
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductCategory
+from store_catalog.domain.model import ProductManufacturer
+from store_catalog.domain.model import ProductModel
+
+# Values of the fields of a product, in the order of Product fields, the product model being shared
+ProductRow = tuple[str, str, str, Any, float, ProductModel, bool, int]
+
+
+class ProductBatch(Sequence[Product]):
+    """Columnar sequence of products, with interned product models, categories and manufacturers.
+
+    A batch is a read-only sequence of Product domain models for its consumers (templates iterate, index and slice it
+    like a list): the Product of an index is built when accessed, without validation, with the shared model of the
+    batch. Equal models (same SKU), categories and manufacturers (same ID) of the products appended are kept once.
+
+    Attributes:
+        _skus (list[str]): SKU of every product.
+        _titles (list[str]): title of every product.
+        _descriptions (list[str]): description of every product.
+        _image_urls (list[Any]): image URL of every product, as validated (HttpUrl) or as trusted (str).
+        _prices (array[float]): price of every product.
+        _stocks (bytearray): stock of every product.
+        _num_purchases (array[int]): number of purchases of every product.
+        _model_indexes (array[int]): index of the model of every product in ``_models``.
+        _models (list[ProductModel]): distinct product models.
+        _model_indexes_by_sku (dict[str, int]): index of models in ``_models`` by SKU.
+        _categories (dict[int, ProductCategory]): distinct categories and category parents by ID.
+        _manufacturers (dict[int, ProductManufacturer]): distinct manufacturers by ID.
+
+    """
+
+    __slots__ = (
+        '_skus',
+        '_titles',
+        '_descriptions',
+        '_image_urls',
+        '_prices',
+        '_stocks',
+        '_num_purchases',
+        '_model_indexes',
+        '_models',
+        '_model_indexes_by_sku',
+        '_categories',
+        '_manufacturers',
+    )
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        """Constructor.
+
+        Args:
+            products (Iterable[Product]): products of the batch, e.g. mapped one by one from search hits.
+
+        """
+        self._skus: list[str] = []
+        self._titles: list[str] = []
+        self._descriptions: list[str] = []
+        self._image_urls: list[Any] = []
+        self._prices: array[float] = array('d')
+        self._stocks: bytearray = bytearray()
+        self._num_purchases: array[int] = array('q')
+        self._model_indexes: array[int] = array('I')
+        self._models: list[ProductModel] = []
+        self._model_indexes_by_sku: dict[str, int] = {}
+        self._categories: dict[int, ProductCategory] = {}
+        self._manufacturers: dict[int, ProductManufacturer] = {}
+        self.extend(products)
+
+    def append(self, product: Product) -> None:
+        """Add a product, keeping its fields and the interned model (the product itself is not kept)."""
+        self._append_row((
+            product.sku,
+            product.title,
+            product.description,
+            product.image_url,
+            product.price,
+            product.model,
+            product.stock,
+            product.num_purchases,
+        ))
+
+    def extend(self, products: Iterable[Product]) -> None:
+        """Add products, the rows of a batch being added without building its products."""
+        if isinstance(products, ProductBatch):
+            for row in products.rows():
+                self._append_row(row)
+        else:
+            for product in products:
+                self.append(product)
+
+    @property
+    def models(self) -> list[ProductModel]:
+        """list[ProductModel]: distinct product models of the products, in order of first appearance."""
+        return self._models
+
+    def rows(self) -> Iterator[ProductRow]:
+        """Values of the fields of every product, in the order of Product fields, without building products.
+
+        Yields:
+            ProductRow: SKU, title, description, image URL, price, shared model, stock and number of purchases.
+
+        """
+        models: list[ProductModel] = self._models
+        for sku, title, description, image_url, price, model_index, stock, num_purchases in zip(
+                self._skus,
+                self._titles,
+                self._descriptions,
+                self._image_urls,
+                self._prices,
+                self._model_indexes,
+                self._stocks,
+                self._num_purchases,
+        ):
+            yield sku, title, description, image_url, price, models[model_index], bool(stock), num_purchases
+
+    def __len__(self) -> int:
+        return len(self._skus)
+
+    @overload
+    def __getitem__(self, index: int) -> Product:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'ProductBatch':
+        ...
+
+    def __getitem__(self, index: int | slice) -> 'Product | ProductBatch':
+        if isinstance(index, slice):
+            return self._slice(index)
+
+        return self._product((
+            self._skus[index],
+            self._titles[index],
+            self._descriptions[index],
+            self._image_urls[index],
+            self._prices[index],
+            self._models[self._model_indexes[index]],
+            bool(self._stocks[index]),
+            self._num_purchases[index],
+        ))
+
+    def __iter__(self) -> Iterator[Product]:
+        for row in self.rows():
+            yield self._product(row)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(products={len(self)}, models={len(self._models)})'
+
+    @staticmethod
+    def _product(row: ProductRow) -> Product:
+        """Product domain model of the values of its fields, without validation (they were validated or trusted)."""
+        sku, title, description, image_url, price, model, stock, num_purchases = row
+        fields: dict[str, Any] = dict(
+            sku=sku,
+            title=title,
+            description=description,
+            image_url=image_url,
+            price=price,
+            model=model,
+            stock=stock,
+            num_purchases=num_purchases,
+        )
+        product: Product = Product.__new__(Product)
+        object.__setattr__(product, '__dict__', fields)
+        object.__setattr__(product, '__pydantic_fields_set__', set(fields))
+        object.__setattr__(product, '__pydantic_extra__', None)
+        object.__setattr__(product, '__pydantic_private__', None)
+        return product
+
+    def _append_row(self, row: ProductRow) -> None:
+        sku, title, description, image_url, price, model, stock, num_purchases = row
+        model_index: int | None = self._model_indexes_by_sku.get(model.sku)
+        if model_index is None:
+            model_index = len(self._models)
+            self._models.append(self._interned_model(model))
+            self._model_indexes_by_sku[model.sku] = model_index
+
+        self._skus.append(sku)
+        self._titles.append(title)
+        self._descriptions.append(description)
+        self._image_urls.append(image_url)
+        self._prices.append(price)
+        self._stocks.append(stock)
+        self._num_purchases.append(num_purchases)
+        self._model_indexes.append(model_index)
+
+    def _slice(self, index: slice) -> 'ProductBatch':
+        """Batch of a slice of the products, sharing the interned models."""
+        batch: ProductBatch = ProductBatch()
+        batch._skus = self._skus[index]
+        batch._titles = self._titles[index]
+        batch._descriptions = self._descriptions[index]
+        batch._image_urls = self._image_urls[index]
+        batch._prices = self._prices[index]
+        batch._stocks = self._stocks[index]
+        batch._num_purchases = self._num_purchases[index]
+        batch._model_indexes = self._model_indexes[index]
+        batch._models = list(self._models)
+        batch._model_indexes_by_sku = dict(self._model_indexes_by_sku)
+        batch._categories = dict(self._categories)
+        batch._manufacturers = dict(self._manufacturers)
+        return batch
+
+    def _interned_model(self, model: ProductModel) -> ProductModel:
+        """Product model referencing the interned category and manufacturer, copied only if they differ."""
+        category: ProductCategory = self._interned_category(model.category)
+        manufacturer: ProductManufacturer = self._manufacturers.setdefault(model.manufacturer.id_, model.manufacturer)
+        if category is model.category and manufacturer is model.manufacturer:
+            return model
+
+        return model.model_copy(update={'category': category, 'manufacturer': manufacturer})
+
+    def _interned_category(self, category: ProductCategory) -> ProductCategory:
+        interned: ProductCategory | None = self._categories.get(category.id_)
+        if interned is not None:
+            return interned
+
+        parent: ProductCategory | None = category.category_parent
+        if parent is not None:
+            interned_parent: ProductCategory = self._interned_category(parent)
+            if interned_parent is not parent:
+                category = category.model_copy(update={'category_parent': interned_parent})
+        self._categories[category.id_] = category
+        return category
@@ -0,0 +1,123 @@
+"""Product facets module.
+
+This module define the filters of the catalog pushed down to searches, and the facet counts of categories and
+manufacturers of the products found, rolled up from the counts of their product models.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from store_catalog.adapters.dimension_cache import Dimensions
+from store_catalog.domain.model import FacetValue
+from store_catalog.domain.model import ProductCategory
+
+CATEGORY_FACET: str = 'category'
+MANUFACTURER_FACET: str = 'manufacturer'
+
+Facets = dict[str, list[FacetValue]]
+
+
+@dataclass(frozen=True)
+class ProductFilters:
+    """Filters of a products search, pushed down to the search engine as ``filter_by`` clauses.
+
+    Attributes:
+        category_ids (tuple[str, ...]): IDs of categories (subcategories) of product models, any of them.
+        manufacturer_ids (tuple[str, ...]): IDs of manufacturers of product models, any of them.
+        min_price (float, optional): min product price in euros.
+        max_price (float, optional): max product price in euros.
+        in_stock (bool): True to find only products in stock.
+    """
+    category_ids: tuple[str, ...] = ()
+    manufacturer_ids: tuple[str, ...] = ()
+    min_price: float | None = None
+    max_price: float | None = None
+    in_stock: bool = False
+
+    def filter_by(self) -> str:
+        """str: typesense ``filter_by`` of the filters, empty if there is not any."""
+        clauses: list[str] = []
+        if self.category_ids:
+            clauses.append(f'$product_models(product_category_id:=[{self._values(self.category_ids)}])')
+        if self.manufacturer_ids:
+            clauses.append(f'$product_models(product_manufacturer_id:=[{self._values(self.manufacturer_ids)}])')
+        if self.min_price is not None and self.max_price is not None:
+            clauses.append(f'price:[{self.min_price}..{self.max_price}]')
+        elif self.min_price is not None:
+            clauses.append(f'price:>={self.min_price}')
+        elif self.max_price is not None:
+            clauses.append(f'price:<={self.max_price}')
+        if self.in_stock:
+            clauses.append('stock:true')
+
+        return ' && '.join(clauses)
+
+    @staticmethod
+    def _values(ids: tuple[str, ...]) -> str:
+        # Backticks can not be escaped in filter values, no ID has them
+        return ','.join(f'`{id_}`' for id_ in ids if '`' not in id_)
+
+
+def join_filter_by(*filters_by: str) -> str:
+    """Typesense ``filter_by`` matching every ``filter_by`` given (empty ones are ignored)."""
+    return ' && '.join(filter_by for filter_by in filters_by if filter_by)
+
+
+def _category_label(category: ProductCategory) -> str:
+    if category.category_parent is None:
+        return category.title
+
+    return f'{category.category_parent.title} / {category.title}'
+
+
+def reference_facets(
+        category_counts: Counter[str],
+        manufacturer_counts: Counter[str],
+        dimensions: Dimensions,
+) -> Facets:
+    """Facet values of categories and manufacturers counts, most frequent first.
+
+    Args:
+        category_counts (Counter[str]): number of products found by category ID.
+        manufacturer_counts (Counter[str]): number of products found by manufacturer ID.
+        dimensions (Dimensions): categories and manufacturers, values not in them are left out.
+
+    Returns:
+        Facets: values of every facet by facet name.
+
+    """
+    return {
+        CATEGORY_FACET: [
+            FacetValue(value=category_id, label=_category_label(dimensions.categories[category_id]), count=count)
+            for category_id, count in category_counts.most_common() if category_id in dimensions.categories
+        ],
+        MANUFACTURER_FACET: [
+            FacetValue(value=manufacturer_id, label=dimensions.manufacturers[manufacturer_id].title, count=count)
+            for manufacturer_id, count in manufacturer_counts.most_common()
+            if manufacturer_id in dimensions.manufacturers
+        ],
+    }
+
+
+def model_facets(model_counts: Iterable[tuple[str, int]], dimensions: Dimensions) -> Facets:
+    """Facet values of categories and manufacturers rolled up from the counts of product models.
+
+    Args:
+        model_counts (Iterable[tuple[str, int]]): product model ID and number of products found with it.
+        dimensions (Dimensions): categories, manufacturers and references of product models, models not in them
+            are left out.
+
+    Returns:
+        Facets: values of every facet by facet name.
+
+    """
+    category_counts: Counter[str] = Counter()
+    manufacturer_counts: Counter[str] = Counter()
+    for model_id, count in model_counts:
+        if model_id in dimensions.model_references:
+            category_id, manufacturer_id = dimensions.model_references[model_id]
+            category_counts[category_id] += count
+            manufacturer_counts[manufacturer_id] += count
+
+    return reference_facets(category_counts, manufacturer_counts, dimensions)
@@ -0,0 +1,184 @@
+"""Product JSON module.
+
+This module define the JSON encoding of Product domain models for the search API: products are serialized by the
+compiled pydantic-core serializer on the selected fields only, and pages or NDJSON exports are encoded in chunks so
+they are streamed while products are got, without building the whole body. Product batches are encoded from their
+columns, the JSON of a product model being encoded once for all its products.
+"""
+
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from pydantic_core import to_json
+
+from store_catalog.adapters.product_batch import ProductBatch
+from store_catalog.adapters.product_projection import FieldsTree
+from store_catalog.adapters.product_projection import fields_tree
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductsPage
+
+# Bytes of encoded products buffered before a chunk is streamed
+CHUNK_SIZE: int = 64 * 1024
+
+IncludeTree = dict[str, 'IncludeTree | bool']
+
+
+def _include(tree: FieldsTree) -> IncludeTree:
+    """Fields tree in the ``include`` format of pydantic serializers."""
+    return {name: _include(nested_fields) if nested_fields else True for name, nested_fields in tree.items()}
+
+
+class ProductJsonEncoder:
+    """JSON encoder of products restricted to some fields.
+
+    Products searched with the same fields are projected on them, so the encoder never reads a field left out (which
+    would be loaded lazily). Categories and manufacturers are encoded with their ``id`` key. Serializer warnings are
+    off: products mapped from trusted documents keep their image URLs as strings, which are encoded as they are.
+
+    Attributes:
+        fields (tuple[str, ...], optional): dotted paths of the selected fields, None for every field.
+        chunk_size (int): bytes of encoded products buffered before a chunk is yielded.
+        _include (IncludeTree, optional): selected fields in the ``include`` format of pydantic serializers.
+
+    """
+
+    def __init__(self, fields: Iterable[str] | None = None, chunk_size: int = CHUNK_SIZE) -> None:
+        """Constructor.
+
+        Args:
+            fields (Iterable[str], optional): dotted paths of the selected fields, e.g. ``model.manufacturer.title``,
+                None for every field.
+            chunk_size (int): bytes of encoded products buffered before a chunk is yielded.
+
+        Raises:
+            ValueError: if a field is not a field of Product domain model.
+
+        """
+        self.fields: tuple[str, ...] | None = tuple(fields) if fields is not None else None
+        self.chunk_size: int = chunk_size
+        self._include: IncludeTree | None = _include(fields_tree(self.fields)) if self.fields is not None else None
+
+    def product(self, product: Product) -> bytes:
+        """JSON object of a product with the selected fields."""
+        return product.__pydantic_serializer__.to_json(product, include=self._include, by_alias=True, warnings=False)
+
+    def batch(self, batch: ProductBatch) -> Iterator[bytes]:
+        """JSON objects of the products of a batch with the selected fields, see product.
+
+        With every field, products are encoded from the columns of the batch without building them, and the JSON of a
+        model is encoded once for every product sharing it.
+
+        Args:
+            batch (ProductBatch): products to encode.
+
+        Yields:
+            bytes: JSON object of every product.
+
+        """
+        if self._include is not None:
+            yield from (self.product(product) for product in batch)
+            return
+
+        # JSON between the product price and its stock by model, keyed by identity as models are shared by the batch
+        models_json: dict[int, bytes] = {}
+        for sku, title, description, image_url, price, model, stock, num_purchases in batch.rows():
+            model_json: bytes | None = models_json.get(id(model))
+            if model_json is None:
+                model_json = b',"model":' + model.__pydantic_serializer__.to_json(
+                    model,
+                    by_alias=True,
+                    warnings=False,
+                ) + b',"stock":'
+                models_json[id(model)] = model_json
+            product_json: bytes = to_json({
+                'sku': sku,
+                'title': title,
+                'description': description,
+                'image_url': image_url,
+                'price': price,
+            })
+            yield b'%s%s%s,"num_purchases":%d}' % (
+                product_json[:-1],
+                model_json,
+                b'true' if stock else b'false',
+                num_purchases,
+            )
+
+    def page_chunks(self, products_page: ProductsPage, facets: bool = False) -> Iterator[bytes]:
+        """JSON object of a page of products in chunks, with the counts of the search and its facets if requested.
+
+        ``stale`` is true if the page is the last good result of its search, served while Typesense is failing.
+
+        Args:
+            products_page (ProductsPage): page of products.
+            facets (bool): True to encode the facets of the page.
+
+        Yields:
+            bytes: chunks of the JSON object, of ``chunk_size`` bytes at least except the last one.
+
+        """
+        header: bytes = b'{"found":%d,"page":%d,"per_page":%d,"pages":%d,"stale":%s,"products":[' % (
+            products_page.found,
+            products_page.page,
+            products_page.per_page,
+            products_page.pages,
+            b'true' if products_page.stale else b'false',
+        )
+        footer: bytes = b'],"facets":' + to_json(products_page.facets, by_alias=True) + b'}' if facets else b']}'
+        yield from self._chunks(header, self._separated(products_page.products), footer)
+
+    def ndjson_chunks(self, products: Iterable[Product]) -> Iterator[bytes]:
+        """Products as NDJSON (a JSON object per line) in chunks, consuming products while chunks are consumed.
+
+        Args:
+            products (Iterable[Product]): products to encode, e.g. iterated page by page from a search.
+
+        Yields:
+            bytes: chunks of lines, of ``chunk_size`` bytes at least except the last one.
+
+        """
+        yield from self._chunks(b'', (self.product(product) + b'\n' for product in products), b'')
+
+    def batches_ndjson_chunks(self, batches: Iterable[ProductBatch]) -> Iterator[bytes]:
+        """Products of batches as NDJSON in chunks, see ndjson_chunks and batch."""
+        yield from self._chunks(b'', (product + b'\n' for batch in batches for product in self.batch(batch)), b'')
+
+    async def async_ndjson_chunks(self, products: AsyncIterable[Product]) -> AsyncIterator[bytes]:
+        """Products as NDJSON in chunks, see ndjson_chunks, consuming an asynchronous iterator of products."""
+        async for chunk in self._async_chunks(self.product(product) async for product in products):
+            yield chunk
+
+    async def async_batches_ndjson_chunks(self, batches: AsyncIterable[ProductBatch]) -> AsyncIterator[bytes]:
+        """Products of batches as NDJSON in chunks, see batches_ndjson_chunks, consuming an asynchronous iterator."""
+        async for chunk in self._async_chunks(product async for batch in batches for product in self.batch(batch)):
+            yield chunk
+
+    def _separated(self, products: Iterable[Product]) -> Iterator[bytes]:
+        for index, product in enumerate(products):
+            yield b',' + self.product(product) if index else self.product(product)
+
+    def _chunks(self, header: bytes, parts: Iterable[bytes], footer: bytes) -> Iterator[bytes]:
+        """Parts buffered in chunks of ``chunk_size`` bytes, so a response is not written product by product."""
+        buffer: bytearray = bytearray(header)
+        for part in parts:
+            buffer += part
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += footer
+        if buffer:
+            yield bytes(buffer)
+
+    async def _async_chunks(self, products: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """JSON objects of products as lines buffered in chunks, see _chunks."""
+        buffer: bytearray = bytearray()
+        async for product in products:
+            buffer += product
+            buffer += b'\n'
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
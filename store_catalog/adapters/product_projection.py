@@ -0,0 +1,355 @@
+"""Product projection module.
+
+This module define the projection of Typesense product documents on the Product domain model fields needed by a
+caller, with the fields left out loaded lazily when accessed.
+"""
+
+import copy
+import threading
+import weakref
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+from typing import cast
+
+from pydantic import BaseModel
+from pydantic import PrivateAttr
+from pydantic import create_model
+
+from store_catalog.adapters.dimension_cache import Dimensions
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductCategory
+from store_catalog.domain.model import ProductManufacturer
+from store_catalog.domain.model import ProductModel
+
+FieldsTree = dict[str, 'FieldsTree']
+
+# Domain model and document key of the joined document of every relation field
+RELATIONS: dict[tuple[type[BaseModel], str], tuple[type[BaseModel], str]] = {
+    (Product, 'model'): (ProductModel, 'product_models'),
+    (ProductModel, 'category'): (ProductCategory, 'product_categories'),
+    (ProductModel, 'manufacturer'): (ProductManufacturer, 'product_manufacturers'),
+    (ProductCategory, 'category_parent'): (ProductCategory, 'product_categories'),
+}
+
+# Reference key in the document and dimensions attribute of the relation fields assembled from cached dimensions
+DIMENSION_REFERENCES: dict[tuple[type[BaseModel], str], tuple[str, str]] = {
+    (ProductModel, 'category'): ('product_category_id', 'categories'),
+    (ProductModel, 'manufacturer'): ('product_manufacturer_id', 'manufacturers'),
+}
+
+# Document key of the domain fields named differently
+DOCUMENT_KEYS: dict[str, str] = {'id_': 'id'}
+
+# Every field of Product domain model stored in product documents and their joined documents
+PRODUCT_FIELDS: FieldsTree = {
+    'sku': {},
+    'title': {},
+    'description': {},
+    'image_url': {},
+    'price': {},
+    'stock': {},
+    'num_purchases': {},
+    'model': {
+        'sku': {},
+        'title': {},
+        'description': {},
+        'image_url': {},
+        'min_price': {},
+        'category': {
+            'id_': {},
+            'title': {},
+            'subcategory': {},
+            'category_parent': {'id_': {}, 'title': {}, 'subcategory': {}},
+        },
+        'manufacturer': {'id_': {}, 'title': {}, 'image_url': {}},
+    },
+}
+
+
+def fields_tree(fields: Iterable[str]) -> FieldsTree:
+    """Tree of the Product fields of dotted paths, with every field of the relations given without nested fields.
+
+    Args:
+        fields (Iterable[str]): dotted paths of fields, e.g. ``model.manufacturer.title`` or ``model.manufacturer``.
+
+    Returns:
+        FieldsTree: nested fields by name, the SKU always included.
+
+    Raises:
+        ValueError: if a field is not a field of Product domain model.
+
+    """
+    # The SKU identifies the products whose fields are loaded lazily
+    tree: FieldsTree = {'sku': {}}
+    for field in fields:
+        product_fields: FieldsTree = PRODUCT_FIELDS
+        projected_fields: FieldsTree = tree
+        for name in field.split('.'):
+            if name not in product_fields:
+                raise ValueError(f'Unknown product field {field!r}')
+            product_fields = product_fields[name]
+            projected_fields = projected_fields.setdefault(name, {})
+        projected_fields.update(copy.deepcopy(product_fields))
+
+    return tree
+
+
+class LazyFieldsLoader:
+    """Loader of the fields left out of the projected products of a search.
+
+    The first access to a missing field of any product loads the missing fields of every product of the search in a
+    single batched fetch by SKU, instead of a request per product. Products are referenced weakly, as they reference
+    their loader, so products streamed page by page are freed once consumed instead of by the garbage collector.
+
+    Attributes:
+        _fetch (Callable[[list[str]], dict[str, Product]]): fetcher of complete products by SKU.
+        _products (list[weakref.ref[Product]]): projected products to complete.
+        _loaded (bool): True once the missing fields are loaded.
+
+    """
+
+    def __init__(self, fetch: Callable[[list[str]], dict[str, Product]]) -> None:
+        self._fetch: Callable[[list[str]], dict[str, Product]] = fetch
+        self._products: list[weakref.ref[Product]] = []
+        self._loaded: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, product: Product) -> None:
+        self._products.append(weakref.ref(product))
+
+    def load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+
+            products: list[Product] = [product for product in (ref() for ref in self._products) if product is not None]
+            complete_products: dict[str, Product] = self._fetch([product.sku for product in products])
+            for product in products:
+                if product.sku in complete_products:
+                    self._complete(product, complete_products[product.sku])
+            self._products = []
+            self._loaded = True
+
+    @classmethod
+    def _complete(cls, model: BaseModel, complete_model: BaseModel) -> None:
+        for name in type(model).model_fields:
+            if name not in model.__dict__:
+                model.__dict__[name] = complete_model.__dict__[name]
+                model.__pydantic_fields_set__.add(name)
+            elif isinstance(model.__dict__[name], LazyFieldsModel):
+                cls._complete(model.__dict__[name], complete_model.__dict__[name])
+
+
+class LazyFieldsModel(BaseModel):
+    """Domain model mixin of projected models, whose fields left out are loaded when accessed.
+
+    Fields are loaded by the LazyFieldsLoader of the search, an AttributeError is raised if there is not any, as
+    in unpickled models.
+    """
+    _lazy_fields: LazyFieldsLoader | None = PrivateAttr(default=None)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in type(self).model_fields:
+            lazy_fields: LazyFieldsLoader | None = (self.__pydantic_private__ or {}).get('_lazy_fields')
+            if lazy_fields is not None:
+                lazy_fields.load()
+            if name in self.__dict__:
+                return self.__dict__[name]
+            raise AttributeError(f'Field {name!r} of {type(self).__name__!r} was not projected')
+
+        return super().__getattr__(name)  # type: ignore[misc]
+
+    def __getstate__(self) -> dict[Any, Any]:
+        # The loader holds typesense sessions, pickled models (e.g. by a shared cache) keep projected fields only
+        return {**super().__getstate__(), '__pydantic_private__': {'_lazy_fields': None}}
+
+
+class LazyProduct(LazyFieldsModel, Product):
+    ...
+
+
+class LazyProductModel(LazyFieldsModel, ProductModel):
+    ...
+
+
+class LazyProductCategory(LazyFieldsModel, ProductCategory):
+    ...
+
+
+class LazyProductManufacturer(LazyFieldsModel, ProductManufacturer):
+    ...
+
+
+LAZY_MODELS: dict[type[BaseModel], type[LazyFieldsModel]] = {
+    Product: LazyProduct,
+    ProductModel: LazyProductModel,
+    ProductCategory: LazyProductCategory,
+    ProductManufacturer: LazyProductManufacturer,
+}
+
+
+@dataclass(frozen=True)
+class _ProjectedModel:
+    """Projected fields of a domain model.
+
+    Attributes:
+        lazy_model_class (type[LazyFieldsModel]): class of projected models.
+        fields (dict[str, str]): document key by projected field name, relations excluded.
+        relations (dict[str, tuple[str, _ProjectedModel]]): document key and projected model by relation field name.
+        references (dict[str, tuple[str, str]]): reference key and dimensions attribute by relation field name, for
+            relations assembled from cached dimensions.
+        validation_model_class (type[BaseModel], optional): model of the projected fields only, to validate them at
+            once, None if they are trusted.
+    """
+    lazy_model_class: type[LazyFieldsModel]
+    fields: dict[str, str]
+    relations: dict[str, tuple[str, '_ProjectedModel']]
+    references: dict[str, tuple[str, str]]
+    validation_model_class: type[BaseModel] | None
+
+
+class ProductProjection:
+    """Projection of product documents on some fields of Product domain model.
+
+    Attributes:
+        fields (FieldsTree): projected fields by domain model (the SKU is always projected).
+        include_fields (str): typesense ``include_fields`` search parameter of the projected fields.
+        _projected_product (_ProjectedModel): projected fields of Product and its relations.
+
+    """
+
+    def __init__(self, fields: Iterable[str], trusted: bool = False, dimensions: bool = False) -> None:
+        """Constructor.
+
+        Args:
+            fields (Iterable[str]): dotted paths of projected fields, e.g. ``model.manufacturer.title``, all the
+                fields of a relation are projected if no nested field is given, e.g. ``model.manufacturer``.
+            trusted (bool): True to set fields without validation, for documents validated on ingest.
+            dimensions (bool): True to get categories and manufacturers from cached dimensions instead of joining
+                their documents.
+
+        Raises:
+            ValueError: if a field is not a field of Product domain model.
+
+        """
+        self.fields: FieldsTree = fields_tree(fields)
+        self.include_fields: str = self._include_fields(Product, self.fields, dimensions)
+        self._projected_product: _ProjectedModel = self._projected_model(Product, self.fields, trusted, dimensions)
+
+    @classmethod
+    def _include_fields(cls, model_class: type[BaseModel], fields_tree: FieldsTree, dimensions: bool) -> str:
+        include_fields: list[str] = []
+        for name, nested_fields in fields_tree.items():
+            relation: tuple[type[BaseModel], str] | None = RELATIONS.get((model_class, name))
+            if dimensions and (model_class, name) in DIMENSION_REFERENCES:
+                include_fields.append(DIMENSION_REFERENCES[(model_class, name)][0])
+            elif relation is None:
+                include_fields.append(DOCUMENT_KEYS.get(name, name))
+            else:
+                include_fields.append(
+                    f'${relation[1]}({cls._include_fields(relation[0], nested_fields, dimensions)})',
+                )
+
+        # Typesense includes every field of a document if only joined collections are included
+        if all(include_field.startswith('$') for include_field in include_fields):
+            include_fields.insert(0, 'id')
+
+        return ', '.join(include_fields)
+
+    @classmethod
+    def _projected_model(
+            cls,
+            model_class: type[BaseModel],
+            fields_tree: FieldsTree,
+            trusted: bool,
+            dimensions: bool,
+    ) -> _ProjectedModel:
+        fields: dict[str, str] = {}
+        relations: dict[str, tuple[str, _ProjectedModel]] = {}
+        references: dict[str, tuple[str, str]] = {}
+        for name, nested_fields in fields_tree.items():
+            relation: tuple[type[BaseModel], str] | None = RELATIONS.get((model_class, name))
+            if dimensions and (model_class, name) in DIMENSION_REFERENCES:
+                references[name] = DIMENSION_REFERENCES[(model_class, name)]
+            elif relation is None:
+                fields[name] = DOCUMENT_KEYS.get(name, name)
+            else:
+                relations[name] = (relation[1], cls._projected_model(relation[0], nested_fields, trusted, dimensions))
+
+        return _ProjectedModel(
+            lazy_model_class=LAZY_MODELS[model_class],
+            fields=fields,
+            relations=relations,
+            references=references,
+            validation_model_class=None if trusted else create_model(  # type: ignore[call-overload]
+                f'Projected{model_class.__name__}',
+                **{
+                    name: (model_class.model_fields[name].annotation, model_class.model_fields[name])
+                    for name in fields
+                },
+            ),
+        )
+
+    def product(
+            self,
+            product_document: dict,
+            lazy_fields: LazyFieldsLoader | None = None,
+            dimensions: Dimensions | None = None,
+    ) -> Product:
+        """Mapper a projected product document to a Product domain model with the projected fields.
+
+        Args:
+            product_document (dict): projected product document of products collection of typesense.
+            lazy_fields (LazyFieldsLoader, optional): loader of the fields left out, they can not be accessed if None.
+            dimensions (Dimensions, optional): cached categories and manufacturers shared by the products, for
+                projections with dimensions.
+
+        Returns:
+            Product: product domain model.
+
+        Raises:
+            ValidationError: if a projected field is not valid (only if not trusted).
+
+        """
+        product: Product = cast(
+            Product,
+            self._model(self._projected_product, product_document, lazy_fields, dimensions),
+        )
+        if lazy_fields is not None:
+            lazy_fields.add(product)
+
+        return product
+
+    def _model(
+            self,
+            projected_model: _ProjectedModel,
+            document: dict,
+            lazy_fields: LazyFieldsLoader | None,
+            dimensions: Dimensions | None,
+    ) -> LazyFieldsModel:
+        fields: dict[str, Any]
+        if projected_model.validation_model_class is None:
+            fields = {
+                name: int(document[document_key]) if name == 'id_' else document[document_key]
+                for name, document_key in projected_model.fields.items()
+            }
+        else:
+            fields = projected_model.validation_model_class.__pydantic_validator__.validate_python(document).__dict__
+
+        # Missing joined documents are left out, to be loaded lazily
+        for name, (document_key, nested_projected_model) in projected_model.relations.items():
+            if document_key in document:
+                fields[name] = self._model(nested_projected_model, document[document_key], lazy_fields, dimensions)
+        if dimensions is not None:
+            for name, (reference_key, dimension) in projected_model.references.items():
+                if reference_key in document:
+                    fields[name] = getattr(dimensions, dimension)[document[reference_key]]
+
+        model: LazyFieldsModel = projected_model.lazy_model_class.__new__(projected_model.lazy_model_class)
+        object.__setattr__(model, '__dict__', fields)
+        object.__setattr__(model, '__pydantic_fields_set__', set(fields))
+        object.__setattr__(model, '__pydantic_extra__', None)
+        object.__setattr__(model, '__pydantic_private__', {'_lazy_fields': lazy_fields})
+        return model
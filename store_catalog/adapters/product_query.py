@@ -0,0 +1,129 @@
+"""Product query module.
+
+This module define the typed query of a products search (text query, weighted query fields, filters and sort
+order), translated to Typesense search parameters so ranking, filtering and paging happen in the search engine and only
+a page of products comes back.
+"""
+
+from dataclasses import dataclass
+from dataclasses import field
+
+from store_catalog.adapters.product_facets import ProductFilters
+
+RELEVANCE_SORT: str = 'relevance'
+POPULARITY_SORT: str = 'popularity'
+PRICE_ASC_SORT: str = 'price_asc'
+PRICE_DESC_SORT: str = 'price_desc'
+
+# Typesense sort clauses by sort, relevance is the default ranking of the engine (text match, then the default
+# sorting field of products, their number of purchases)
+SORT_CLAUSES: dict[str, tuple[str, ...]] = {
+    RELEVANCE_SORT: (),
+    POPULARITY_SORT: ('num_purchases:desc',),
+    PRICE_ASC_SORT: ('price:asc',),
+    PRICE_DESC_SORT: ('price:desc',),
+}
+SORT_LABELS: dict[str, str] = {
+    RELEVANCE_SORT: 'Relevance',
+    POPULARITY_SORT: 'Popularity',
+    PRICE_ASC_SORT: 'Price: low to high',
+    PRICE_DESC_SORT: 'Price: high to low',
+}
+# Ranks products in stock before the others (a Typesense sort by a filter expression)
+IN_STOCK_FIRST_CLAUSE: str = '_eval(stock:true):desc'
+TEXT_MATCH_CLAUSE: str = '_text_match:desc'
+# Typesense sorts by three clauses at most
+MAX_SORT_CLAUSES: int = 3
+# Product fields indexed for text queries
+QUERY_FIELDS: tuple[str, ...] = ('title', 'sku', 'description')
+
+QueryBy = tuple[tuple[str, int], ...]
+
+
+def parse_query_by(query_by: str) -> QueryBy:
+    """Weighted query fields of a comma separated list of fields with an optional weight, e.g. ``title:3,sku:2``.
+
+    Args:
+        query_by (str): fields and weights, a field without weight weighs 1.
+
+    Returns:
+        QueryBy: query fields with their weight, in the order given.
+
+    Raises:
+        ValueError: if a field is not indexed for text queries or a weight is not a positive integer.
+
+    """
+    fields: list[tuple[str, int]] = []
+    for field_weight in query_by.split(','):
+        name, _, weight = field_weight.strip().partition(':')
+        fields.append((name, int(weight) if weight else 1))
+
+    return _checked_query_by(tuple(fields))
+
+
+def _checked_query_by(query_by: QueryBy) -> QueryBy:
+    if not query_by:
+        raise ValueError('A query field is required')
+    for name, weight in query_by:
+        if name not in QUERY_FIELDS:
+            raise ValueError(f'Unknown query field {name!r}, one of {", ".join(QUERY_FIELDS)}')
+        if weight < 1:
+            raise ValueError(f'Weight of query field {name!r} is not positive')
+
+    return query_by
+
+
+@dataclass(frozen=True)
+class ProductQuery:
+    """Query of a products search, translated to Typesense search parameters.
+
+    Attributes:
+        q (str): text query, ``*`` to find every product.
+        query_by (QueryBy): product fields matched by the text query with their weight, higher weights ranking their
+            matches first.
+        filters (ProductFilters): filters of products found.
+        sort (str): ``relevance``, ``popularity`` (most purchased first), ``price_asc`` or ``price_desc``.
+        in_stock_first (bool): True to rank products in stock before the others, whatever the sort.
+    """
+    q: str = '*'
+    query_by: QueryBy = (('title', 1),)
+    filters: ProductFilters = field(default_factory=ProductFilters)
+    sort: str = RELEVANCE_SORT
+    in_stock_first: bool = False
+
+    def __post_init__(self) -> None:
+        if self.sort not in SORT_CLAUSES:
+            raise ValueError(f'Unknown sort {self.sort!r}, one of {", ".join(SORT_CLAUSES)}')
+        _checked_query_by(self.query_by)
+
+    def sort_by(self) -> str:
+        """str: typesense ``sort_by`` of the sort, empty for the default ranking of the engine."""
+        clauses: tuple[str, ...] = SORT_CLAUSES[self.sort]
+        if self.in_stock_first:
+            # Sorting by a filter replaces the default ranking, relevance is kept as the next clauses
+            clauses = (IN_STOCK_FIRST_CLAUSE, *(clauses or (TEXT_MATCH_CLAUSE, 'num_purchases:desc')))
+
+        return ','.join(clauses[:MAX_SORT_CLAUSES])
+
+    def search(self) -> dict:
+        """Typesense search parameters of the query.
+
+        Returns:
+            dict: ``q`` and ``query_by``, with ``query_by_weights`` if several fields are weighted, ``filter_by`` if
+                there are filters and ``sort_by`` if the sort is not the default ranking.
+
+        """
+        search: dict = {
+            'q': self.q.strip() or '*',
+            'query_by': ','.join(name for name, _ in self.query_by),
+        }
+        weights: set[int] = {weight for _, weight in self.query_by}
+        if len(weights) > 1:
+            search['query_by_weights'] = ','.join(str(weight) for _, weight in self.query_by)
+        filter_by: str = self.filters.filter_by()
+        if filter_by:
+            search['filter_by'] = filter_by
+        sort_by: str = self.sort_by()
+        if sort_by:
+            search['sort_by'] = sort_by
+        return search
@@ -0,0 +1,300 @@
+"""Product updates module.
+
+This module define a write buffer of partial updates of hot product fields (stock and purchases), coalesced by SKU
+and flushed to the repository in bulk, so bursts of order events do not send a request per event.
+"""
+
+import atexit
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from store_catalog.adapters.migration_lock import AbstractMigrationLock
+from store_catalog.adapters.repository import AbstractProductRepository
+from store_catalog.domain.model import ProductsUpdate
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Fields updated in place as orders come, with their type
+HOT_FIELDS: dict[str, type] = {'stock': bool, 'num_purchases': int}
+
+
+class ProductUpdatesOverflowError(Exception):
+    """The buffer is full of pending updates and was not flushed in time, the update is rejected."""
+
+
+class ProductUpdatesHeldError(Exception):
+    """A migration copies the collections updated, pending updates are sent once it swaps them."""
+
+
+@dataclass(frozen=True)
+class ProductUpdatesStats:
+    """Snapshot of the product updates counters.
+
+    Attributes:
+        received (int): updates received.
+        coalesced (int): updates merged into a pending update of the same SKU, not sent on their own.
+        sent (int): product updates sent to the repository (one per SKU of a flush).
+        updated (int): products updated.
+        not_found (int): updates of SKUs without any product.
+        failed (int): updates rejected by the repository.
+        retried (int): updates requeued because their flush failed.
+        rejected (int): updates rejected because the buffer was full.
+        held (int): flushes held because a migration was copying the collections updated.
+        flushes (int): bulk updates sent to the repository.
+        pending (int): SKUs with a pending update.
+    """
+    received: int
+    coalesced: int
+    sent: int
+    updated: int
+    not_found: int
+    failed: int
+    retried: int
+    rejected: int
+    held: int
+    flushes: int
+    pending: int
+
+
+class ProductUpdateBuffer:
+    """Write buffer of partial product updates, coalesced by SKU and flushed in bulk by a background thread.
+
+    Updates of the same SKU are merged while pending (the last value of every field wins), and flushed to the
+    repository in bulk updates of at most ``batch_size`` SKUs when that many SKUs are pending or every
+    ``flush_interval_seconds``. A flush that fails is requeued (newer pending values win) and sent again by the next
+    flush. Flushes are held while the migration lock is held, so updates are not lost with the collections replaced
+    by a migration. When ``max_pending`` SKUs are pending, updates of other SKUs wait for a flush for at most
+    ``put_timeout_seconds``, then they are rejected (backpressure).
+
+    Attributes:
+        _repository (AbstractProductRepository): repository of products updated.
+        _batch_size (int): max SKUs per bulk update, and pending SKUs that trigger a flush.
+        _flush_interval_seconds (float): max seconds an update is pending before a flush.
+        _max_pending (int): max SKUs pending.
+        _put_timeout_seconds (float): max seconds an update waits while the buffer is full.
+        _pending (dict[str, dict]): new value of updated fields by SKU, in order of first update.
+        _in_flight (int): SKUs of the bulk update being sent.
+        _on_updated (Callable[[list[str]], None], optional): hook called with the SKUs of products updated, e.g. to
+            invalidate their cached lookups.
+        _migration_lock (AbstractMigrationLock, optional): lock holding flushes while a migration copies collections.
+        _thread (threading.Thread, optional): flushing thread, started by the first update.
+
+    """
+
+    def __init__(
+            self,
+            repository: AbstractProductRepository,
+            batch_size: int = 1000,
+            flush_interval_seconds: float = 1.0,
+            max_pending: int = 100000,
+            put_timeout_seconds: float = 5.0,
+            on_updated: Callable[[list[str]], None] | None = None,
+            migration_lock: AbstractMigrationLock | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            repository (AbstractProductRepository): repository of products updated.
+            batch_size (int): max SKUs per bulk update, and pending SKUs that trigger a flush.
+            flush_interval_seconds (float): max seconds an update is pending before a flush.
+            max_pending (int): max SKUs pending.
+            put_timeout_seconds (float): max seconds an update waits while the buffer is full.
+            on_updated (Callable[[list[str]], None], optional): hook called with the SKUs of products updated.
+            migration_lock (AbstractMigrationLock, optional): lock holding flushes while a migration copies
+                collections, never held if None.
+
+        """
+        self._repository: AbstractProductRepository = repository
+        self._batch_size: int = batch_size
+        self._flush_interval_seconds: float = flush_interval_seconds
+        self._max_pending: int = max_pending
+        self._put_timeout_seconds: float = put_timeout_seconds
+        self._pending: dict[str, dict] = {}
+        self._in_flight: int = 0
+        self._on_updated: Callable[[list[str]], None] | None = on_updated
+        self._migration_lock: AbstractMigrationLock | None = migration_lock
+        self._thread: threading.Thread | None = None
+        self._closed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        # Flushes are serialized, so a requeued update never overwrites a newer one sent meanwhile
+        self._flush_lock: threading.Lock = threading.Lock()
+        self._counters: dict[str, int] = dict.fromkeys(
+            (
+                'received',
+                'coalesced',
+                'sent',
+                'updated',
+                'not_found',
+                'failed',
+                'retried',
+                'rejected',
+                'held',
+                'flushes',
+            ),
+            0,
+        )
+
+    def update(self, sku: str, **fields: Any) -> None:
+        """Buffer a partial update of hot fields of a product.
+
+        Args:
+            sku (str): SKU of product to update.
+            **fields: new value of updated fields, any of ``HOT_FIELDS``.
+
+        Raises:
+            ValueError: if a field is not a hot field or its value has not the field type.
+            ProductUpdatesOverflowError: if the buffer is still full after ``put_timeout_seconds``.
+
+        """
+        for name, value in fields.items():
+            if name not in HOT_FIELDS or type(value) is not HOT_FIELDS[name]:
+                raise ValueError(f'Invalid update of {name!r}, only {", ".join(HOT_FIELDS)} fields can be updated')
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Product updates buffer is closed')
+            self._start()
+            self._counters['received'] += 1
+            if sku in self._pending:
+                self._pending[sku].update(fields)
+                self._counters['coalesced'] += 1
+                return
+
+            # SKUs being sent count as pending, so updates are rejected while the repository fails
+            if not self._condition.wait_for(
+                    lambda: len(self._pending) + self._in_flight < self._max_pending,
+                    self._put_timeout_seconds,
+            ):
+                self._counters['rejected'] += 1
+                raise ProductUpdatesOverflowError(f'{len(self._pending)} product updates pending')
+
+            self._pending[sku] = dict(fields)
+            if len(self._pending) >= self._batch_size:
+                self._condition.notify_all()
+
+    def flush(self) -> ProductsUpdate:
+        """Send every pending update now, in bulk updates of at most ``batch_size`` SKUs.
+
+        Returns:
+            ProductsUpdate: SKUs of products updated, not found or failed, of every bulk update sent.
+
+        Raises:
+            ProductUpdatesHeldError: if a migration holds writes, updates stay pending.
+
+        """
+        products_update: ProductsUpdate = ProductsUpdate()
+        while True:
+            batch_update: ProductsUpdate | None = self._flush_batch()
+            if batch_update is None:
+                return products_update
+
+            products_update.updated.extend(batch_update.updated)
+            products_update.not_found.extend(batch_update.not_found)
+            products_update.failed.update(batch_update.failed)
+
+    def close(self) -> None:
+        """Stop the flushing thread and send every pending update, updates are rejected once closed.
+
+        Updates held by a migration or whose flush fails are logged and dropped, as the process exits.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except ProductUpdatesHeldError as error:
+            logger.warning('Product updates not sent on close: %s', error)
+        except Exception:
+            logger.exception('Product updates not sent on close, %d updates dropped', self.stats.pending)
+
+    @property
+    def stats(self) -> ProductUpdatesStats:
+        with self._condition:
+            return ProductUpdatesStats(**self._counters, pending=len(self._pending))
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='product-updates', daemon=True)
+            self._thread.start()
+            # Pending updates are sent when the process exits
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        """Flush pending updates every interval, or as soon as a batch is full, until closed."""
+        failed: bool = False
+        while True:
+            with self._condition:
+                # After a failed flush the next one waits a whole interval, even if a batch is full
+                self._condition.wait_for(
+                    lambda: self._closed or (not failed and len(self._pending) >= self._batch_size),
+                    self._flush_interval_seconds,
+                )
+                if self._closed:
+                    return
+            try:
+                self.flush()
+                failed = False
+            except ProductUpdatesHeldError as error:
+                # Updates of a held flush stay pending, they are sent by the first flush after the migration
+                logger.info('%s', error)
+                failed = True
+            except Exception:
+                # Updates of a failed flush are requeued, they are sent again by the next flush
+                logger.exception('Product updates flush failed, %d updates pending', self.stats.pending)
+                failed = True
+
+    def _flush_batch(self) -> ProductsUpdate | None:
+        """Send a bulk update of the first ``batch_size`` pending SKUs, None if there is not any.
+
+        Raises:
+            ProductUpdatesHeldError: if a migration holds writes, updates stay pending.
+            Exception: error of the repository, updates of the batch are requeued.
+
+        """
+        with self._flush_lock:
+            # Read out of the condition, the lock of a shared backend is a round trip
+            held: bool = self._migration_lock is not None and self._migration_lock.locked()
+            with self._condition:
+                if not self._pending:
+                    return None
+                if held:
+                    self._counters['held'] += 1
+                    raise ProductUpdatesHeldError(f'{len(self._pending)} product updates held by a migration')
+                batch: dict[str, dict] = {
+                    sku: self._pending.pop(sku) for sku in list(islice(self._pending, self._batch_size))
+                }
+                self._in_flight = len(batch)
+                self._counters['sent'] += len(batch)
+                self._counters['flushes'] += 1
+
+            try:
+                products_update: ProductsUpdate = self._repository.update_many(batch)
+            except Exception:
+                self._requeue(batch)
+                raise
+
+        with self._condition:
+            self._in_flight = 0
+            self._condition.notify_all()
+            self._counters['updated'] += len(products_update.updated)
+            self._counters['not_found'] += len(products_update.not_found)
+            self._counters['failed'] += len(products_update.failed)
+        if self._on_updated is not None and products_update.updated:
+            self._on_updated(products_update.updated)
+        return products_update
+
+    def _requeue(self, batch: dict[str, dict]) -> None:
+        with self._condition:
+            for sku, fields in batch.items():
+                # Updates received while the batch was sent are newer than its updates
+                self._pending[sku] = {**fields, **self._pending.get(sku, {})}
+            self._in_flight = 0
+            self._counters['retried'] += len(batch)
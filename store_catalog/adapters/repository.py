@@ -5,16 +5,64 @@ This module define a layer of abstraction around search engine access.
 
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import AsyncIterator
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
+from itertools import chain
 from typing import Any
+from typing import TypeVar
 
+import httpx
+from pydantic import BaseModel
 from typesense import Client as TypesenseClient  # type: ignore
+from typesense.exceptions import Timeout as TypesenseTimeout  # type: ignore
+from typesense.exceptions import TypesenseClientError
 
+from store_catalog.adapters.async_typesense_database import AsyncTypesenseSession
+from store_catalog.adapters.dimension_cache import DimensionCache
+from store_catalog.adapters.dimension_cache import Dimensions
+from store_catalog.adapters.instrumentation import MAPPING_STAGE
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.product_batch import ProductBatch
+from store_catalog.adapters.product_facets import Facets
+from store_catalog.adapters.product_facets import model_facets
+from store_catalog.adapters.product_projection import LazyFieldsLoader
+from store_catalog.adapters.product_projection import ProductProjection
+from store_catalog.adapters.search_cache import AbstractSearchCache
+from store_catalog.adapters.typesense_cluster import NODE_ERRORS
+from store_catalog.adapters.typesense_database import ConnectionPoolTimeoutError
 from store_catalog.domain.model import Product
 from store_catalog.domain.model import ProductCategory
 from store_catalog.domain.model import ProductManufacturer
 from store_catalog.domain.model import ProductModel
+from store_catalog.domain.model import ProductsBySku
+from store_catalog.domain.model import ProductsPage
+from store_catalog.domain.model import ProductsUpdate
+from store_catalog.domain.model import Suggestion
+from store_catalog.domain.model import Suggestions
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+# Product fields got by searches of facet counts only
+FACET_COUNTS_FIELDS: tuple[str, ...] = ('sku',)
+# Suggestions match the title or the SKU, the last token as a prefix and without typos, so the products matching a
+# query are a subset of the products matching its prefixes (see SuggestionCache), most purchased first
+SUGGEST_SEARCH: dict = {
+    'query_by': 'title,sku',
+    'sort_by': 'num_purchases:desc',
+}
+
+# Errors of Typesense down, overloaded or unreachable (not of a search it rejected), failures of circuit breakers
+SEARCH_ENGINE_ERRORS: tuple[type[Exception], ...] = (
+    *NODE_ERRORS,
+    TypesenseTimeout,
+    httpx.TransportError,
+    ConnectionPoolTimeoutError,
+)
 
 
 class ProductNotFoundError(Exception):
@@ -25,6 +73,28 @@ class ProductMultipleFoundsError(Exception):
     ...
 
 
+def _construct(model_class: type[ModelT], fields: dict) -> ModelT:
+    """Build a pydantic model instance from all its fields without validation.
+
+    Leaner than ``BaseModel.model_construct``, which is slower than a validation done by pydantic-core because it
+    resolves aliases and defaults in Python: every field must be given.
+
+    Args:
+        model_class (type[ModelT]): pydantic model class.
+        fields (dict): value of every field of model by field name.
+
+    Returns:
+        ModelT: model instance.
+
+    """
+    model: ModelT = model_class.__new__(model_class)
+    object.__setattr__(model, '__dict__', fields)
+    object.__setattr__(model, '__pydantic_fields_set__', set(fields))
+    object.__setattr__(model, '__pydantic_extra__', None)
+    object.__setattr__(model, '__pydantic_private__', None)
+    return model
+
+
 class AbstractProductRepository(ABC):
     """Abstract product repository class Port (interface).
     """
@@ -34,34 +104,274 @@ class AbstractProductRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def list(self, *args: Any, **kwargs: Any) -> list[Product]:
+    def get_many(self, skus: Iterable[str]) -> ProductsBySku:
         raise NotImplementedError
 
+    @abstractmethod
+    def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
+        raise NotImplementedError
 
-class TypesenseProductRepository(AbstractProductRepository):
-    """Typesense product repository class Adapter.
+    @abstractmethod
+    def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_all(self, *args: Any, per_page: int = 250, **kwargs: Any) -> Iterator[Product]:
+        raise NotImplementedError
+
+    def list_batch(self, *args: Any, **kwargs: Any) -> ProductBatch:
+        """Search products with every field in a compact batch (see ProductBatch), e.g. for large listings.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitary kwyword arguments with search parameters.
+
+        Returns:
+            ProductBatch: products found.
+
+        """
+        return ProductBatch(self.list(*args, **kwargs))
+
+    def iter_batches(self, *args: Any, per_page: int = 250, **kwargs: Any) -> Iterator[ProductBatch]:
+        """Iterate over every product found by a search with every field in a compact batch per page, e.g. for
+        exports, see iter_all.
+
+        Args:
+            *args: Variable length argument list.
+            per_page (int): products requested per page.
+            **kwargs: Arbitary kwyword arguments with search parameters.
+
+        Yields:
+            ProductBatch: products of every page.
+
+        """
+        page: int = 1
+        while True:
+            products_page: ProductsPage = self.list_page(*args, page=page, per_page=per_page, **kwargs)
+            if products_page.products:
+                yield ProductBatch(products_page.products)
+            if not products_page.has_next or not products_page.products:
+                return
+            page += 1
+
+    def facet_counts(self, *args: Any, **kwargs: Any) -> Facets:
+        """Facet counts of the products found by a search, getting a single product."""
+        return self.list_page(*args, per_page=1, fields=FACET_COUNTS_FIELDS, facets=True, **kwargs).facets
+
+    def suggest(self, q: str, per_page: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, matching its title or SKU (the last token as a prefix).
+
+        Args:
+            q (str): query typed.
+            per_page (int): max number of products suggested.
+
+        Returns:
+            Suggestions: products suggested, most purchased first, with the number of products matching the query.
+
+        """
+        products_page: ProductsPage = self.list_page(q=q, per_page=per_page, fields=('sku', 'title'), **SUGGEST_SEARCH)
+        return Suggestions(
+            suggestions=[Suggestion(sku=product.sku, title=product.title) for product in products_page.products],
+            found=products_page.found,
+        )
+
+    @abstractmethod
+    def update_many(self, updates: Mapping[str, dict]) -> ProductsUpdate:
+        """Update some fields of several products by SKU, leaving their other fields unchanged.
+
+        Args:
+            updates (Mapping[str, dict]): new value of updated fields by SKU.
+
+        Returns:
+            ProductsUpdate: SKUs of products updated, not found or failed.
+
+        """
+        raise NotImplementedError
+
+    def invalidate_cache(self) -> None:
+        """Invalidate products cached by the repository, to call when the catalog changes."""
+
+    def is_healthy(self) -> bool:
+        """True if products can be searched, e.g. the search engine is up."""
+        return True
+
+    def warm_up(self) -> None:
+        """Load what the first searches would load (e.g. cached dimensions), before a worker serves them."""
+
+
+class AsyncAbstractProductRepository(ABC):
+    """Abstract asynchronous product repository class Port (interface).
+    """
+
+    @abstractmethod
+    async def get(self, sku: str) -> Product | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_all(self, *args: Any, per_page: int = 250, **kwargs: Any) -> AsyncIterator[Product]:
+        raise NotImplementedError
+
+    async def list_batch(self, *args: Any, **kwargs: Any) -> ProductBatch:
+        """Search products with every field in a compact batch, see AbstractProductRepository.list_batch."""
+        return ProductBatch(await self.list(*args, **kwargs))
+
+    async def iter_batches(self, *args: Any, per_page: int = 250, **kwargs: Any) -> AsyncIterator[ProductBatch]:
+        """Iterate over every product found by a search in batches, see AbstractProductRepository.iter_batches."""
+        page: int = 1
+        while True:
+            products_page: ProductsPage = await self.list_page(*args, page=page, per_page=per_page, **kwargs)
+            if products_page.products:
+                yield ProductBatch(products_page.products)
+            if not products_page.has_next or not products_page.products:
+                return
+            page += 1
+
+    async def facet_counts(self, *args: Any, **kwargs: Any) -> Facets:
+        """Facet counts of the products found by a search, see AbstractProductRepository.facet_counts."""
+        return (await self.list_page(*args, per_page=1, fields=FACET_COUNTS_FIELDS, facets=True, **kwargs)).facets
+
+    async def suggest(self, q: str, per_page: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, see AbstractProductRepository.suggest."""
+        products_page: ProductsPage = await self.list_page(
+            q=q,
+            per_page=per_page,
+            fields=('sku', 'title'),
+            **SUGGEST_SEARCH,
+        )
+        return Suggestions(
+            suggestions=[Suggestion(sku=product.sku, title=product.title) for product in products_page.products],
+            found=products_page.found,
+        )
+
+    def invalidate_cache(self) -> None:
+        """Invalidate products cached by the repository, to call when the catalog changes."""
+
+
+class TypesenseProductDocuments:
+    """Search parameters and product documents mapping shared by Typesense product repositories.
 
     Attributes:
-        _session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense client session factory.
+        _trusted (bool): True to build domain models without validation, for documents validated on ingest.
+        _document_to_product (Callable[[dict, Dimensions | None], Product]): mapper of product documents to Product
+            domain models.
+        _sku_cache (AbstractSearchCache, optional): hot cache of products by SKU.
+        _dimension_cache (DimensionCache, optional): cache of categories and manufacturers, joined if None.
+        _facet_dimension_cache (DimensionCache): dimensions rolling up facet counts without dimension cache.
+        _instrumentation (Instrumentation): timing of the mapping of documents to domain models.
+        _include_fields (str): typesense include fields of product documents with every field.
+        _projections (dict[tuple[str, ...], ProductProjection]): projections of searches by projected fields.
 
     """
+    # Alias of the current versioned products collection, swapped by schema migrations and reindexes
     COLLECTION_NAME: str = 'products'
+    SKUS_PER_SEARCH: int = 100
+    SEARCHES_PER_REQUEST: int = 50
+    MAX_PER_PAGE: int = 250
     INCLUDE_FIELDS: str = ('$product_models(*, $product_categories(*, $product_categories(*)),'
                            '$product_manufacturers(*))')
+    # Product models with their category and manufacturer IDs, to get them from the dimension cache
+    DIMENSIONS_INCLUDE_FIELDS: str = '$product_models(*)'
+    # Facets are counted by product model (the facet field of products) and rolled up to categories and
+    # manufacturers, so models beyond the max facet values are not counted
+    FACET_BY: str = 'product_model_id'
+    MAX_FACET_VALUES: int = 1000
 
-    def __init__(self, session_factory: Callable[..., AbstractContextManager[TypesenseClient]]) -> None:
-        self._session_factory: Callable[..., AbstractContextManager[TypesenseClient]] = session_factory
+    def __init__(
+            self,
+            trusted: bool = False,
+            sku_cache: AbstractSearchCache | None = None,
+            dimension_cache: DimensionCache | None = None,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            trusted (bool): True to build domain models without validation, for documents validated on ingest.
+            sku_cache (AbstractSearchCache, optional): hot cache of products by SKU, no cache if None.
+            dimension_cache (DimensionCache, optional): cache of categories and manufacturers, joined by every
+                search if None.
+            instrumentation (Instrumentation, optional): timing of the mapping to domain models, disabled if None.
+
+        """
+        self._trusted: bool = trusted
+        self._document_to_product: Callable[[dict, Dimensions | None], Product] = (
+            self._product_document_to_trusted_product if trusted else self._product_document_to_product
+        )
+        self._sku_cache: AbstractSearchCache | None = sku_cache
+        self._dimension_cache: DimensionCache | None = dimension_cache
+        # Dimensions rolling up facet counts without dimension cache, loaded by the first faceted search
+        self._facet_dimension_cache: DimensionCache = DimensionCache()
+        self._instrumentation: Instrumentation = instrumentation or Instrumentation()
+        self._include_fields: str = self.DIMENSIONS_INCLUDE_FIELDS if dimension_cache else self.INCLUDE_FIELDS
+        self._projections: dict[tuple[str, ...], ProductProjection] = {}
 
     @staticmethod
-    def _product_document_to_product(product_document: dict) -> Product:
+    def _product_document_to_product(product_document: dict, dimensions: Dimensions | None = None) -> Product:
         """Mapper a product document of typesense products collection to a Product domain model.
         Args:
             product_document (dict): product document of products collection of typesense.
+            dimensions (Dimensions, optional): cached category and manufacturer of models, None if they are joined.
 
         Returns:
             Product: product domain model.
 
         """
+        category: ProductCategory
+        manufacturer: ProductManufacturer
+        if dimensions is not None:
+            category, manufacturer = dimensions.references(product_document['product_models'])
+        else:
+            category = ProductCategory(
+                id_=product_document['product_models']['product_categories']['id'],
+                title=product_document['product_models']['product_categories']['title'],
+                subcategory=product_document['product_models']['product_categories']['subcategory'],
+                category_parent=ProductCategory(
+                    id_=product_document
+                    ['product_models']
+                    ['product_categories']
+                    ['product_categories']
+                    ['id'],
+                    title=product_document
+                    ['product_models']
+                    ['product_categories']
+                    ['product_categories']
+                    ['title'],
+                )
+            )
+            manufacturer = ProductManufacturer(
+                id_=product_document['product_models']['product_manufacturers']['id'],
+                title=product_document['product_models']['product_manufacturers']['title'],
+                image_url=product_document['product_models']['product_manufacturers']['image_url'],
+            )
+
         return Product(
             sku=product_document['sku'],
             title=product_document['title'],
@@ -74,36 +384,435 @@ class TypesenseProductRepository(AbstractProductRepository):
                 description=product_document['product_models']['description'],
                 image_url=product_document['product_models']['image_url'],
                 min_price=product_document['product_models']['min_price'],
-                category=ProductCategory(
-                    id_=product_document['product_models']['product_categories']['id'],
-                    title=product_document['product_models']['product_categories']['title'],
-                    subcategory=product_document['product_models']['product_categories']['subcategory'],
-                    category_parent=ProductCategory(
-                        id_=product_document
-                        ['product_models']
-                        ['product_categories']
-                        ['product_categories']
-                        ['id'],
-                        title=product_document
-                        ['product_models']
-                        ['product_categories']
-                        ['product_categories']
-                        ['title'],
-                    )
-                ),
-                manufacturer=ProductManufacturer(
-                    id_=product_document['product_models']['product_manufacturers']['id'],
-                    title=product_document['product_models']['product_manufacturers']['title'],
-                    image_url=product_document['product_models']['product_manufacturers']['image_url'],
-                ),
+                category=category,
+                manufacturer=manufacturer,
             ),
             stock=product_document['stock'],
             num_purchases=product_document['num_purchases'],
         )
 
+    @staticmethod
+    def _product_document_to_trusted_product(product_document: dict, dimensions: Dimensions | None = None) -> Product:
+        """Mapper a trusted product document to a Product domain model without pydantic validation.
+
+        Documents must have been validated on ingest: fields are set as they come from Typesense (image URLs are
+        kept as strings, ProductJsonEncoder encodes them without serializer warnings) except IDs, which are converted
+        to int.
+
+        Args:
+            product_document (dict): product document of products collection of typesense.
+            dimensions (Dimensions, optional): cached category and manufacturer of models, None if they are joined.
+
+        Returns:
+            Product: product domain model.
+
+        """
+        model_document: dict = product_document['product_models']
+        category: ProductCategory
+        manufacturer: ProductManufacturer
+        if dimensions is not None:
+            category, manufacturer = dimensions.references(model_document)
+        else:
+            category_document: dict = model_document['product_categories']
+            category_parent_document: dict = category_document['product_categories']
+            manufacturer_document: dict = model_document['product_manufacturers']
+            category = _construct(ProductCategory, dict(
+                id_=int(category_document['id']),
+                title=category_document['title'],
+                subcategory=category_document['subcategory'],
+                category_parent=_construct(ProductCategory, dict(
+                    id_=int(category_parent_document['id']),
+                    title=category_parent_document['title'],
+                    subcategory=False,
+                    category_parent=None,
+                )),
+            ))
+            manufacturer = _construct(ProductManufacturer, dict(
+                id_=int(manufacturer_document['id']),
+                title=manufacturer_document['title'],
+                image_url=manufacturer_document['image_url'],
+            ))
+
+        return _construct(Product, dict(
+            sku=product_document['sku'],
+            title=product_document['title'],
+            description=product_document['description'],
+            image_url=product_document['image_url'],
+            price=product_document['price'],
+            model=_construct(ProductModel, dict(
+                sku=model_document['sku'],
+                title=model_document['title'],
+                description=model_document['description'],
+                image_url=model_document['image_url'],
+                category=category,
+                manufacturer=manufacturer,
+                min_price=model_document['min_price'],
+            )),
+            stock=product_document['stock'],
+            num_purchases=product_document['num_purchases'],
+        ))
+
+    def invalidate_cache(self) -> None:
+        if self._sku_cache is not None:
+            self._sku_cache.clear()
+        if self._dimension_cache is not None:
+            self._dimension_cache.invalidate()
+        self._facet_dimension_cache.invalidate()
+
+    @staticmethod
+    def _cached_dimensions(
+            dimension_cache: DimensionCache,
+            product_documents: Iterable[dict],
+            model_ids: Iterable[str] = (),
+    ) -> Dimensions | None:
+        """Cached dimensions with every reference of product documents and product models, None if they must be
+        loaded."""
+        dimensions: Dimensions | None = dimension_cache.get()
+        if dimensions is not None and not (
+                all(
+                    dimensions.has_references(product_document['product_models'])
+                    for product_document in product_documents if 'product_models' in product_document
+                )
+                and all(model_id in dimensions.model_references for model_id in model_ids)
+        ):
+            # A category, manufacturer or model was added after the dimensions were loaded
+            dimension_cache.invalidate()
+            return None
+
+        return dimensions
+
+    @staticmethod
+    def _dimension_search(page: int, include_fields: str | None = None) -> dict:
+        """Search parameters of a page of every document of a dimension collection."""
+        search: dict = {'q': '*', 'per_page': TypesenseProductDocuments.MAX_PER_PAGE, 'page': page}
+        if include_fields is not None:
+            search['include_fields'] = include_fields
+        return search
+
+    def _facet_search(self, search: dict, facets: bool) -> dict:
+        """Search parameters with the facet counts of product models if facets are requested."""
+        if not facets:
+            return search
+
+        return {**search, 'facet_by': self.FACET_BY, 'max_facet_values': self.MAX_FACET_VALUES}
+
+    def _facet_model_counts(self, result: dict) -> list[tuple[str, int]]:
+        """ID of every product model counted by the facets of a search result, with its number of products."""
+        return [
+            (facet_count['value'], facet_count['count'])
+            for field_counts in result.get('facet_counts', []) if field_counts['field_name'] == self.FACET_BY
+            for facet_count in field_counts['counts']
+        ]
+
+    def _facet_model_ids(self, result: dict) -> list[str]:
+        return [model_id for model_id, _ in self._facet_model_counts(result)]
+
+    def _cached_product(self, sku: str) -> Product | None:
+        return self._sku_cache.get(sku) if self._sku_cache is not None else None
+
+    def _sku_hits_to_product(self, sku: str, products_hits: list[dict], dimensions: Dimensions | None) -> Product:
+        """Product of the hits of an exact SKU search, cached by SKU.
+
+        Raises:
+            ProductNotFoundError: if product with sku not exists
+            ProductMultipleFoundsError: if several products with that sku.
+
+        """
+        if len(products_hits) == 0:
+            raise ProductNotFoundError
+        elif len(products_hits) > 1:
+            raise ProductMultipleFoundsError
+
+        with self._instrumentation.span(MAPPING_STAGE):
+            product: Product = self._document_to_product(products_hits[0]['document'], dimensions)
+        if self._sku_cache is not None:
+            self._sku_cache.set(sku, product)
+
+        return product
+
+    def _cached_products_by_sku(self, skus: Iterable[str]) -> tuple[ProductsBySku, list[str]]:
+        """Products of SKUs in the SKU cache and the unique SKUs to search."""
+        products_by_sku: ProductsBySku = ProductsBySku()
+        skus_to_search: list[str] = []
+        for sku in dict.fromkeys(skus):
+            cached_product: Product | None = self._cached_product(sku)
+            if cached_product is not None:
+                products_by_sku.products[sku] = cached_product
+            else:
+                skus_to_search.append(sku)
+
+        return products_by_sku, skus_to_search
+
+    def _skus_chunks(self, skus: list[str]) -> list[list[str]]:
+        """Chunks of ``SKUS_PER_SEARCH`` SKUs, without SKUs with backticks (they can not be escaped in filters)."""
+        searchable_skus: list[str] = [sku for sku in skus if '`' not in sku]
+        return [
+            searchable_skus[index:index + self.SKUS_PER_SEARCH]
+            for index in range(0, len(searchable_skus), self.SKUS_PER_SEARCH)
+        ]
+
+    def _skus_search(self, skus: list[str], page: int = 1, per_page: int = MAX_PER_PAGE) -> dict:
+        """Search parameters of products matching exactly any SKU."""
+        return {
+            'q': '*',
+            'filter_by': f'sku:=[{",".join(f"`{sku}`" for sku in skus)}]',
+            'include_fields': self._include_fields,
+            'per_page': per_page,
+            'page': page,
+        }
+
+    def _skus_multi_search(self, skus: list[str]) -> dict:
+        """Multi search parameters of products matching exactly any SKU."""
+        return {'collection': self.COLLECTION_NAME, **self._skus_search(skus)}
+
+    def _ids_multi_search(self, skus: list[str]) -> dict:
+        """Multi search parameters of the document IDs of products matching exactly any SKU."""
+        return {**self._skus_multi_search(skus), 'include_fields': 'id,sku'}
+
+    def _update_documents(self, updates: Mapping[str, dict], ids_by_sku: dict[str, list[str]]) -> list[dict]:
+        """Documents of an import in update mode, with the ID and updated fields of every product of SKUs."""
+        return [{**updates[sku], 'id': id_} for sku, ids in ids_by_sku.items() for id_ in ids]
+
+    def _products_update(
+            self,
+            ids_by_sku: dict[str, list[str]],
+            import_results: list[dict],
+    ) -> ProductsUpdate:
+        """Updated, not found and failed SKUs of the results of an import in update mode, in documents order."""
+        products_update: ProductsUpdate = ProductsUpdate()
+        results: Iterator[dict] = iter(import_results)
+        for sku, ids in ids_by_sku.items():
+            if not ids:
+                products_update.not_found.append(sku)
+                continue
+
+            errors: list[str] = [
+                result.get('error', 'unknown error')
+                for result in (next(results) for _ in ids) if not result.get('success', False)
+            ]
+            if errors:
+                products_update.failed[sku] = errors[0]
+            else:
+                products_update.updated.append(sku)
+            # Products got before the update must not be served from the SKU cache
+            if self._sku_cache is not None:
+                self._sku_cache.delete(sku)
+
+        return products_update
+
+    def _add_products_by_sku(
+            self,
+            products_by_sku: ProductsBySku,
+            documents_by_sku: dict[str, list[dict]],
+            dimensions: Dimensions | None,
+    ) -> None:
+        """Add found, not found and duplicated SKUs of searched documents to a lookup result."""
+        with self._instrumentation.span(MAPPING_STAGE):
+            self._add_documents_by_sku(products_by_sku, documents_by_sku, dimensions)
+
+    def _add_documents_by_sku(
+            self,
+            products_by_sku: ProductsBySku,
+            documents_by_sku: dict[str, list[dict]],
+            dimensions: Dimensions | None,
+    ) -> None:
+        for sku, documents in documents_by_sku.items():
+            if not documents:
+                products_by_sku.not_found.append(sku)
+            elif len(documents) > 1:
+                products_by_sku.duplicated.append(sku)
+            else:
+                products_by_sku.products[sku] = self._document_to_product(documents[0], dimensions)
+                if self._sku_cache is not None:
+                    self._sku_cache.set(sku, products_by_sku.products[sku])
+
+    @staticmethod
+    def _add_sku_hits(documents_by_sku: dict[str, list[dict]], hits: list[dict]) -> None:
+        for hit in hits:
+            if hit['document']['sku'] in documents_by_sku:
+                documents_by_sku[hit['document']['sku']].append(hit['document'])
+
+    def _projection(self, fields: Iterable[str] | None) -> ProductProjection | None:
+        """Projection of projected fields, None to get every field."""
+        if fields is None:
+            return None
+
+        fields = tuple(fields)
+        if fields not in self._projections:
+            self._projections[fields] = ProductProjection(
+                fields,
+                trusted=self._trusted,
+                dimensions=self._dimension_cache is not None,
+            )
+        return self._projections[fields]
+
+    def _list_search(self, projection: ProductProjection | None = None, **kwargs: Any) -> dict:
+        """Search parameters of a products list search."""
+        # TODO: improve search parameters adn options (https://typesense.org/docs/27.1/api/search.html)
+        return {
+            **kwargs,
+            'include_fields': projection.include_fields if projection is not None else self._include_fields,
+        }
+
+    def _page_search(self, page: int, per_page: int, projection: ProductProjection | None, **kwargs: Any) -> dict:
+        """Search parameters of a page of a products list search, per page is limited to ``MAX_PER_PAGE``."""
+        return self._list_search(
+            projection,
+            **kwargs,
+            page=max(page, 1),
+            per_page=min(max(per_page, 1), self.MAX_PER_PAGE),
+        )
+
+    def _lazy_fields_loader(self) -> LazyFieldsLoader | None:
+        """Loader of the fields left out of projected products of a search, None if they can not be loaded."""
+        return None
+
+    def _hits_to_products(
+            self,
+            products_hits: list[dict],
+            projection: ProductProjection | None,
+            dimensions: Dimensions | None,
+    ) -> list[Product]:
+        """Products of search hits, with the projected fields only if there is a projection."""
+        with self._instrumentation.span(MAPPING_STAGE):
+            if projection is None:
+                return [
+                    self._document_to_product(product_hit['document'], dimensions) for product_hit in products_hits
+                ]
+
+            lazy_fields: LazyFieldsLoader | None = self._lazy_fields_loader()
+            return [
+                projection.product(product_hit['document'], lazy_fields, dimensions) for product_hit in products_hits
+            ]
+
+    def _hits_to_batch(self, products_hits: list[dict], dimensions: Dimensions | None) -> ProductBatch:
+        """Batch of the products of search hits with every field, mapped one at a time so the Product tree of a
+        single hit is alive at once."""
+        with self._instrumentation.span(MAPPING_STAGE):
+            return ProductBatch(
+                self._document_to_product(product_hit['document'], dimensions) for product_hit in products_hits
+            )
+
+    def _products_page(
+            self,
+            result: dict,
+            search: dict,
+            projection: ProductProjection | None,
+            dimensions: Dimensions | None,
+            facet_dimensions: Dimensions | None = None,
+    ) -> ProductsPage:
+        """Page of products of a search result, with its facets if dimensions of facets are given."""
+        return ProductsPage(
+            products=self._hits_to_products(result['hits'], projection, dimensions),
+            found=result['found'],
+            page=search['page'],
+            per_page=search['per_page'],
+            facets=self._facets(result, facet_dimensions) if facet_dimensions is not None else {},
+        )
+
+    def _facets(self, result: dict, dimensions: Dimensions) -> Facets:
+        """Facets of categories and manufacturers of a search result, rolled up from the counts of models."""
+        return model_facets(self._facet_model_counts(result), dimensions)
+
+    def _suggest_search(self, q: str, per_page: int) -> dict:
+        """Search parameters of suggestions, getting only the fields suggested and without highlights."""
+        return {
+            **SUGGEST_SEARCH,
+            'q': q,
+            'prefix': 'true',
+            'num_typos': 0,
+            'drop_tokens_threshold': 0,
+            'per_page': min(max(per_page, 1), self.MAX_PER_PAGE),
+            'include_fields': 'sku,title',
+            'enable_highlight_v1': 'false',
+        }
+
+    def _suggestions(self, result: dict) -> Suggestions:
+        """Suggestions of a search result, built without validation for documents validated on ingest."""
+        with self._instrumentation.span(MAPPING_STAGE):
+            if self._trusted:
+                return _construct(Suggestions, {
+                    'suggestions': [
+                        _construct(Suggestion, {'sku': hit['document']['sku'], 'title': hit['document']['title']})
+                        for hit in result['hits']
+                    ],
+                    'found': result['found'],
+                })
+
+            return Suggestions(
+                suggestions=[
+                    Suggestion(sku=hit['document']['sku'], title=hit['document']['title']) for hit in result['hits']
+                ],
+                found=result['found'],
+            )
+
+
+class TypesenseProductRepository(TypesenseProductDocuments, AbstractProductRepository):
+    """Typesense product repository class Adapter.
+
+    Attributes:
+        _session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense client session factory.
+
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[..., AbstractContextManager[TypesenseClient]],
+            trusted: bool = False,
+            sku_cache: AbstractSearchCache | None = None,
+            dimension_cache: DimensionCache | None = None,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense session factory.
+            trusted (bool): True to build domain models without validation, for documents validated on ingest.
+            sku_cache (AbstractSearchCache, optional): hot cache of products by SKU, no cache if None.
+            dimension_cache (DimensionCache, optional): cache of categories and manufacturers, joined if None.
+            instrumentation (Instrumentation, optional): timing of the mapping to domain models, disabled if None.
+
+        """
+        super().__init__(
+            trusted=trusted,
+            sku_cache=sku_cache,
+            dimension_cache=dimension_cache,
+            instrumentation=instrumentation,
+        )
+        self._session_factory: Callable[..., AbstractContextManager[TypesenseClient]] = session_factory
+
+    def is_healthy(self) -> bool:
+        """True if a Typesense node answers its health check, the first session also opens a pooled connection.
+
+        Nodes are checked once each, without the retries of the client (which sleep between them), so a check of a
+        Typesense still starting returns at once and the startup backoff paces the next one.
+        """
+        try:
+            with self._session_factory() as session:
+                nodes: list[Any] = [session.config.nearest_node, *session.config.nodes]
+                return any(
+                    session.api_call.session.get(
+                        f'{node.url()}/health',
+                        timeout=session.config.connection_timeout_seconds,
+                    ).json().get('ok') is True
+                    for node in nodes if node is not None
+                )
+        except Exception:
+            # Down, starting or unreachable, whatever the error
+            return False
+
+    def warm_up(self) -> None:
+        """Load the categories, manufacturers and models of the dimension cache, if any."""
+        if self._dimension_cache is not None:
+            with self._session_factory() as session:
+                self._load_dimensions(session, self._dimension_cache)
+
     def get(self, sku: str) -> Product | None:
         """Get product with sku from Typesense products collection.
 
+        The SKU is matched exactly with a ``filter_by`` search (no typo tolerance nor tokenized text match), served
+        from the SKU cache if the product was got recently.
+
         Args:
             sku (str): SKU of product to get.
 
@@ -115,37 +824,517 @@ class TypesenseProductRepository(AbstractProductRepository):
             ProductMultipleFoundsError: if several products with that sku.
 
         """
+        product: Product | None = self._cached_product(sku)
+        if product is not None:
+            return product
+
+        # Backticks can not be escaped in filter values, no product has them
+        if '`' in sku:
+            raise ProductNotFoundError
+
         with self._session_factory() as session:
-            products_hits: list[dict] = session.collections[self.COLLECTION_NAME].documents.search(dict(
-                q=sku,
-                query_by='sku',
-                include_fields=self.INCLUDE_FIELDS,
-            ))['hits']
+            products_hits: list[dict] = session.collections[self.COLLECTION_NAME].documents.search(
+                # A second hit is enough to know that the SKU is duplicated
+                self._skus_search([sku], per_page=2),
+            )['hits']
+            dimensions: Dimensions | None = self._dimensions(session, [hit['document'] for hit in products_hits])
+
+        return self._sku_hits_to_product(sku, products_hits, dimensions)
+
+    def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        """Get products of several SKUs from Typesense products collection in a few requests.
 
-            if len(products_hits) == 0:
-                raise ProductNotFoundError
-            elif len(products_hits) > 1:
-                raise ProductMultipleFoundsError
+        SKUs not in the SKU cache are matched exactly with ``filter_by`` searches of ``SKUS_PER_SEARCH`` SKUs, sent
+        together in multi search requests of ``SEARCHES_PER_REQUEST`` searches.
 
-            return self._product_document_to_product(product_document=products_hits[0]['document'])
+        Args:
+            skus (Iterable[str]): SKUs of products to get.
+
+        Returns:
+            ProductsBySku: products found by SKU, and SKUs not found or with several products.
+
+        """
+        products_by_sku, skus_to_search = self._cached_products_by_sku(skus)
+        documents_by_sku: dict[str, list[dict]] = {sku: [] for sku in skus_to_search}
+        skus_chunks: list[list[str]] = self._skus_chunks(skus_to_search)
+
+        with self._session_factory() as session:
+            for index in range(0, len(skus_chunks), self.SEARCHES_PER_REQUEST):
+                requests_chunks: list[list[str]] = skus_chunks[index:index + self.SEARCHES_PER_REQUEST]
+                results: list[dict] = session.multi_search.perform(
+                    {'searches': [self._skus_multi_search(skus_chunk) for skus_chunk in requests_chunks]},
+                    {},
+                )['results']
+
+                for skus_chunk, result in zip(requests_chunks, results):
+                    if 'error' in result:
+                        raise TypesenseClientError(result['error'])
+
+                    self._add_sku_hits(documents_by_sku, result['hits'])
+                    # More hits than a page means duplicated SKUs, get remaining pages of the chunk
+                    for page in range(2, -(-result['found'] // self.MAX_PER_PAGE) + 1):
+                        self._add_sku_hits(documents_by_sku, session.collections[self.COLLECTION_NAME].documents.search(
+                            self._skus_search(skus_chunk, page=page),
+                        )['hits'])
+
+            dimensions: Dimensions | None = self._dimensions(session, chain.from_iterable(documents_by_sku.values()))
+
+        self._add_products_by_sku(products_by_sku, documents_by_sku, dimensions)
+        return products_by_sku
+
+    def suggest(self, q: str, per_page: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, with a single search getting only the fields suggested.
+
+        Args:
+            q (str): query typed.
+            per_page (int): max number of products suggested (at most ``MAX_PER_PAGE``).
+
+        Returns:
+            Suggestions: products suggested, most purchased first, with the number of products matching the query.
+
+        """
+        with self._session_factory() as session:
+            result: dict = session.collections[self.COLLECTION_NAME].documents.search(self._suggest_search(q, per_page))
 
-    def list(self, *args: Any, **kwargs: Any) -> list[Product]:
+        return self._suggestions(result)
+
+    def update_many(self, updates: Mapping[str, dict]) -> ProductsUpdate:
+        """Update some fields of several products by SKU in a few requests.
+
+        Document IDs of SKUs are searched first, with searches of ``SKUS_PER_SEARCH`` SKUs sent together in multi
+        search requests of ``SEARCHES_PER_REQUEST`` searches, then every product is updated in a single bulk import
+        in update mode. Every product with a duplicated SKU is updated.
+
+        Args:
+            updates (Mapping[str, dict]): new value of updated fields by SKU.
+
+        Returns:
+            ProductsUpdate: SKUs of products updated, not found or failed.
+
+        """
+        ids_by_sku: dict[str, list[str]] = {sku: [] for sku in updates}
+        skus_chunks: list[list[str]] = self._skus_chunks(list(updates))
+        import_results: list[dict] = []
+        with self._session_factory() as session:
+            for index in range(0, len(skus_chunks), self.SEARCHES_PER_REQUEST):
+                results: list[dict] = session.multi_search.perform(
+                    {'searches': [
+                        self._ids_multi_search(skus_chunk)
+                        for skus_chunk in skus_chunks[index:index + self.SEARCHES_PER_REQUEST]
+                    ]},
+                    {},
+                )['results']
+                for result in results:
+                    if 'error' in result:
+                        raise TypesenseClientError(result['error'])
+                    for hit in result['hits']:
+                        ids_by_sku[hit['document']['sku']].append(hit['document']['id'])
+
+            update_documents: list[dict] = self._update_documents(updates, ids_by_sku)
+            if update_documents:
+                import_results = session.collections[self.COLLECTION_NAME].documents.import_(
+                    update_documents,
+                    {'action': 'update'},
+                )
+
+        return self._products_update(ids_by_sku, import_results)
+
+    def _dimensions(
+            self,
+            session: TypesenseClient,
+            product_documents: Iterable[dict],
+            model_ids: Iterable[str] = (),
+    ) -> Dimensions | None:
+        """Dimensions of product documents and product models, loaded if not cached, None without dimension cache."""
+        if self._dimension_cache is None:
+            return None
+
+        dimensions: Dimensions | None = self._cached_dimensions(self._dimension_cache, product_documents, model_ids)
+        if dimensions is None:
+            dimensions = self._load_dimensions(session, self._dimension_cache)
+
+        return dimensions
+
+    def _facet_dimensions(
+            self,
+            session: TypesenseClient,
+            dimensions: Dimensions | None,
+            model_ids: Iterable[str],
+    ) -> Dimensions:
+        """Dimensions of facets, the cached ones, or without dimension cache those loaded once by the repository for
+        facets (loaded again when a model counted is missing or they expire)."""
+        if dimensions is not None:
+            return dimensions
+
+        facet_dimensions: Dimensions | None = self._cached_dimensions(self._facet_dimension_cache, (), model_ids)
+        if facet_dimensions is None:
+            facet_dimensions = self._load_dimensions(session, self._facet_dimension_cache)
+        return facet_dimensions
+
+    def _load_dimensions(self, session: TypesenseClient, dimension_cache: DimensionCache) -> Dimensions:
+        version: int = dimension_cache.version
+        return dimension_cache.set(
+            self._collection_documents(session, DimensionCache.CATEGORIES_COLLECTION_NAME),
+            self._collection_documents(session, DimensionCache.MANUFACTURERS_COLLECTION_NAME),
+            version,
+            model_documents=self._collection_documents(
+                session,
+                DimensionCache.MODELS_COLLECTION_NAME,
+                DimensionCache.MODEL_REFERENCE_FIELDS,
+            ),
+        )
+
+    def _collection_documents(
+            self,
+            session: TypesenseClient,
+            collection_name: str,
+            include_fields: str | None = None,
+    ) -> list[dict]:
+        """Every document of a (small) collection, requesting ``MAX_PER_PAGE`` documents at once."""
+        documents: list[dict] = []
+        page: int = 1
+        while True:
+            result: dict = session.collections[collection_name].documents.search(
+                self._dimension_search(page, include_fields),
+            )
+            documents.extend(hit['document'] for hit in result['hits'])
+            if not result['hits'] or len(documents) >= result['found']:
+                return documents
+            page += 1
+
+    def _list_hits(self, projection: ProductProjection | None, **kwargs: Any) -> tuple[list[dict], Dimensions | None]:
+        """Hits of a products list search, with the cached dimensions they reference."""
+        with self._session_factory() as session:
+            products_hits: list[dict] = session.collections[self.COLLECTION_NAME].documents.search(
+                self._list_search(projection, **kwargs),
+            )['hits']
+            dimensions: Dimensions | None = self._dimensions(session, [hit['document'] for hit in products_hits])
+
+        return products_hits, dimensions
+
+    def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
         """Search in Typesense products collection and return products found list.
 
+        With projected fields only those fields are got from Typesense, the other fields are loaded when a product
+        field left out is accessed for the first time, for every product of the search in a single batched request.
+
         Args:
             *args: Variable length argument list.
+            fields (Iterable[str], optional): dotted paths of fields to get (see ProductProjection), all if None.
             **kwargs: Arbitary kwyword arguments with search parameters.
 
         Returns:
             list[Product]: list of Products found in products Typesense collection.
         """
+        projection: ProductProjection | None = self._projection(fields)
+        products_hits, dimensions = self._list_hits(projection, **kwargs)
+        return self._hits_to_products(products_hits, projection, dimensions)
+
+    def list_batch(self, *args: Any, **kwargs: Any) -> ProductBatch:
+        """Search products with every field in a compact batch, see list and AbstractProductRepository.list_batch.
+
+        Hits are mapped into the batch one at a time, so a single Product tree is built at once.
+        """
+        return self._hits_to_batch(*self._list_hits(None, **kwargs))
+
+    def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        """Search a page of products in Typesense products collection.
+
+        Facets of categories and manufacturers are counted by product model in the same search, and rolled up with
+        the references of models of the dimension cache (loaded by the search without dimension cache).
+
+        Args:
+            *args: Variable length argument list.
+            page (int): number of the page, starting at 1.
+            per_page (int): max number of products per page (at most ``MAX_PER_PAGE``).
+            fields (Iterable[str], optional): dotted paths of fields to get (see list), all if None.
+            facets (bool): True to count the products found by category and manufacturer.
+            **kwargs: Arbitary kwyword arguments with search parameters.
+
+        Returns:
+            ProductsPage: products of the page with the number of products found in every page, and the facets.
+
+        """
+        projection: ProductProjection | None = self._projection(fields)
+        search: dict = self._facet_search(self._page_search(page, per_page, projection, **kwargs), facets)
+        facet_dimensions: Dimensions | None = None
         with self._session_factory() as session:
-            # TODO: improve search parameters adn options (https://typesense.org/docs/27.1/api/search.html)
-            products_hits: list[dict] = session.collections['products'].documents.search({
-                **kwargs,
-                'include_fields': self.INCLUDE_FIELDS,
-            })['hits']
+            result: dict = session.collections[self.COLLECTION_NAME].documents.search(search)
+            model_ids: list[str] = self._facet_model_ids(result)
+            dimensions: Dimensions | None = self._dimensions(
+                session,
+                [hit['document'] for hit in result['hits']],
+                model_ids,
+            )
+            if facets:
+                facet_dimensions = self._facet_dimensions(session, dimensions, model_ids)
+
+        return self._products_page(result, search, projection, dimensions, facet_dimensions)
+
+    def _lazy_fields_loader(self) -> LazyFieldsLoader | None:
+        return LazyFieldsLoader(lambda skus: self.get_many(skus).products)
+
+    def iter_all(
+            self,
+            *args: Any,
+            per_page: int = TypesenseProductDocuments.MAX_PER_PAGE,
+            **kwargs: Any,
+    ) -> Iterator[Product]:
+        """Iterate over every product found by a search, requesting one page at once.
+
+        Only a page of products is kept in memory whatever the number of products found, and no typesense
+        connection is held while the products of a page are consumed.
+
+        Args:
+            *args: Variable length argument list.
+            per_page (int): products requested per page (at most ``MAX_PER_PAGE``).
+            **kwargs: Arbitary kwyword arguments with search parameters.
+
+        Yields:
+            Product: every product found.
+
+        """
+        page: int = 1
+        while True:
+            products_page: ProductsPage = self.list_page(*args, page=page, per_page=per_page, **kwargs)
+            yield from products_page.products
+            if not products_page.has_next or not products_page.products:
+                return
+            page += 1
+
+
+class AsyncTypesenseProductRepository(TypesenseProductDocuments, AsyncAbstractProductRepository):
+    """Asynchronous Typesense product repository class Adapter.
+
+    Attributes:
+        _session_factory (Callable[..., AbstractAsyncContextManager[AsyncTypesenseSession]]): async session factory.
+
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[..., AbstractAsyncContextManager[AsyncTypesenseSession]],
+            trusted: bool = False,
+            sku_cache: AbstractSearchCache | None = None,
+            dimension_cache: DimensionCache | None = None,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            session_factory (Callable[..., AbstractAsyncContextManager[AsyncTypesenseSession]]): session factory.
+            trusted (bool): True to build domain models without validation, for documents validated on ingest.
+            sku_cache (AbstractSearchCache, optional): hot cache of products by SKU, no cache if None.
+            dimension_cache (DimensionCache, optional): cache of categories and manufacturers, joined if None.
+            instrumentation (Instrumentation, optional): timing of the mapping to domain models, disabled if None.
+
+        """
+        super().__init__(
+            trusted=trusted,
+            sku_cache=sku_cache,
+            dimension_cache=dimension_cache,
+            instrumentation=instrumentation,
+        )
+        self._session_factory: Callable[..., AbstractAsyncContextManager[AsyncTypesenseSession]] = session_factory
+
+    async def get(self, sku: str) -> Product | None:
+        """Get product with sku from Typesense products collection, see TypesenseProductRepository.get."""
+        product: Product | None = self._cached_product(sku)
+        if product is not None:
+            return product
+
+        if '`' in sku:
+            raise ProductNotFoundError
+
+        async with self._session_factory() as session:
+            products_hits: list[dict] = (await session.search(
+                self.COLLECTION_NAME,
+                self._skus_search([sku], per_page=2),
+            ))['hits']
+            dimensions: Dimensions | None = await self._dimensions(
+                session,
+                [hit['document'] for hit in products_hits],
+            )
+
+        return self._sku_hits_to_product(sku, products_hits, dimensions)
+
+    async def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        """Get products of several SKUs, see TypesenseProductRepository.get_many."""
+        products_by_sku, skus_to_search = self._cached_products_by_sku(skus)
+        documents_by_sku: dict[str, list[dict]] = {sku: [] for sku in skus_to_search}
+        skus_chunks: list[list[str]] = self._skus_chunks(skus_to_search)
+
+        async with self._session_factory() as session:
+            for index in range(0, len(skus_chunks), self.SEARCHES_PER_REQUEST):
+                requests_chunks: list[list[str]] = skus_chunks[index:index + self.SEARCHES_PER_REQUEST]
+                results: list[dict] = (await session.multi_search(
+                    [self._skus_multi_search(skus_chunk) for skus_chunk in requests_chunks],
+                ))['results']
+
+                for skus_chunk, result in zip(requests_chunks, results):
+                    if 'error' in result:
+                        raise TypesenseClientError(result['error'])
+
+                    self._add_sku_hits(documents_by_sku, result['hits'])
+                    for page in range(2, -(-result['found'] // self.MAX_PER_PAGE) + 1):
+                        self._add_sku_hits(documents_by_sku, (await session.search(
+                            self.COLLECTION_NAME,
+                            self._skus_search(skus_chunk, page=page),
+                        ))['hits'])
+
+            dimensions: Dimensions | None = await self._dimensions(
+                session,
+                chain.from_iterable(documents_by_sku.values()),
+            )
+
+        self._add_products_by_sku(products_by_sku, documents_by_sku, dimensions)
+        return products_by_sku
+
+    async def suggest(self, q: str, per_page: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, see TypesenseProductRepository.suggest."""
+        async with self._session_factory() as session:
+            result: dict = await session.search(self.COLLECTION_NAME, self._suggest_search(q, per_page))
+
+        return self._suggestions(result)
+
+    async def _dimensions(
+            self,
+            session: AsyncTypesenseSession,
+            product_documents: Iterable[dict],
+            model_ids: Iterable[str] = (),
+    ) -> Dimensions | None:
+        """Dimensions of product documents and models, see TypesenseProductRepository._dimensions."""
+        if self._dimension_cache is None:
+            return None
+
+        dimensions: Dimensions | None = self._cached_dimensions(self._dimension_cache, product_documents, model_ids)
+        if dimensions is None:
+            dimensions = await self._load_dimensions(session, self._dimension_cache)
+
+        return dimensions
+
+    async def _facet_dimensions(
+            self,
+            session: AsyncTypesenseSession,
+            dimensions: Dimensions | None,
+            model_ids: Iterable[str],
+    ) -> Dimensions:
+        """Dimensions of facets, see TypesenseProductRepository._facet_dimensions."""
+        if dimensions is not None:
+            return dimensions
+
+        facet_dimensions: Dimensions | None = self._cached_dimensions(self._facet_dimension_cache, (), model_ids)
+        if facet_dimensions is None:
+            facet_dimensions = await self._load_dimensions(session, self._facet_dimension_cache)
+        return facet_dimensions
+
+    async def _load_dimensions(self, session: AsyncTypesenseSession, dimension_cache: DimensionCache) -> Dimensions:
+        version: int = dimension_cache.version
+        return dimension_cache.set(
+            await self._collection_documents(session, DimensionCache.CATEGORIES_COLLECTION_NAME),
+            await self._collection_documents(session, DimensionCache.MANUFACTURERS_COLLECTION_NAME),
+            version,
+            model_documents=await self._collection_documents(
+                session,
+                DimensionCache.MODELS_COLLECTION_NAME,
+                DimensionCache.MODEL_REFERENCE_FIELDS,
+            ),
+        )
+
+    async def _collection_documents(
+            self,
+            session: AsyncTypesenseSession,
+            collection_name: str,
+            include_fields: str | None = None,
+    ) -> list[dict]:
+        """Every document of a (small) collection, see TypesenseProductRepository._collection_documents."""
+        documents: list[dict] = []
+        page: int = 1
+        while True:
+            result: dict = await session.search(collection_name, self._dimension_search(page, include_fields))
+            documents.extend(hit['document'] for hit in result['hits'])
+            if not result['hits'] or len(documents) >= result['found']:
+                return documents
+            page += 1
+
+    async def _list_hits(
+            self,
+            projection: ProductProjection | None,
+            **kwargs: Any,
+    ) -> tuple[list[dict], Dimensions | None]:
+        """Hits of a products list search, see TypesenseProductRepository._list_hits."""
+        async with self._session_factory() as session:
+            products_hits: list[dict] = (await session.search(
+                self.COLLECTION_NAME,
+                self._list_search(projection, **kwargs),
+            ))['hits']
+            dimensions: Dimensions | None = await self._dimensions(
+                session,
+                [hit['document'] for hit in products_hits],
+            )
+
+        return products_hits, dimensions
+
+    async def list(self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any) -> list[Product]:
+        """Search in Typesense products collection, see TypesenseProductRepository.list.
+
+        Fields left out of the projection can not be loaded lazily without blocking the event loop: accessing them
+        raises an AttributeError.
+        """
+        projection: ProductProjection | None = self._projection(fields)
+        products_hits, dimensions = await self._list_hits(projection, **kwargs)
+        return self._hits_to_products(products_hits, projection, dimensions)
+
+    async def list_batch(self, *args: Any, **kwargs: Any) -> ProductBatch:
+        """Search products with every field in a compact batch, see TypesenseProductRepository.list_batch."""
+        return self._hits_to_batch(*(await self._list_hits(None, **kwargs)))
+
+    async def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            fields: Iterable[str] | None = None,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        """Search a page of products, see TypesenseProductRepository.list_page and list."""
+        projection: ProductProjection | None = self._projection(fields)
+        search: dict = self._facet_search(self._page_search(page, per_page, projection, **kwargs), facets)
+        facet_dimensions: Dimensions | None = None
+        async with self._session_factory() as session:
+            result: dict = await session.search(self.COLLECTION_NAME, search)
+            model_ids: list[str] = self._facet_model_ids(result)
+            dimensions: Dimensions | None = await self._dimensions(
+                session,
+                [hit['document'] for hit in result['hits']],
+                model_ids,
+            )
+            if facets:
+                facet_dimensions = await self._facet_dimensions(session, dimensions, model_ids)
 
-            products_documents: list[dict] = [field['document'] for field in products_hits]
+        return self._products_page(result, search, projection, dimensions, facet_dimensions)
 
-            return [self._product_document_to_product(product_document) for product_document in products_documents]
+    async def iter_all(
+            self,
+            *args: Any,
+            per_page: int = TypesenseProductDocuments.MAX_PER_PAGE,
+            **kwargs: Any,
+    ) -> AsyncIterator[Product]:
+        """Iterate over every product found by a search, see TypesenseProductRepository.iter_all."""
+        page: int = 1
+        while True:
+            products_page: ProductsPage = await self.list_page(*args, page=page, per_page=per_page, **kwargs)
+            for product in products_page.products:
+                yield product
+            if not products_page.has_next or not products_page.products:
+                return
+            page += 1
@@ -0,0 +1,248 @@
+"""Search cache module.
+
+This module define a layer of abstraction around the cache of search results.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+# Django cache backends kept in the memory of every process, which other processes (e.g. commands) do not reach
+LOCAL_DJANGO_CACHE_BACKENDS: tuple[str, ...] = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@dataclass(frozen=True)
+class SearchCacheStats:
+    """Snapshot of the search cache counters.
+
+    Attributes:
+        hits (int): lookups answered by the cache.
+        misses (int): lookups not found (or expired) in the cache.
+        evictions (int): entries removed because the cache was full.
+        expirations (int): entries removed because their TTL was expired.
+        size (int): entries in the cache (-1 if the backend can not count them).
+    """
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+
+
+def shared_django_cache(alias: str) -> bool:
+    """True if a Django cache is shared by processes (e.g. Redis or Memcached), False if it is kept in process."""
+    # Django is imported lazily so store_catalog does not depend on it unless a Django backend is selected
+    from django.core.cache import caches
+
+    backend: type = type(caches[alias])
+    return f'{backend.__module__}.{backend.__qualname__}' not in LOCAL_DJANGO_CACHE_BACKENDS
+
+
+def search_cache_key(*args: Any, **kwargs: Any) -> str:
+    """Build a cache key from search parameters, normalized so equivalent searches share the entry.
+
+    Typesense searches are case insensitive and ignore extra whitespaces, so the text query is normalized too.
+
+    Args:
+        *args: search positional arguments.
+        **kwargs: search key-word arguments.
+
+    Returns:
+        str: cache key.
+
+    """
+    if isinstance(kwargs.get('q'), str):
+        kwargs['q'] = ' '.join(kwargs['q'].lower().split()) or '*'
+
+    return json.dumps([args, kwargs], sort_keys=True, default=str, separators=(',', ':'))
+
+
+class AbstractSearchCache(ABC):
+    """Abstract search cache class Port (interface).
+    """
+
+    @property
+    def shared(self) -> bool:
+        """bool: True if entries are shared by processes, so a clear reaches every worker."""
+        return False
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def stats(self) -> SearchCacheStats:
+        raise NotImplementedError
+
+
+class LRUSearchCache(AbstractSearchCache):
+    """In-process search cache Adapter, with LRU eviction bounded by size and TTL expiration.
+
+    Attributes:
+        _max_size (int): max number of entries.
+        _ttl_seconds (float): seconds an entry is valid.
+        _entries (OrderedDict[str, tuple[float, Any]]): expiration time and value by key, least recent first.
+
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60) -> None:
+        """Constructor.
+
+        Args:
+            max_size (int): max number of entries.
+            ttl_seconds (float): seconds an entry is valid.
+
+        """
+        self._max_size: int = max_size
+        self._ttl_seconds: float = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._expirations: int = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry: tuple[float, Any] | None = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        with self._lock:
+            return SearchCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+            )
+
+
+class DjangoSearchCache(AbstractSearchCache):
+    """Search cache Adapter over a Django cache backend, shared by every worker using the same backend.
+
+    Keys are prefixed with a generation number stored in the backend, so clearing the cache is a single
+    increment that makes every previous entry unreachable (they expire by TTL). The generation is read again
+    from the backend at most once per ``GENERATION_REFRESH_SECONDS`` to save a round trip per lookup.
+
+    Attributes:
+        _alias (str): Django cache alias.
+        _ttl_seconds (float): seconds an entry is valid.
+
+    """
+    GENERATION_KEY: str = 'store_catalog:search:generation'
+    GENERATION_REFRESH_SECONDS: float = 1.0
+
+    def __init__(self, alias: str = 'default', ttl_seconds: float = 60) -> None:
+        """Constructor.
+
+        Args:
+            alias (str): Django cache alias.
+            ttl_seconds (float): seconds an entry is valid.
+
+        """
+        self._alias: str = alias
+        self._ttl_seconds: float = ttl_seconds
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._generation: int = 0
+        self._generation_expires_at: float = 0.0
+
+    @property
+    def _cache(self) -> Any:
+        # Django is imported lazily so store_catalog does not depend on it unless this backend is selected
+        from django.core.cache import caches
+
+        return caches[self._alias]
+
+    def _key(self, key: str) -> str:
+        if self._generation_expires_at < time.monotonic():
+            self._generation = self._cache.get_or_set(self.GENERATION_KEY, 0, timeout=None)
+            self._generation_expires_at = time.monotonic() + self.GENERATION_REFRESH_SECONDS
+
+        return f'store_catalog:search:{self._generation}:{hashlib.sha1(key.encode()).hexdigest()}'
+
+    @property
+    def shared(self) -> bool:
+        return shared_django_cache(self._alias)
+
+    def get(self, key: str) -> Any | None:
+        value: Any | None = self._cache.get(self._key(key))
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._cache.set(self._key(key), value, timeout=self._ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(self._key(key))
+
+    def clear(self) -> None:
+        try:
+            self._generation = self._cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            self._generation = 1
+            self._cache.set(self.GENERATION_KEY, self._generation, timeout=None)
+        self._generation_expires_at = time.monotonic() + self.GENERATION_REFRESH_SECONDS
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        with self._lock:
+            return SearchCacheStats(hits=self._hits, misses=self._misses, evictions=0, expirations=0, size=-1)
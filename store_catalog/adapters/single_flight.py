@@ -0,0 +1,187 @@
+"""Single flight module.
+
+This module define the coalescing of identical concurrent searches: the first caller of a key (the leader) searches
+while the callers of the same key arriving before it finishes (the followers) wait for its result, so a popular
+search whose cache entry expired reaches Typesense once instead of once per concurrent request.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from typing import TypeVar
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Snapshot of the single flight counters.
+
+    Attributes:
+        leaders (int): calls made for their key.
+        coalesced (int): calls answered by the result (or error) of the leader of their key.
+        timeouts (int): calls made by followers after waiting ``timeout_seconds`` for their leader.
+        in_flight (int): keys being called.
+    """
+    leaders: int
+    coalesced: int
+    timeouts: int
+    in_flight: int
+
+
+class _Call:
+    """Call of a leader, waited by its followers."""
+
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalescing of identical concurrent calls by key, for threads and for asynchronous tasks.
+
+    Followers share the result of the leader, or get its error. A follower waiting longer than ``timeout_seconds``
+    (e.g. the leader is stuck on a slow node) stops waiting and calls by itself, and the asynchronous followers of a
+    cancelled leader choose a new one. Threads and tasks never coalesce with each other, and tasks coalesce with tasks
+    of the same event loop only.
+
+    Attributes:
+        _timeout_seconds (float): seconds a follower waits for the leader before calling by itself.
+        _calls (dict[str, _Call]): calls of threads in flight by key.
+        _async_calls (dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future]): calls of tasks in flight by event
+            loop and key.
+
+    """
+
+    def __init__(self, timeout_seconds: float = 5.0) -> None:
+        """Constructor.
+
+        Args:
+            timeout_seconds (float): seconds a follower waits for the leader before calling by itself.
+
+        """
+        self._timeout_seconds: float = timeout_seconds
+        self._calls: dict[str, _Call] = {}
+        self._async_calls: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._leaders: int = 0
+        self._coalesced: int = 0
+        self._timeouts: int = 0
+
+    def do(self, key: str, call: Callable[[], T]) -> T:
+        """Call once for the identical calls of concurrent threads.
+
+        Args:
+            key (str): key of the call, e.g. its normalized search parameters.
+            call (Callable[[], T]): call made by the leader.
+
+        Returns:
+            T: result of the call, made by this thread or shared by the leader.
+
+        Raises:
+            BaseException: error raised by the call, by this thread or by the leader.
+
+        """
+        with self._lock:
+            leader_call: _Call | None = self._calls.get(key)
+            if leader_call is None:
+                self._calls[key] = own_call = _Call()
+                self._leaders += 1
+
+        if leader_call is None:
+            return self._lead(key, own_call, call)
+
+        if not leader_call.done.wait(self._timeout_seconds):
+            with self._lock:
+                self._timeouts += 1
+            return call()
+
+        self._count_coalesced()
+        if leader_call.error is not None:
+            raise leader_call.error
+        return leader_call.result
+
+    async def do_async(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Call once for the identical calls of concurrent tasks of the running event loop, see do.
+
+        Args:
+            key (str): key of the call, e.g. its normalized search parameters.
+            call (Callable[[], Awaitable[T]]): asynchronous call made by the leader.
+
+        Returns:
+            T: result of the call, made by this task or shared by the leader.
+
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future: asyncio.Future | None = self._async_calls.get((loop, key))
+        if future is None:
+            return await self._lead_async(loop, key, call)
+
+        try:
+            result: T = await asyncio.wait_for(asyncio.shield(future), self._timeout_seconds)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            return await call()
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The leader was cancelled (e.g. its client disconnected), not this follower, so a new one is chosen
+            return await self.do_async(key, call)
+        except Exception:
+            self._count_coalesced()
+            raise
+
+        self._count_coalesced()
+        return result
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                leaders=self._leaders,
+                coalesced=self._coalesced,
+                timeouts=self._timeouts,
+                in_flight=len(self._calls) + len(self._async_calls),
+            )
+
+    def _count_coalesced(self) -> None:
+        with self._lock:
+            self._coalesced += 1
+
+    def _lead(self, key: str, own_call: _Call, call: Callable[[], T]) -> T:
+        try:
+            own_call.result = call()
+            return own_call.result
+        except BaseException as error:
+            own_call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            own_call.done.set()
+
+    async def _lead_async(self, loop: asyncio.AbstractEventLoop, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        future: asyncio.Future = loop.create_future()
+        self._async_calls[(loop, key)] = future
+        with self._lock:
+            self._leaders += 1
+        try:
+            result: T = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Retrieved, so it is not logged as never retrieved if there are no followers
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[(loop, key)]
@@ -0,0 +1,157 @@
+"""Stale cache module.
+
+This module define an in-process store of the last good result of searches, served stale while they are searched
+again in the background once their cached result expired, and served when a search fails (e.g. Typesense is down or
+the circuit breaker is open), so an incident of the search engine does not reach the users of popular searches.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class StaleEntry:
+    """Last good result of a search.
+
+    Attributes:
+        value (Any): result of the search.
+        age_seconds (float): seconds since the search.
+        revalidate (bool): True if the result is served while searched again in the background, False if it is
+            served only when the search fails (too old, or searched before the catalog changed).
+    """
+    value: Any
+    age_seconds: float
+    revalidate: bool
+
+
+class StaleSearchCache:
+    """In-process store of the last good result by search, with LRU eviction bounded by size.
+
+    A result is served while revalidated for ``revalidate_seconds`` after its search, and only if a search fails for
+    ``if_error_seconds``. Clearing the store (the catalog changed) keeps results for errors only, so a result is
+    never served stale while a search would answer a newer catalog.
+
+    Attributes:
+        _max_size (int): max number of entries.
+        _revalidate_seconds (float): seconds a result is served while searched again in the background.
+        _if_error_seconds (float): seconds a result is served if a search fails.
+        _entries (OrderedDict[str, tuple[float, int, Any]]): search time, version and result by key, least recent
+            first.
+        _refreshing (set[str]): keys being searched again in the background.
+        _version (int): version of results, increased when they are cleared.
+        _executor (ThreadPoolExecutor): executor of background searches of synchronous searchers.
+        _tasks (set[asyncio.Task]): background searches of asynchronous searchers.
+
+    """
+
+    def __init__(self, max_size: int = 10000, revalidate_seconds: float = 300, if_error_seconds: float = 3600) -> None:
+        """Constructor.
+
+        Args:
+            max_size (int): max number of entries.
+            revalidate_seconds (float): seconds a result is served while searched again in the background.
+            if_error_seconds (float): seconds a result is served if a search fails.
+
+        """
+        self._max_size: int = max_size
+        self._revalidate_seconds: float = revalidate_seconds
+        self._if_error_seconds: float = max(if_error_seconds, revalidate_seconds)
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._version: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='stale-refresh')
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def version(self) -> int:
+        """int: version of results, to give to ``set`` when their search starts."""
+        return self._version
+
+    def get(self, key: str) -> StaleEntry | None:
+        """Last good result of a search, None if there is none younger than ``if_error_seconds``."""
+        with self._lock:
+            entry: tuple[float, int, Any] | None = self._entries.get(key)
+            if entry is None:
+                return None
+
+            age_seconds: float = time.monotonic() - entry[0]
+            if age_seconds > self._if_error_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return StaleEntry(
+                value=entry[2],
+                age_seconds=age_seconds,
+                revalidate=age_seconds <= self._revalidate_seconds and entry[1] == self._version,
+            )
+
+    def set(self, key: str, value: Any, version: int) -> None:
+        """Store the result of a search, unless results were cleared while it was searched and one is stored."""
+        with self._lock:
+            if version != self._version and key in self._entries:
+                return
+
+            self._entries[key] = (time.monotonic(), version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: str, search: Callable[[], Any]) -> None:
+        """Search again in a background thread, unless the search is being refreshed.
+
+        Args:
+            key (str): key of the search.
+            search (Callable[[], Any]): search storing its result.
+
+        """
+        if self._claim_refresh(key):
+            self._executor.submit(self._refresh, key, search)
+
+    def refresh_async(self, key: str, search: Callable[[], Awaitable[Any]]) -> None:
+        """Search again in a background task of the running event loop, see refresh."""
+        if self._claim_refresh(key):
+            task: asyncio.Task = asyncio.get_running_loop().create_task(self._refresh_async(key, search))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def clear(self) -> None:
+        """Keep results to serve them only if a search fails, to call when the catalog changes."""
+        with self._lock:
+            self._version += 1
+            self._refreshing.clear()
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: str, search: Callable[[], Any]) -> None:
+        try:
+            search()
+        except Exception:
+            # The stale result is served until it is too old, then the search fails
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(self, key: str, search: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await search()
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
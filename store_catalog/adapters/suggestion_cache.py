@@ -0,0 +1,183 @@
+"""Suggestion cache module.
+
+This module define an in-process cache of the suggestions of queries being typed, keyed by query prefix, so the
+suggestions of a query are filtered locally from the complete suggestions of a query it extends (``hon`` for
+``hone``) instead of searched on every keystroke.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from store_catalog.adapters.in_memory_repository import normalize
+from store_catalog.adapters.in_memory_repository import sku_key
+from store_catalog.adapters.in_memory_repository import tokenize
+from store_catalog.domain.model import Suggestion
+from store_catalog.domain.model import Suggestions
+
+
+def suggestion_cache_key(q: str) -> str:
+    """Query typed normalized as Typesense matches it (case, accents and whitespaces ignored)."""
+    return ' '.join(normalize(q).split())
+
+
+@dataclass(frozen=True)
+class SuggestionCacheStats:
+    """Snapshot of the suggestion cache counters.
+
+    Attributes:
+        hits (int): lookups answered by the suggestions of the query.
+        prefix_hits (int): lookups answered by filtering the complete suggestions of a prefix of the query.
+        misses (int): lookups to search.
+        size (int): entries in the cache.
+    """
+    hits: int
+    prefix_hits: int
+    misses: int
+    size: int
+
+
+@dataclass(frozen=True)
+class _Candidate:
+    suggestion: Suggestion
+    title_tokens: tuple[str, ...]
+    sku_key: str
+
+    def matches(self, tokens: list[str], query_sku_key: str) -> bool:
+        """True if the title has every token (the last one as a prefix) or the SKU starts with the query."""
+        if query_sku_key and self.sku_key.startswith(query_sku_key):
+            return True
+
+        return bool(tokens) and all(token in self.title_tokens for token in tokens[:-1]) and any(
+            title_token.startswith(tokens[-1]) for title_token in self.title_tokens
+        )
+
+
+@dataclass(frozen=True)
+class _Entry:
+    expires_at: float
+    candidates: tuple[_Candidate, ...]
+    found: int
+
+    @property
+    def complete(self) -> bool:
+        """True if every product matching the query is a candidate, so queries extending it are answered locally."""
+        return self.found <= len(self.candidates)
+
+    def suggestions(self, limit: int) -> Suggestions:
+        return Suggestions(
+            suggestions=[candidate.suggestion for candidate in self.candidates[:limit]],
+            found=self.found,
+        )
+
+
+class SuggestionCache:
+    """In-process cache of suggestions by query, with LRU eviction bounded by size and TTL expiration.
+
+    Suggestions are searched with ``depth`` candidates, more than the suggestions shown. Once the candidates of a
+    query are every product matching it (complete), a query extending it matches a subset of them in the same order
+    (the last token is matched as a prefix without typos, and products are sorted by purchases), so its suggestions
+    are filtered locally from the candidates of the longest cached prefix, without a search.
+
+    Attributes:
+        depth (int): candidates got by a suggestions search.
+        _max_size (int): max number of entries.
+        _ttl_seconds (float): seconds an entry is valid, entries filtered from a prefix expire with it.
+        _entries (OrderedDict[str, _Entry]): candidates by normalized query, least recent first.
+
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300, depth: int = 50) -> None:
+        """Constructor.
+
+        Args:
+            max_size (int): max number of entries.
+            ttl_seconds (float): seconds an entry is valid.
+            depth (int): candidates got by a suggestions search.
+
+        """
+        self.depth: int = depth
+        self._max_size: int = max_size
+        self._ttl_seconds: float = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._prefix_hits: int = 0
+        self._misses: int = 0
+
+    def get(self, q: str, limit: int) -> Suggestions | None:
+        """Cached suggestions of a query, or filtered from the complete suggestions of a prefix, None if missing.
+
+        Args:
+            q (str): query typed.
+            limit (int): max number of products suggested.
+
+        Returns:
+            Suggestions | None: at most ``limit`` products suggested, None if they must be searched.
+
+        """
+        key: str = suggestion_cache_key(q)
+        with self._lock:
+            entry: _Entry | None = self._entry(key)
+            if entry is not None and (entry.complete or len(entry.candidates) >= limit):
+                self._hits += 1
+                return entry.suggestions(limit)
+
+            for length in range(len(key) - 1, 0, -1):
+                prefix_entry: _Entry | None = self._entry(key[:length])
+                if prefix_entry is not None and prefix_entry.complete:
+                    self._prefix_hits += 1
+                    tokens: list[str] = tokenize(key)
+                    query_sku_key: str = sku_key(key)
+                    candidates: tuple[_Candidate, ...] = tuple(
+                        candidate for candidate in prefix_entry.candidates if candidate.matches(tokens, query_sku_key)
+                    )
+                    entry = self._add(key, _Entry(prefix_entry.expires_at, candidates, len(candidates)))
+                    return entry.suggestions(limit)
+
+            self._misses += 1
+            return None
+
+    def set(self, q: str, suggestions: Suggestions) -> None:
+        """Cache the suggestions of a query, searched with ``depth`` candidates."""
+        candidates: tuple[_Candidate, ...] = tuple(
+            _Candidate(suggestion, tuple(tokenize(suggestion.title)), sku_key(suggestion.sku))
+            for suggestion in suggestions.suggestions
+        )
+        entry: _Entry = _Entry(time.monotonic() + self._ttl_seconds, candidates, suggestions.found)
+        with self._lock:
+            self._add(suggestion_cache_key(q), entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> SuggestionCacheStats:
+        with self._lock:
+            return SuggestionCacheStats(
+                hits=self._hits,
+                prefix_hits=self._prefix_hits,
+                misses=self._misses,
+                size=len(self._entries),
+            )
+
+    def _entry(self, key: str) -> _Entry | None:
+        entry: _Entry | None = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _add(self, key: str, entry: _Entry) -> _Entry:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return entry
@@ -0,0 +1,413 @@
+"""Typesense cluster routing module.
+
+This module define the health-aware node routing of a multi-node Typesense cluster used by typesense clients.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from urllib.parse import ParseResult
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.exceptions import RequestException
+from typesense import Client as TypesenseClient  # type: ignore
+from typesense.api_call import ApiCall  # type: ignore
+from typesense.configuration import Node  # type: ignore
+from typesense.exceptions import HTTPStatus0Error  # type: ignore
+from typesense.exceptions import ServerError
+from typesense.exceptions import ServiceUnavailable
+
+from store_catalog.adapters.instrumentation import DECODE_STAGE
+from store_catalog.adapters.instrumentation import TYPESENSE_STAGE
+from store_catalog.adapters.instrumentation import Instrumentation
+
+# Errors that mean a node is unhealthy, the request can be served by another node
+NODE_ERRORS: tuple[type[Exception], ...] = (RequestException, HTTPStatus0Error, ServerError, ServiceUnavailable)
+
+
+def node_config(url: str) -> dict:
+    """Typesense node config of a node URL (typesense client 0.21 fails parsing URL strings).
+
+    Args:
+        url (str): node URL, e.g. ``http://typesense-1:8108``.
+
+    Returns:
+        dict: node config with host, port, path and protocol.
+
+    """
+    parsed_url: ParseResult = urlparse(url.strip())
+    return dict(host=parsed_url.hostname, port=parsed_url.port, path=parsed_url.path, protocol=parsed_url.scheme)
+
+
+@dataclass(frozen=True)
+class NodeStats:
+    """Snapshot of the counters of a Typesense node.
+
+    Attributes:
+        url (str): node URL.
+        healthy (bool): True if last request to node succeeded else False.
+        requests (int): requests sent to node (hedged ones included).
+        failures (int): requests to node failed by connection or server errors.
+        hedged_requests (int): hedged requests sent to node because another one was too slow.
+        hedge_wins (int): hedged requests of node answered before the original one.
+        latency_ewma_ms (float): exponentially weighted moving average of node latency.
+        latency_p95_ms (float): p95 latency of node recent requests.
+    """
+    url: str
+    healthy: bool
+    requests: int
+    failures: int
+    hedged_requests: int
+    hedge_wins: int
+    latency_ewma_ms: float
+    latency_p95_ms: float
+
+
+@dataclass
+class _NodeState:
+    healthy: bool = True
+    last_access_ts: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    hedged_requests: int = 0
+    hedge_wins: int = 0
+    latency_ewma_ms: float = 0.0
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=NodeRouter.LATENCY_WINDOW))
+
+    @property
+    def latency_p95_ms(self) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        latencies_ms: list[float] = sorted(self.latencies_ms)
+        return latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))]
+
+
+class NodeRouter:
+    """Health and latency aware router of Typesense nodes shared by all clients of a database.
+
+    The nearest node is used while it is healthy, otherwise the healthy node with the lowest latency moving
+    average is selected. Unhealthy nodes are probed again once their health check interval is expired.
+
+    Attributes:
+        _healthcheck_interval_seconds (float): seconds before an unhealthy node is retried.
+        _hedge_reads (bool): True to send a hedged search to another node when the first one is too slow.
+        _hedge_min_delay_ms (float): min delay before hedging, used too while node has no latency samples.
+        _executor (ThreadPoolExecutor): executor of hedged searches.
+
+    """
+    LATENCY_WINDOW: int = 256
+    LATENCY_EWMA_ALPHA: float = 0.2
+
+    def __init__(
+            self,
+            healthcheck_interval_seconds: float = 60,
+            hedge_reads: bool = False,
+            hedge_min_delay_ms: float = 50.0,
+            max_workers: int = 10,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            healthcheck_interval_seconds (float): seconds before an unhealthy node is retried.
+            hedge_reads (bool): True to send hedged searches.
+            hedge_min_delay_ms (float): min delay before hedging a search.
+            max_workers (int): max number of concurrent searches when hedging.
+
+        """
+        self._healthcheck_interval_seconds: float = healthcheck_interval_seconds
+        self._hedge_reads: bool = hedge_reads
+        self._hedge_min_delay_ms: float = hedge_min_delay_ms
+        self._executor: ThreadPoolExecutor | None = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='typesense-hedge') if hedge_reads else None
+        )
+        self._lock: threading.Lock = threading.Lock()
+        self._nodes: dict[str, _NodeState] = {}
+
+    @property
+    def hedge_reads(self) -> bool:
+        return self._hedge_reads
+
+    def _state(self, node: Node) -> _NodeState:
+        return self._nodes.setdefault(node.url(), _NodeState())
+
+    def _available(self, node_state: _NodeState) -> bool:
+        return node_state.healthy or time.time() - node_state.last_access_ts > self._healthcheck_interval_seconds
+
+    def select(self, nodes: list[Node], nearest_node: Node | None = None, exclude: Node | None = None) -> Node:
+        """Select the node to send a request.
+
+        Args:
+            nodes (list[Node]): cluster nodes.
+            nearest_node (Node, optional): node preferred while it is healthy.
+            exclude (Node, optional): node to avoid, if there are others, e.g. the slow one when hedging.
+
+        Returns:
+            Node: the nearest node if healthy, else the fastest healthy one (any if no one is healthy).
+
+        """
+        excluded_url: str | None = exclude.url() if exclude is not None else None
+        with self._lock:
+            if nearest_node is not None and nearest_node.url() != excluded_url \
+                    and self._available(self._state(nearest_node)):
+                return nearest_node
+
+            candidates: list[Node] = [node for node in nodes if node.url() != excluded_url] or nodes
+            available: list[Node] = [node for node in candidates if self._available(self._state(node))]
+
+            return min(
+                available or candidates,
+                key=lambda node: (not self._state(node).healthy, self._state(node).latency_ewma_ms),
+            )
+
+    def record_success(self, node: Node, elapsed_seconds: float) -> None:
+        elapsed_ms: float = elapsed_seconds * 1000
+        with self._lock:
+            node_state: _NodeState = self._state(node)
+            node_state.healthy = True
+            node_state.last_access_ts = time.time()
+            node_state.requests += 1
+            node_state.latencies_ms.append(elapsed_ms)
+            node_state.latency_ewma_ms = (
+                elapsed_ms if node_state.latency_ewma_ms == 0.0
+                else self.LATENCY_EWMA_ALPHA * elapsed_ms + (1 - self.LATENCY_EWMA_ALPHA) * node_state.latency_ewma_ms
+            )
+
+    def record_failure(self, node: Node) -> None:
+        with self._lock:
+            node_state: _NodeState = self._state(node)
+            node_state.healthy = False
+            node_state.last_access_ts = time.time()
+            node_state.requests += 1
+            node_state.failures += 1
+
+    def record_hedge(self, node: Node, won: bool = False) -> None:
+        with self._lock:
+            if won:
+                self._state(node).hedge_wins += 1
+            else:
+                self._state(node).hedged_requests += 1
+
+    def hedge_delay_seconds(self, node: Node) -> float:
+        """Delay before hedging a search sent to node: its p95 latency, at least the min hedge delay."""
+        with self._lock:
+            return max(self._state(node).latency_p95_ms, self._hedge_min_delay_ms) / 1000
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        assert self._executor is not None, 'Hedged reads are disabled'
+        # Hedged searches are timed in the request context of the caller
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    @property
+    def stats(self) -> list[NodeStats]:
+        """list[NodeStats]: current counters of every node seen by the router."""
+        with self._lock:
+            return [
+                NodeStats(
+                    url=url,
+                    healthy=node_state.healthy,
+                    requests=node_state.requests,
+                    failures=node_state.failures,
+                    hedged_requests=node_state.hedged_requests,
+                    hedge_wins=node_state.hedge_wins,
+                    latency_ewma_ms=node_state.latency_ewma_ms,
+                    latency_p95_ms=node_state.latency_p95_ms,
+                )
+                for url, node_state in self._nodes.items()
+            ]
+
+
+class RoutedApiCall(ApiCall):
+    """Typesense API call which selects nodes with a NodeRouter and hedges slow searches.
+
+    Requests are sent by the HTTP session of the call instead of the module level session of typesense client, so
+    clients of different databases (or processes) never share connections.
+
+    Attributes:
+        session (Session): HTTP session sending the requests, with its keep-alive connections.
+        _router (NodeRouter): router shared by every client of the cluster.
+        _instrumentation (Instrumentation): timing of round trips and JSON decoding of responses.
+        _current_node (Node): node of the request in progress (a client is used by one thread at once).
+
+    """
+    _router: NodeRouter | None = None
+
+    def __init__(
+            self,
+            config: Any,
+            router: NodeRouter,
+            session: Session,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        super().__init__(config)
+        self.session: Session = session
+        self._router = router
+        self._instrumentation: Instrumentation = instrumentation or Instrumentation()
+        self._current_node: Node | None = None
+
+    def get_node(self) -> Node:
+        assert self._router is not None
+        self._current_node = self._router.select(self.nodes, self.config.nearest_node)
+        return self._current_node
+
+    def set_node_healthcheck(self, node: Node, is_healthy: bool) -> None:
+        super().set_node_healthcheck(node, is_healthy)
+        # Nodes are marked healthy on initialization, the router only tracks real requests
+        if self._router is not None and not is_healthy:
+            self._router.record_failure(node)
+
+    def make_request(self, fn: Callable[..., Any], endpoint: str, as_json: bool, **kwargs: Any) -> Any:
+        # Methods of typesense client pass a method of its module level session, the same method of ours is called
+        session_fn: Callable[..., Any] = getattr(self.session, fn.__name__)
+
+        def timed_fn(url: str, **fn_kwargs: Any) -> Any:
+            assert self._router is not None and self._current_node is not None
+            node: Node = self._current_node
+            start: float = time.perf_counter()
+            response: Any = session_fn(url, **fn_kwargs)
+            elapsed_seconds: float = time.perf_counter() - start
+            if 0 < response.status_code < 500:
+                self._router.record_success(node, elapsed_seconds)
+            if self._instrumentation.enabled:
+                self._instrumentation.record(TYPESENSE_STAGE, elapsed_seconds)
+                # Typesense client decodes the response, its decoding is timed when it is called
+                response.json = self._timed_json(response)
+            return response
+
+        timed_fn.__name__ = fn.__name__
+        return super().make_request(timed_fn, endpoint, as_json, **kwargs)
+
+    def _timed_json(self, response: Any) -> Callable[..., Any]:
+        """JSON decoder of a response, timed and recording the search results."""
+        response_json: Callable[..., Any] = response.json
+
+        def timed_json(**kwargs: Any) -> Any:
+            with self._instrumentation.span(DECODE_STAGE):
+                result: Any = response_json(**kwargs)
+            self._instrumentation.typesense_response(result, len(response.content))
+            return result
+
+        return timed_json
+
+    def _request_node(self, node: Node, endpoint: str, params: dict, as_json: bool) -> Any:
+        """Send a GET request to a given node, without retries."""
+        assert self._router is not None
+        start: float = time.perf_counter()
+        try:
+            response: Any = self.session.get(
+                node.url() + endpoint,
+                headers={ApiCall.API_KEY_HEADER_NAME: self.config.api_key},
+                params=params,
+                timeout=self.config.connection_timeout_seconds,
+                verify=self.config.verify,
+            )
+        except RequestException:
+            self._router.record_failure(node)
+            raise
+
+        elapsed_seconds: float = time.perf_counter() - start
+        if 0 < response.status_code < 500:
+            self._router.record_success(node, elapsed_seconds)
+        else:
+            self._router.record_failure(node)
+        if self._instrumentation.enabled:
+            self._instrumentation.record(TYPESENSE_STAGE, elapsed_seconds)
+            response.json = self._timed_json(response)
+
+        if not 200 <= response.status_code < 300:
+            error_message: str = (
+                response.json().get('message', 'API error.')
+                if response.headers.get('Content-Type', '').startswith('application/json') else 'API error.'
+            )
+            raise ApiCall.get_exception(response.status_code)(response.status_code, error_message)
+
+        return response.json() if as_json else response.text
+
+    def get(self, endpoint: str, params: dict | None = None, as_json: bool = True) -> Any:
+        """GET request, searches are hedged to a second node when the first one exceeds its p95 latency."""
+        if self._router is None or not self._router.hedge_reads or not endpoint.endswith('/search') \
+                or len(self.nodes) < 2:
+            return super().get(endpoint, params, as_json)
+
+        params = params or {}
+        primary_node: Node = self.get_node()
+        futures: dict[Future, Node] = {
+            self._router.submit(self._request_node, primary_node, endpoint, params, as_json): primary_node,
+        }
+        done, _ = wait(futures, timeout=self._router.hedge_delay_seconds(primary_node))
+        if not done:
+            hedge_node: Node = self._router.select(self.nodes, exclude=primary_node)
+            self._router.record_hedge(hedge_node)
+            futures[self._router.submit(self._request_node, hedge_node, endpoint, params, as_json)] = hedge_node
+
+        last_error: Exception | None = None
+        for future in as_completed(futures):
+            try:
+                result: Any = future.result()
+            except NODE_ERRORS as error:
+                last_error = error
+                continue
+            if futures[future].url() != primary_node.url():
+                self._router.record_hedge(futures[future], won=True)
+            return result
+
+        assert last_error is not None
+        return self._request_untried(
+            {node.url() for node in futures.values()},
+            last_error,
+            endpoint,
+            params,
+            as_json,
+        )
+
+    def _request_untried(
+            self,
+            tried_urls: set[str],
+            last_error: Exception,
+            endpoint: str,
+            params: dict,
+            as_json: bool,
+    ) -> Any:
+        """Request once each node not tried yet by a hedged search, without the retry interval of typesense client,
+        so a hedged search never waits longer than an unhedged one.
+
+        Raises:
+            Exception: the error of the last node requested if every node fails.
+
+        """
+        for node in self.nodes:
+            if node.url() in tried_urls:
+                continue
+            try:
+                return self._request_node(node, endpoint, params, as_json)
+            except NODE_ERRORS as error:
+                last_error = error
+
+        raise last_error
+
+
+class RoutedTypesenseClient(TypesenseClient):
+    """Typesense client whose requests are routed by a NodeRouter and sent by a given HTTP session.
+    """
+
+    def __init__(
+            self,
+            config_dict: dict,
+            router: NodeRouter,
+            session: Session,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        super().__init__(config_dict)
+        self.api_call = RoutedApiCall(self.config, router, session, instrumentation)
+        for endpoint in vars(self).values():
+            if hasattr(endpoint, 'api_call'):
+                endpoint.api_call = self.api_call
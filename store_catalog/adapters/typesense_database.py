@@ -1,40 +1,233 @@
 """Typesense database client config module.
 """
 
+import os
+import threading
 from collections.abc import Callable
 from contextlib import contextmanager
+from dataclasses import dataclass
+from queue import Empty
+from queue import LifoQueue
 from typing import Iterator
+from weakref import WeakSet
 
+from requests import Session
+from requests.adapters import HTTPAdapter
 from typesense import Client as TypesenseClient  # type: ignore
 
+from store_catalog.adapters.instrumentation import SESSION_STAGE
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.typesense_cluster import NodeRouter
+from store_catalog.adapters.typesense_cluster import NodeStats
+from store_catalog.adapters.typesense_cluster import RoutedTypesenseClient
+from store_catalog.adapters.typesense_cluster import node_config
+
+
+class ConnectionPoolTimeoutError(Exception):
+    ...
+
+
+# Databases of the process, their pools are reset in a forked child by a single hook
+_databases: WeakSet['TypesenseDatabase'] = WeakSet()
+
+
+def _reset_pools() -> None:
+    for database in list(_databases):
+        database._reset_pool()
+
+
+os.register_at_fork(after_in_child=_reset_pools)
+
+
+@dataclass(frozen=True)
+class ConnectionPoolStats:
+    """Snapshot of the typesense clients pool counters.
+
+    Attributes:
+        size (int): max number of clients of the pool.
+        in_use (int): clients checked out by a session right now.
+        idle (int): clients created and waiting in the pool.
+        created (int): clients created since the pool was (re)initialized.
+        reused (int): sessions served by an already created client.
+    """
+    size: int
+    in_use: int
+    idle: int
+    created: int
+    reused: int
+
 
 class TypesenseDatabase(object):
     """Singleton to manage typesense client connections.
 
+    Clients are created lazily and kept in a thread-safe pool, so every session reuses a long-lived client and
+    the keep-alive HTTP connections of the ``requests`` session of the pool instead of paying client construction
+    and a TCP handshake per repository call. The pool is reset when the process is forked so every worker owns its
+    clients and connections.
+    Requests of every client are routed to the cluster nodes by a shared health and latency aware NodeRouter.
+
     Attributes:
         _session_factory (Callable): The factory to create a typesense client.
+        _pool_size (int): max number of clients (and keep-alive connections per node) of the pool.
+        _pool_timeout_seconds (float): max seconds waiting for an idle client when the pool is exhausted.
+        _router (NodeRouter): router of requests to typesense cluster nodes.
+        _http_session (Session): HTTP session of the clients of the pool.
+        _instrumentation (Instrumentation): timing of client checkouts and requests.
 
     """
-    # TODO: improve with multiple nodes config
-    def __init__(self, api_key: str, host: str, port: str, protocol: str) -> None:
+    def __init__(
+            self,
+            api_key: str,
+            host: str | None = None,
+            port: str | None = None,
+            protocol: str | None = None,
+            nodes: list[str] | None = None,
+            nearest_node: str | None = None,
+            pool_size: int = 10,
+            connect_timeout_seconds: float = 3.0,
+            read_timeout_seconds: float = 10.0,
+            pool_timeout_seconds: float = 5.0,
+            healthcheck_interval_seconds: float = 60,
+            num_retries: int = 3,
+            retry_interval_seconds: float = 1.0,
+            hedge_reads: bool = False,
+            hedge_min_delay_ms: float = 50.0,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
         """Constructor.
 
         Args:
             api_key (str): The API key for the typesense client.
-            host (str): The host of the typesense client.
-            port (str): The port of the typesense client.
-            protocol (str): The protocol of the typesense client.
+            host (str, optional): The host of the typesense client, used if there are not nodes.
+            port (str, optional): The port of the typesense client, used if there are not nodes.
+            protocol (str, optional): The protocol of the typesense client, used if there are not nodes.
+            nodes (list[str], optional): URLs of typesense cluster nodes, e.g. ``http://typesense-1:8108``.
+            nearest_node (str, optional): URL of the node to prefer while it is healthy.
+            pool_size (int): max number of pooled clients and keep-alive connections per node.
+            connect_timeout_seconds (float): timeout to establish a connection with typesense.
+            read_timeout_seconds (float): timeout to wait for typesense response once connected.
+            pool_timeout_seconds (float): max time waiting for an idle client when the pool is exhausted.
+            healthcheck_interval_seconds (float): seconds before an unhealthy node is retried.
+            num_retries (int): max retries of a request on another node when a node fails.
+            retry_interval_seconds (float): seconds slept before every retry.
+            hedge_reads (bool): True to send a search to a second node when the first exceeds its p95 latency.
+            hedge_min_delay_ms (float): min delay before hedging a search.
+            instrumentation (Instrumentation, optional): timing of client checkouts and requests, disabled if None.
 
         """
-        self._session_factory: Callable[..., TypesenseClient] = lambda: TypesenseClient(config_dict=dict(
+        self._pool_size: int = pool_size
+        self._pool_timeout_seconds: float = pool_timeout_seconds
+        self._healthcheck_interval_seconds: float = healthcheck_interval_seconds
+        self._hedge_reads: bool = hedge_reads
+        self._hedge_min_delay_ms: float = hedge_min_delay_ms
+        self._instrumentation: Instrumentation = instrumentation or Instrumentation()
+        config_dict: dict = dict(
             api_key=api_key,
-            nodes=[
-                dict(host=host, port=port, protocol=protocol),
-            ],
-            connection_timeoud_seconds=10,
-        ))
+            nodes=(
+                [node_config(node) for node in nodes] if nodes
+                else [dict(host=host, port=port, protocol=protocol)]
+            ),
+            nearest_node=node_config(nearest_node) if nearest_node else None,
+            # requests accepts a (connect, read) tuple as timeout, typesense client pass it through as is
+            connection_timeout_seconds=(connect_timeout_seconds, read_timeout_seconds),
+            healthcheck_interval_seconds=healthcheck_interval_seconds,
+            num_retries=num_retries,
+            retry_interval_seconds=retry_interval_seconds,
+        )
+        self._nodes_count: int = len(config_dict['nodes']) + (1 if nearest_node else 0)
+        self._session_factory: Callable[..., TypesenseClient] = lambda: RoutedTypesenseClient(
+            config_dict=config_dict,
+            router=self._router,
+            session=self._http_session,
+            instrumentation=self._instrumentation,
+        )
+        self._reset_pool()
+        _databases.add(self)
+
+    def _reset_pool(self) -> None:
+        """Initialize an empty clients pool owned by the current process."""
+        self._lock: threading.Lock = threading.Lock()
+        self._pool: LifoQueue[TypesenseClient] = LifoQueue(maxsize=self._pool_size)
+        self._in_use: int = 0
+        self._created: int = 0
+        self._reused: int = 0
+        self._router: NodeRouter = NodeRouter(
+            healthcheck_interval_seconds=self._healthcheck_interval_seconds,
+            hedge_reads=self._hedge_reads,
+            hedge_min_delay_ms=self._hedge_min_delay_ms,
+            max_workers=self._pool_size,
+        )
+        self._http_session: Session = self._new_http_session()
+
+    def _new_http_session(self) -> Session:
+        """HTTP session of the clients of the pool, with a keep-alive connection pool sized for them.
+
+        A new one is created with every pool, so a forked worker never shares sockets with its parent process.
+        """
+        http_session: Session = Session()
+        http_adapter: HTTPAdapter = HTTPAdapter(pool_connections=self._nodes_count, pool_maxsize=self._pool_size)
+        http_session.mount('http://', http_adapter)
+        http_session.mount('https://', http_adapter)
+        return http_session
+
+    def _acquire(self) -> TypesenseClient:
+        """Check out an idle client, create one if the pool is not full or wait for a released one.
+
+        Raises:
+            ConnectionPoolTimeoutError: if no client is released before pool timeout.
+
+        """
+        with self._lock:
+            try:
+                typesense_client: TypesenseClient = self._pool.get_nowait()
+                self._reused += 1
+            except Empty:
+                if self._created < self._pool_size:
+                    self._created += 1
+                    self._in_use += 1
+                    return self._session_factory()
+            else:
+                self._in_use += 1
+                return typesense_client
+
+        try:
+            typesense_client = self._pool.get(timeout=self._pool_timeout_seconds)
+        except Empty:
+            raise ConnectionPoolTimeoutError(f'No typesense client released in {self._pool_timeout_seconds} seconds')
+
+        with self._lock:
+            self._reused += 1
+            self._in_use += 1
+        return typesense_client
+
+    def _release(self, typesense_client: TypesenseClient) -> None:
+        """Give back a checked out client to the pool."""
+        with self._lock:
+            self._in_use -= 1
+            self._pool.put_nowait(typesense_client)
+
+    @property
+    def pool_stats(self) -> ConnectionPoolStats:
+        """ConnectionPoolStats: current counters of the clients pool."""
+        with self._lock:
+            return ConnectionPoolStats(
+                size=self._pool_size,
+                in_use=self._in_use,
+                idle=self._pool.qsize(),
+                created=self._created,
+                reused=self._reused,
+            )
+
+    @property
+    def node_stats(self) -> list[NodeStats]:
+        """list[NodeStats]: current counters of every typesense node."""
+        return self._router.stats
 
     @contextmanager
     def session(self) -> Iterator[TypesenseClient]:
-        typesense_client: TypesenseClient = self._session_factory()
-        yield typesense_client
+        with self._instrumentation.span(SESSION_STAGE):
+            typesense_client: TypesenseClient = self._acquire()
+        try:
+            yield typesense_client
+        finally:
+            self._release(typesense_client)
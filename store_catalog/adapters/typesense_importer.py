@@ -0,0 +1,332 @@
+"""Typesense catalog importer module.
+
+This module define a streaming bulk importer of catalog JSONL files into Typesense collections.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+from typesense import Client as TypesenseClient  # type: ignore
+
+
+@dataclass(frozen=True)
+class CatalogFile:
+    """Catalog JSONL file to import in a collection.
+
+    Attributes:
+        collection_name (str): name of the Typesense collection.
+        file_name (str): name of the JSONL file in catalog directory.
+        required_fields (tuple[str, ...]): fields that every document must have.
+    """
+    collection_name: str
+    file_name: str
+    required_fields: tuple[str, ...]
+
+
+# Catalog files in reference order, referenced documents are imported before the documents referencing them
+CATALOG_FILES: tuple[CatalogFile, ...] = (
+    CatalogFile('product_categories', 'product_categories.jsonl', ('id', 'title', 'subcategory')),
+    CatalogFile(
+        'product_categories',
+        'product_subcategories.jsonl',
+        ('id', 'title', 'subcategory', 'product_category_id'),
+    ),
+    CatalogFile('product_manufacturers', 'product_manufactures.jsonl', ('id', 'title')),
+    CatalogFile(
+        'product_models',
+        'product_models.jsonl',
+        ('id', 'sku', 'title', 'description', 'image_url', 'product_category_id', 'product_manufacturer_id',
+         'min_price'),
+    ),
+    CatalogFile(
+        'products',
+        'products.jsonl',
+        ('id', 'sku', 'title', 'description', 'image_url', 'price', 'product_model_id', 'stock', 'num_purchases'),
+    ),
+)
+
+
+@dataclass
+class BatchFailure:
+    """Documents of a batch that could not be imported.
+
+    Attributes:
+        batch_number (int): number of batch in its file, starting at 1.
+        first_line (int): line number of the first document of the batch in its file.
+        failed (int): number of documents of the batch not imported.
+        errors (list[str]): first error messages of the batch.
+    """
+    batch_number: int
+    first_line: int
+    failed: int
+    errors: list[str]
+
+
+@dataclass
+class ImportReport:
+    """Import result of a catalog file.
+
+    Attributes:
+        collection_name (str): name of the Typesense collection.
+        file_name (str): name of the imported JSONL file.
+        imported (int): documents imported.
+        failed (int): documents rejected by Typesense.
+        invalid (int): lines skipped because they are not a valid document.
+        batches (int): batches sent to Typesense.
+        elapsed_seconds (float): import duration.
+        batch_failures (list[BatchFailure]): batches with failed documents.
+        invalid_lines (list[str]): first validation errors with their line number.
+    """
+    collection_name: str
+    file_name: str
+    imported: int = 0
+    failed: int = 0
+    invalid: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    batch_failures: list[BatchFailure] = field(default_factory=list)
+    invalid_lines: list[str] = field(default_factory=list)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.imported / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class _Batch:
+    number: int
+    first_line: int
+    documents: list[str]
+
+
+class TypesenseCatalogImporter:
+    """Streaming bulk importer of catalog JSONL files into Typesense.
+
+    Files are read line by line and sent in batches of raw JSONL lines through the bulk import endpoint, with at
+    most ``concurrency`` batches in flight, so memory stays constant whatever the size of the catalog.
+
+    Attributes:
+        _session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense client session factory.
+        _batch_size (int): documents per import request.
+        _concurrency (int): max import requests in flight.
+        _action (str): typesense import action (create, upsert, update or emplace).
+        _on_imported (Callable[[], None], optional): hook called once a catalog is imported into the served
+            collections, e.g. to invalidate caches.
+
+    """
+    MAX_REPORTED_ERRORS: int = 10
+
+    def __init__(
+            self,
+            session_factory: Callable[..., AbstractContextManager[TypesenseClient]],
+            batch_size: int = 1000,
+            concurrency: int = 4,
+            action: str = 'upsert',
+            on_imported: Callable[[], None] | None = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense session factory.
+            batch_size (int): documents per import request.
+            concurrency (int): max import requests in flight.
+            action (str): typesense import action.
+            on_imported (Callable[[], None], optional): hook called once a catalog is imported into the served
+                collections.
+
+        """
+        self._session_factory: Callable[..., AbstractContextManager[TypesenseClient]] = session_factory
+        self._batch_size: int = batch_size
+        self._concurrency: int = concurrency
+        self._action: str = action
+        self._on_imported: Callable[[], None] | None = on_imported
+
+    def _batches(self, lines: Iterable[str], catalog_file: CatalogFile, report: ImportReport) -> Iterator[_Batch]:
+        """Stream the valid documents of JSONL lines grouped in batches.
+
+        Args:
+            lines (Iterable[str]): JSONL lines, e.g. an open JSONL file.
+            catalog_file (CatalogFile): catalog file to import.
+            report (ImportReport): report where invalid lines are counted.
+
+        Yields:
+            _Batch: batch of raw JSONL documents.
+
+        """
+        batch: _Batch = _Batch(number=1, first_line=1, documents=[])
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            error: str | None = self._validate(line, catalog_file)
+            if error is not None:
+                report.invalid += 1
+                if len(report.invalid_lines) < self.MAX_REPORTED_ERRORS:
+                    report.invalid_lines.append(f'line {line_number}: {error}')
+                continue
+
+            if not batch.documents:
+                batch.first_line = line_number
+            batch.documents.append(line)
+            if len(batch.documents) == self._batch_size:
+                yield batch
+                batch = _Batch(number=batch.number + 1, first_line=line_number + 1, documents=[])
+
+        if batch.documents:
+            yield batch
+
+    @staticmethod
+    def _validate(line: str, catalog_file: CatalogFile) -> str | None:
+        """Validation error of a JSONL line, None if it is a valid document."""
+        try:
+            document: object = json.loads(line)
+        except json.JSONDecodeError as error:
+            return f'invalid JSON ({error.msg})'
+
+        if not isinstance(document, dict):
+            return 'document is not a JSON object'
+
+        missing_fields: list[str] = [name for name in catalog_file.required_fields if name not in document]
+        if missing_fields:
+            return f'missing fields {", ".join(missing_fields)}'
+
+        return None
+
+    def _import_batch(self, collection_name: str, batch: _Batch) -> BatchFailure | None:
+        """Send a batch to Typesense bulk import endpoint.
+
+        Returns:
+            BatchFailure | None: failed documents of batch, None if all were imported.
+
+        """
+        with self._session_factory() as session:
+            response: str = session.collections[collection_name].documents.import_(
+                '\n'.join(batch.documents),
+                {'action': self._action},
+            )
+
+        failed: int = 0
+        errors: list[str] = []
+        for result_line in response.split('\n'):
+            result: dict = json.loads(result_line)
+            if not result.get('success', False):
+                failed += 1
+                if len(errors) < self.MAX_REPORTED_ERRORS:
+                    errors.append(result.get('error', 'unknown error'))
+
+        if failed:
+            return BatchFailure(batch_number=batch.number, first_line=batch.first_line, failed=failed, errors=errors)
+        return None
+
+    def import_file(self, path: Path, catalog_file: CatalogFile, collection_name: str | None = None) -> ImportReport:
+        """Import a JSONL file into its collection.
+
+        Args:
+            path (Path): path of JSONL file.
+            catalog_file (CatalogFile): catalog file to import.
+            collection_name (str, optional): name of the collection to import into, the catalog file one if None.
+
+        Returns:
+            ImportReport: import counters of the file.
+
+        """
+        with path.open(encoding='utf-8') as jsonl_file:
+            return self.import_lines(jsonl_file, catalog_file, collection_name=collection_name, file_name=path.name)
+
+    def import_lines(
+            self,
+            lines: Iterable[str],
+            catalog_file: CatalogFile,
+            collection_name: str | None = None,
+            file_name: str | None = None,
+    ) -> ImportReport:
+        """Import JSONL lines into a collection, e.g. documents exported from another collection.
+
+        Args:
+            lines (Iterable[str]): JSONL lines, read as batches are sent.
+            catalog_file (CatalogFile): catalog file of the documents, with their required fields.
+            collection_name (str, optional): name of the collection to import into, the catalog file one if None.
+            file_name (str, optional): name of the source of the lines in the report, the catalog file one if None.
+
+        Returns:
+            ImportReport: import counters of the lines.
+
+        """
+        collection_name = collection_name or catalog_file.collection_name
+        report: ImportReport = ImportReport(
+            collection_name=collection_name,
+            file_name=file_name or catalog_file.file_name,
+        )
+        start: float = time.perf_counter()
+        in_flight: dict[Future, _Batch] = {}
+
+        def collect(futures: set[Future]) -> None:
+            for future in futures:
+                batch: _Batch = in_flight.pop(future)
+                batch_failure: BatchFailure | None = future.result()
+                report.batches += 1
+                report.imported += len(batch.documents)
+                if batch_failure is not None:
+                    report.imported -= batch_failure.failed
+                    report.failed += batch_failure.failed
+                    report.batch_failures.append(batch_failure)
+
+        with ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix='typesense-import') as executor:
+            for batch in self._batches(lines, catalog_file, report):
+                if len(in_flight) >= self._concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight[executor.submit(self._import_batch, collection_name, batch)] = batch
+
+            collect(set(in_flight))
+
+        report.elapsed_seconds = time.perf_counter() - start
+        return report
+
+    def import_catalog(
+            self,
+            catalog_dir: Path,
+            catalog_files: tuple[CatalogFile, ...] = CATALOG_FILES,
+            collection_names: Mapping[str, str] | None = None,
+    ) -> Iterator[ImportReport]:
+        """Import catalog files in reference order, each file is completely imported before the next one.
+
+        Caches are invalidated once by the ``on_imported`` hook when the import stops, if documents were imported
+        into the served collections (the collections of a reindex are served once swapped by the migrator).
+
+        Args:
+            catalog_dir (Path): directory with catalog JSONL files.
+            catalog_files (tuple[CatalogFile, ...]): catalog files to import, in reference order.
+            collection_names (Mapping[str, str], optional): collection to import into by collection name of catalog
+                files, e.g. new versions of collections to reindex, catalog files ones if None.
+
+        Yields:
+            ImportReport: import counters of each file once imported.
+
+        """
+        imported: bool = False
+        try:
+            for catalog_file in catalog_files:
+                report: ImportReport = self.import_file(
+                    catalog_dir / catalog_file.file_name,
+                    catalog_file,
+                    collection_name=(collection_names or {}).get(catalog_file.collection_name),
+                )
+                imported = imported or report.imported > 0
+                yield report
+        finally:
+            if self._on_imported is not None and imported and collection_names is None:
+                self._on_imported()
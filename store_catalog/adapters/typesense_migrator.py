@@ -0,0 +1,434 @@
+"""Typesense migrator module.
+
+This module define a runner of versioned schema migrations of Typesense collections. Every collection is served
+through an alias (e.g. ``products``) pointing to a versioned collection (e.g. ``products_v3``), so a schema change or
+a reindex fills a new versioned collection while searches keep using the current one, then swaps the alias.
+"""
+
+import json
+import re
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+from typesense import Client as TypesenseClient  # type: ignore
+from typesense.api_call import ApiCall  # type: ignore
+from typesense.configuration import Node  # type: ignore
+from typesense.exceptions import ObjectNotFound  # type: ignore
+
+from store_catalog.adapters.migration_lock import AbstractMigrationLock
+from store_catalog.adapters.typesense_importer import CATALOG_FILES
+from store_catalog.adapters.typesense_importer import CatalogFile
+from store_catalog.adapters.typesense_importer import ImportReport
+from store_catalog.adapters.typesense_importer import TypesenseCatalogImporter
+
+
+class MigrationError(Exception):
+    ...
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Versioned change of the schemas of collections.
+
+    Attributes:
+        version (int): version of the migration, migrations are applied in version order.
+        description (str): description of the change.
+        schemas (tuple[dict, ...]): typesense schemas of the collections created or changed, in reference order,
+            named after the alias of the collection. References name the alias of the referenced collection.
+        transform (Callable[[str, dict], dict], optional): function of the alias of a collection and one of its
+            documents returning the document copied into the new version of the collection, unchanged if None.
+    """
+    version: int
+    description: str
+    schemas: tuple[dict, ...]
+    transform: Callable[[str, dict], dict] | None = None
+
+
+@dataclass
+class MigrationReport:
+    """Result of a migration or a reindex.
+
+    Attributes:
+        version (int): version of the migration, the last one applied for a reindex.
+        description (str): description of the migration.
+        collections (dict[str, str]): new versioned collection by alias swapped.
+        imports (list[ImportReport]): documents copied or imported into every new collection.
+        elapsed_seconds (float): migration duration.
+    """
+    version: int
+    description: str
+    collections: dict[str, str] = field(default_factory=dict)
+    imports: list[ImportReport] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+class TypesenseMigrator:
+    """Runner of versioned and idempotent schema migrations of Typesense collections, without search outage.
+
+    Applied versions are recorded in the ``schema_migrations`` collection, so running the migrations again only
+    applies the pending ones. A migration creates a new versioned collection for every collection it changes and
+    for every collection referencing them (references are bound to a collection, not to an alias), copies their
+    documents in parallel batches from the current collections, then swaps the aliases and drops the replaced
+    collections. Collections created before aliases (named as their alias) are copied and replaced the same way.
+    Searches are served by the current collections until the swap, and documents are imported with bounded
+    concurrency so Typesense keeps serving them at full speed.
+
+    Writes to the current collections would be lost with them: while documents are copied, the migration lock holds
+    product updates (they are sent to the new collections once swapped), after ``write_grace_seconds`` for the
+    updates being sent to finish.
+
+    Migrations must not run concurrently; versioned collections left by an interrupted migration are dropped by the
+    next one.
+
+    Attributes:
+        _session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense client session factory.
+        _importer (TypesenseCatalogImporter): importer of documents into new collections.
+        _on_migrated (Callable[[], None], optional): hook called once aliases are swapped, e.g. to invalidate caches.
+        _drop_replaced (bool): True to drop collections once replaced, False to keep them to roll back by hand.
+        _migration_lock (AbstractMigrationLock, optional): lock holding writes while documents are copied.
+        _write_grace_seconds (float): seconds waited once the lock is held, for writes being sent to finish.
+
+    """
+    MIGRATIONS_COLLECTION_NAME: str = 'schema_migrations'
+
+    def __init__(
+            self,
+            session_factory: Callable[..., AbstractContextManager[TypesenseClient]],
+            importer: TypesenseCatalogImporter,
+            on_migrated: Callable[[], None] | None = None,
+            drop_replaced: bool = True,
+            migration_lock: AbstractMigrationLock | None = None,
+            write_grace_seconds: float = 0.0,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            session_factory (Callable[..., AbstractContextManager[TypesenseClient]]): typesense session factory.
+            importer (TypesenseCatalogImporter): importer of documents into new collections.
+            on_migrated (Callable[[], None], optional): hook called once aliases are swapped.
+            drop_replaced (bool): True to drop collections once replaced.
+            migration_lock (AbstractMigrationLock, optional): lock holding writes while documents are copied, writes
+                are not held if None.
+            write_grace_seconds (float): seconds waited once the lock is held, for writes being sent to finish.
+
+        """
+        self._session_factory: Callable[..., AbstractContextManager[TypesenseClient]] = session_factory
+        self._importer: TypesenseCatalogImporter = importer
+        self._on_migrated: Callable[[], None] | None = on_migrated
+        self._drop_replaced: bool = drop_replaced
+        self._migration_lock: AbstractMigrationLock | None = migration_lock
+        self._write_grace_seconds: float = write_grace_seconds
+
+    def applied_versions(self) -> list[int]:
+        """Versions of the migrations applied, in order."""
+        with self._session_factory() as session:
+            try:
+                export: str = session.collections[self.MIGRATIONS_COLLECTION_NAME].documents.export()
+            except ObjectNotFound:
+                return []
+
+        return sorted(json.loads(line)['version'] for line in export.splitlines() if line)
+
+    def migrate(self, migrations: Iterable[Migration]) -> Iterator[MigrationReport]:
+        """Apply the pending migrations in version order.
+
+        Args:
+            migrations (Iterable[Migration]): every migration, applied or not.
+
+        Yields:
+            MigrationReport: result of each migration once applied.
+
+        Raises:
+            MigrationError: if documents could not be copied, the migration and the next ones are not applied.
+
+        """
+        self._create_migrations_collection()
+        applied: set[int] = set(self.applied_versions())
+        ordered: list[Migration] = sorted(migrations, key=lambda migration: migration.version)
+        for migration in ordered:
+            if migration.version in applied:
+                continue
+
+            schemas: dict[str, dict] = self._schemas(ordered, migration.version)
+            report: MigrationReport = self._replace(
+                MigrationReport(version=migration.version, description=migration.description),
+                schemas,
+                self._dependents(schemas, {schema['name'] for schema in migration.schemas}),
+                lambda collections: self._copy(collections, migration.transform),
+            )
+            with self._session_factory() as session:
+                session.collections[self.MIGRATIONS_COLLECTION_NAME].documents.upsert({
+                    'id': str(migration.version),
+                    'version': migration.version,
+                    'description': migration.description,
+                    'applied_at': int(time.time()),
+                })
+            yield report
+
+    def reindex(
+            self,
+            catalog_dir: Path,
+            migrations: Iterable[Migration],
+            catalog_files: tuple[CatalogFile, ...] = CATALOG_FILES,
+    ) -> MigrationReport:
+        """Import the catalog files into new versions of their collections, then swap their aliases.
+
+        Args:
+            catalog_dir (Path): directory with catalog JSONL files.
+            migrations (Iterable[Migration]): every migration, they must be applied.
+            catalog_files (tuple[CatalogFile, ...]): catalog files to import, in reference order.
+
+        Returns:
+            MigrationReport: new collections and import counters of every catalog file.
+
+        Raises:
+            MigrationError: if a migration is pending or documents were rejected, aliases are not swapped.
+
+        """
+        ordered: list[Migration] = sorted(migrations, key=lambda migration: migration.version)
+        pending: list[int] = sorted({migration.version for migration in ordered} - set(self.applied_versions()))
+        if pending:
+            raise MigrationError(f'Migrations {", ".join(map(str, pending))} are pending, apply them first')
+
+        schemas: dict[str, dict] = self._schemas(ordered, ordered[-1].version)
+        return self._replace(
+            MigrationReport(version=ordered[-1].version, description='reindex'),
+            schemas,
+            self._dependents(schemas, {catalog_file.collection_name for catalog_file in catalog_files}),
+            lambda collections: list(
+                self._importer.import_catalog(catalog_dir, catalog_files, collection_names=collections)
+            ),
+        )
+
+    def _create_migrations_collection(self) -> None:
+        with self._session_factory() as session:
+            try:
+                session.collections[self.MIGRATIONS_COLLECTION_NAME].retrieve()
+            except ObjectNotFound:
+                session.collections.create({
+                    'name': self.MIGRATIONS_COLLECTION_NAME,
+                    'fields': [
+                        {'name': 'version', 'type': 'int32'},
+                        {'name': 'description', 'type': 'string'},
+                        {'name': 'applied_at', 'type': 'int64'},
+                    ],
+                })
+
+    @staticmethod
+    def _schemas(migrations: list[Migration], version: int) -> dict[str, dict]:
+        """Schema by alias of every collection at a version, in reference order of their first migration."""
+        schemas: dict[str, dict] = {}
+        for migration in migrations:
+            if migration.version <= version:
+                schemas.update({schema['name']: schema for schema in migration.schemas})
+
+        return schemas
+
+    @staticmethod
+    def _referenced(schema: dict) -> set[str]:
+        """Aliases of the collections referenced by a schema."""
+        return {
+            schema_field['reference'].split('.', 1)[0]
+            for schema_field in schema['fields'] if 'reference' in schema_field
+        }
+
+    def _dependents(self, schemas: dict[str, dict], aliases: set[str]) -> list[str]:
+        """Aliases given and aliases of the collections referencing them, directly or not, in reference order."""
+        replaced: set[str] = set(aliases)
+        while True:
+            dependents: set[str] = {
+                alias for alias, schema in schemas.items()
+                if alias not in replaced and self._referenced(schema) & replaced
+            }
+            if not dependents:
+                return [alias for alias in schemas if alias in replaced]
+
+            replaced |= dependents
+
+    def _replace(
+            self,
+            report: MigrationReport,
+            schemas: dict[str, dict],
+            aliases: list[str],
+            fill: Callable[[dict[str, str]], list[ImportReport]],
+    ) -> MigrationReport:
+        """Create new versions of collections, fill them and swap their aliases, dropped if they can not be filled.
+
+        Args:
+            report (MigrationReport): report of the migration, completed with its collections and imports.
+            schemas (dict[str, dict]): schema by alias of every collection.
+            aliases (list[str]): aliases of the collections to replace, in reference order.
+            fill (Callable[[dict[str, str]], list[ImportReport]]): function importing documents into the new
+                collection by alias.
+
+        Returns:
+            MigrationReport: report of the migration.
+
+        Raises:
+            MigrationError: if documents were rejected by Typesense.
+
+        """
+        start: float = time.perf_counter()
+        with self._session_factory() as session:
+            targets: dict[str, str] = self._alias_targets(session)
+            collection_names: set[str] = {collection['name'] for collection in session.collections.retrieve()}
+            for alias in aliases:
+                report.collections[alias] = self._new_collection_name(session, alias, targets, collection_names)
+            for alias in aliases:
+                session.collections.create(self._collection_schema(schemas[alias], report.collections, targets))
+
+        self._hold_writes()
+        try:
+            try:
+                report.imports = fill(report.collections)
+                failed: list[ImportReport] = [imported for imported in report.imports if imported.failed]
+                if failed:
+                    raise MigrationError(
+                        'Documents rejected by Typesense: '
+                        + ', '.join(f'{imported.failed} of {imported.file_name}' for imported in failed)
+                    )
+            except Exception:
+                self._drop(reversed(report.collections.values()))
+                raise
+
+            self._swap(report.collections, targets, collection_names)
+        finally:
+            if self._migration_lock is not None:
+                self._migration_lock.release()
+
+        report.elapsed_seconds = time.perf_counter() - start
+        return report
+
+    def _hold_writes(self) -> None:
+        """Hold writes to the current collections (or extend the lock), waiting once for writes being sent."""
+        if self._migration_lock is None:
+            return
+
+        held: bool = self._migration_lock.locked()
+        self._migration_lock.acquire()
+        if not held:
+            time.sleep(self._write_grace_seconds)
+
+    def _copy(
+            self,
+            collections: dict[str, str],
+            transform: Callable[[str, dict], dict] | None,
+    ) -> list[ImportReport]:
+        """Copy documents of current collections into their new collection, in reference order."""
+        reports: list[ImportReport] = []
+        with self._session_factory() as session:
+            targets: dict[str, str] = self._alias_targets(session)
+            collection_names: set[str] = {collection['name'] for collection in session.collections.retrieve()}
+
+        for alias, collection_name in collections.items():
+            source: str | None = targets.get(alias, alias if alias in collection_names else None)
+            if source is None:
+                continue
+
+            # The lock expires if it is not released, it is extended for every collection copied
+            self._hold_writes()
+            lines: Iterable[str] = self._export_lines(source)
+            if transform is not None:
+                lines = (json.dumps(transform(alias, json.loads(line))) for line in lines if line)
+            reports.append(self._importer.import_lines(
+                lines,
+                CatalogFile(collection_name=alias, file_name=source, required_fields=('id',)),
+                collection_name=collection_name,
+            ))
+
+        return reports
+
+    def _export_lines(self, collection_name: str) -> Iterator[str]:
+        """Stream the JSONL export of a collection line by line, as documents are imported (typesense client reads
+        the whole export in memory).
+
+        Raises:
+            MigrationError: if the export is not answered.
+
+        """
+        with self._session_factory() as session:
+            node: Node = session.api_call.get_node()
+            with session.api_call.session.get(
+                    f'{node.url()}/collections/{collection_name}/documents/export',
+                    headers={ApiCall.API_KEY_HEADER_NAME: session.config.api_key},
+                    stream=True,
+                    timeout=session.config.connection_timeout_seconds,
+                    verify=session.config.verify,
+            ) as response:
+                if response.status_code != 200:
+                    raise MigrationError(f'Export of {collection_name} answered {response.status_code}')
+                # Lines are decoded only if an encoding is known, JSONL is UTF-8
+                response.encoding = 'utf-8'
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        yield line
+
+    def _swap(self, collections: dict[str, str], targets: dict[str, str], collection_names: set[str]) -> None:
+        """Point aliases to their new collection, referencing collections first, and drop replaced collections."""
+        replaced: list[str] = []
+        with self._session_factory() as session:
+            for alias, collection_name in reversed(collections.items()):
+                session.aliases.upsert(alias, {'collection_name': collection_name})
+                if alias in targets:
+                    replaced.append(targets[alias])
+                elif alias in collection_names:
+                    # A collection named as the alias is served instead of the alias (collection names take
+                    # precedence) until it is dropped, once the alias points to the new collection (only once)
+                    session.collections[alias].delete()
+
+        if self._on_migrated is not None:
+            self._on_migrated()
+        if self._drop_replaced:
+            self._drop(replaced)
+
+    def _drop(self, collection_names: Iterable[str]) -> None:
+        with self._session_factory() as session:
+            for collection_name in collection_names:
+                try:
+                    session.collections[collection_name].delete()
+                except ObjectNotFound:
+                    pass
+
+    @staticmethod
+    def _alias_targets(session: TypesenseClient) -> dict[str, str]:
+        """Collection name by alias."""
+        return {alias['name']: alias['collection_name'] for alias in session.aliases.retrieve()['aliases']}
+
+    @staticmethod
+    def _new_collection_name(
+            session: TypesenseClient,
+            alias: str,
+            targets: dict[str, str],
+            collection_names: set[str],
+    ) -> str:
+        """Name of the next version of a collection, versions not pointed by the alias (interrupted) are dropped."""
+        versions: dict[str, int] = {
+            collection_name: int(match.group(1)) for collection_name in collection_names
+            if (match := re.fullmatch(rf'{re.escape(alias)}_v(\d+)', collection_name))
+        }
+        for collection_name in versions:
+            if collection_name != targets.get(alias):
+                session.collections[collection_name].delete()
+
+        return f'{alias}_v{max(versions.values(), default=0) + 1}'
+
+    @staticmethod
+    def _collection_schema(schema: dict, collections: dict[str, str], targets: dict[str, str]) -> dict:
+        """Schema of a new collection, with references bound to the new or current referenced collections."""
+        fields: list[dict] = []
+        for schema_field in schema['fields']:
+            if 'reference' in schema_field:
+                alias, referenced_field = schema_field['reference'].split('.', 1)
+                schema_field = {
+                    **schema_field,
+                    'reference': f'{collections.get(alias, targets.get(alias, alias))}.{referenced_field}',
+                }
+            fields.append(schema_field)
+
+        return {**schema, 'name': collections[schema['name']], 'fields': fields}
@@ -4,13 +4,41 @@ This module define container of Dependency Injector use to explicit dependencies
 """
 
 from dependency_injector.containers import DeclarativeContainer
+from dependency_injector.providers import Callable
 from dependency_injector.providers import Configuration
 from dependency_injector.providers import Factory
+from dependency_injector.providers import Object
+from dependency_injector.providers import Selector
 from dependency_injector.providers import Singleton
 
+from store_catalog.adapters.async_typesense_database import AsyncTypesenseDatabase
+from store_catalog.adapters.catalog_version import DjangoCatalogVersionStore
+from store_catalog.adapters.catalog_version import LocalCatalogVersionStore
+from store_catalog.adapters.circuit_breaker import CircuitBreaker
+from store_catalog.adapters.dimension_cache import DimensionCache
+from store_catalog.adapters.facet_cache import FacetCache
+from store_catalog.adapters.in_memory_repository import AsyncInMemoryProductRepository
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.adapters.instrumentation import Instrumentation
+from store_catalog.adapters.instrumentation import PrometheusMetrics
+from store_catalog.adapters.migration_lock import DjangoMigrationLock
+from store_catalog.adapters.migration_lock import LocalMigrationLock
+from store_catalog.adapters.product_updates import ProductUpdateBuffer
+from store_catalog.adapters.repository import SEARCH_ENGINE_ERRORS
+from store_catalog.adapters.repository import AsyncTypesenseProductRepository
 from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.adapters.search_cache import DjangoSearchCache
+from store_catalog.adapters.search_cache import LRUSearchCache
+from store_catalog.adapters.single_flight import SingleFlight
+from store_catalog.adapters.stale_cache import StaleSearchCache
+from store_catalog.adapters.suggestion_cache import SuggestionCache
+from store_catalog.adapters.typesense_importer import TypesenseCatalogImporter
 from store_catalog.adapters.typesense_database import TypesenseDatabase
+from store_catalog.adapters.typesense_migrator import TypesenseMigrator
+from store_catalog.service_layer.services import AsyncProductSearcher
 from store_catalog.service_layer.services import ProductSearcher
+from store_catalog.service_layer.startup import Startup
+from store_catalog.service_layer.startup import top_queries
 
 
 class Container(DeclarativeContainer):
@@ -18,16 +46,232 @@ class Container(DeclarativeContainer):
 
     """
     config: Configuration = Configuration()
+    metrics: Selector = Selector(
+        config.METRICS_BACKEND,
+        prometheus=Singleton(PrometheusMetrics),
+        none=Object(None),
+    )
+    instrumentation: Singleton = Singleton(
+        Instrumentation,
+        enabled=config.INSTRUMENTATION_ENABLED,
+        metrics=metrics,
+    )
     typesense_database: Singleton = Singleton(
         TypesenseDatabase,
         api_key=config.TYPESENSE_API_KEY,
         host=config.TYPESENSE_HOST,
         port=config.TYPESENSE_PORT,
         protocol=config.TYPESENSE_PROTOCOL,
+        nodes=config.TYPESENSE_NODES,
+        nearest_node=config.TYPESENSE_NEAREST_NODE,
+        pool_size=config.TYPESENSE_POOL_SIZE,
+        connect_timeout_seconds=config.TYPESENSE_CONNECT_TIMEOUT_SECONDS,
+        read_timeout_seconds=config.TYPESENSE_READ_TIMEOUT_SECONDS,
+        pool_timeout_seconds=config.TYPESENSE_POOL_TIMEOUT_SECONDS,
+        healthcheck_interval_seconds=config.TYPESENSE_HEALTHCHECK_INTERVAL_SECONDS,
+        num_retries=config.TYPESENSE_NUM_RETRIES,
+        retry_interval_seconds=config.TYPESENSE_RETRY_INTERVAL_SECONDS,
+        hedge_reads=config.TYPESENSE_HEDGE_READS,
+        hedge_min_delay_ms=config.TYPESENSE_HEDGE_MIN_DELAY_MS,
+        instrumentation=instrumentation,
+    )
+
+    sku_cache: Singleton = Singleton(
+        LRUSearchCache,
+        max_size=config.SKU_CACHE_MAX_SIZE,
+        ttl_seconds=config.SKU_CACHE_TTL_SECONDS,
+    )
+    dimension_cache: Selector = Selector(
+        config.DIMENSION_CACHE_BACKEND,
+        memory=Singleton(DimensionCache, ttl_seconds=config.DIMENSION_CACHE_TTL_SECONDS),
+        none=Object(None),
+    )
+
+    catalog_versions: Selector = Selector(
+        config.CATALOG_VERSION_BACKEND,
+        memory=Singleton(
+            LocalCatalogVersionStore,
+            updates_window_seconds=config.CATALOG_VERSION_UPDATES_WINDOW_SECONDS,
+        ),
+        django=Singleton(
+            DjangoCatalogVersionStore,
+            alias=config.CATALOG_VERSION_DJANGO_ALIAS,
+            refresh_seconds=config.CATALOG_VERSION_REFRESH_SECONDS,
+            updates_window_seconds=config.CATALOG_VERSION_UPDATES_WINDOW_SECONDS,
+        ),
+    )
+    # Shared by the same backend as catalog versions, commands reach the workers through both
+    migration_lock: Selector = Selector(
+        config.CATALOG_VERSION_BACKEND,
+        memory=Singleton(LocalMigrationLock, ttl_seconds=config.MIGRATION_LOCK_TTL_SECONDS),
+        django=Singleton(
+            DjangoMigrationLock,
+            alias=config.CATALOG_VERSION_DJANGO_ALIAS,
+            ttl_seconds=config.MIGRATION_LOCK_TTL_SECONDS,
+        ),
     )
 
-    product_repository: Factory = Factory(
-        TypesenseProductRepository,
+    in_memory_product_repository: Singleton = Singleton(InMemoryProductRepository, catalog_dir=config.CATALOG_DIR)
+    product_repository: Selector = Selector(
+        config.PRODUCT_REPOSITORY_BACKEND,
+        typesense=Singleton(
+            TypesenseProductRepository,
+            session_factory=typesense_database.provided.session,
+            trusted=config.TYPESENSE_TRUSTED_DOCUMENTS,
+            sku_cache=sku_cache,
+            dimension_cache=dimension_cache,
+            instrumentation=instrumentation,
+        ),
+        memory=in_memory_product_repository,
+    )
+    async_typesense_database: Singleton = Singleton(
+        AsyncTypesenseDatabase,
+        api_key=config.TYPESENSE_API_KEY,
+        host=config.TYPESENSE_HOST,
+        port=config.TYPESENSE_PORT,
+        protocol=config.TYPESENSE_PROTOCOL,
+        nodes=config.TYPESENSE_NODES,
+        nearest_node=config.TYPESENSE_NEAREST_NODE,
+        pool_size=config.TYPESENSE_ASYNC_POOL_SIZE,
+        connect_timeout_seconds=config.TYPESENSE_CONNECT_TIMEOUT_SECONDS,
+        read_timeout_seconds=config.TYPESENSE_READ_TIMEOUT_SECONDS,
+        pool_timeout_seconds=config.TYPESENSE_POOL_TIMEOUT_SECONDS,
+        healthcheck_interval_seconds=config.TYPESENSE_HEALTHCHECK_INTERVAL_SECONDS,
+        num_retries=config.TYPESENSE_NUM_RETRIES,
+        instrumentation=instrumentation,
+    )
+    async_product_repository: Selector = Selector(
+        config.PRODUCT_REPOSITORY_BACKEND,
+        typesense=Singleton(
+            AsyncTypesenseProductRepository,
+            session_factory=async_typesense_database.provided.session,
+            trusted=config.TYPESENSE_TRUSTED_DOCUMENTS,
+            sku_cache=sku_cache,
+            dimension_cache=dimension_cache,
+            instrumentation=instrumentation,
+        ),
+        memory=Singleton(AsyncInMemoryProductRepository, repository=in_memory_product_repository),
+    )
+
+    search_cache: Selector = Selector(
+        config.SEARCH_CACHE_BACKEND,
+        memory=Singleton(
+            LRUSearchCache,
+            max_size=config.SEARCH_CACHE_MAX_SIZE,
+            ttl_seconds=config.SEARCH_CACHE_TTL_SECONDS,
+        ),
+        django=Singleton(
+            DjangoSearchCache,
+            alias=config.SEARCH_CACHE_DJANGO_ALIAS,
+            ttl_seconds=config.SEARCH_CACHE_TTL_SECONDS,
+        ),
+        none=Object(None),
+    )
+    facet_cache: Selector = Selector(
+        config.FACET_CACHE_BACKEND,
+        memory=Singleton(
+            FacetCache,
+            max_size=config.FACET_CACHE_MAX_SIZE,
+            refresh_seconds=config.FACET_CACHE_REFRESH_SECONDS,
+            ttl_seconds=config.FACET_CACHE_TTL_SECONDS,
+        ),
+        none=Object(None),
+    )
+    suggestion_cache: Selector = Selector(
+        config.SUGGESTION_CACHE_BACKEND,
+        memory=Singleton(
+            SuggestionCache,
+            max_size=config.SUGGESTION_CACHE_MAX_SIZE,
+            ttl_seconds=config.SUGGESTION_CACHE_TTL_SECONDS,
+            depth=config.SUGGESTION_CACHE_DEPTH,
+        ),
+        none=Object(None),
+    )
+    single_flight: Selector = Selector(
+        config.SINGLE_FLIGHT_BACKEND,
+        memory=Singleton(SingleFlight, timeout_seconds=config.SINGLE_FLIGHT_TIMEOUT_SECONDS),
+        none=Object(None),
+    )
+    # Shared by synchronous and asynchronous searchers, which search the same Typesense
+    circuit_breaker: Selector = Selector(
+        config.CIRCUIT_BREAKER_BACKEND,
+        memory=Singleton(
+            CircuitBreaker,
+            failure_rate_threshold=config.CIRCUIT_BREAKER_FAILURE_RATE,
+            slow_call_seconds=config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=config.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+            window_size=config.CIRCUIT_BREAKER_WINDOW_SIZE,
+            min_calls=config.CIRCUIT_BREAKER_MIN_CALLS,
+            open_seconds=config.CIRCUIT_BREAKER_OPEN_SECONDS,
+            half_open_calls=config.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+            failure_errors=Object(SEARCH_ENGINE_ERRORS),
+        ),
+        none=Object(None),
+    )
+    stale_cache: Selector = Selector(
+        config.STALE_CACHE_BACKEND,
+        memory=Singleton(
+            StaleSearchCache,
+            max_size=config.STALE_CACHE_MAX_SIZE,
+            revalidate_seconds=config.STALE_CACHE_REVALIDATE_SECONDS,
+            if_error_seconds=config.STALE_CACHE_IF_ERROR_SECONDS,
+        ),
+        none=Object(None),
+    )
+    product_searcher: Singleton = Singleton(
+        ProductSearcher,
+        repository=product_repository,
+        cache=search_cache,
+        facet_cache=facet_cache,
+        suggestion_cache=suggestion_cache,
+        catalog_versions=catalog_versions,
+        single_flight=single_flight,
+        circuit_breaker=circuit_breaker,
+        stale_cache=stale_cache,
+    )
+    async_product_searcher: Singleton = Singleton(
+        AsyncProductSearcher,
+        repository=async_product_repository,
+        cache=search_cache,
+        facet_cache=facet_cache,
+        suggestion_cache=suggestion_cache,
+        catalog_versions=catalog_versions,
+        single_flight=single_flight,
+        circuit_breaker=circuit_breaker,
+        stale_cache=stale_cache,
+    )
+    product_update_buffer: Singleton = Singleton(
+        ProductUpdateBuffer,
+        repository=product_repository,
+        batch_size=config.PRODUCT_UPDATES_BATCH_SIZE,
+        flush_interval_seconds=config.PRODUCT_UPDATES_FLUSH_INTERVAL_SECONDS,
+        max_pending=config.PRODUCT_UPDATES_MAX_PENDING,
+        put_timeout_seconds=config.PRODUCT_UPDATES_PUT_TIMEOUT_SECONDS,
+        on_updated=product_searcher.provided.invalidate_products,
+        migration_lock=migration_lock,
+    )
+    # The replay of queries is added by the Django app, which knows how to request a catalog page
+    startup: Singleton = Singleton(
+        Startup,
+        repository=product_repository,
+        queries=Callable(top_queries, path=config.CATALOG_WARM_UP_QUERIES_FILE, top_n=config.CATALOG_WARM_UP_TOP_N),
+        timeout_seconds=config.CATALOG_STARTUP_TIMEOUT_SECONDS,
+        initial_delay_seconds=config.CATALOG_STARTUP_INITIAL_DELAY_SECONDS,
+        max_delay_seconds=config.CATALOG_STARTUP_MAX_DELAY_SECONDS,
+    )
+
+    catalog_importer: Factory = Factory(
+        TypesenseCatalogImporter,
+        session_factory=typesense_database.provided.session,
+        batch_size=config.TYPESENSE_IMPORT_BATCH_SIZE,
+        concurrency=config.TYPESENSE_IMPORT_CONCURRENCY,
+        on_imported=product_searcher.provided.invalidate_cache,
+    )
+    schema_migrator: Factory = Factory(
+        TypesenseMigrator,
         session_factory=typesense_database.provided.session,
+        importer=catalog_importer,
+        on_migrated=product_searcher.provided.invalidate_cache,
+        migration_lock=migration_lock,
+        write_grace_seconds=config.MIGRATION_LOCK_GRACE_SECONDS,
     )
-    product_searcher: Singleton = Singleton(ProductSearcher, repository=product_repository)
@@ -91,3 +91,96 @@ class Product(BaseModel):
     model: ProductModel
     stock: bool
     num_purchases: int
+
+
+class FacetValue(BaseModel):
+    """Value of a facet with the number of products found with it.
+
+    Attributes:
+        value (str): ID of the value, e.g. of a category.
+        label (str): title of the value shown to users.
+        count (int): number of products found with the value, in every page.
+    """
+    value: str
+    label: str
+    count: int
+
+
+class ProductsPage(BaseModel):
+    """Page of products of a search.
+
+    Attributes:
+        products (list[Product]): products of the page.
+        found (int): number of products found by the search, in every page.
+        page (int): number of the page, starting at 1.
+        per_page (int): max number of products per page.
+        facets (dict[str, list[FacetValue]]): values of every facet by facet name, most frequent first (empty if
+            facets were not requested).
+        stale (bool): True if the page is the last good result of its search, served because the search failed.
+    """
+    products: list[Product]
+    found: int
+    page: int
+    per_page: int
+    facets: dict[str, list[FacetValue]] = {}
+    stale: bool = False
+
+    @property
+    def pages(self) -> int:
+        return -(-self.found // self.per_page)
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.pages
+
+
+class ProductsBySku(BaseModel):
+    """Result of a lookup of several products by SKU.
+
+    Attributes:
+        products (dict[str, Product]): product found by SKU, for SKUs with exactly one product.
+        not_found (list[str]): SKUs without any product.
+        duplicated (list[str]): SKUs with several products.
+    """
+    products: dict[str, Product] = {}
+    not_found: list[str] = []
+    duplicated: list[str] = []
+
+
+class ProductsUpdate(BaseModel):
+    """Result of a partial update of several products by SKU.
+
+    Attributes:
+        updated (list[str]): SKUs of products updated.
+        not_found (list[str]): SKUs without any product.
+        failed (dict[str, str]): update error by SKU, for products not updated.
+    """
+    updated: list[str] = []
+    not_found: list[str] = []
+    failed: dict[str, str] = {}
+
+
+class Suggestion(BaseModel):
+    """Compact product suggested while a search query is typed.
+
+    Attributes:
+        sku (str): SKU of product.
+        title (str): title of product.
+    """
+    sku: str
+    title: str
+
+
+class Suggestions(BaseModel):
+    """Products suggested for a search query being typed, most purchased first.
+
+    Attributes:
+        suggestions (list[Suggestion]): products suggested.
+        found (int): number of products matching the query, suggested or not.
+    """
+    suggestions: list[Suggestion] = []
+    found: int = 0
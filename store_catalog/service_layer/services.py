@@ -2,27 +2,223 @@
 
 This module define a layer of services.
 """
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from typing import Any
+from typing import TypeVar
+from typing import cast
 
+from store_catalog.adapters.catalog_version import AbstractCatalogVersionStore
+from store_catalog.adapters.circuit_breaker import CircuitBreaker
+from store_catalog.adapters.facet_cache import FacetCache
+from store_catalog.adapters.product_batch import ProductBatch
+from store_catalog.adapters.product_facets import Facets
 from store_catalog.adapters.repository import AbstractProductRepository
+from store_catalog.adapters.repository import AsyncAbstractProductRepository
+from store_catalog.adapters.search_cache import AbstractSearchCache
+from store_catalog.adapters.search_cache import search_cache_key
+from store_catalog.adapters.single_flight import SingleFlight
+from store_catalog.adapters.stale_cache import StaleEntry
+from store_catalog.adapters.stale_cache import StaleSearchCache
+from store_catalog.adapters.suggestion_cache import SuggestionCache
 from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductsBySku
+from store_catalog.domain.model import ProductsPage
+from store_catalog.domain.model import Suggestions
 
+T = TypeVar('T')
 
-class ProductSearcher:
-    """Product searcher service.
+# Search parameters that do not change the products found, so searches with any of them share facet counts
+FACETS_INDEPENDENT_PARAMETERS: tuple[str, ...] = ('fields', 'sort_by')
+
+
+def _facets_search(*args: Any, **kwargs: Any) -> tuple[str, dict]:
+    """Key of the facets of a search in the facet cache and search parameters to count them."""
+    facets_kwargs: dict = {
+        parameter: value for parameter, value in kwargs.items() if parameter not in FACETS_INDEPENDENT_PARAMETERS
+    }
+    return search_cache_key('Facets', *args, **facets_kwargs), facets_kwargs
+
+
+def _marked_stale(result: T) -> T:
+    """Last good result of a search served stale, pages are marked so their responses tell it."""
+    if isinstance(result, ProductsPage):
+        return cast(T, result.model_copy(update={'stale': True}))
+    return result
+
+
+class ProductSearcherCaches:
+    """Caches, catalog version and coalescing of searches shared by product searchers, which only make the calls
+    to their repository (and await them for the asynchronous one).
 
     Attributes:
-        _repository [AbstractProductRepository]: repository to search products.
+        _repository [AbstractProductRepository | AsyncAbstractProductRepository]: repository to search products.
+        _cache [AbstractSearchCache, optional]: read-through cache of search results.
+        _facet_cache [FacetCache, optional]: cache of facet counts, refreshed in the background.
+        _suggestion_cache [SuggestionCache, optional]: cache of suggestions by query prefix.
+        _catalog_versions [AbstractCatalogVersionStore, optional]: version stamp of the catalog, bumped when
+            caches are invalidated.
+        _catalog_version [int, optional]: last version of the catalog seen, the caches kept in process are cleared
+            when another process bumps it.
+        _generation [int]: number of times the caches were cleared, results of searches started before are not
+            cached (nor shared with searches started after).
+        _single_flight [SingleFlight, optional]: coalescing of identical concurrent searches missing the cache.
+        _circuit_breaker [CircuitBreaker, optional]: breaker of repository calls while they fail or are slow.
+        _stale_cache [StaleSearchCache, optional]: last good results, served while refreshed or stale if failing.
+
+    """
+    _repository: AbstractProductRepository | AsyncAbstractProductRepository
+
+    def __init__(
+            self,
+            cache: AbstractSearchCache | None = None,
+            facet_cache: FacetCache | None = None,
+            suggestion_cache: SuggestionCache | None = None,
+            catalog_versions: AbstractCatalogVersionStore | None = None,
+            single_flight: SingleFlight | None = None,
+            circuit_breaker: CircuitBreaker | None = None,
+            stale_cache: StaleSearchCache | None = None,
+    ):
+        """Constructor.
+
+        Args:
+            cache (AbstractSearchCache, optional): read-through cache of search results, no cache if None.
+            facet_cache (FacetCache, optional): cache of facet counts, counted by every faceted search if None.
+            suggestion_cache (SuggestionCache, optional): cache of suggestions, searched on every keystroke if None.
+            catalog_versions (AbstractCatalogVersionStore, optional): version stamp of the catalog, not bumped if
+                None.
+            single_flight (SingleFlight, optional): coalescing of identical concurrent searches, every search
+                reaches the repository if None.
+            circuit_breaker (CircuitBreaker, optional): breaker of repository calls, never open if None.
+            stale_cache (StaleSearchCache, optional): last good results of searches, failed searches raise if None.
+
+        """
+        self._cache = cache
+        self._facet_cache = facet_cache
+        self._suggestion_cache = suggestion_cache
+        self._catalog_versions = catalog_versions
+        self._single_flight = single_flight
+        self._circuit_breaker = circuit_breaker
+        self._stale_cache = stale_cache
+        self._catalog_version: int | None = None
+        self._generation: int = 0
+
+    def invalidate_cache(self) -> None:
+        """Invalidate cached search results, facets, suggestions and products, to call when the catalog changes.
+
+        The catalog version is bumped, so workers sharing it (django backend of catalog versions) clear the caches
+        they keep in process on their next search.
+        """
+        self._clear_caches(shared=True)
+        if self._catalog_versions is not None:
+            self._catalog_version = self._catalog_versions.bump().version
+
+    def invalidate_products(self, skus: Iterable[str]) -> None:
+        """Invalidate the cached lookups of products whose hot fields (stock and purchases) were updated.
+
+        The catalog version is kept, so the other caches are kept and pages show the updated fields once their
+        cached searches expire. The ETag of pages changes once per updates window of the catalog versions.
+
+        Args:
+            skus (Iterable[str]): SKUs of products updated.
+
+        """
+        if self._cache is not None:
+            for sku in skus:
+                self._cache.delete(search_cache_key(sku))
+        if self._catalog_versions is not None:
+            self._catalog_versions.touch()
+
+    @staticmethod
+    def _page_cache_key(*args: Any, page: int, per_page: int, facets: bool, **kwargs: Any) -> str:
+        return search_cache_key(ProductsPage.__name__, *args, page=page, per_page=per_page, facets=facets, **kwargs)
+
+    def _cached(self, cache_key: str) -> Any | None:
+        """Result of a search in the search cache, once the caches are in sync with the catalog version."""
+        self._sync_catalog_version()
+        return self._cache.get(cache_key) if self._cache is not None else None
+
+    def _stale_entry(self, cache_key: str) -> StaleEntry | None:
+        return self._stale_cache.get(cache_key) if self._stale_cache is not None else None
+
+    def _stale_version(self) -> int:
+        """Version of the stale results, to get when a search starts."""
+        return self._stale_cache.version if self._stale_cache is not None else 0
+
+    def _cache_result(self, cache_key: str, result: T, generation: int, stale_version: int) -> T:
+        """Cache the result of a search, in the search cache only if the caches were not cleared since it started."""
+        if self._cache is not None and generation == self._generation:
+            self._cache.set(cache_key, result)
+        if self._stale_cache is not None:
+            self._stale_cache.set(cache_key, result, stale_version)
+        return result
+
+    @staticmethod
+    def _flight_key(cache_key: str, generation: int) -> str:
+        """Key of coalesced searches, searches started before the caches were cleared are not shared."""
+        return f'{generation}:{cache_key}'
+
+    def _revalidates(self, stale_entry: StaleEntry) -> bool:
+        """True if the last good result is served while searched again in the background."""
+        return stale_entry.revalidate and self._cache is not None and self._stale_cache is not None
 
+    def _cached_suggestions(self, q: str, limit: int) -> Suggestions | None:
+        self._sync_catalog_version()
+        return self._suggestion_cache.get(q, limit) if self._suggestion_cache is not None else None
+
+    def _suggestions_depth(self, limit: int) -> int:
+        """Products suggested searched for a query, the depth of the suggestion cache if any."""
+        return max(limit, self._suggestion_cache.depth) if self._suggestion_cache is not None else limit
+
+    def _cache_suggestions(self, q: str, suggestions: Suggestions, limit: int) -> Suggestions:
+        """Cache the suggestions searched for a query, and keep the first ``limit`` of them."""
+        if self._suggestion_cache is None:
+            return suggestions
+        self._suggestion_cache.set(q, suggestions)
+        return Suggestions(suggestions=suggestions.suggestions[:limit], found=suggestions.found)
+
+    def _sync_catalog_version(self) -> None:
+        """Clear the caches kept in process if another process bumped the catalog version (e.g. an import command)."""
+        if self._catalog_versions is None:
+            return
+
+        version: int = self._catalog_versions.get().version
+        if version != self._catalog_version:
+            if self._catalog_version is not None:
+                self._clear_caches(shared=False)
+            self._catalog_version = version
+
+    def _clear_caches(self, shared: bool) -> None:
+        """Clear the caches, those shared by processes only if ``shared`` (they were cleared by the process bumping
+        the version)."""
+        self._generation += 1
+        if self._cache is not None and (shared or not self._cache.shared):
+            self._cache.clear()
+        if self._facet_cache is not None:
+            self._facet_cache.clear()
+        if self._suggestion_cache is not None:
+            self._suggestion_cache.clear()
+        if self._stale_cache is not None:
+            self._stale_cache.clear()
+        self._repository.invalidate_cache()
+
+
+class ProductSearcher(ProductSearcherCaches):
+    """Product searcher service, see ProductSearcherCaches for its attributes.
     """
-    def __init__(self, repository: AbstractProductRepository):
+    def __init__(self, repository: AbstractProductRepository, **kwargs: Any):
         """Constructor.
 
         Args:
             repository (AbstractProductRepository): repository to search products.
+            **kwargs (Any): caches, catalog versions, single flight and circuit breaker, see ProductSearcherCaches.
 
         """
-        self._repository = repository
+        super().__init__(**kwargs)
+        self._repository: AbstractProductRepository = repository
 
     def __call__(self, sku: str | None = None, *args: Any, **kwargs: Any) -> Product | None | list[Product]:
         """Search products.
@@ -36,7 +232,318 @@ class ProductSearcher:
             Product | None | list[Product]: product, list of products or None.
 
         """
+        cache_key: str = search_cache_key(sku, *args, **kwargs)
+        products: Product | None | list[Product] = self._cached(cache_key)
+        if products is not None:
+            return products
+
+        return self._coalesced(cache_key, lambda: self._search(sku, *args, **kwargs))
+
+    def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        """Get products of several SKUs, e.g. of a basket, an order or a comparison list.
+
+        Args:
+            skus (Iterable[str]): stock-keeping units.
+
+        Returns:
+            ProductsBySku: products found by SKU, and SKUs not found or with several products.
+
+        """
+        self._sync_catalog_version()
+        return self._guarded(lambda: self._repository.get_many(skus))
+
+    def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        """Search a page of products.
+
+        Facets cached for the search are served without counting them again (they are refreshed in the background
+        once stale), whatever the page and sort order. Identical concurrent searches missing the cache are searched
+        once, and their result is shared. The last good page of a search is served while it is searched again in the
+        background (it is of the current catalog), or marked stale if its search fails.
+
+        Args:
+            *args (Any): additional arguments.
+            page (int): number of the page, starting at 1.
+            per_page (int): max number of products per page.
+            facets (bool): True to count the products found by category and manufacturer.
+            **kwargs (Any): search key-word arguments.
+
+        Returns:
+            ProductsPage: products of the page with the number of products found in every page, and the facets.
+
+        """
+        cache_key: str = self._page_cache_key(*args, page=page, per_page=per_page, facets=facets, **kwargs)
+        products_page: ProductsPage | None = self._cached(cache_key)
+        if products_page is not None:
+            return products_page
+
+        return self._coalesced(
+            cache_key,
+            lambda: self._list_page(*args, page=page, per_page=per_page, facets=facets, **kwargs),
+        )
+
+    def _coalesced(self, cache_key: str, search: Callable[[], T]) -> T:
+        """Search once for identical concurrent searches and cache the result, the leader caches it for all.
+
+        Once the cached result expired, the last good result is served while searched again in the background (if
+        it is recent enough and of the current catalog), else it is served marked stale only if the search fails.
+        Searches started before the caches are cleared (e.g. by a product update) are neither cached nor shared with
+        searches started after.
+        """
+        generation: int = self._generation
+
+        def cached_search() -> T:
+            stale_version: int = self._stale_version()
+            return self._cache_result(cache_key, self._guarded(search), generation, stale_version)
+
+        def coalesced_search() -> T:
+            if self._single_flight is None:
+                return cached_search()
+            return self._single_flight.do(self._flight_key(cache_key, generation), cached_search)
+
+        stale_entry: StaleEntry | None = self._stale_entry(cache_key)
+        if stale_entry is None:
+            return coalesced_search()
+        if self._revalidates(stale_entry):
+            cast(StaleSearchCache, self._stale_cache).refresh(cache_key, coalesced_search)
+            return stale_entry.value
+
+        try:
+            return coalesced_search()
+        except Exception:
+            return _marked_stale(stale_entry.value)
+
+    def _guarded(self, call: Callable[[], T]) -> T:
+        """Call the repository through the circuit breaker, if any."""
+        if self._circuit_breaker is None:
+            return call()
+        return self._circuit_breaker.call(call)
+
+    def _list_page(self, *args: Any, page: int, per_page: int, facets: bool, **kwargs: Any) -> ProductsPage:
+        """Search a page of products in the repository, with the cached facets of the search if any."""
+        if not facets or self._facet_cache is None:
+            return self._repository.list_page(*args, page=page, per_page=per_page, facets=facets, **kwargs)
+
+        facets_key, facets_kwargs = _facets_search(*args, **kwargs)
+        cached_facets: Facets | None = self._facet_cache.get(facets_key)
+        if cached_facets is None:
+            version: int = self._facet_cache.version
+            products_page: ProductsPage = self._repository.list_page(
+                *args,
+                page=page,
+                per_page=per_page,
+                facets=True,
+                **kwargs,
+            )
+            self._facet_cache.set(facets_key, products_page.facets, version)
+            return products_page
+
+        self._facet_cache.refresh(
+            facets_key,
+            lambda: self._guarded(lambda: self._repository.facet_counts(*args, **facets_kwargs)),
+        )
+        return self._repository.list_page(*args, page=page, per_page=per_page, **kwargs).model_copy(
+            update={'facets': cached_facets},
+        )
+
+    def iter_all(self, *args: Any, **kwargs: Any) -> Iterator[Product]:
+        """Iterate over every product found by a search page by page, e.g. for exports (not cached).
+
+        Args:
+            *args (Any): additional arguments.
+            **kwargs (Any): search key-word arguments.
+
+        Yields:
+            Product: every product found.
+
+        """
+        yield from self._repository.iter_all(*args, **kwargs)
+
+    def iter_batches(self, *args: Any, **kwargs: Any) -> Iterator[ProductBatch]:
+        """Iterate over every product found by a search with every field, in a compact batch per page (not cached).
+
+        Args:
+            *args (Any): additional arguments.
+            **kwargs (Any): search key-word arguments.
+
+        Yields:
+            ProductBatch: products of every page.
+
+        """
+        yield from self._repository.iter_batches(*args, **kwargs)
+
+    def suggest(self, q: str, limit: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, by title or SKU prefix, most purchased first.
+
+        Suggestions of a query extending a cached query whose candidates are complete are filtered locally from
+        them, otherwise they are searched with the depth of the suggestion cache and cached.
+
+        Args:
+            q (str): query typed.
+            limit (int): max number of products suggested.
+
+        Returns:
+            Suggestions: products suggested with the number of products matching the query.
+
+        """
+        if not q.strip():
+            return Suggestions()
+        suggestions: Suggestions | None = self._cached_suggestions(q, limit)
+        if suggestions is None:
+            depth: int = self._suggestions_depth(limit)
+            suggestions = self._cache_suggestions(
+                q,
+                self._guarded(lambda: self._repository.suggest(q, per_page=depth)),
+                limit,
+            )
+
+        return suggestions
+
+    def _search(self, sku: str | None = None, *args: Any, **kwargs: Any) -> Product | None | list[Product]:
         if sku is not None:
             return self._repository.get(sku=sku)
 
         return self._repository.list(*args, **kwargs)
+
+
+class AsyncProductSearcher(ProductSearcherCaches):
+    """Asynchronous product searcher service, see ProductSearcherCaches for its attributes.
+    """
+    def __init__(self, repository: AsyncAbstractProductRepository, **kwargs: Any):
+        """Constructor.
+
+        Args:
+            repository (AsyncAbstractProductRepository): repository to search products.
+            **kwargs (Any): caches, catalog versions, single flight and circuit breaker, see ProductSearcherCaches.
+
+        """
+        super().__init__(**kwargs)
+        self._repository: AsyncAbstractProductRepository = repository
+
+    async def __call__(self, sku: str | None = None, *args: Any, **kwargs: Any) -> Product | None | list[Product]:
+        """Search products, see ProductSearcher.__call__."""
+        cache_key: str = search_cache_key(sku, *args, **kwargs)
+        products: Product | None | list[Product] = self._cached(cache_key)
+        if products is not None:
+            return products
+
+        return await self._coalesced(cache_key, lambda: self._search(sku, *args, **kwargs))
+
+    async def get_many(self, skus: Iterable[str]) -> ProductsBySku:
+        """Get products of several SKUs, see ProductSearcher.get_many."""
+        self._sync_catalog_version()
+        return await self._guarded(lambda: self._repository.get_many(skus))
+
+    async def list_page(
+            self,
+            *args: Any,
+            page: int = 1,
+            per_page: int = 10,
+            facets: bool = False,
+            **kwargs: Any,
+    ) -> ProductsPage:
+        """Search a page of products, see ProductSearcher.list_page."""
+        cache_key: str = self._page_cache_key(*args, page=page, per_page=per_page, facets=facets, **kwargs)
+        products_page: ProductsPage | None = self._cached(cache_key)
+        if products_page is not None:
+            return products_page
+
+        return await self._coalesced(
+            cache_key,
+            lambda: self._list_page(*args, page=page, per_page=per_page, facets=facets, **kwargs),
+        )
+
+    async def _coalesced(self, cache_key: str, search: Callable[[], Awaitable[T]]) -> T:
+        """Search once for identical concurrent searches and cache the result, see ProductSearcher._coalesced."""
+        generation: int = self._generation
+
+        async def cached_search() -> T:
+            stale_version: int = self._stale_version()
+            return self._cache_result(cache_key, await self._guarded(search), generation, stale_version)
+
+        async def coalesced_search() -> T:
+            if self._single_flight is None:
+                return await cached_search()
+            return await self._single_flight.do_async(self._flight_key(cache_key, generation), cached_search)
+
+        stale_entry: StaleEntry | None = self._stale_entry(cache_key)
+        if stale_entry is None:
+            return await coalesced_search()
+        if self._revalidates(stale_entry):
+            cast(StaleSearchCache, self._stale_cache).refresh_async(cache_key, coalesced_search)
+            return stale_entry.value
+
+        try:
+            return await coalesced_search()
+        except Exception:
+            return _marked_stale(stale_entry.value)
+
+    async def _guarded(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Call the repository through the circuit breaker, if any."""
+        if self._circuit_breaker is None:
+            return await call()
+        return await self._circuit_breaker.call_async(call)
+
+    async def _list_page(self, *args: Any, page: int, per_page: int, facets: bool, **kwargs: Any) -> ProductsPage:
+        """Search a page of products in the repository, see ProductSearcher._list_page."""
+        if not facets or self._facet_cache is None:
+            return await self._repository.list_page(*args, page=page, per_page=per_page, facets=facets, **kwargs)
+
+        facets_key, facets_kwargs = _facets_search(*args, **kwargs)
+        cached_facets: Facets | None = self._facet_cache.get(facets_key)
+        if cached_facets is None:
+            version: int = self._facet_cache.version
+            products_page: ProductsPage = await self._repository.list_page(
+                *args,
+                page=page,
+                per_page=per_page,
+                facets=True,
+                **kwargs,
+            )
+            self._facet_cache.set(facets_key, products_page.facets, version)
+            return products_page
+
+        self._facet_cache.refresh_async(
+            facets_key,
+            lambda: self._guarded(lambda: self._repository.facet_counts(*args, **facets_kwargs)),
+        )
+        return (await self._repository.list_page(*args, page=page, per_page=per_page, **kwargs)).model_copy(
+            update={'facets': cached_facets},
+        )
+
+    async def iter_all(self, *args: Any, **kwargs: Any) -> AsyncIterator[Product]:
+        """Iterate over every product found by a search, see ProductSearcher.iter_all."""
+        async for product in self._repository.iter_all(*args, **kwargs):
+            yield product
+
+    async def iter_batches(self, *args: Any, **kwargs: Any) -> AsyncIterator[ProductBatch]:
+        """Iterate over every product found by a search in a batch per page, see ProductSearcher.iter_batches."""
+        async for batch in self._repository.iter_batches(*args, **kwargs):
+            yield batch
+
+    async def suggest(self, q: str, limit: int = 10) -> Suggestions:
+        """Products suggested for a query being typed, see ProductSearcher.suggest."""
+        if not q.strip():
+            return Suggestions()
+        suggestions: Suggestions | None = self._cached_suggestions(q, limit)
+        if suggestions is None:
+            depth: int = self._suggestions_depth(limit)
+            suggestions = self._cache_suggestions(
+                q,
+                await self._guarded(lambda: self._repository.suggest(q, per_page=depth)),
+                limit,
+            )
+
+        return suggestions
+
+    async def _search(self, sku: str | None = None, *args: Any, **kwargs: Any) -> Product | None | list[Product]:
+        if sku is not None:
+            return await self._repository.get(sku=sku)
+
+        return await self._repository.list(*args, **kwargs)
@@ -0,0 +1,248 @@
+"""Startup module.
+
+This module define the startup of a worker: it waits for the product repository with exponential backoff, warms it
+up and replays the most popular searches, so the worker reports ready once its first responses are as fast as the
+next ones.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from store_catalog.adapters.repository import AbstractProductRepository
+
+STARTING: str = 'starting'
+WARMING_UP: str = 'warming_up'
+READY: str = 'ready'
+FAILED: str = 'failed'
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class RepositoryUnavailableError(Exception):
+    """Product repository not healthy before the startup timeout."""
+
+
+def backoff_delays(initial_seconds: float, max_seconds: float, multiplier: float = 2.0) -> Iterator[float]:
+    """Exponential delays between retries, with jitter so workers started together do not retry together.
+
+    Args:
+        initial_seconds (float): first delay.
+        max_seconds (float): max delay.
+        multiplier (float): growth of the delay after every retry.
+
+    Yields:
+        float: delay before the next retry, between half and the whole of the exponential delay.
+
+    """
+    delay: float = initial_seconds
+    while True:
+        yield delay / 2 + random.uniform(0, delay / 2)
+        delay = min(delay * multiplier, max_seconds)
+
+
+def wait_until_healthy(
+        is_healthy: Callable[[], bool],
+        timeout_seconds: float,
+        initial_delay_seconds: float = 0.1,
+        max_delay_seconds: float = 5.0,
+) -> float:
+    """Check health until healthy, with exponential backoff between checks.
+
+    Args:
+        is_healthy (Callable[[], bool]): health check, False (not an error) if unhealthy.
+        timeout_seconds (float): max time checking.
+        initial_delay_seconds (float): delay after the first failed check.
+        max_delay_seconds (float): max delay between checks.
+
+    Returns:
+        float: seconds until healthy.
+
+    Raises:
+        RepositoryUnavailableError: if not healthy before the timeout.
+
+    """
+    start: float = time.monotonic()
+    for delay in backoff_delays(initial_delay_seconds, max_delay_seconds):
+        if is_healthy():
+            return time.monotonic() - start
+        remaining_seconds: float = start + timeout_seconds - time.monotonic()
+        if remaining_seconds <= 0:
+            break
+        time.sleep(min(delay, remaining_seconds))
+
+    raise RepositoryUnavailableError(f'Product repository not healthy after {timeout_seconds}s')
+
+
+def top_queries(path: str | Path | None, top_n: int) -> tuple[str, ...]:
+    """Queries of a file (one per line, most popular first, e.g. exported from search analytics), with the landing
+    page (empty query) first.
+
+    Args:
+        path (str | Path, optional): file of queries, only the landing page if None, empty or the file cannot be
+            read (logged, so a worker starts anyway).
+        top_n (int): max number of queries of the file.
+
+    Returns:
+        tuple[str, ...]: distinct queries, the landing page first.
+
+    """
+    queries: dict[str, None] = {'': None}
+    if not path:
+        return tuple(queries)
+
+    try:
+        with open(path, encoding='utf-8') as queries_file:
+            for line in queries_file:
+                if len(queries) > top_n:
+                    break
+                queries.setdefault(line.strip(), None)
+    except (OSError, UnicodeDecodeError) as error:
+        logger.warning('Warm-up queries not read from %s, only the landing page is replayed: %s', path, error)
+        return ('',)
+
+    return tuple(queries)
+
+
+@dataclass(frozen=True)
+class StartupReport:
+    """Snapshot of a worker startup.
+
+    Attributes:
+        state (str): ``starting``, ``warming_up``, ``ready`` or ``failed``.
+        healthy_seconds (float, optional): seconds until the repository was healthy.
+        warm_up_seconds (float, optional): seconds warming up the repository and replaying queries.
+        queries (int): queries replayed.
+        failed_queries (int): queries replayed with an error (the worker is ready anyway).
+        error (str, optional): error of a failed startup.
+    """
+    state: str
+    healthy_seconds: float | None = None
+    warm_up_seconds: float | None = None
+    queries: int = 0
+    failed_queries: int = 0
+    error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+
+class Startup:
+    """Startup of a worker, reporting its readiness.
+
+    The repository is checked with exponential backoff until healthy, then warmed up (e.g. dimensions are loaded)
+    and the top queries are replayed (e.g. requesting their first catalog page), so their searches, facets and
+    rendered rows are cached before the worker reports ready. A failed startup is started again by the next ``start``.
+
+    Attributes:
+        _repository (AbstractProductRepository): repository to wait for and warm up.
+        _replay (Callable[[str], None], optional): replay of a query, queries are not replayed if None.
+        _queries (Sequence[str]): queries to replay, most popular first.
+        _timeout_seconds (float): max time waiting for the repository.
+        _initial_delay_seconds (float): delay after the first failed health check.
+        _max_delay_seconds (float): max delay between health checks.
+        _report (StartupReport): current state of the startup.
+
+    """
+
+    def __init__(
+            self,
+            repository: AbstractProductRepository,
+            replay: Callable[[str], None] | None = None,
+            queries: Sequence[str] = (),
+            timeout_seconds: float = 60,
+            initial_delay_seconds: float = 0.1,
+            max_delay_seconds: float = 5.0,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            repository (AbstractProductRepository): repository to wait for and warm up.
+            replay (Callable[[str], None], optional): replay of a query, queries are not replayed if None.
+            queries (Sequence[str]): queries to replay, most popular first.
+            timeout_seconds (float): max time waiting for the repository.
+            initial_delay_seconds (float): delay after the first failed health check.
+            max_delay_seconds (float): max delay between health checks.
+
+        """
+        self._repository: AbstractProductRepository = repository
+        self._replay: Callable[[str], None] | None = replay
+        self._queries: Sequence[str] = queries
+        self._timeout_seconds: float = timeout_seconds
+        self._initial_delay_seconds: float = initial_delay_seconds
+        self._max_delay_seconds: float = max_delay_seconds
+        self._report: StartupReport = StartupReport(state=STARTING)
+        self._thread: threading.Thread | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def report(self) -> StartupReport:
+        return self._report
+
+    def start(self) -> StartupReport:
+        """Run the startup in a background thread, unless it is running or ready.
+
+        Returns:
+            StartupReport: current state of the startup.
+
+        """
+        with self._lock:
+            if self._thread is None or (self._report.state == FAILED and not self._thread.is_alive()):
+                self._report = StartupReport(state=STARTING)
+                self._thread = threading.Thread(target=self.run, name='catalog-startup', daemon=True)
+                self._thread.start()
+
+            return self._report
+
+    def run(self) -> StartupReport:
+        """Run the startup in the calling thread, e.g. before a worker accepts requests.
+
+        Returns:
+            StartupReport: final state of the startup, ``ready`` or ``failed``.
+
+        """
+        try:
+            healthy_seconds: float = wait_until_healthy(
+                self._repository.is_healthy,
+                self._timeout_seconds,
+                self._initial_delay_seconds,
+                self._max_delay_seconds,
+            )
+        except RepositoryUnavailableError as error:
+            self._report = StartupReport(state=FAILED, error=str(error))
+            return self._report
+
+        self._report = StartupReport(state=WARMING_UP, healthy_seconds=healthy_seconds)
+        start: float = time.monotonic()
+        try:
+            self._repository.warm_up()
+        except Exception as error:
+            self._report = StartupReport(state=FAILED, healthy_seconds=healthy_seconds, error=repr(error))
+            return self._report
+
+        queries: int = 0
+        failed_queries: int = 0
+        if self._replay is not None:
+            for query in self._queries:
+                queries += 1
+                try:
+                    self._replay(query)
+                except Exception:
+                    # A failed query is searched again by its first request, it does not delay the worker
+                    failed_queries += 1
+
+        self._report = StartupReport(
+            state=READY,
+            healthy_seconds=healthy_seconds,
+            warm_up_seconds=time.monotonic() - start,
+            queries=queries,
+            failed_queries=failed_queries,
+        )
+        return self._report
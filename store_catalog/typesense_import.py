@@ -0,0 +1,83 @@
+"""Typesense catalog import command.
+
+Stream the catalog JSONL files into Typesense collections, e.g.:
+
+    python store_catalog/typesense_import.py tests/catalog_files --batch-size 1000 --concurrency 4
+
+With ``--reindex`` the files are imported into new versions of the collections, swapped in once imported, so the
+catalog is replaced without search outage.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from djangoproject.django_project import container
+from store_catalog.adapters.typesense_importer import ImportReport
+from store_catalog.adapters.typesense_importer import TypesenseCatalogImporter
+from store_catalog.adapters.typesense_migrator import MigrationError
+from store_catalog.adapters.typesense_migrator import MigrationReport
+from store_catalog.typesense_migrations import MIGRATIONS
+from store_catalog.typesense_migrations import warn_if_version_not_shared
+
+# Settings are needed by the shared Django search cache invalidated after import
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoproject.django_project.settings')
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Import catalog JSONL files to Typesense.')
+    parser.add_argument('catalog_dir', type=Path, help='directory with catalog JSONL files')
+    parser.add_argument('--batch-size', type=int, default=container.config.TYPESENSE_IMPORT_BATCH_SIZE())
+    parser.add_argument('--concurrency', type=int, default=container.config.TYPESENSE_IMPORT_CONCURRENCY())
+    parser.add_argument('--action', choices=('create', 'upsert', 'update', 'emplace'), default='upsert')
+    parser.add_argument('--reindex', action='store_true', help='import into new collections swapped once imported')
+    args: argparse.Namespace = parser.parse_args()
+
+    catalog_importer: TypesenseCatalogImporter = container.catalog_importer(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        action=args.action,
+    )
+    warn_if_version_not_shared()
+    if args.reindex:
+        return reindex(catalog_importer, args.catalog_dir)
+
+    succeeded: bool = True
+    for report in catalog_importer.import_catalog(args.catalog_dir):
+        print_report(report)
+        succeeded = succeeded and not report.failed and not report.invalid
+
+    return 0 if succeeded else 1
+
+
+def reindex(catalog_importer: TypesenseCatalogImporter, catalog_dir: Path) -> int:
+    try:
+        report: MigrationReport = container.schema_migrator(importer=catalog_importer).reindex(catalog_dir, MIGRATIONS)
+    except MigrationError as error:
+        print(f'Reindex failed, collections not swapped: {error}')
+        return 1
+
+    for import_report in report.imports:
+        print_report(import_report)
+    print(', '.join(f'{alias} -> {name}' for alias, name in report.collections.items()))
+    return 0 if not any(import_report.invalid for import_report in report.imports) else 1
+
+
+def print_report(report: ImportReport) -> None:
+    print(
+        f'{report.file_name} -> {report.collection_name}: {report.imported} imported, {report.failed} failed, '
+        f'{report.invalid} invalid, {report.batches} batches in {report.elapsed_seconds:.2f}s '
+        f'({report.docs_per_second:.0f} docs/s)'
+    )
+    for invalid_line in report.invalid_lines:
+        print(f'  invalid {invalid_line}')
+    for batch_failure in report.batch_failures:
+        print(
+            f'  batch {batch_failure.batch_number} (from line {batch_failure.first_line}): '
+            f'{batch_failure.failed} failed, {"; ".join(batch_failure.errors)}'
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
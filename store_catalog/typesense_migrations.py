@@ -1,76 +1,178 @@
+"""Typesense migrations command.
+
+Apply the pending schema migrations of Typesense collections, served through aliases swapped once their new
+versioned collections are filled, e.g.:
+
+    python store_catalog/typesense_migrations.py
+    python store_catalog/typesense_migrations.py --status
+"""
+
+import argparse
+import os
+import sys
+
 from djangoproject.django_project import container
-from store_catalog.adapters.typesense_database import TypesenseDatabase
-
-typesense_database: TypesenseDatabase = container.typesense_database()
-
-
-with typesense_database.session() as session:
-    # Create collections
-    # Product Manufacturers
-    session.collections.create({
-        'name': 'product_manufacturers',
-        'fields': [
-            {'name': 'title', 'type': 'string'},
-            {'name': 'image_url', 'type': 'string', 'optional': True},
-        ],
-    })
-
-    # Product Categories
-    session.collections.create({
-        'name': 'product_categories',
-        'fields': [
-            {'name': 'title', 'type': 'string'},
-            {'name': 'subcategory', 'type': 'bool'},
+from store_catalog.adapters.typesense_migrator import Migration
+from store_catalog.adapters.typesense_migrator import MigrationError
+from store_catalog.adapters.typesense_migrator import MigrationReport
+from store_catalog.adapters.typesense_migrator import TypesenseMigrator
+
+# Settings are needed by the shared Django search cache invalidated after a migration
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoproject.django_project.settings')
+
+# Migrations in version order, schemas are named after the alias of their collection and reference aliases
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description='Create catalog collections',
+        schemas=(
+            # Product Categories
+            {
+                'name': 'product_categories',
+                'fields': [
+                    {'name': 'title', 'type': 'string'},
+                    {'name': 'subcategory', 'type': 'bool'},
+                    {
+                        'name': 'product_category_id',
+                        'type': 'string',
+                        'optional': True,
+                        'facet': True,
+                        'reference': 'product_categories.id',
+                    },
+                ],
+            },
+            # Product Manufacturers
             {
-                'name': 'product_category_id',
-                'type': 'string',
-                'optional': True,
-                'facet': True,
-                'reference': 'product_categories.id',
+                'name': 'product_manufacturers',
+                'fields': [
+                    {'name': 'title', 'type': 'string'},
+                    {'name': 'image_url', 'type': 'string', 'optional': True},
+                ],
             },
-        ],
-    })
-
-    # Product Models
-    session.collections.create({
-        'name': 'product_models',
-        'fields': [
-            {'name': 'sku', 'type': 'string'},
-            {'name': 'title', 'type': 'string'},
-            {'name': 'description', 'type': 'string'},
-            {'name': 'image_url', 'type': 'string'},
+            # Product Models
             {
-                'name': 'product_category_id',
-                'type': 'string',
-                'facet': True,
-                'reference': 'product_categories.id',
+                'name': 'product_models',
+                'fields': [
+                    {'name': 'sku', 'type': 'string'},
+                    {'name': 'title', 'type': 'string'},
+                    {'name': 'description', 'type': 'string'},
+                    {'name': 'image_url', 'type': 'string'},
+                    {
+                        'name': 'product_category_id',
+                        'type': 'string',
+                        'facet': True,
+                        'reference': 'product_categories.id',
+                    },
+                    {
+                        'name': 'product_manufacturer_id',
+                        'type': 'string',
+                        'facet': True,
+                        'reference': 'product_manufacturers.id',
+                    },
+                    {'name': 'min_price', 'type': 'float'},
+                ],
             },
+            # Products
             {
-                'name': 'product_manufacturer_id',
-                'type': 'string',
-                'facet': True,
-                'reference': 'product_manufacturers.id',
+                'name': 'products',
+                'fields': [
+                    {'name': 'sku', 'type': 'string'},
+                    {'name': 'title', 'type': 'string'},
+                    {'name': 'description', 'type': 'string'},
+                    {'name': 'image_url', 'type': 'string'},
+                    {'name': 'price', 'type': 'float'},
+                    {
+                        'name': 'product_model_id',
+                        'type': 'string',
+                        'facet': True,
+                        'reference': 'product_models.id',
+                    },
+                    {'name': 'stock', 'type': 'bool'},
+                    {'name': 'num_purchases', 'type': 'int32'},
+                ],
             },
-            {'name': 'min_price', 'type': 'float'},
-        ],
-    })
-
-    # Products
-    session.collections.create({
-        'name': 'products',
-        'fields': [
-            {'name': 'sku', 'type': 'string'},
-            {'name': 'title', 'type': 'string'},
-            {'name': 'description', 'type': 'string'},
-            {'name': 'image_url', 'type': 'string'},
-            {'name': 'price', 'type': 'float'},
+        ),
+    ),
+    Migration(
+        version=2,
+        description='Rank products by popularity by default and stop indexing image URLs',
+        schemas=(
+            # Products, most purchased first by default (numeric fields are sortable without declaring it), image URLs
+            # are stored but not indexed
             {
-                'name': 'product_model_id',
-                'type': 'string',
-                'facet': True,
-                'reference': 'product_models.id',
+                'name': 'products',
+                'fields': [
+                    {'name': 'sku', 'type': 'string'},
+                    {'name': 'title', 'type': 'string'},
+                    {'name': 'description', 'type': 'string'},
+                    {'name': 'image_url', 'type': 'string', 'index': False, 'optional': True},
+                    {'name': 'price', 'type': 'float'},
+                    {
+                        'name': 'product_model_id',
+                        'type': 'string',
+                        'facet': True,
+                        'reference': 'product_models.id',
+                    },
+                    {'name': 'stock', 'type': 'bool'},
+                    {'name': 'num_purchases', 'type': 'int32'},
+                ],
+                'default_sorting_field': 'num_purchases',
             },
-            {'name': 'stock', 'type': 'bool'},
-            {'name': 'num_purchases', 'type': 'int32'},
-        ],
-    })
+        ),
+    ),
+)
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Apply Typesense schema migrations.')
+    parser.add_argument('--status', action='store_true', help='print applied and pending migrations only')
+    parser.add_argument('--keep-replaced', action='store_true', help='keep collections replaced by a migration')
+    parser.add_argument('--batch-size', type=int, default=container.config.TYPESENSE_IMPORT_BATCH_SIZE())
+    parser.add_argument('--concurrency', type=int, default=container.config.TYPESENSE_IMPORT_CONCURRENCY())
+    args: argparse.Namespace = parser.parse_args()
+
+    migrator: TypesenseMigrator = container.schema_migrator(
+        importer=container.catalog_importer(batch_size=args.batch_size, concurrency=args.concurrency),
+        drop_replaced=not args.keep_replaced,
+    )
+    if args.status:
+        applied: list[int] = migrator.applied_versions()
+        for migration in MIGRATIONS:
+            print(f'{migration.version} {"applied" if migration.version in applied else "pending"}: '
+                  f'{migration.description}')
+        return 0
+
+    warn_if_version_not_shared()
+    try:
+        for report in migrator.migrate(MIGRATIONS):
+            print_report(report)
+    except MigrationError as error:
+        print(f'Migration failed: {error}')
+        return 1
+
+    return 0
+
+
+def warn_if_version_not_shared() -> None:
+    """Warn that web workers keep serving their cached catalog if the catalog version bumped by a command is not
+    shared with them, they see the change once their caches expire (or when they restart), and that their product
+    updates are not held while collections are copied (the migration lock shares the catalog version backend)."""
+    if not container.catalog_versions().shared or not container.migration_lock().shared:
+        print(
+            'Warning: the catalog version is not shared with web workers, their caches are not invalidated and '
+            'their product updates are not held while collections are copied. Set CATALOG_VERSION_BACKEND=django '
+            'with a Django cache shared by processes (CACHE_BACKEND, CACHE_LOCATION).',
+            file=sys.stderr,
+        )
+
+
+def print_report(report: MigrationReport) -> None:
+    print(f'{report.version} {report.description}: applied in {report.elapsed_seconds:.2f}s')
+    for alias, collection_name in report.collections.items():
+        print(f'  {alias} -> {collection_name}')
+    for imported in report.imports:
+        print(f'  {imported.file_name} -> {imported.collection_name}: {imported.imported} documents')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from store_catalog.adapters.catalog_version import CatalogVersion
+from store_catalog.adapters.catalog_version import LocalCatalogVersionStore
+
+
+def test_etag_changes_with_updates_after_the_last_change() -> None:
+    assert CatalogVersion(version=3, modified_at=1000.5).etag == '3-1000'
+    assert CatalogVersion(version=3, modified_at=1000.5, updated_at=960.0).etag == '3-1000'
+    assert CatalogVersion(version=3, modified_at=1000.5, updated_at=1020.0).etag == '3-1000-1020'
+    assert CatalogVersion(version=3, modified_at=1000.5, updated_at=1020.0).key == '3-1000'
+    assert CatalogVersion(version=3, modified_at=1000.5, updated_at=1020.0).last_modified_at == 1020.0
+
+
+def test_bump_changes_the_version() -> None:
+    catalog_versions: LocalCatalogVersionStore = LocalCatalogVersionStore()
+    version: CatalogVersion = catalog_versions.get()
+
+    bumped: CatalogVersion = catalog_versions.bump()
+
+    assert bumped.version == version.version + 1
+    assert bumped.modified_at >= version.modified_at
+    assert catalog_versions.get() == bumped
+
+
+def test_touch_keeps_the_version_and_records_the_update() -> None:
+    catalog_versions: LocalCatalogVersionStore = LocalCatalogVersionStore(updates_window_seconds=0)
+    version: CatalogVersion = catalog_versions.get()
+
+    touched: CatalogVersion = catalog_versions.touch()
+
+    assert touched.key == version.key
+    assert touched.updated_at >= version.modified_at
+    assert touched.last_modified_at == touched.updated_at
+
+
+def test_updates_of_the_window_of_the_last_change_keep_the_etag() -> None:
+    catalog_versions: LocalCatalogVersionStore = LocalCatalogVersionStore(updates_window_seconds=10 ** 9)
+    version: CatalogVersion = catalog_versions.get()
+
+    assert catalog_versions.touch().etag == version.etag
@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+import pytest
+
+from store_catalog.adapters.circuit_breaker import CLOSED
+from store_catalog.adapters.circuit_breaker import HALF_OPEN
+from store_catalog.adapters.circuit_breaker import OPEN
+from store_catalog.adapters.circuit_breaker import CircuitBreaker
+from store_catalog.adapters.circuit_breaker import CircuitOpenError
+
+OPEN_SECONDS: float = 0.05
+
+
+class EngineError(Exception):
+    """Failure of the search engine."""
+
+
+def _circuit_breaker(
+        slow_call_seconds: float = 2.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = OPEN_SECONDS,
+        half_open_calls: int = 2,
+) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_rate_threshold=0.5,
+        slow_call_seconds=slow_call_seconds,
+        slow_call_rate_threshold=slow_call_rate_threshold,
+        window_size=4,
+        min_calls=4,
+        open_seconds=open_seconds,
+        half_open_calls=half_open_calls,
+        failure_errors=(EngineError,),
+    )
+
+
+def _fail() -> None:
+    raise EngineError('Typesense is down')
+
+
+def _opened(circuit_breaker: CircuitBreaker) -> CircuitBreaker:
+    for _ in range(4):
+        with pytest.raises(EngineError):
+            circuit_breaker.call(_fail)
+    assert circuit_breaker.state == OPEN
+    return circuit_breaker
+
+
+def _half_opened(circuit_breaker: CircuitBreaker) -> CircuitBreaker:
+    _opened(circuit_breaker)
+    time.sleep(OPEN_SECONDS)
+    assert circuit_breaker.state == HALF_OPEN
+    return circuit_breaker
+
+
+def test_stays_closed_below_min_calls() -> None:
+    circuit_breaker: CircuitBreaker = _circuit_breaker()
+
+    for _ in range(3):
+        with pytest.raises(EngineError):
+            circuit_breaker.call(_fail)
+
+    assert circuit_breaker.state == CLOSED
+    assert circuit_breaker.stats.failure_rate == 1.0
+
+
+def test_opens_once_failure_rate_reaches_threshold() -> None:
+    circuit_breaker: CircuitBreaker = _circuit_breaker()
+
+    assert circuit_breaker.call(lambda: 'page') == 'page'
+    assert circuit_breaker.call(lambda: 'page') == 'page'
+    with pytest.raises(EngineError):
+        circuit_breaker.call(_fail)
+    assert circuit_breaker.state == CLOSED
+    with pytest.raises(EngineError):
+        circuit_breaker.call(_fail)
+
+    assert circuit_breaker.state == OPEN
+    assert circuit_breaker.stats.opened == 1
+
+
+def test_errors_not_of_the_engine_are_not_failures() -> None:
+    circuit_breaker: CircuitBreaker = _circuit_breaker()
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            circuit_breaker.call(lambda: int('not a number'))
+
+    assert circuit_breaker.state == CLOSED
+
+
+def test_opens_once_slow_call_rate_reaches_threshold() -> None:
+    circuit_breaker: CircuitBreaker = _circuit_breaker(slow_call_seconds=0, slow_call_rate_threshold=1.0)
+
+    for _ in range(4):
+        circuit_breaker.call(lambda: 'page')
+
+    assert circuit_breaker.state == OPEN
+
+
+def test_open_rejects_calls_without_making_them() -> None:
+    circuit_breaker: CircuitBreaker = _opened(_circuit_breaker(open_seconds=60))
+    calls: list[int] = []
+
+    with pytest.raises(CircuitOpenError) as error:
+        circuit_breaker.call(lambda: calls.append(1))
+
+    assert calls == []
+    assert 0 < error.value.retry_after_seconds <= 60
+    assert circuit_breaker.stats.rejected == 1
+
+
+def test_half_open_closes_once_probes_succeed() -> None:
+    circuit_breaker: CircuitBreaker = _half_opened(_circuit_breaker())
+
+    circuit_breaker.call(lambda: 'page')
+    assert circuit_breaker.state == HALF_OPEN
+    circuit_breaker.call(lambda: 'page')
+
+    assert circuit_breaker.state == CLOSED
+    assert circuit_breaker.stats.calls == 0
+
+
+def test_half_open_opens_again_if_a_probe_fails() -> None:
+    circuit_breaker: CircuitBreaker = _half_opened(_circuit_breaker())
+
+    circuit_breaker.call(lambda: 'page')
+    with pytest.raises(EngineError):
+        circuit_breaker.call(_fail)
+
+    assert circuit_breaker.state == OPEN
+    assert circuit_breaker.stats.opened == 2
+
+
+def test_half_open_rejects_calls_beyond_probes() -> None:
+    circuit_breaker: CircuitBreaker = _half_opened(_circuit_breaker())
+
+    async def probes() -> list[str | BaseException]:
+        started: asyncio.Event = asyncio.Event()
+
+        async def probe() -> str:
+            started.set()
+            await asyncio.sleep(0.01)
+            return 'page'
+
+        first: asyncio.Task = asyncio.create_task(circuit_breaker.call_async(probe))
+        second: asyncio.Task = asyncio.create_task(circuit_breaker.call_async(probe))
+        await started.wait()
+        with pytest.raises(CircuitOpenError):
+            await circuit_breaker.call_async(probe)
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(probes()) == ['page', 'page']
+    assert circuit_breaker.state == CLOSED
+
+
+def test_cancelled_probe_lets_another_probe_through() -> None:
+    circuit_breaker: CircuitBreaker = _half_opened(_circuit_breaker(half_open_calls=1))
+
+    async def cancelled_probe() -> None:
+        probe: asyncio.Task = asyncio.create_task(circuit_breaker.call_async(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    async def page() -> str:
+        return 'page'
+
+    asyncio.run(cancelled_probe())
+    assert circuit_breaker.state == HALF_OPEN
+    assert asyncio.run(circuit_breaker.call_async(page)) == 'page'
+    assert circuit_breaker.state == CLOSED
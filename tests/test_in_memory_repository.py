@@ -0,0 +1,117 @@
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+from store_catalog.adapters.in_memory_repository import InMemoryCatalog
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.domain.model import FacetValue
+from store_catalog.domain.model import ProductsPage
+
+CATALOG_DIR: Path = Path(__file__).parent / 'catalog_files'
+
+
+def _skus(products_page: ProductsPage) -> list[str]:
+    return [product.sku for product in products_page.products]
+
+
+def test_filters_are_combined() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    assert _skus(repository.list_page(filter_by='price:<600')) == ['PC45D020000200', 'PC45D100000200']
+    assert _skus(repository.list_page(filter_by='price:[600..1000] && $product_models(product_manufacturer_id:=[2])')) \
+        == ['ZT11142-T0E000FZ']
+    assert repository.list_page(filter_by='stock:false').found == 0
+
+
+def test_text_queries_match_titles_and_sku_prefixes() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    assert _skus(repository.list_page(q='Térmica')) == ['PC45D020000200', 'PC45D100000200', 'ZT11142-T0E000FZ']
+    assert _skus(repository.list_page(q='termica pc')) == ['PC45D020000200', 'PC45D100000200']
+    assert _skus(repository.list_page(q='zt411', query_by='sku')) == ['ZT41142-T0E00C0Z']
+
+
+def test_pages_are_sorted_and_sliced() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    first_page: ProductsPage = repository.list_page(sort_by='price:desc', per_page=2)
+    second_page: ProductsPage = repository.list_page(sort_by='price:desc', page=2, per_page=2)
+    last_page: ProductsPage = repository.list_page(sort_by='price:desc', page=3, per_page=2)
+
+    assert _skus(first_page) == ['ZT41142-T0E00C0Z', 'PBT9600-SRRBK10EU']
+    assert _skus(second_page) == ['ZT11142-T0E000FZ', 'PC45D020000200']
+    assert _skus(last_page) == ['PC45D100000200']
+    assert (first_page.found, first_page.pages) == (5, 3)
+    assert _skus(repository.list_page(q='termica', sort_by='price:asc', per_page=2)) == [
+        'PC45D100000200',
+        'PC45D020000200',
+    ]
+    assert _skus(repository.list_page(
+        sort_by='_eval($product_models(product_category_id:=[11])):desc,price:asc',
+        per_page=3,
+    )) == ['ZT11142-T0E000FZ', 'ZT41142-T0E00C0Z', 'PC45D100000200']
+
+
+def test_facets_count_the_products_found() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    products_page: ProductsPage = repository.list_page(q='termica', filter_by='price:<1000', per_page=1, facets=True)
+
+    assert products_page.facets == {
+        'category': [
+            FacetValue(value='8', label='Impresoras / Impresoras de Etiquetas RFID', count=2),
+            FacetValue(value='11', label='Impresoras / Impresoras de Etiquetas', count=1),
+        ],
+        'manufacturer': [
+            FacetValue(value='1', label='Honeywell', count=2),
+            FacetValue(value='2', label='Zebra', count=1),
+        ],
+    }
+    assert repository.list_page(q='termica').facets == {}
+
+
+def test_pages_beyond_the_catalog_are_empty() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    for filter_by, sort_by in (('', ''), ('stock:true', ''), ('', 'price:asc')):
+        products_page: ProductsPage = repository.list_page(
+            page=sys.maxsize,
+            per_page=10,
+            filter_by=filter_by,
+            sort_by=sort_by,
+        )
+
+        assert products_page.products == []
+        assert products_page.found == 5
+
+
+def _reloaded(repository: InMemoryProductRepository) -> InMemoryCatalog:
+    for thread in threading.enumerate():
+        if thread.name == 'in-memory-catalog':
+            thread.join(5)
+    return repository.catalog
+
+
+def test_changed_catalog_files_are_loaded_again_in_the_background(tmp_path: Path) -> None:
+    catalog_dir: Path = Path(shutil.copytree(CATALOG_DIR, tmp_path / 'catalog'))
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=catalog_dir)
+    repository.warm_up()
+
+    products_path: Path = catalog_dir / 'products.jsonl'
+    products_path.write_text(''.join(products_path.read_text(encoding='utf-8').splitlines(True)[:2]), 'utf-8')
+    repository.invalidate_cache()
+
+    # The loaded catalog is searched until the new one replaces it
+    assert repository.catalog.size in (5, 2)
+    assert _reloaded(repository).size == 2
+    assert repository.list_page().found == 2
+
+
+def test_unchanged_catalog_files_are_not_loaded_again() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+    catalog: InMemoryCatalog = repository.catalog
+
+    repository.invalidate_cache()
+
+    assert _reloaded(repository) is catalog
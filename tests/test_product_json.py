@@ -0,0 +1,77 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.adapters.product_batch import ProductBatch
+from store_catalog.adapters.product_json import ProductJsonEncoder
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductsPage
+
+CATALOG_DIR: Path = Path(__file__).parent / 'catalog_files'
+
+
+@pytest.fixture(scope='module')
+def products() -> list[Product]:
+    return InMemoryProductRepository(catalog_dir=CATALOG_DIR).list_page(per_page=10).products
+
+
+def test_only_selected_fields_are_encoded(products: list[Product]) -> None:
+    encoder: ProductJsonEncoder = ProductJsonEncoder(['sku', 'model.manufacturer.title'])
+
+    assert json.loads(encoder.product(products[0])) == {
+        'sku': 'PC45D020000200',
+        'model': {'manufacturer': {'title': 'Honeywell'}},
+    }
+    with pytest.raises(ValueError):
+        ProductJsonEncoder(['sku', 'weight'])
+
+
+def test_ndjson_lines_are_chunked(products: list[Product]) -> None:
+    encoder: ProductJsonEncoder = ProductJsonEncoder(['sku'], chunk_size=64)
+
+    chunks: list[bytes] = list(encoder.ndjson_chunks(products))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 64 for chunk in chunks[:-1])
+    assert [json.loads(line)['sku'] for line in b''.join(chunks).splitlines()] == [
+        product.sku for product in products
+    ]
+
+
+def test_batches_are_encoded_as_their_products(products: list[Product]) -> None:
+    encoder: ProductJsonEncoder = ProductJsonEncoder()
+    batches: list[ProductBatch] = [ProductBatch(products[:2]), ProductBatch(products[2:])]
+
+    assert b''.join(encoder.batches_ndjson_chunks(batches)) == b''.join(encoder.ndjson_chunks(products))
+
+
+def test_async_ndjson_chunks_are_the_same(products: list[Product]) -> None:
+    encoder: ProductJsonEncoder = ProductJsonEncoder(['sku', 'price'], chunk_size=64)
+
+    async def async_products() -> AsyncIterator[Product]:
+        for product in products:
+            yield product
+
+    async def chunks() -> list[bytes]:
+        return [chunk async for chunk in encoder.async_ndjson_chunks(async_products())]
+
+    assert asyncio.run(chunks()) == list(encoder.ndjson_chunks(products))
+
+
+def test_page_is_encoded_with_its_counts(products: list[Product]) -> None:
+    products_page: ProductsPage = ProductsPage(products=products[:2], found=5, page=1, per_page=2)
+
+    page: dict = json.loads(b''.join(ProductJsonEncoder(['sku']).page_chunks(products_page)))
+
+    assert page == {
+        'found': 5,
+        'page': 1,
+        'per_page': 2,
+        'pages': 3,
+        'stale': False,
+        'products': [{'sku': 'PC45D020000200'}, {'sku': 'PC45D100000200'}],
+    }
@@ -0,0 +1,37 @@
+import warnings
+
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.catalog_documents import product_documents
+from store_catalog.adapters.product_json import ProductJsonEncoder
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.domain.model import Product
+
+validated = TypesenseProductRepository._product_document_to_product
+trusted = TypesenseProductRepository._product_document_to_trusted_product
+
+
+def test_trusted_and_validated_products_are_encoded_alike() -> None:
+    encoder: ProductJsonEncoder = ProductJsonEncoder()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for product_document in product_documents():
+            assert encoder.product(trusted(product_document)) == encoder.product(validated(product_document))
+
+
+def test_trusted_references_have_int_ids() -> None:
+    product: Product = trusted(product_documents()[0])
+
+    assert isinstance(product.model.category.id_, int)
+    assert isinstance(product.model.category.category_parent.id_, int)  # type: ignore[union-attr]
+    assert isinstance(product.model.manufacturer.id_, int)
+
+
+def test_only_validated_products_reject_invalid_documents() -> None:
+    product_document: dict = {**product_documents()[0], 'image_url': 'not an url'}
+
+    with pytest.raises(ValidationError):
+        validated(product_document)
+    assert trusted(product_document).image_url == 'not an url'
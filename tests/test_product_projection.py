@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks.catalog_documents import product_documents
+from store_catalog.adapters.product_projection import LazyFieldsLoader
+from store_catalog.adapters.product_projection import ProductProjection
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.domain.model import Product
+
+
+def test_only_projected_fields_are_included() -> None:
+    assert ProductProjection(['title', 'model.manufacturer.title']).include_fields == (
+        'sku, title, $product_models(id, $product_manufacturers(title))'
+    )
+    assert ProductProjection(['model.category'], dimensions=True).include_fields == (
+        'sku, $product_models(product_category_id)'
+    )
+    with pytest.raises(ValueError):
+        ProductProjection(['model.weight'])
+
+
+def test_fields_left_out_are_not_set() -> None:
+    product: Product = ProductProjection(['title', 'model.manufacturer.title']).product(product_documents()[0])
+
+    assert product.title.startswith('Honeywell PC45')
+    assert product.model.manufacturer.title == 'Honeywell'
+    with pytest.raises(AttributeError):
+        product.price
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+def test_fields_left_out_are_loaded_once_for_every_product(trusted: bool) -> None:
+    documents: list[dict] = product_documents()
+    complete_products: dict[str, Product] = {
+        document['sku']: TypesenseProductRepository._product_document_to_product(document) for document in documents
+    }
+    fetches: list[list[str]] = []
+
+    def fetch(skus: list[str]) -> dict[str, Product]:
+        fetches.append(skus)
+        return {sku: complete_products[sku] for sku in skus}
+
+    lazy_fields: LazyFieldsLoader = LazyFieldsLoader(fetch)
+    projection: ProductProjection = ProductProjection(['title'], trusted=trusted)
+    products: list[Product] = [projection.product(document, lazy_fields) for document in documents]
+
+    assert [product.price for product in products] == [document['price'] for document in documents]
+    assert products[0].model.manufacturer.title == 'Honeywell'
+    assert fetches == [[document['sku'] for document in documents]]
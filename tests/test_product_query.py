@@ -0,0 +1,53 @@
+import pytest
+
+from store_catalog.adapters.product_facets import ProductFilters
+from store_catalog.adapters.product_query import POPULARITY_SORT
+from store_catalog.adapters.product_query import PRICE_ASC_SORT
+from store_catalog.adapters.product_query import ProductQuery
+from store_catalog.adapters.product_query import parse_query_by
+
+
+def test_default_query_finds_every_product_by_relevance() -> None:
+    assert ProductQuery(q='  ').search() == {'q': '*', 'query_by': 'title'}
+
+
+def test_weights_are_sent_only_if_they_differ() -> None:
+    assert ProductQuery(query_by=parse_query_by('title,sku')).search() == {'q': '*', 'query_by': 'title,sku'}
+    assert ProductQuery(query_by=parse_query_by('title:3, sku:2')).search() == {
+        'q': '*',
+        'query_by': 'title,sku',
+        'query_by_weights': '3,2',
+    }
+
+
+@pytest.mark.parametrize('query_by', ['price', 'title:0', 'title:x', ''])
+def test_invalid_query_fields_are_rejected(query_by: str) -> None:
+    with pytest.raises(ValueError):
+        parse_query_by(query_by)
+
+
+def test_filters_and_sort_are_pushed_down() -> None:
+    product_query: ProductQuery = ProductQuery(
+        q='termica',
+        filters=ProductFilters(manufacturer_ids=('1', '2'), min_price=100.0, in_stock=True),
+        sort=PRICE_ASC_SORT,
+    )
+
+    assert product_query.search() == {
+        'q': 'termica',
+        'query_by': 'title',
+        'filter_by': '$product_models(product_manufacturer_id:=[`1`,`2`]) && price:>=100.0 && stock:true',
+        'sort_by': 'price:asc',
+    }
+
+
+def test_products_in_stock_are_ranked_first() -> None:
+    assert ProductQuery(in_stock_first=True).sort_by() == '_eval(stock:true):desc,_text_match:desc,num_purchases:desc'
+    assert ProductQuery(sort=POPULARITY_SORT, in_stock_first=True).sort_by() == (
+        '_eval(stock:true):desc,num_purchases:desc'
+    )
+
+
+def test_unknown_sort_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        ProductQuery(sort='newest')
@@ -0,0 +1,158 @@
+from collections.abc import Mapping
+from pathlib import Path
+
+import pytest
+
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.adapters.migration_lock import LocalMigrationLock
+from store_catalog.adapters.product_updates import ProductUpdateBuffer
+from store_catalog.adapters.product_updates import ProductUpdatesHeldError
+from store_catalog.adapters.product_updates import ProductUpdatesOverflowError
+from store_catalog.domain.model import ProductsPage
+from store_catalog.domain.model import ProductsUpdate
+
+CATALOG_DIR: Path = Path(__file__).parent / 'catalog_files'
+
+
+class RecordingRepository(InMemoryProductRepository):
+    """Repository recording the bulk updates sent, failing the first ``failures`` of them."""
+
+    def __init__(self, failures: int = 0) -> None:
+        super().__init__(catalog_dir=CATALOG_DIR)
+        self.failures: int = failures
+        self.batches: list[dict[str, dict]] = []
+
+    def update_many(self, updates: Mapping[str, dict]) -> ProductsUpdate:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('Typesense is down')
+        self.batches.append(dict(updates))
+        return ProductsUpdate(updated=list(updates))
+
+
+def _buffer(
+        repository: RecordingRepository,
+        max_pending: int = 100,
+        put_timeout_seconds: float = 1.0,
+        migration_lock: LocalMigrationLock | None = None,
+) -> ProductUpdateBuffer:
+    # A long interval, so the flushing thread does not flush while tests do
+    return ProductUpdateBuffer(
+        repository,
+        batch_size=10,
+        flush_interval_seconds=60,
+        max_pending=max_pending,
+        put_timeout_seconds=put_timeout_seconds,
+        migration_lock=migration_lock,
+    )
+
+
+def test_updates_of_a_sku_are_coalesced() -> None:
+    repository: RecordingRepository = RecordingRepository()
+    buffer: ProductUpdateBuffer = _buffer(repository)
+
+    buffer.update('A', stock=True)
+    buffer.update('A', num_purchases=3)
+    buffer.update('A', stock=False)
+    buffer.flush()
+
+    assert repository.batches == [{'A': {'stock': False, 'num_purchases': 3}}]
+    assert buffer.stats.coalesced == 2
+    buffer.close()
+
+
+def test_only_hot_fields_are_updated() -> None:
+    buffer: ProductUpdateBuffer = _buffer(RecordingRepository())
+
+    with pytest.raises(ValueError):
+        buffer.update('A', price=1.0)
+    with pytest.raises(ValueError):
+        buffer.update('A', num_purchases='3')
+
+
+def test_failed_flush_is_requeued() -> None:
+    repository: RecordingRepository = RecordingRepository(failures=1)
+    buffer: ProductUpdateBuffer = _buffer(repository)
+    buffer.update('A', stock=True, num_purchases=1)
+    buffer.update('B', stock=False)
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert buffer.stats.pending == 2
+    assert buffer.stats.retried == 2
+
+    buffer.update('A', num_purchases=2)
+    buffer.flush()
+
+    # The update received after the failed flush wins over the requeued one
+    assert repository.batches == [{'A': {'stock': True, 'num_purchases': 2}, 'B': {'stock': False}}]
+    assert buffer.stats.pending == 0
+    buffer.close()
+
+
+def test_close_flushes_pending_updates() -> None:
+    repository: RecordingRepository = RecordingRepository()
+    buffer: ProductUpdateBuffer = _buffer(repository)
+    buffer.update('A', stock=True)
+    buffer.update('B', num_purchases=5)
+
+    buffer.close()
+
+    assert repository.batches == [{'A': {'stock': True}, 'B': {'num_purchases': 5}}]
+    with pytest.raises(RuntimeError):
+        buffer.update('C', stock=True)
+
+
+def test_updates_are_rejected_while_full() -> None:
+    buffer: ProductUpdateBuffer = _buffer(RecordingRepository(), max_pending=1, put_timeout_seconds=0.01)
+    buffer.update('A', stock=True)
+
+    with pytest.raises(ProductUpdatesOverflowError):
+        buffer.update('B', stock=True)
+    assert buffer.stats.rejected == 1
+    buffer.close()
+
+
+def test_flushes_are_held_while_migrating() -> None:
+    repository: RecordingRepository = RecordingRepository()
+    migration_lock: LocalMigrationLock = LocalMigrationLock()
+    buffer: ProductUpdateBuffer = _buffer(repository, migration_lock=migration_lock)
+    buffer.update('A', stock=True)
+
+    migration_lock.acquire()
+    with pytest.raises(ProductUpdatesHeldError):
+        buffer.flush()
+    assert buffer.stats.pending == 1
+
+    migration_lock.release()
+    buffer.close()
+    assert repository.batches == [{'A': {'stock': True}}]
+
+
+def test_close_while_held_keeps_updates_pending() -> None:
+    migration_lock: LocalMigrationLock = LocalMigrationLock()
+    buffer: ProductUpdateBuffer = _buffer(RecordingRepository(), migration_lock=migration_lock)
+    buffer.update('A', stock=True)
+    migration_lock.acquire()
+
+    buffer.close()
+
+    assert buffer.stats.pending == 1
+
+
+def test_in_memory_updates_are_searched() -> None:
+    repository: InMemoryProductRepository = InMemoryProductRepository(catalog_dir=CATALOG_DIR)
+
+    products_update: ProductsUpdate = repository.update_many({
+        'PC45D020000200': {'stock': False},
+        'ZT11142-T0E000FZ': {'num_purchases': 7},
+        'MISSING': {'stock': True},
+    })
+
+    assert products_update.updated == ['PC45D020000200', 'ZT11142-T0E000FZ']
+    assert products_update.not_found == ['MISSING']
+    assert repository.get('PC45D020000200').stock is False  # type: ignore[union-attr]
+    in_stock: ProductsPage = repository.list_page(filter_by='stock:true', sort_by='num_purchases:desc', per_page=10)
+    assert in_stock.found == 4
+    assert in_stock.products[0].sku == 'ZT11142-T0E000FZ'
+    assert in_stock.products[0].num_purchases == 7
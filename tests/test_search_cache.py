@@ -0,0 +1,135 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from store_catalog.adapters.catalog_version import LocalCatalogVersionStore
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.adapters.search_cache import LRUSearchCache
+from store_catalog.adapters.search_cache import search_cache_key
+from store_catalog.domain.model import Product
+from store_catalog.domain.model import ProductsPage
+from store_catalog.service_layer.services import ProductSearcher
+
+CATALOG_DIR: Path = Path(__file__).parent / 'catalog_files'
+SKU: str = 'PC45D020000200'
+
+
+class CountingRepository(InMemoryProductRepository):
+    """Repository counting the lookups and page searches made."""
+
+    def __init__(self) -> None:
+        super().__init__(catalog_dir=CATALOG_DIR)
+        self.gets: int = 0
+        self.pages: int = 0
+
+    def get(self, sku: str) -> Product | None:
+        self.gets += 1
+        return super().get(sku)
+
+    def list_page(self, *args: Any, **kwargs: Any) -> ProductsPage:
+        self.pages += 1
+        return super().list_page(*args, **kwargs)
+
+
+def test_equivalent_searches_share_a_key() -> None:
+    assert search_cache_key(q='  Termica   PC45 ', sort_by='price:asc', page=1) == search_cache_key(
+        page=1,
+        sort_by='price:asc',
+        q='termica pc45',
+    )
+    assert search_cache_key(q=' ') == search_cache_key(q='*')
+    assert search_cache_key(q='termica', page=1) != search_cache_key(q='termica', page=2)
+    assert search_cache_key(SKU) != search_cache_key(q=SKU)
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache: LRUSearchCache = LRUSearchCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats.evictions == 1
+    assert cache.stats.size == 2
+
+
+def test_expired_entries_are_misses() -> None:
+    cache: LRUSearchCache = LRUSearchCache(ttl_seconds=0.01)
+    cache.set('a', 1)
+
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.misses == 1
+
+
+def test_searches_are_served_from_the_cache() -> None:
+    repository: CountingRepository = CountingRepository()
+    searcher: ProductSearcher = ProductSearcher(repository, cache=LRUSearchCache())
+
+    first_page: ProductsPage = searcher.list_page(q='termica', per_page=2)
+    assert searcher.list_page(q='  Termica ', per_page=2) is first_page
+    assert searcher(SKU) is searcher(SKU)
+
+    assert repository.pages == 1
+    assert repository.gets == 1
+
+
+def test_invalidated_cache_searches_again() -> None:
+    repository: CountingRepository = CountingRepository()
+    searcher: ProductSearcher = ProductSearcher(repository, cache=LRUSearchCache())
+    searcher.list_page(per_page=2)
+    searcher(SKU)
+
+    searcher.invalidate_cache()
+    searcher.list_page(per_page=2)
+    searcher(SKU)
+
+    assert repository.pages == 2
+    assert repository.gets == 2
+
+
+def test_updated_products_are_looked_up_again_and_pages_are_kept() -> None:
+    repository: CountingRepository = CountingRepository()
+    catalog_versions: LocalCatalogVersionStore = LocalCatalogVersionStore()
+    searcher: ProductSearcher = ProductSearcher(
+        repository,
+        cache=LRUSearchCache(),
+        catalog_versions=catalog_versions,
+    )
+    searcher.list_page(per_page=2)
+    searcher(SKU)
+    version: int = catalog_versions.get().version
+
+    searcher.invalidate_products([SKU])
+    searcher.list_page(per_page=2)
+    searcher(SKU)
+
+    assert repository.pages == 1
+    assert repository.gets == 2
+    assert catalog_versions.get().version == version
+
+
+def test_bumped_catalog_version_clears_the_caches_of_other_searchers() -> None:
+    repository: CountingRepository = CountingRepository()
+    catalog_versions: LocalCatalogVersionStore = LocalCatalogVersionStore()
+    searcher: ProductSearcher = ProductSearcher(
+        repository,
+        cache=LRUSearchCache(),
+        catalog_versions=catalog_versions,
+    )
+    importer_searcher: ProductSearcher = ProductSearcher(
+        InMemoryProductRepository(catalog_dir=CATALOG_DIR),
+        cache=LRUSearchCache(),
+        catalog_versions=catalog_versions,
+    )
+    searcher.list_page(per_page=2)
+
+    importer_searcher.invalidate_cache()
+    searcher.list_page(per_page=2)
+
+    assert repository.pages == 2
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from store_catalog.adapters.single_flight import SingleFlight
+
+FOLLOWERS: int = 4
+
+
+def test_concurrent_calls_are_coalesced() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=5)
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+    calls: list[int] = []
+
+    def search() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'page'
+
+    with ThreadPoolExecutor(max_workers=FOLLOWERS + 1) as executor:
+        leader = executor.submit(single_flight.do, 'landing', search)
+        assert started.wait(5)
+        followers = [executor.submit(single_flight.do, 'landing', search) for _ in range(FOLLOWERS)]
+        # Time for the followers to wait for the leader
+        time.sleep(0.1)
+        release.set()
+
+        assert leader.result() == 'page'
+        assert [follower.result() for follower in followers] == ['page'] * FOLLOWERS
+
+    assert len(calls) == 1
+    assert single_flight.stats.leaders == 1
+    assert single_flight.stats.coalesced == FOLLOWERS
+    assert single_flight.stats.in_flight == 0
+
+
+def test_error_of_the_leader_is_shared() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=5)
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+    error: RuntimeError = RuntimeError('Typesense is down')
+
+    def failing_search() -> str:
+        started.set()
+        release.wait(5)
+        raise error
+
+    def follower_search() -> str:
+        return 'page'
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, 'landing', failing_search)
+        assert started.wait(5)
+        follower = executor.submit(single_flight.do, 'landing', follower_search)
+        time.sleep(0.1)
+        release.set()
+
+        with pytest.raises(RuntimeError) as leader_error:
+            leader.result()
+        with pytest.raises(RuntimeError) as follower_error:
+            follower.result()
+
+    assert leader_error.value is error
+    assert follower_error.value is error
+    assert single_flight.stats.coalesced == 1
+    assert single_flight.stats.in_flight == 0
+
+
+def test_follower_calls_by_itself_after_timeout() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=0.05)
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+
+    def stuck_search() -> str:
+        started.set()
+        release.wait(5)
+        return 'stuck'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(single_flight.do, 'landing', stuck_search)
+        assert started.wait(5)
+        assert single_flight.do('landing', lambda: 'page') == 'page'
+        release.set()
+        assert leader.result() == 'stuck'
+
+    assert single_flight.stats.timeouts == 1
+
+
+def test_different_keys_are_not_coalesced() -> None:
+    single_flight: SingleFlight = SingleFlight()
+
+    assert single_flight.do('a', lambda: 1) == 1
+    assert single_flight.do('b', lambda: 2) == 2
+    assert single_flight.stats.leaders == 2
+    assert single_flight.stats.coalesced == 0
+
+
+def test_concurrent_tasks_are_coalesced() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=5)
+    calls: list[int] = []
+
+    async def search() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'page'
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(single_flight.do_async('landing', search) for _ in range(FOLLOWERS + 1)))
+
+    assert asyncio.run(main()) == ['page'] * (FOLLOWERS + 1)
+    assert len(calls) == 1
+    assert single_flight.stats.coalesced == FOLLOWERS
+
+
+def test_error_of_the_leader_task_is_shared() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=5)
+
+    async def failing_search() -> str:
+        await asyncio.sleep(0.01)
+        raise RuntimeError('Typesense is down')
+
+    async def main() -> list[str | BaseException]:
+        return await asyncio.gather(
+            *(single_flight.do_async('landing', failing_search) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+    errors: list[str | BaseException] = asyncio.run(main())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert errors[0] is errors[1]
+    assert single_flight.stats.coalesced == 1
+
+
+def test_followers_of_a_cancelled_leader_task_choose_a_new_one() -> None:
+    single_flight: SingleFlight = SingleFlight(timeout_seconds=5)
+
+    async def search() -> str:
+        await asyncio.sleep(0.01)
+        return 'page'
+
+    async def main() -> str:
+        leader: asyncio.Task = asyncio.create_task(single_flight.do_async('landing', search))
+        await asyncio.sleep(0)
+        follower: asyncio.Task = asyncio.create_task(single_flight.do_async('landing', search))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == 'page'
+    assert single_flight.stats.leaders == 2
+    assert single_flight.stats.in_flight == 0
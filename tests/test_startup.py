@@ -0,0 +1,93 @@
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+from store_catalog.adapters.in_memory_repository import InMemoryProductRepository
+from store_catalog.service_layer.startup import FAILED
+from store_catalog.service_layer.startup import READY
+from store_catalog.service_layer.startup import RepositoryUnavailableError
+from store_catalog.service_layer.startup import Startup
+from store_catalog.service_layer.startup import StartupReport
+from store_catalog.service_layer.startup import backoff_delays
+from store_catalog.service_layer.startup import top_queries
+from store_catalog.service_layer.startup import wait_until_healthy
+
+CATALOG_DIR: Path = Path(__file__).parent / 'catalog_files'
+
+
+class StartingRepository(InMemoryProductRepository):
+    """Repository unhealthy for its first ``unhealthy_checks`` health checks."""
+
+    def __init__(self, unhealthy_checks: int = 0) -> None:
+        super().__init__(catalog_dir=CATALOG_DIR)
+        self.unhealthy_checks: int = unhealthy_checks
+
+    def is_healthy(self) -> bool:
+        if self.unhealthy_checks:
+            self.unhealthy_checks -= 1
+            return False
+        return True
+
+
+def test_backoff_delays_grow_with_jitter_up_to_max() -> None:
+    delays: list[float] = list(islice(backoff_delays(1.0, 4.0), 5))
+
+    for delay, exponential_delay in zip(delays, (1.0, 2.0, 4.0, 4.0, 4.0)):
+        assert exponential_delay / 2 <= delay <= exponential_delay
+
+
+def test_health_is_checked_until_healthy() -> None:
+    repository: StartingRepository = StartingRepository(unhealthy_checks=2)
+
+    assert wait_until_healthy(repository.is_healthy, timeout_seconds=5, initial_delay_seconds=0.01) < 5
+    assert repository.unhealthy_checks == 0
+
+
+def test_unhealthy_until_timeout_is_unavailable() -> None:
+    with pytest.raises(RepositoryUnavailableError):
+        wait_until_healthy(lambda: False, timeout_seconds=0.05, initial_delay_seconds=0.01)
+
+
+def test_top_queries_start_with_the_landing_page(tmp_path: Path) -> None:
+    queries_path: Path = tmp_path / 'queries.txt'
+    queries_path.write_text('termica\nzebra\ntermica\nrfid\n', encoding='utf-8')
+
+    assert top_queries(queries_path, top_n=2) == ('', 'termica', 'zebra')
+    assert top_queries(tmp_path / 'missing.txt', top_n=2) == ('',)
+    assert top_queries(None, top_n=2) == ('',)
+
+
+def test_ready_once_queries_are_replayed() -> None:
+    replayed: list[str] = []
+
+    def replay(query: str) -> None:
+        replayed.append(query)
+        if query == 'zebra':
+            raise RuntimeError('Typesense is down')
+
+    startup: Startup = Startup(
+        StartingRepository(unhealthy_checks=1),
+        replay=replay,
+        queries=('', 'termica', 'zebra'),
+        initial_delay_seconds=0.01,
+    )
+    report: StartupReport = startup.run()
+
+    assert report.state == READY
+    assert replayed == ['', 'termica', 'zebra']
+    assert (report.queries, report.failed_queries) == (3, 1)
+
+
+def test_failed_startup_is_reported() -> None:
+    startup: Startup = Startup(
+        StartingRepository(unhealthy_checks=100),
+        timeout_seconds=0.05,
+        initial_delay_seconds=0.01,
+    )
+
+    report: StartupReport = startup.run()
+
+    assert report.state == FAILED
+    assert not report.ready
+    assert report.error is not None
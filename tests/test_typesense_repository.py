@@ -0,0 +1,132 @@
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+
+from benchmarks.catalog_documents import product_documents
+from store_catalog.adapters.repository import ProductMultipleFoundsError
+from store_catalog.adapters.repository import ProductNotFoundError
+from store_catalog.adapters.repository import TypesenseProductRepository
+from store_catalog.adapters.search_cache import LRUSearchCache
+from store_catalog.domain.model import ProductsBySku
+from store_catalog.domain.model import ProductsUpdate
+
+SKUS_FILTER_PATTERN: re.Pattern = re.compile(r'sku:=\[(?P<skus>.*)\]')
+
+
+class FakeDocuments:
+    """Products collection matching SKUs exactly, as Typesense does for a ``sku:=[...]`` filter."""
+
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents: list[dict] = documents
+        self.imported: list[dict] = []
+        self.searches: int = 0
+
+    def search(self, search: dict) -> dict:
+        self.searches += 1
+        skus_match: re.Match | None = SKUS_FILTER_PATTERN.fullmatch(search['filter_by'])
+        assert skus_match is not None
+        skus: set[str] = {sku.strip('`') for sku in skus_match['skus'].split(',')}
+        hits: list[dict] = [{'document': document} for document in self.documents if document['sku'] in skus]
+        start: int = (search['page'] - 1) * search['per_page']
+        return {'found': len(hits), 'hits': hits[start:start + search['per_page']]}
+
+    def import_(self, documents: list[dict], params: dict) -> list[dict]:
+        assert params == {'action': 'update'}
+        self.imported.extend(documents)
+        return [{'success': True} for _ in documents]
+
+
+class FakeMultiSearch:
+    """Multi search recording the searches of every request."""
+
+    def __init__(self, documents: FakeDocuments) -> None:
+        self.documents: FakeDocuments = documents
+        self.requests: list[list[dict]] = []
+
+    def perform(self, body: dict, params: dict) -> dict:
+        self.requests.append(body['searches'])
+        return {'results': [self.documents.search(search) for search in body['searches']]}
+
+
+class FakeTypesenseClient:
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents: FakeDocuments = FakeDocuments(documents)
+        self.collections: dict = {TypesenseProductRepository.COLLECTION_NAME: self}
+        self.multi_search: FakeMultiSearch = FakeMultiSearch(self.documents)
+
+
+class ChunkedRepository(TypesenseProductRepository):
+    SKUS_PER_SEARCH: int = 2
+    SEARCHES_PER_REQUEST: int = 2
+    MAX_PER_PAGE: int = 2
+
+
+def _repository(client: FakeTypesenseClient, sku_cache: LRUSearchCache | None = None) -> ChunkedRepository:
+    @contextmanager
+    def session_factory() -> Iterator[FakeTypesenseClient]:
+        yield client
+
+    return ChunkedRepository(session_factory, sku_cache=sku_cache)  # type: ignore[arg-type]
+
+
+def test_sku_is_matched_exactly_and_cached() -> None:
+    documents: list[dict] = product_documents()
+    client: FakeTypesenseClient = FakeTypesenseClient(documents)
+    repository: ChunkedRepository = _repository(client, sku_cache=LRUSearchCache())
+
+    assert repository.get(documents[0]['sku']).sku == documents[0]['sku']  # type: ignore[union-attr]
+    assert repository.get(documents[0]['sku']).sku == documents[0]['sku']  # type: ignore[union-attr]
+    assert client.documents.searches == 1
+    with pytest.raises(ProductNotFoundError):
+        repository.get(documents[0]['sku'][:-2])
+    with pytest.raises(ProductNotFoundError):
+        repository.get('PC45`')
+    assert client.documents.searches == 2
+
+
+def test_duplicated_sku_is_not_got() -> None:
+    documents: list[dict] = product_documents()
+    client: FakeTypesenseClient = FakeTypesenseClient([*documents, {**documents[0], 'id': 'duplicate'}])
+
+    with pytest.raises(ProductMultipleFoundsError):
+        _repository(client).get(documents[0]['sku'])
+
+
+def test_skus_are_got_in_chunked_multi_searches() -> None:
+    documents: list[dict] = product_documents()
+    client: FakeTypesenseClient = FakeTypesenseClient(documents)
+    skus: list[str] = [document['sku'] for document in documents]
+
+    products_by_sku: ProductsBySku = _repository(client).get_many([*skus, 'MISSING', skus[0]])
+
+    assert list(products_by_sku.products) == skus
+    assert products_by_sku.not_found == ['MISSING']
+    # 6 SKUs in 3 searches of 2 SKUs, sent in 2 requests of 2 searches at most
+    assert [len(searches) for searches in client.multi_search.requests] == [2, 1]
+
+
+def test_duplicated_skus_are_reported() -> None:
+    documents: list[dict] = product_documents()
+    duplicate: dict = {**documents[0], 'id': 'duplicate'}
+    client: FakeTypesenseClient = FakeTypesenseClient([*documents, duplicate, {**duplicate, 'id': 'triplicate'}])
+
+    products_by_sku: ProductsBySku = _repository(client).get_many([documents[0]['sku'], documents[1]['sku']])
+
+    assert products_by_sku.duplicated == [documents[0]['sku']]
+    assert list(products_by_sku.products) == [documents[1]['sku']]
+
+
+def test_updates_are_imported_by_document_id() -> None:
+    documents: list[dict] = product_documents()
+    client: FakeTypesenseClient = FakeTypesenseClient(documents)
+
+    products_update: ProductsUpdate = _repository(client).update_many({
+        documents[0]['sku']: {'stock': False},
+        'MISSING': {'stock': True},
+    })
+
+    assert client.documents.imported == [{'stock': False, 'id': documents[0]['id']}]
+    assert products_update.updated == [documents[0]['sku']]
+    assert products_update.not_found == ['MISSING']
@@ -1,30 +1,17 @@
-import time
-
-from requests.exceptions import ConnectionError
-
 from djangoproject.django_project import container
-from store_catalog.adapters.typesense_database import TypesenseDatabase
-
-
-typesense_database: TypesenseDatabase = container.typesense_database()
+from store_catalog.adapters.repository import AbstractProductRepository
+from store_catalog.service_layer.startup import wait_until_healthy
 
 
 def wait_for_typesense_to_come_up() -> None:
-    deadline: float = time.time() + 10
-    typesense_ok: bool = False
-
-    with typesense_database.session() as session:
-        while time.time() < deadline:
-            try:
-                if not session.operations.is_healthy():
-                    time.sleep(0.5)
-                else:
-                    typesense_ok = True
-            except ConnectionError:
-                time.sleep(0.5)
-
-    if not typesense_ok:
-        raise Exception('Typesense never came up')
+    # Checked with exponential backoff, returning as soon as Typesense is healthy
+    product_repository: AbstractProductRepository = container.product_repository()
+    wait_until_healthy(
+        product_repository.is_healthy,
+        timeout_seconds=container.config.CATALOG_STARTUP_TIMEOUT_SECONDS(),
+        initial_delay_seconds=container.config.CATALOG_STARTUP_INITIAL_DELAY_SECONDS(),
+        max_delay_seconds=container.config.CATALOG_STARTUP_MAX_DELAY_SECONDS(),
+    )
 
 
 if __name__ == '__main__':